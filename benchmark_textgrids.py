@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 16:05:37 2026
+
+@author: Roy Alderton
+
+This script measures how quickly the process_textgrid_tiers_* scripts process
+TextGrids, so that changes that make them slower (or faster) can be spotted.
+
+Instead of using real recordings, it generates a corpus of TextGrids like the
+ones produced by the 'B2P -> MAUS -> PHO2SYLL' pipeline in BAS Web Services,
+with the tiers ORT-MAU, KAN-MAU, KAS-MAU, MAU and MAS. Each TextGrid contains
+the carrier phrase for its language with one of the target words, including
+the words that need word-specific corrections (e.g. 'Leonard' or 'lenfer').
+The sounds are given random durations, so no two files are the same.
+
+Each TextGrid is then processed one after another with the language's
+process_textgrid() function, and the time spent in each stage is added up:
+
+    1. load: reading and parsing the file.
+    2. tiers: deleting and renaming tiers.
+    3. roi: finding the region of interest and adding the PHRASE tier.
+    4. fixes: the simple transcription fixes.
+    5. sound and syllable: the word-specific changes to the sound and
+    syllable tiers.
+    6. write: formatting and writing the file.
+
+The script should be run in the command line by navigating to the folder with
+the processing scripts and entering a command in the following format:
+
+    python benchmark_textgrids.py --files 1000 --languages de en fr
+
+If using Linux, you may need to replace 'python' with 'python3'.
+
+The following options can be added:
+
+    --files: the number of TextGrids generated for each language (default:
+    1000).
+    --languages: the languages to measure (default: de en fr).
+    --words: only use these target words (default: all target words).
+    --input-format: the format of the generated TextGrids, 'long', 'short' or
+    'binary' (default: long).
+    --repeat: how many times to process the corpus. The fastest run is
+    reported (default: 3).
+    --seed: the seed for the random durations (default: 1).
+    --json: also save the results to this JSON file.
+
+The generated TextGrids are deleted at the end.
+
+The textgrid_*.py and stimulus_ids.py modules and the process_textgrid_tiers_*
+scripts must be saved in the same folder as this script.
+
+You may need to install the numpy library if it isn't already on your
+computer. You can do this by entering the following into the command prompt:
+
+    pip install numpy
+
+"""
+
+import os
+import json
+import shutil
+import argparse
+import tempfile
+import importlib
+import numpy as np
+import textgrid_arrays
+import textgrid_batch
+import textgrid_profile
+
+# Carrier phrases for each language, as the words before and after the target
+# word. Each word is given as its spelling and its syllables, and each syllable
+# as a list of the sounds MAUS transcribes in it.
+carrier_phrases = {
+    'de': ([('Er', [['E6']]), ('las', [['l', 'a:', 's']]), ('Kleo', [['k', 'l', 'e:'], ['o:']])],
+           [('zweimal', [['ts', 'v', 'aI'], ['m', 'a:', 'l']]), ('vor', [['f', 'o:6']])]),
+    'en': ([("he'll", [['h', 'l']]), ('tell', [['t', 'E', 'l']]), ('Cleo', [['k', 'l', 'i:'], ['@U']])],
+           [('soon', [['s', 'u', 'n']])]),
+    'fr': ([('je', [['Z', '@']]), ('dis', [['d', 'i']]), ('à', [['a']]), ('Cléo', [['k', 'l', 'e'], ['o', 'z']])],
+           [('samedi', [['s', 'a'], ['m', '@'], ['d', 'i']])]),
+    }
+
+# Target words for each language, as (word, condition, pair number, syllables)
+target_words = {
+    'de': [('Mann', 'fin_nas', 3, [['m', 'a', 'n']]),
+           ('Tat', 'fin_or', 3, [['t', 'a:', 't']]),
+           ('Jacke', 'ini_or', 5, [['dZ', 'a', 'k'], ['@']]),
+           ('Nase', 'ini_nas', 6, [['n', 'a:'], ['z', '@']]),
+           ('Pate', 'ini_or', 6, [['p', 'a:'], ['t', '@']]),
+           ('Kamm', 'fin_nas', 7, [['k', 'a', 'm']])],
+    'en': [('Leonard', 'fin_nas', 1, [['l', 'E'], ['n', '3`']]),
+           ('ringer', 'fin_nas', 2, [['r', 'I'], ['N', '3`']]),
+           ('met', 'fin_or', 4, [['m', 'E', 't']]),
+           ('knot', 'ini_nas', 5, [['n', 'Q', 't']]),
+           ('own', 'fin_nas', 13, [['@U', 'n']]),
+           ('rocky', 'ini_or', 8, [['r', 'Q'], ['k', 'i:']])],
+    'fr': [('lenfer', 'ini_nas', 2, [['l', '@'], ['a~'], ['f', 'e']]),
+           ('yack', 'ini_or', 4, [['i'], ['a', 'k']]),
+           ('laine', 'ini_nas', 6, [['l'], ['a', 'j'], ['n', 'e']]),
+           ('lanis', 'ini_nas', 7, [['l', '@'], ['a'], ['n', 'i']]),
+           ('noeud', 'fin_nas', 9, [['n', '9', 'd']]),
+           ('Yann', 'fin_nas', 11, [['j', 'a~', 'n']]),
+           ('lotte', 'fin_or', 13, [['l', 'O', 't']])],
+    }
+
+
+def make_textgrid(language, word, rng):
+    '''
+    Generates a TextGrid like those produced by MAUS for one stimulus.
+
+    Parameters
+    ----------
+    language : str
+        'de', 'en' or 'fr'.
+    word : tuple
+        The target word, as an entry of target_words.
+    rng : numpy Generator
+        The random number generator used for the durations of the sounds.
+
+    Returns
+    -------
+    tg : TextGrid object from the textgrid_arrays module
+        The generated TextGrid.
+
+    '''
+    before, after = carrier_phrases[language]
+    words = before + [(word[0], word[3])] + after
+
+    # Give each sound a random duration of about 80 ms, and add a pause at the
+    # start and end
+    sounds = [sound for _, syllables in words for syllable in syllables for sound in syllable]
+    durations = np.concatenate([[rng.uniform(0.2, 0.6)], rng.lognormal(np.log(0.08), 0.35, len(sounds)), [rng.uniform(0.2, 0.6)]])
+    boundaries = np.concatenate([[0.0], np.cumsum(durations)]).round(6)
+
+    mau = ['<p:>'] + sounds + ['<p:>']
+    word_bounds = [0, 1]
+    syllable_bounds = [0, 1]
+    ort = ['']
+    kan = ['']
+    kas = ['']
+    mas = ['']
+    position = 1
+    for spelling, syllables in words:
+        for syllable in syllables:
+            position += len(syllable)
+            syllable_bounds.append(position)
+            mas.append(' '.join(syllable))
+        word_bounds.append(position)
+        ort.append(spelling)
+        kan.append(' '.join(sound for syllable in syllables for sound in syllable))
+        kas.append(' . '.join(' '.join(syllable) for syllable in syllables))
+    word_bounds.append(position + 1)
+    syllable_bounds.append(position + 1)
+    for tier in (ort, kan, kas, mas):
+        tier.append('')
+
+    tg = textgrid_arrays.TextGrid(xmin = 0.0, xmax = float(boundaries[-1]))
+    word_bounds = np.array(word_bounds)
+    syllable_bounds = np.array(syllable_bounds)
+    for name, texts, bounds in (('ORT-MAU', ort, word_bounds), ('KAN-MAU', kan, word_bounds), ('KAS-MAU', kas, word_bounds)):
+        tg[name] = textgrid_arrays.Tier.from_arrays(boundaries[bounds[:-1]], boundaries[bounds[1:]], texts)
+    tg['MAU'] = textgrid_arrays.Tier.from_arrays(boundaries[:-1], boundaries[1:], mau)
+    tg['MAS'] = textgrid_arrays.Tier.from_arrays(boundaries[syllable_bounds[:-1]], boundaries[syllable_bounds[1:]], mas)
+    return tg
+
+
+def make_corpus(path, language, n_files, words = None, file_format = 'long', seed = 1):
+    '''
+    Generates a folder of TextGrids with make_textgrid(), named like the real
+    recordings (e.g. '0003de_nasals_fin_nas_p03_Mann_1_07__01.TextGrid').
+
+    Parameters
+    ----------
+    path : str
+        The folder to save the TextGrids in.
+    language : str
+        'de', 'en' or 'fr'.
+    n_files : int
+        The number of TextGrids.
+    words : list, optional
+        Only use the target words in this list. The default is None (use all
+        target words).
+    file_format : str, optional
+        The format of the TextGrids ('long', 'short' or 'binary'). The default
+        is 'long'.
+    seed : int, optional
+        The seed for the random durations. The default is 1.
+
+    Returns
+    -------
+    file_list : list
+        The file names of the generated TextGrids.
+
+    '''
+    stimuli = [word for word in target_words[language] if words is None or word[0] in words]
+    if not stimuli:
+        raise ValueError('none of the given words are target words for {}'.format(language))
+
+    rng = np.random.default_rng(seed)
+    os.makedirs(path, exist_ok = True)
+    file_list = []
+    for number in range(n_files):
+        word = stimuli[number % len(stimuli)]
+        speaker = number // (len(stimuli) * 3) + 1
+        block = number // len(stimuli) % 3 + 1
+        file = '{:04d}{}_nasals_{}_p{:02d}_{}_{}_{:02d}__01.TextGrid'.format(speaker, language, word[1], word[2], word[0], block, number % len(stimuli) + 1)
+        make_textgrid(language, word, rng).write(os.path.join(path, file), file_format)
+        file_list.append(file)
+    return file_list
+
+
+def run_benchmark(language, path, file_list, repeat = 3):
+    '''
+    Processes a folder of TextGrids with the language's process_textgrid()
+    function and measures the time spent in each stage.
+
+    Parameters
+    ----------
+    language : str
+        'de', 'en' or 'fr'.
+    path : str
+        The folder with the TextGrids. The processed TextGrids are written to
+        a sub-folder, so the originals can be processed again.
+    file_list : list
+        The file names of the TextGrids.
+    repeat : int, optional
+        How many times to process the TextGrids. The default is 3.
+
+    Returns
+    -------
+    result : dict
+        The number of files, the total time of the fastest run, the number of
+        files processed per second and the time spent in each stage.
+
+    '''
+    process_textgrid = importlib.import_module('process_textgrid_tiers_' + language).process_textgrid
+    output_path = os.path.join(path, 'processed')
+    os.makedirs(output_path, exist_ok = True)
+
+    best = None
+    for _ in range(repeat):
+        timer = textgrid_profile.StageTimer()
+        for file in file_list:
+            result = textgrid_batch.process_file(file, process_textgrid, path, output_path, timer = timer)
+            if result['error'] is not None:
+                raise RuntimeError('{} could not be processed: {}'.format(file, result['error']))
+        total = sum(timer.times.values())
+        if best is None or total < best[0]:
+            best = (total, timer.times)
+
+    total, stages = best
+    return {'files': len(file_list),
+            'seconds': total,
+            'files_per_second': len(file_list) / total if total else float('inf'),
+            'stages': stages}
+
+
+def format_result(language, result):
+    '''Returns a table of the results for one language as text.'''
+    lines = ['\n{}: {} files in {:.2f} s ({:.0f} files/s)'.format(language, result['files'], result['seconds'], result['files_per_second']),
+             '    {:<10} {:>10} {:>14} {:>7}'.format('stage', 'total (s)', 'per file (ms)', 'share')]
+    for stage, seconds in result['stages'].items():
+        lines.append('    {:<10} {:>10.3f} {:>14.3f} {:>6.1f}%'.format(stage, seconds, 1000 * seconds / result['files'], 100 * seconds / result['seconds']))
+    return '\n'.join(lines)
+
+
+# Generate and process a corpus for each language
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Measure how quickly synthetic MAUS TextGrids are processed.')
+    parser.add_argument('--files', type = int, default = 1000, help = 'number of TextGrids per language (default: 1000)')
+    parser.add_argument('--languages', nargs = '+', choices = sorted(target_words), default = sorted(target_words), help = 'languages to measure (default: all)')
+    parser.add_argument('--words', nargs = '+', default = None, help = 'only use these target words (default: all)')
+    parser.add_argument('--input-format', choices = textgrid_arrays.file_formats, default = 'long', help = 'format of the generated TextGrids (default: long)')
+    parser.add_argument('--repeat', type = int, default = 3, help = 'number of runs, of which the fastest is reported (default: 3)')
+    parser.add_argument('--seed', type = int, default = 1, help = 'seed for the random durations (default: 1)')
+    parser.add_argument('--json', default = None, help = 'also save the results to this JSON file')
+    args = parser.parse_args()
+
+    results = {}
+    for language in args.languages:
+        path = tempfile.mkdtemp(prefix = 'benchmark_' + language + '_')
+        try:
+            words = None
+            if args.words:
+                words = [word for word in args.words if word in {entry[0] for entry in target_words[language]}]
+                if not words:
+                    print('\nSkipping {}, as none of the given words are {} target words.'.format(language, language))
+                    continue
+            file_list = make_corpus(path, language, args.files, words, args.input_format, args.seed)
+            results[language] = run_benchmark(language, path, file_list, args.repeat)
+            print(format_result(language, results[language]))
+        finally:
+            shutil.rmtree(path, ignore_errors = True)
+
+    if args.json:
+        with open(args.json, 'w', encoding = 'UTF-8') as outfile:
+            json.dump({'settings': vars(args), 'results': results}, outfile, indent = 1)
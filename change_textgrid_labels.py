@@ -10,27 +10,36 @@ the item numbers of its corresponding mono WAV files.
 This script is designed to modify the labels of TextGrids for long stereo files 
 recorded for each block in the nasalance experiment (e.g. 0012_nasalance_1). 
 These TextGrids are generated by Praat's 'Annotate to TextGrid (silences)...'
-function. The script assumes the following:
+function, or by textgrid_silences.py, which does the same for all the block
+recordings in a folder at once. The script assumes the following:
     
     1. The TextGrid contains a 'silence' tier which alternates between blank
     intervals corresponding to silence / unneeded noise, and intervals labelled
     'speech' corresponding to all (and only) the items in the block.
     
-    2. The TextGrid's file name contains '_x', where x is the block number.
+    2. The TextGrid's file name starts with the speaker ID and contains '_x',
+    where x is the block number (e.g. 0012_nasalance_1).
     
     3. Within the same folder as the TextGrid is a sub-folder called 'RECS_mono'
     which contains mono WAV files recorded by the main microphone, not the
     nasometer. The order of these WAV files' 'date modified' attribute
     corresponds to the order in which the items were recorded.
     
-    4. Each WAV file name contains '_x_', where x is the block number.
+    4. Each WAV file name contains '_x_', where x is the block number (as in
+    the file names parsed by the stimulus_ids module, e.g.
+    0012de_nasals_fin_nas_p03_Mann_1_03__01.wav). If the WAV file names
+    start with a speaker ID, only the WAV files of the TextGrid's speaker are
+    used.
     
     5. The TextGrid and WAV file names do not use '_x_' to refer to anything
-    else other than the block number. Note that x is only one digit.
+    else other than the block number. x can have any number of digits.
     
 The script will produce a new TextGrid file with the same name as the original
 TextGrid but with '_labelled' appended to the end.
 
+The nasalance of each item can then be measured from the labelled TextGrid and
+the stereo recording with textgrid_nasalance.py.
+
 The script should be run in the command line by navigating to the correct
 folder and entering a command in the following format:
     
@@ -40,70 +49,182 @@ An example for German speaker 12, block 1 in Windows is shown below:
     
     python change_textgrid_labels.py 0012_nasalance_1.TextGrid
     
+Several TextGrids (e.g. all the blocks of one or more speakers) can be
+labelled in one run by giving all their names, or by giving none, in which
+case every TextGrid in the folder with a block number in its name is labelled
+(except ones that have already been labelled), e.g.:
+    
+    python change_textgrid_labels.py 0012_nasalance_1.TextGrid 0012_nasalance_2.TextGrid
+    python change_textgrid_labels.py
+    
+The RECS_mono folder is only listed once per run, however many TextGrids are
+labelled: the file names and modification times are read in one pass with
+os.scandir() and the WAV files are sorted and grouped by block once, rather
+than looking up every file again for each TextGrid.
+    
 If using Linux, you may need to replace 'python' with 'python3'.
 
 You may not be able to run this file from the IPS server, in which case,
 just copy everything to your computer and run it locally.
 
+The stimulus_ids.py module must be saved in the same folder as this script.
+
 You may need to install the textgrids library if it isn't already on your
 computer. You can do this by typing the following into the command prompt:
     
     pip install textgrids
 """
 
-import sys
 import os
 import re
+import argparse
 import textgrids
-
-textgrid_name = sys.argv[1]
-
-# specify textgrid_name for testing
-#textgrid_name = '0012_nasalance_3_copy.TextGrid'
-
-# Define the name for the new TextGrid file to be created
-new_textgrid_name = textgrid_name[:-9] + '_labelled.TextGrid'
+import stimulus_ids
 
 # Get the name of the directory containing the WAV files
-dir_name = "RECS_mono/"
-
-# Get the block ID (as '_1_', '_2_' or '_3_') from the TextGrid file name
-block_id = re.search(r'_\d', textgrid_name).group() + '_'
-print('block_id =', block_id)
-
-# Get list of all files in dir_name
-list_of_files = filter(lambda x: os.path.isfile(os.path.join(dir_name, x)), os.listdir(dir_name))
-
-# Sort list of files based on last modification time in ascending order (earliest first)
-list_of_files = sorted(list_of_files, key = lambda x: os.path.getmtime(os.path.join(dir_name, x)))
-  
-# Remove practice and instruction items from the list
-# Also remove the '.wav' extension from the file names
-wav_list = [i[:-4] for i in list_of_files if 'practice' not in i and 'instr' not in i]
-
-# Remove items from the list that aren't from the same block as the TextGrid
-block_wav_list = [i for i in wav_list if block_id in i]
-
-# Duplicate and merge block_wav_list so that each list item appears twice consecutively
-# E.g. [list1-item1, list2-item1, list1-item2, list2-item2], etc
-# This is required because this list needs to be the same length as the number of intervals in the TextGrid, which always alternates between speech and silence
-# The TextGrid cannot be filtered as far as I can work out
-block_wav_list_doubled = [None] * (len(block_wav_list) + len(block_wav_list))
-block_wav_list_doubled[::2] = block_wav_list
-block_wav_list_doubled[1::2] = block_wav_list
-
-# Load TextGrid
-tg = textgrids.TextGrid(textgrid_name)
-
-# Overwrite the 'speech' text in each interval on the 'silences' tier
-for file_name, interval in zip(block_wav_list_doubled, tg['silences']):
-    if interval.text == 'speech':
-        interval.text = file_name
-
-# Print the new interval text to check whether it's done it correctly
-for interval in tg['silences']:
-    if interval.text != '':
-        print(interval.text)
-
-# Save the changes as a new TextGrid file
-tg.write(new_textgrid_name)
\ No newline at end of file
+dir_name = "RECS_mono"
+
+# Regex patterns for the speaker ID and block number of a TextGrid (e.g.
+# 0012_nasalance_1), and for the block number of a WAV file whose name can't
+# be parsed by the stimulus_ids module
+speaker_pattern = re.compile(r'^\d+')
+textgrid_block_pattern = re.compile(r'_(\d+)')
+wav_block_pattern = re.compile(r'_(\d+)_')
+
+
+def textgrid_block(textgrid_name):
+    '''
+    Returns the speaker ID (or None) and the block number of a TextGrid from
+    its file name, or None if the name has no block number.
+    '''
+    name = os.path.basename(textgrid_name)
+    block = textgrid_block_pattern.search(name)
+    if block is None:
+        return None
+    speaker = speaker_pattern.match(name)
+    return speaker.group() if speaker else None, int(block.group(1))
+
+
+def scan_wav_files(path):
+    '''
+    Lists the WAV files in a folder in the order they were recorded, grouped
+    by block, in one pass over the folder.
+
+    Parameters
+    ----------
+    path : str
+        The folder with the WAV files (e.g. RECS_mono).
+
+    Returns
+    -------
+    blocks : dict
+        For each block number, a list of (speaker, name) tuples for the WAV
+        files of that block, where name is the file name without '.wav' and
+        speaker is the speaker ID at the start of it (or None), in ascending
+        order of their 'date modified' attribute (earliest first). Practice
+        and instruction items are left out.
+
+    '''
+    # Get the name and modification time of every file in one pass. The stat
+    # results are cached by the directory entries, so each file is only
+    # looked up once.
+    with os.scandir(path) as entries:
+        files = [(entry.stat().st_mtime, entry.name) for entry in entries if entry.is_file()]
+
+    # Sort list of files based on last modification time in ascending order (earliest first)
+    files.sort(key = lambda file: file[0])
+
+    # Remove practice and instruction items from the list
+    # Also remove the '.wav' extension from the file names
+    blocks = {}
+    for _, name in files:
+        if 'practice' in name or 'instr' in name:
+            continue
+        name = name[:-4]
+        stimulus_id = stimulus_ids.parse_stimulus_id(name)
+        block = stimulus_id.block
+        if block is None:
+            match = wav_block_pattern.search(name)
+            if match is None:
+                continue
+            block = int(match.group(1))
+        blocks.setdefault(block, []).append((stimulus_id.speaker, name))
+    return blocks
+
+
+def label_textgrid(textgrid_name, blocks):
+    '''
+    Relabels the 'speech' intervals of a TextGrid with the names of the WAV
+    files of its block and saves it as a new TextGrid.
+
+    Parameters
+    ----------
+    textgrid_name : str
+        The path of the TextGrid.
+    blocks : dict
+        The WAV files in the RECS_mono folder, from scan_wav_files().
+
+    Returns
+    -------
+    new_textgrid_name : str
+        The path of the new TextGrid.
+
+    '''
+    # Define the name for the new TextGrid file to be created
+    new_textgrid_name = textgrid_name[:-9] + '_labelled.TextGrid'
+
+    # Get the speaker ID and block number from the TextGrid file name
+    speaker, block = textgrid_block(textgrid_name)
+    print('block =', block)
+
+    # Get the items from the same block (and speaker) as the TextGrid
+    block_wav_list = [name for wav_speaker, name in blocks.get(block, []) if speaker is None or wav_speaker in (None, speaker)]
+
+    # Duplicate and merge block_wav_list so that each list item appears twice consecutively
+    # E.g. [list1-item1, list2-item1, list1-item2, list2-item2], etc
+    # This is required because this list needs to be the same length as the number of intervals in the TextGrid, which always alternates between speech and silence
+    # The TextGrid cannot be filtered as far as I can work out
+    block_wav_list_doubled = [None] * (len(block_wav_list) + len(block_wav_list))
+    block_wav_list_doubled[::2] = block_wav_list
+    block_wav_list_doubled[1::2] = block_wav_list
+
+    # Load TextGrid
+    tg = textgrids.TextGrid(textgrid_name)
+
+    # Overwrite the 'speech' text in each interval on the 'silences' tier
+    for file_name, interval in zip(block_wav_list_doubled, tg['silences']):
+        if interval.text == 'speech':
+            interval.text = file_name
+
+    # Print the new interval text to check whether it's done it correctly
+    for interval in tg['silences']:
+        if interval.text != '':
+            print(interval.text)
+
+    # Save the changes as a new TextGrid file
+    tg.write(new_textgrid_name)
+    return new_textgrid_name
+
+
+# Label the TextGrids given (or all the TextGrids in the folder)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Relabel the items in TextGrids of block recordings with the names of their WAV files.')
+    parser.add_argument('textgrids', nargs = '*',
+                        help = 'the TextGrids to label (default: every TextGrid in the folder with a block number that has not been labelled yet)')
+    args = parser.parse_args()
+
+    textgrid_names = args.textgrids
+    if not textgrid_names:
+        textgrid_names = sorted(file for file in os.listdir('.') if file.endswith('.TextGrid') and not file.endswith('_labelled.TextGrid') and textgrid_block(file) is not None)
+
+    # List each RECS_mono folder only once, however many TextGrids use it
+    wav_folders = {}
+    for textgrid_name in textgrid_names:
+        if textgrid_block(textgrid_name) is None:
+            print('Skipping {}: no block number in the file name.'.format(textgrid_name))
+            continue
+        wav_dir = os.path.join(os.path.dirname(textgrid_name), dir_name)
+        if wav_dir not in wav_folders:
+            wav_folders[wav_dir] = scan_wav_files(wav_dir)
+        print('\n' + textgrid_name)
+        print('Saved', label_textgrid(textgrid_name, wav_folders[wav_dir]))
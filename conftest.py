@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 23:41:05 2026
+
+@author: Roy Alderton
+
+Shared fixtures for the tests. The TextGrids are generated with
+benchmark_textgrids.py, so they are like the ones produced by MAUS (with the
+tiers ORT-MAU, KAN-MAU, KAS-MAU, MAU and MAS) without needing real recordings.
+
+The tests can be run by navigating to this folder and entering:
+
+    python -m pytest
+"""
+
+import pytest
+import benchmark_textgrids
+
+
+@pytest.fixture
+def make_corpus(tmp_path):
+    '''
+    Returns a function that generates a folder of TextGrids for a language
+    and returns the folder and the file names (see
+    benchmark_textgrids.make_corpus()).
+    '''
+    def make(language, n_files = None, folder = 'TextGrids', **options):
+        if n_files is None:
+            n_files = len(benchmark_textgrids.target_words[language])
+        path = str(tmp_path / folder)
+        return path, benchmark_textgrids.make_corpus(path, language, n_files, **options)
+    return make
@@ -33,40 +33,136 @@ folder and entering a command in the following format:
     
 If using Linux, you may need to replace 'python' with 'python3'.
 
+The files are processed in parallel, using one process per processor core. To
+use fewer processes (e.g. to keep the computer usable while the script runs),
+add the --jobs option, e.g.:
+    
+    python process_textgrid_tiers_de.py --jobs 2
+
+If a file can't be processed (e.g. because MAUS has missed one of the sounds
+used to find the region of interest), the script carries on with the other
+files and lists the failed files and their errors at the end. The failed files
+are left unchanged.
+
+The script keeps a record of the files it has processed in a file called
+'processing_manifest.json' in the output folder. If the script is run again
+(e.g. after more TextGrids have come back from WebMAUS), only new or changed
+TextGrids are processed, unless the script itself has been edited since the
+last run. To process every file again, add the --force option.
+
+If a run is interrupted (e.g. by a crash or a power cut), just run the script
+again and it will carry on where it stopped. Each TextGrid is only replaced
+once its processed version has been written completely, and the files
+processed so far are noted in 'processing_journal.jsonl' until the manifest
+is saved, so no file is left half-processed or processed twice.
+
+The processed TextGrids are written in Praat's long text format. To write them
+in Praat's more compact short text or binary format instead (e.g. for
+intermediate files that will be processed further), add the --format option,
+e.g.:
+    
+    python process_textgrid_tiers_de.py --format binary
+
+TextGrids in any of these formats can be read by the script.
+
+To export every interval of the processed TextGrids to one table for analysis
+(see textgrid_export.py), add the --export option, e.g.:
+    
+    python process_textgrid_tiers_de.py --export tiers.npz
+
+To save the durations in the region of interest of each processed TextGrid
+(the phrase, the target sound and the sound before it) to one table, with one
+row per file (see textgrid_measure.py), add the --measure option, e.g.:
+    
+    python process_textgrid_tiers_de.py --measure durations.csv
+
+To see how long each stage (loading, renaming tiers, finding the region of
+interest, the fixes, the sound and syllable tiers, writing) takes, add the
+--profile option, optionally followed by the name of a JSON file for the
+summary (default: profile.json). The progress is printed every few seconds,
+with the number of files processed per second and the estimated time left:
+
+    python process_textgrid_tiers_de.py --profile
+
+To keep the script running during a recording session and process each new
+TextGrid as soon as it is saved in the folder, add the --watch option. A file
+is processed once it hasn't changed for two seconds (or the number of seconds
+given after --watch). Press Ctrl+C to stop the script:
+
+    python process_textgrid_tiers_de.py --watch
+
 You may not be able to run this file from the IPS server, in which case,
 just copy everything to your computer and run it locally.
 
-You may need to install the textgrids library if it isn't already on your
+If you do run it on TextGrids on a network drive, the script reads the next
+few files and writes the finished ones while it processes each file, so it
+spends less time waiting for the network. The number of files read ahead can
+be changed with the --prefetch option (0 turns this off).
+
+The TextGrids can also be read from a single bundle file made with
+textgrid_bundle.py (e.g. one per speaker), which is much quicker to read and
+write than hundreds of separate files, by adding the --bundle option followed
+by the bundle, e.g.:
+
+    python process_textgrid_tiers_de.py --bundle 0012.tgb
+
+In this case, the bundle is replaced with the processed one once all the
+TextGrids have been processed.
+
+The results of a WebMAUS batch run can be processed straight from the zip (or
+tar) archive they are downloaded in, without extracting it first, by adding
+the --archive option followed by the archive. The processed TextGrids are
+written to a new folder named after the archive (e.g. results_processed), so
+that they are kept apart from the TextGrids that the script processes without
+--archive, or to a new archive or folder given with the --output option, e.g.:
+
+    python process_textgrid_tiers_de.py --archive results.zip --output processed.zip
+
+The script loads and writes the TextGrids with the textgrid_arrays.py module,
+which stores each tier as arrays rather than as one Python object per
+interval. This makes large folders of TextGrids much quicker to process. The
+textgrid_*.py and stimulus_ids.py modules used by this script must be saved
+in the same folder as this script.
+
+You may need to install the numpy library if it isn't already on your
 computer. You can do this by entering the following into the command prompt:
     
-    pip install praat-textgrids
-    
-There is currently a bug in the library's set-up files that causes some Windows
-computers to fail to install the library correctly via pip. If this occurs,
-download the library as a zip file from the project's GitHub page and then 
-extract it manually to the relevant folder in your computer's Python 
-installation. See links below for details.
-
-https://github.com/Legisign/Praat-textgrids
-https://youtu.be/DKR0VYSOqLc
+    pip install numpy
 
 """
 
-import os
-import textgrids
+import textgrid_arrays
+import textgrid_batch
+import textgrid_profile
+import textgrid_roi
 
 # Specify folder path where the TextGrids are located
 path = "TextGrids/"
-dir_list = os.listdir(path)
 
-# Get a list of TextGrid files in the folder
-tg_list = [file for file in dir_list if 'practice' not in file and file.endswith('.TextGrid')]
+# Specify the region of interest, which starts at the [e:] in 'Kleo' and ends
+# at the target nasal sound or its oral counterpart (see process_textgrid()
+# for details)
+region_of_interest = textgrid_roi.RegionOfInterest(start_labels = ['e:'], end_labels = ['m', 'n', 'N', 'p', 't', 'k', 'x'], end_index = 1)
 
-# For each TextGrid file in the list...
-for file in tg_list:
-    
-    # Load the file as a TextGrid in Python
-    tg = textgrids.TextGrid(path + file)
+def process_textgrid(tg, file, timer = textgrid_profile.no_timer):
+    """
+    Applies the steps listed in the preamble to one German TextGrid.
+
+    Parameters
+    ----------
+    tg : TextGrid object from the textgrid_arrays module
+        The loaded TextGrid, which is changed in place.
+    file : str
+        The file name of the TextGrid.
+    timer : StageTimer object from the textgrid_profile module, optional
+        Measures how long each stage takes. The default is no_timer, which
+        measures nothing.
+
+    Returns
+    -------
+    None.
+
+    """
     
     # Delete the unneeded tiers
     del tg['KAN-MAU']
@@ -74,51 +170,41 @@ for file in tg_list:
     
     # Rename the word tier
     tg['WORD'] = tg.pop('ORT-MAU')
+    timer.lap('tiers')
        
     # Get the end time of the final interval on the sound (MAU) tier.
     # This is so that the end time of the new phrase tier can be specified 
     # correctly.
     file_end = tg['MAU'][-1].xmax
     
-    # Get the start time of [e:] intervals on the sound (MAU) tier.
-    # The first of these (corresponding to the [e:] in 'Kleo' will be used as 
-    # the start of the 'phrase' interval on the phrase tier.
-    e_start_time = []
-    for interval in tg['MAU']:
-        if interval.text == 'e:':
-            e_start_time.append(interval.xmin)   
-    
-    # Get the end time of the target nasal / oral interval on the sound (MAU) 
-    # tier.
-    # This will be used as the end of the 'phrase' interval on the phrase tier.
-    nasals_orals = ['m', 'n', 'N', 'p', 't', 'k', 'x']
-    nasal_oral_end_time = []
-    for interval in tg['MAU']:
-        if interval.text in nasals_orals:
-            nasal_oral_end_time.append(interval.xmax)    
+    # Find the start and end times of the region of interest on the sound
+    # (MAU) tier. These will be used as the boundaries of the 'phrase' interval
+    # on the phrase tier.
     
-    # Specify the three intervals for the new phrase tier
+    # The first [e:] is used as the start, i.e. the [e:] in 'Kleo'. This is
+    # because some items have another [e:] later (e.g. 'Meter').
     
-    # The first item (index [0]) in e_start_time is used, i.e. the [e:] in
-    # 'Kleo'. This is because some items have another [e:] later (e.g. 'Meter').
-    
-    # The second item (index [1]) in nasal_oral_end_time is used.
+    # The second nasal / oral sound (index [1]) is used as the end.
     # This is because all items have a [k] in Kleo, then the target, then 
     # potentially more of the same sound (e.g. another [t] in 'Tat'), then the
     # [m] in 'zweimal'. However, these other sounds always come after our 
     # target sound in the region of interest, so index [1] is reliable.
+    phrase_start, phrase_end = region_of_interest.find(tg['MAU'], file)
     
-    interval_1 = textgrids.Interval(text = '', xmin = 0.0, xmax = e_start_time[0])
-    interval_2 = textgrids.Interval(text = 'phrase', xmin = e_start_time[0], xmax = nasal_oral_end_time[1])
-    interval_3 = textgrids.Interval(text = '', xmin = nasal_oral_end_time[1], xmax = file_end)
+    # Specify the three intervals for the new phrase tier
+    interval_1 = textgrid_arrays.Interval(text = '', xmin = 0.0, xmax = phrase_start)
+    interval_2 = textgrid_arrays.Interval(text = 'phrase', xmin = phrase_start, xmax = phrase_end)
+    interval_3 = textgrid_arrays.Interval(text = '', xmin = phrase_end, xmax = file_end)
     
     # Specify the new phrase tier with the three intervals
-    tg['PHRASE'] = textgrids.Tier(data = [interval_1, interval_2, interval_3])
+    tg['PHRASE'] = textgrid_arrays.Tier(data = [interval_1, interval_2, interval_3])
+    timer.lap('roi')
     
     # Over-write 'dZ a k' with 'j U k' on the syllable tier
     for interval in tg['MAS']:
         if interval.text == 'dZ a k':
             interval.text = 'j U k'
+    timer.lap('syllable')
             
     # Over-write ['dZ', 'a', 'k'] with ['j', 'U', 'k'] on the sound tier    
     for count, interval in enumerate(tg['MAU']):
@@ -127,19 +213,21 @@ for file in tg_list:
     for interval in tg['MAU']:
         if interval.text == 'dZ':
             interval.text = 'j'
+    timer.lap('sound')
             
     # Over-write empty labels on the word tier with '<p:>'
     for interval in tg['WORD']:
         if interval.text == '':
             interval.text = '<p:>'
+    timer.lap('fixes')
     
     # Rename the sound and syllable tiers
     # This has to be done last to preserve the tier order.
     tg['SOUND'] = tg.pop('MAU')
     tg['SYLLABLE'] = tg.pop('MAS')
-    
-    # Write the new TextGrid in the TextGrids folder (over-writing the old file)    
-    tg.write(path + file)
-    
-    # Print a message to check that the file has been successfully processed
-    print('Successfully processed {}!'.format(file))
\ No newline at end of file
+    timer.lap('tiers')
+
+
+# Process each TextGrid file in the folder (over-writing the old files)
+if __name__ == '__main__':
+    textgrid_batch.main(process_textgrid, path, description = 'Process German MAUS TextGrids.')
\ No newline at end of file
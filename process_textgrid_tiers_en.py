@@ -34,82 +34,268 @@ folder and entering a command in the following format:
     
 If using Linux, you may need to replace 'python' with 'python3'.
 
+The files are processed in parallel, using one process per processor core. To
+use fewer processes (e.g. to keep the computer usable while the script runs),
+add the --jobs option, e.g.:
+    
+    python process_textgrid_tiers_en.py --jobs 2
+
+If a file can't be processed (e.g. because MAUS has missed one of the sounds
+used to find the region of interest), the script carries on with the other
+files and lists the failed files and their errors at the end. The failed files
+are left unchanged.
+
+The script keeps a record of the files it has processed in a file called
+'processing_manifest.json' in the output folder. If the script is run again
+(e.g. after more TextGrids have come back from WebMAUS), only new or changed
+TextGrids are processed, unless the script itself has been edited since the
+last run. To process every file again, add the --force option.
+
+If a run is interrupted (e.g. by a crash or a power cut), just run the script
+again and it will carry on where it stopped. Each TextGrid is only replaced
+once its processed version has been written completely, and the files
+processed so far are noted in 'processing_journal.jsonl' until the manifest
+is saved, so no file is left half-processed or processed twice.
+
+The processed TextGrids are written in Praat's long text format. To write them
+in Praat's more compact short text or binary format instead (e.g. for
+intermediate files that will be processed further), add the --format option,
+e.g.:
+    
+    python process_textgrid_tiers_en.py --format binary
+
+TextGrids in any of these formats can be read by the script.
+
+To export every interval of the processed TextGrids to one table for analysis
+(see textgrid_export.py), add the --export option, e.g.:
+    
+    python process_textgrid_tiers_en.py --export tiers.npz
+
+To save the durations in the region of interest of each processed TextGrid
+(the phrase, the target sound and the sound before it) to one table, with one
+row per file (see textgrid_measure.py), add the --measure option, e.g.:
+    
+    python process_textgrid_tiers_en.py --measure durations.csv
+
+To see how long each stage (loading, renaming tiers, finding the region of
+interest, the fixes, the sound and syllable tiers, writing) takes, add the
+--profile option, optionally followed by the name of a JSON file for the
+summary (default: profile.json). The progress is printed every few seconds,
+with the number of files processed per second and the estimated time left:
+
+    python process_textgrid_tiers_en.py --profile
+
+To keep the script running during a recording session and process each new
+TextGrid as soon as it is saved in the folder, add the --watch option. A file
+is processed once it hasn't changed for two seconds (or the number of seconds
+given after --watch). Press Ctrl+C to stop the script:
+
+    python process_textgrid_tiers_en.py --watch
+
 You may not be able to run this file from the IPS server, in which case,
 just copy everything to your computer and run it locally.
 
-You may need to install the textgrids library if it isn't already on your
+If you do run it on TextGrids on a network drive, the script reads the next
+few files and writes the finished ones while it processes each file, so it
+spends less time waiting for the network. The number of files read ahead can
+be changed with the --prefetch option (0 turns this off).
+
+The TextGrids can also be read from a single bundle file made with
+textgrid_bundle.py (e.g. one per speaker), which is much quicker to read and
+write than hundreds of separate files, by adding the --bundle option followed
+by the bundle, e.g.:
+
+    python process_textgrid_tiers_en.py --bundle 0012.tgb
+
+In this case, the bundle is replaced with the processed one once all the
+TextGrids have been processed.
+
+The results of a WebMAUS batch run can be processed straight from the zip (or
+tar) archive they are downloaded in, without extracting it first, by adding
+the --archive option followed by the archive. The processed TextGrids are
+written to a new folder named after the archive (e.g. results_processed), so
+that they are kept apart from the TextGrids that the script processes without
+--archive, or to a new archive or folder given with the --output option, e.g.:
+
+    python process_textgrid_tiers_en.py --archive results.zip --output processed.zip
+
+The boundaries of the sounds that the script adds ([i:] in "he'll" and [d] in
+'Leonard') are put at a fixed proportion of the interval they are split from.
+To place them where the sound changes most in the recording instead, add the
+--acoustic-boundaries option, optionally followed by the feature to use
+(energy, spectral or zcr; default: energy), e.g.:
+
+    python process_textgrid_tiers_en.py --acoustic-boundaries spectral
+
+The WAV file of each TextGrid must be saved in the same folder with the same
+name. See the textgrid_audio.py module for details.
+
+The script loads and writes the TextGrids with the textgrid_arrays.py module,
+which stores each tier as arrays rather than as one Python object per
+interval. This makes large folders of TextGrids much quicker to process. The
+textgrid_*.py and stimulus_ids.py modules used by this script must be saved
+in the same folder as this script.
+
+You may need to install the numpy library if it isn't already on your
 computer. You can do this by entering the following into the command prompt:
     
-    pip install praat-textgrids
-    
-There is currently a bug in the library's set-up files that causes some Windows
-computers to fail to install the library correctly via pip. If this occurs,
-download the library as a zip file from the project's GitHub page and then 
-extract it manually to the relevant folder in your computer's Python 
-installation. See links below for details.
-
-https://github.com/Legisign/Praat-textgrids
-https://youtu.be/DKR0VYSOqLc
+    pip install numpy
 
 """
 # import required libraries
-import os
-import re
-import textgrids
+import textgrid_arrays
+import textgrid_batch
+import textgrid_edits
+import textgrid_profile
+import textgrid_roi
+import textgrid_rules
+import stimulus_ids
+from textgrid_rules import Rule
+
+def keeps_glottal_stop(file):
+    """
+    Checks whether a file is one of 'own' and 'oat' (pair 13), which keep
+    their glottal stops. If the pair number can't be found in the file name,
+    the file name is searched for 'p13' instead, as before.
+    """
+    pair = stimulus_ids.parse_stimulus_id(file).pair
+    return 'p13' in file if pair is None else pair == 13
+
+# Simple transcription corrections for the sound and syllable tiers, applied in
+# the order listed. See the textgrid_rules module for details.
+sound_syllable_rules = textgrid_rules.RuleSet([
+    Rule(r'u$|u\s', 'u:', regex = True), # Set GOOSE to [u:]
+    Rule('s u:n', 's u: n'), # Set GOOSE to [u:]
+    Rule('@U', 'oU'), # Convert GOAT to AmE
+    Rule('Q', 'A'), # Convert LOT to AmE
+    Rule('R', 'r'), # Fix [r]
+    Rule('3`', '@r'), # Fix lettER; here we're using [@r] instead of X-SAMPA [@`] for a rhotic schwa
+    Rule('h l', 'h i: l'), # Fix "he'll"
+  # Rule('{', 'a'), # Set TRAP to [a]; could be added later
+    
+    # Add [d] to 'Leonard' in the syllable tier
+    Rule('n @r', 'n @r d', whole = True, condition = stimulus_ids.word_condition('Leonard')),
+        
+    # Replace glottal stop [?] with [t] for all tokens except 'own' and 'oat'
+    # (where a glottal stop may be used to separate the target from 'Cleo').
+    Rule('?', 't', condition = lambda file: not keeps_glottal_stop(file)),
+        
+    # Move [N] from the onset of the second syllable to the coda of the first
+    # syllable in 'ringer' (syllable tier)
+    Rule('r I', 'r I N', condition = stimulus_ids.word_condition('ringer')),
+    Rule('N @r', '@r', condition = stimulus_ids.word_condition('ringer')),
+    ])
+
+def fix_sound_syllable(tier, file):
+    """
+    Applies simple transcription corrections to all the intervals in the sound
+    or syllable tier of the English nasality TextGrids by replacing the text.
+    The corrections are listed in sound_syllable_rules above.
+
+    Parameters
+    ----------
+    tier : Tier object from the textgrid_arrays module
+        The tier whose intervals you want to edit. See the module documentation
+        for details on tier objects.
+    file : str
+        The file name of the TextGrid, used for word-specific corrections.
+
+    Returns
+    -------
+    None.
+
+    """
+    sound_syllable_rules.apply(tier, file)
 
-def fix_sound_syllable(interval):
+def fix_leonard_sound(sound, count):
     """
-    Applies simple transcription corrections to intervals in the the sound and
-    / or syllable tiers of the English nasality TextGrids by replacing the text.
+    Adds the missing [d] at the end of 'Leonard' on the sound tier.
 
     Parameters
     ----------
-    interval : object class of an IntervalTier from the textgrids library
-        The interval whose text you want to edit. See the library documentation
-        for details on interval objects.
+    sound : TierEdits object from the textgrid_edits module
+        The changes to the sound tier.
+    count : int
+        The position of the interval to check.
 
     Returns
     -------
     None.
 
     """
+    if sound.texts[count] == '@r' and sound.next_text(count) == 's':
+        sound.split(count, 'd', 0.75) # split the current interval at a certain proportion of its duration, adding a new [d] interval to its right
 
-    interval.text = re.sub(r'u$|u\s', 'u:', interval.text) # Set GOOSE to [u:]
-    interval.text = interval.text.replace('s u:n', 's u: n') # Set GOOSE to [u:]
-    interval.text = interval.text.replace('@U', 'oU') # Convert GOAT to AmE
-    interval.text = interval.text.replace('Q', 'A') # Convert LOT to AmE
-    interval.text = interval.text.replace('R', 'r') # Fix [r]
-    interval.text = interval.text.replace('3`', '@r') # Fix lettER; here we're using [@r] instead of X-SAMPA [@`] for a rhotic schwa
-    interval.text = interval.text.replace('h l', 'h i: l') # Fix "he'll"
-  # interval.text = interval.text.replace('{', 'a') # Set TRAP to [a]; could be added later
+def fix_ringer(tg):
+    """
+    Moves the boundary between the syllables of 'ringer' to the offset of [N]
+    on the sound tier, to go with moving [N] from the onset of the second
+    syllable to the coda of the first (see sound_syllable_rules).
+
+    Parameters
+    ----------
+    tg : TextGrid object from the textgrid_arrays module
+        The TextGrid, once the sound tier has been changed.
+
+    Returns
+    -------
+    None.
+
+    """
+    # Get offset of [N] in 'ringer'
+    for interval in tg['SOUND']:
+        if interval.text == 'N':
+            ringer_N_offset = interval.xmax
     
-    # Add [d] to 'Leonard' in the syllable tier
-    if 'Leonard' in file and interval.text == 'n @r':
-        interval.text = interval.text.replace('n @r', 'n @r d')
+    for interval in tg['SYLLABLE']:
         
-    # Replace glottal stop [?] with [t] for all tokens except 'own' and 'oat'
-    # (where a glottal stop may be used to separate the target from 'Cleo').
-    if 'p13' not in file:
-        interval.text = interval.text.replace('?', 't')
+        # Move the right boundary of the first syllable in line with the
+        # offset of N obtained above
+        if interval.text == 'r I N':
+            interval.xmax = ringer_N_offset
         
-    # Move [N] from the onset of the second syllable to the coda of the first
-    # syllable in 'ringer' (syllable tier)
-    if 'ringer' in file:
-        interval.text = interval.text.replace('r I', 'r I N')
-        interval.text = interval.text.replace('N @r', '@r')
+        # Move the left boundary of the second syllable in line with the
+        # offset of N obtained above
+        if interval.text == '@r':
+            interval.xmin = ringer_N_offset
+
+# Word-specific changes to the sound and syllable tiers, looked up once per
+# file by the word in the file name (see the stimulus_ids module)
+word_fixes = {'Leonard': stimulus_ids.WordFixes(sound = fix_leonard_sound),
+              'ringer': stimulus_ids.WordFixes(finish = fix_ringer)}
 
 # Specify folder path where the TextGrids are located
 source_path = "TextGrids/"
 
-# Get a list of TextGrid files in the folder
-dir_list = os.listdir(source_path)
-tg_list = [file for file in dir_list if 'practice' not in file and file.endswith('.TextGrid')]
+# Specify the region of interest, which starts at the [i:] in 'Cleo' and ends
+# at the target nasal sound or its oral counterpart (see process_textgrid()
+# for details)
+region_of_interest = textgrid_roi.RegionOfInterest(start_labels = ['i:'], end_labels = ['m', 'n', 'N', 'p', 't', 'k'], end_index = 2)
 
-# For each TextGrid file in the list...
-for file in tg_list:
-    
-    # Load the file as a TextGrid in Python
-    tg = textgrids.TextGrid(source_path + file)
+def process_textgrid(tg, file, timer = textgrid_profile.no_timer, place_boundary = None):
+    """
+    Applies the steps listed in the preamble to one English TextGrid.
+
+    Parameters
+    ----------
+    tg : TextGrid object from the textgrid_arrays module
+        The loaded TextGrid, which is changed in place.
+    file : str
+        The file name of the TextGrid.
+    timer : StageTimer object from the textgrid_profile module, optional
+        Measures how long each stage takes. The default is no_timer, which
+        measures nothing.
+    place_boundary : function, optional
+        Places the boundaries of the sounds that are added to the sound tier,
+        e.g. a BoundaryPlacer object from the textgrid_audio module. The
+        default is None (put them at a fixed proportion of the interval they
+        are split from).
+
+    Returns
+    -------
+    None.
+
+    """
     
     # Delete the unneeded tiers
     del tg['KAN-MAU']
@@ -117,56 +303,47 @@ for file in tg_list:
     
     # Rename the word tier
     tg['WORD'] = tg.pop('ORT-MAU')
+    timer.lap('tiers')
          
     # Get the end time of the final interval on the sound (MAU) tier.
     # This is so that the end time of the new phrase tier can be specified 
     # correctly.
     file_end = tg['MAU'][-1].xmax
     
-    # Get the start time of [i:] intervals on the sound (MAU) tier.
-    # The first of these (corresponding to the [i:] in 'Cleo' will be used as 
-    # the start of the 'phrase' interval on the phrase tier.
-    i_start_time = []
-    for interval in tg['MAU']:
-        if interval.text == 'i:':
-            i_start_time.append(interval.xmin)   
-    
-    # Get the end time of the target nasal / oral interval on the sound (MAU) 
-    # tier.
-    # This will be used as the end of the 'phrase' interval on the phrase tier.
-    nasals_orals = ['m', 'n', 'N', 'p', 't', 'k']
-    nasal_oral_end_time = []
-    for interval in tg['MAU']:
-        if interval.text in nasals_orals:
-            nasal_oral_end_time.append(interval.xmax)    
+    # Find the start and end times of the region of interest on the sound
+    # (MAU) tier. These will be used as the boundaries of the 'phrase' interval
+    # on the phrase tier.
     
-    # Specify the three intervals for the new phrase tier
-    
-    # The first item (index [0]) in i_start_time is used, i.e. the [i:] in
-    # 'Cleo'. This is because some items have another [i:] later (e.g. 'rocky').
+    # The first [i:] is used as the start, i.e. the [i:] in 'Cleo'. This is
+    # because some items have another [i:] later (e.g. 'rocky').
     
-    # The third item (index [2]) in nasal_oral_end_time is used.
+    # The third nasal / oral sound (index [2]) is used as the end.
     # This is because all items have a [t] in 'tell', then a [k] in 'Cleo', then 
     # the target, then potentially more of the same sound (e.g. another [t] in
     # 'met'), then the [n] in 'soon'. However, these other sounds always come 
     # after our target sound in the region of interest, so index [2] is reliable.
+    phrase_start, phrase_end = region_of_interest.find(tg['MAU'], file)
        
-    interval_1 = textgrids.Interval(text = '', xmin = 0.0, xmax = i_start_time[0])
-    interval_2 = textgrids.Interval(text = 'phrase', xmin = i_start_time[0], xmax = nasal_oral_end_time[2])
-    interval_3 = textgrids.Interval(text = '', xmin = nasal_oral_end_time[2], xmax = file_end)
+    # Specify the three intervals for the new phrase tier
+    interval_1 = textgrid_arrays.Interval(text = '', xmin = 0.0, xmax = phrase_start)
+    interval_2 = textgrid_arrays.Interval(text = 'phrase', xmin = phrase_start, xmax = phrase_end)
+    interval_3 = textgrid_arrays.Interval(text = '', xmin = phrase_end, xmax = file_end)
     
     # Specify the new phrase tier with the three intervals
-    tg['PHRASE'] = textgrids.Tier(data = [interval_1, interval_2, interval_3])
+    tg['PHRASE'] = textgrid_arrays.Tier(data = [interval_1, interval_2, interval_3])
+    timer.lap('roi')
                
     # Over-write empty labels on the word tier with '<p:>'
     for interval in tg['WORD']:
         if interval.text == '':
             interval.text = '<p:>'
+    timer.lap('fixes')
     
     # Rename the sound and syllable tiers
     # This has to be done last to preserve the tier order.
     tg['SOUND'] = tg.pop('MAU')
     tg['SYLLABLE'] = tg.pop('MAS')
+    timer.lap('tiers')
     
     
     ### End of basic steps
@@ -175,59 +352,47 @@ for file in tg_list:
     ### Change specific intervals on the sound and syllable tiers
         
     # Make simple transcription fixes in the sound and syllable tiers
-    for interval in tg['SOUND']:
-        fix_sound_syllable(interval)
-    
-    for interval in tg['SYLLABLE']:
-        fix_sound_syllable(interval)
+    fix_sound_syllable(tg['SOUND'], file)
+    fix_sound_syllable(tg['SYLLABLE'], file)
+    timer.lap('fixes')
         
         
+    # Look up the word-specific changes for this file (e.g. adding [d] to
+    # 'Leonard') once, rather than checking the file name at every interval
+    fixes = stimulus_ids.lookup(word_fixes, file, stimulus_ids.no_fixes)
+        
     ## Sound tier
+    # The new intervals are noted first and then added all at once, so that
+    # adding an interval doesn't move the intervals still to be checked (see
+    # the textgrid_edits module).
+    sound = textgrid_edits.TierEdits(tg['SOUND'], place_boundary)
     for count, interval in enumerate(tg['SOUND']):
             
         
         # he'll - add [i:]
-        if interval.text == 'h' and tg['SOUND'][count + 1].text == 'l':
-            index_no = count # save index of this interval, as this will be needed to add the new one
-            duration_proportion = interval.xmin + interval.dur * 0.67 # define the boundary between the current interval and its new neighbour to the right as a certain proportion of its current duration
-            tg['SOUND'].insert(index_no + 1, textgrids.Interval(text = 'i:', xmin = duration_proportion, xmax = interval.xmax)) # insert a new interval to the right of the current interval, using the proportion defined earlier as its left boundary, and the right boundary of the current interval as its right boundary
-            interval.xmax = duration_proportion # update the right boundary of the current interval to match the left boundary of its new neighbour to the right
+        if interval.text == 'h' and sound.next_text(count) == 'l':
+            sound.split(count, 'i:', 0.67) # split the current interval at a certain proportion of its duration, adding a new [i:] interval to its right
         
         
-        # Leonard - add [d]
-        if 'Leonard' in file and interval.text == '@r' and tg['SOUND'][count + 1].text == 's':
-            index_no = count # save index of this interval, as this will be needed to add the new one
-            duration_proportion = interval.xmin + interval.dur * 0.75 # define the boundary between the current interval and its new neighbour to the right as a certain proportion of its current duration
-            tg['SOUND'].insert(index_no + 1, textgrids.Interval(text = 'd', xmin = duration_proportion, xmax = interval.xmax)) # insert a new interval to the right of the current interval, using the proportion defined earlier as its left boundary, and the right boundary of the current interval as its right boundary
-            interval.xmax = duration_proportion # update the right boundary of the current interval to match the left boundary of its new neighbour to the right
-            
-            
-        # Get offset of [N] in 'ringer' for syllable adjustment below
-        if 'ringer' in file and interval.text == 'N':
-            ringer_N_offset = interval.xmax
+        # Word-specific changes, e.g. Leonard - add [d]
+        if fixes.sound is not None:
+            fixes.sound(sound, count)
+    
+    # Add the new intervals
+    sound.apply()
+    timer.lap('sound')
     
     
     
     ## Syllable tier
-    for count, interval in enumerate(tg['SYLLABLE']):
-        
-        
-        # Move the right boundary of the first syllable in 'ringer' in line
-        # with the offset of N obtained above
-        if 'ringer' in file and interval.text == 'r I N':
-            interval.xmax = ringer_N_offset
-        
-        # Move the left boundary of the second syllable in 'ringer' in line
-        # with the offset of N obtained above
-        if 'ringer' in file and interval.text == '@r':
-            interval.xmin = ringer_N_offset
+    # Word-specific changes, e.g. moving the syllable boundary in 'ringer'
+    if fixes.finish is not None:
+        fixes.finish(tg)
+    timer.lap('syllable')
     
 
     ### End of specific interval changes
-    
 
-    # Write the new TextGrid into the copy of the TextGrids folder   
-    tg.write(source_path + file)
-    
-    # Print a message to check that the file has been successfully processed
-    print('Successfully processed {}!'.format(file))
\ No newline at end of file
+# Process each TextGrid file in the folder (over-writing the old files)
+if __name__ == '__main__':
+    textgrid_batch.main(process_textgrid, source_path, description = 'Process English MAUS TextGrids.')
\ No newline at end of file
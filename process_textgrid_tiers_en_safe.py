@@ -25,8 +25,17 @@ where the TextGrids to be processed should be located. You can then use the
 P_text-grid-reviewermitZoom.praat Praat script to view (and edit) the TextGrids
 and their corresponding WAV files at the same time.
  
-This version of the script makes a copy of the TextGrids folder rather than 
-over-writing the original TextGrids.
+This version of the script doesn't over-write the original TextGrids. Instead,
+it writes the processed TextGrids to a folder called 'TextGrids_copy'. Any
+other files in the TextGrids folder (e.g. WAV files) are linked into the new
+folder rather than copied, which is much quicker, especially on a network
+drive. Where the drive supports it, each link is a copy-on-write clone, so
+the two versions can be edited separately. Otherwise it is a hard link,
+which is the same file under two names, so editing it in one folder also
+changes it in the other. If neither is supported, the file is copied.
+
+The processing steps themselves are imported from process_textgrid_tiers_en.py,
+so that script must be saved in the same folder as this one.
 
 The script should be run in the command line by navigating to the correct
 folder and entering a command in the following format:
@@ -35,207 +44,121 @@ folder and entering a command in the following format:
     
 If using Linux, you may need to replace 'python' with 'python3'.
 
-You may not be able to run this file from the IPS server, in which case,
-just copy everything to your computer and run it locally.
-
-You may need to install the textgrids library if it isn't already on your
-computer. You can do this by entering the following into the command prompt:
+The files are processed in parallel, using one process per processor core. To
+use fewer processes (e.g. to keep the computer usable while the script runs),
+add the --jobs option, e.g.:
     
-    pip install praat-textgrids
-    
-There is currently a bug in the library's set-up files that causes some Windows
-computers to fail to install the library correctly via pip. If this occurs,
-download the library as a zip file from the project's GitHub page and then 
-extract it manually to the relevant folder in your computer's Python 
-installation. See links below for details.
+    python process_textgrid_tiers_en_safe.py --jobs 2
 
-https://github.com/Legisign/Praat-textgrids
-https://youtu.be/DKR0VYSOqLc
+If a file can't be processed (e.g. because MAUS has missed one of the sounds
+used to find the region of interest), the script carries on with the other
+files and lists the failed files and their errors at the end. The failed files
+are left unchanged.
 
-"""
-# import required libraries
-import os
-import shutil
-import re
-import textgrids
-
-def fix_sound_syllable(interval):
-    """
-    Applies simple transcription corrections to intervals in the the sound and
-    / or syllable tiers of the English nasality TextGrids by replacing the text.
-
-    Parameters
-    ----------
-    interval : object class of an IntervalTier from the textgrids library
-        The interval whose text you want to edit. See the library documentation
-        for details on interval objects.
-
-    Returns
-    -------
-    None.
-
-    """
-
-    interval.text = re.sub(r'u$|u\s', 'u:', interval.text) # Set GOOSE to [u:]
-    interval.text = interval.text.replace('s u:n', 's u: n') # Set GOOSE to [u:]
-    interval.text = interval.text.replace('@U', 'oU') # Convert GOAT to AmE
-    interval.text = interval.text.replace('Q', 'A') # Convert LOT to AmE
-    interval.text = interval.text.replace('R', 'r') # Fix [r]
-    interval.text = interval.text.replace('3`', '@r') # Fix lettER; here we're using [@r] instead of X-SAMPA [@`] for a rhotic schwa
-    interval.text = interval.text.replace('h l', 'h i: l') # Fix "he'll"
-  # interval.text = interval.text.replace('{', 'a') # Set TRAP to [a]; could be added later
-    
-    # Add [d] to 'Leonard' in the syllable tier
-    if 'Leonard' in file and interval.text == 'n @r':
-        interval.text = interval.text.replace('n @r', 'n @r d')
-        
-    # Replace glottal stop [?] with [t] for all tokens except 'own' and 'oat'
-    # (where a glottal stop may be used to separate the target from 'Cleo').
-    if 'p13' not in file:
-        interval.text = interval.text.replace('?', 't')
-        
-    # Move [N] from the onset of the second syllable to the coda of the first
-    # syllable in 'ringer' (syllable tier)
-    if 'ringer' in file:
-        interval.text = interval.text.replace('r I', 'r I N')
-        interval.text = interval.text.replace('N @r', '@r')
-
-# Specify folder path where the TextGrids are located
-source_path = "TextGrids/"
+The script keeps a record of the files it has processed in a file called
+'processing_manifest.json' in the output folder. If the script is run again
+(e.g. after more TextGrids have come back from WebMAUS), only new or changed
+TextGrids are processed, unless the script itself has been edited since the
+last run. To process every file again, add the --force option.
 
-# Specify folder path for the copy
-copy_path = "TextGrids_copy/"
+If a run is interrupted (e.g. by a crash or a power cut), just run the script
+again and it will carry on where it stopped. Each TextGrid is only replaced
+once its processed version has been written completely, and the files
+processed so far are noted in 'processing_journal.jsonl' until the manifest
+is saved, so no file is left half-processed or processed twice.
 
-# Make a copy of the folder
-shutil.copytree(source_path, copy_path, dirs_exist_ok = True)
+The processed TextGrids are written in Praat's long text format. To write them
+in Praat's more compact short text or binary format instead (e.g. for
+intermediate files that will be processed further), add the --format option,
+e.g.:
+    
+    python process_textgrid_tiers_en_safe.py --format binary
 
-# Get a list of TextGrid files in the folder
-dir_list = os.listdir(copy_path)
-tg_list = [file for file in dir_list if 'practice' not in file and file.endswith('.TextGrid')]
+TextGrids in any of these formats can be read by the script.
 
-# For each TextGrid file in the list...
-for file in tg_list:
-    
-    # Load the file as a TextGrid in Python
-    tg = textgrids.TextGrid(copy_path + file)
-    
-    # Delete the unneeded tiers
-    del tg['KAN-MAU']
-    del tg['KAS-MAU']
-    
-    # Rename the word tier
-    tg['WORD'] = tg.pop('ORT-MAU')
-         
-    # Get the end time of the final interval on the sound (MAU) tier.
-    # This is so that the end time of the new phrase tier can be specified 
-    # correctly.
-    file_end = tg['MAU'][-1].xmax
-    
-    # Get the start time of [i:] intervals on the sound (MAU) tier.
-    # The first of these (corresponding to the [i:] in 'Cleo' will be used as 
-    # the start of the 'phrase' interval on the phrase tier.
-    i_start_time = []
-    for interval in tg['MAU']:
-        if interval.text == 'i:':
-            i_start_time.append(interval.xmin)   
-    
-    # Get the end time of the target nasal / oral interval on the sound (MAU) 
-    # tier.
-    # This will be used as the end of the 'phrase' interval on the phrase tier.
-    nasals_orals = ['m', 'n', 'N', 'p', 't', 'k']
-    nasal_oral_end_time = []
-    for interval in tg['MAU']:
-        if interval.text in nasals_orals:
-            nasal_oral_end_time.append(interval.xmax)    
-    
-    # Specify the three intervals for the new phrase tier
-    
-    # The first item (index [0]) in i_start_time is used, i.e. the [i:] in
-    # 'Cleo'. This is because some items have another [i:] later (e.g. 'rocky').
-    
-    # The third item (index [2]) in nasal_oral_end_time is used.
-    # This is because all items have a [t] in 'tell', then a [k] in 'Cleo', then 
-    # the target, then potentially more of the same sound (e.g. another [t] in
-    # 'met'), then the [n] in 'soon'. However, these other sounds always come 
-    # after our target sound in the region of interest, so index [2] is reliable.
-       
-    interval_1 = textgrids.Interval(text = '', xmin = 0.0, xmax = i_start_time[0])
-    interval_2 = textgrids.Interval(text = 'phrase', xmin = i_start_time[0], xmax = nasal_oral_end_time[2])
-    interval_3 = textgrids.Interval(text = '', xmin = nasal_oral_end_time[2], xmax = file_end)
-    
-    # Specify the new phrase tier with the three intervals
-    tg['PHRASE'] = textgrids.Tier(data = [interval_1, interval_2, interval_3])
-               
-    # Over-write empty labels on the word tier with '<p:>'
-    for interval in tg['WORD']:
-        if interval.text == '':
-            interval.text = '<p:>'
-    
-    # Rename the sound and syllable tiers
-    # This has to be done last to preserve the tier order.
-    tg['SOUND'] = tg.pop('MAU')
-    tg['SYLLABLE'] = tg.pop('MAS')
-    
-    
-    ### End of basic steps
-    
-    
-    ### Change specific intervals on the sound and syllable tiers
-        
-    # Make simple transcription fixes in the sound and syllable tiers
-    for interval in tg['SOUND']:
-        fix_sound_syllable(interval)
-    
-    for interval in tg['SYLLABLE']:
-        fix_sound_syllable(interval)
-        
-        
-    ## Sound tier
-    for count, interval in enumerate(tg['SOUND']):
-            
-        
-        # he'll - add [i:]
-        if interval.text == 'h' and tg['SOUND'][count + 1].text == 'l':
-            index_no = count # save index of this interval, as this will be needed to add the new one
-            duration_proportion = interval.xmin + interval.dur * 0.67 # define the boundary between the current interval and its new neighbour to the right as a certain proportion of its current duration
-            tg['SOUND'].insert(index_no + 1, textgrids.Interval(text = 'i:', xmin = duration_proportion, xmax = interval.xmax)) # insert a new interval to the right of the current interval, using the proportion defined earlier as its left boundary, and the right boundary of the current interval as its right boundary
-            interval.xmax = duration_proportion # update the right boundary of the current interval to match the left boundary of its new neighbour to the right
-        
-        
-        # Leonard - add [d]
-        if 'Leonard' in file and interval.text == '@r' and tg['SOUND'][count + 1].text == 's':
-            index_no = count # save index of this interval, as this will be needed to add the new one
-            duration_proportion = interval.xmin + interval.dur * 0.75 # define the boundary between the current interval and its new neighbour to the right as a certain proportion of its current duration
-            tg['SOUND'].insert(index_no + 1, textgrids.Interval(text = 'd', xmin = duration_proportion, xmax = interval.xmax)) # insert a new interval to the right of the current interval, using the proportion defined earlier as its left boundary, and the right boundary of the current interval as its right boundary
-            interval.xmax = duration_proportion # update the right boundary of the current interval to match the left boundary of its new neighbour to the right
-            
-            
-        # Get offset of [N] in 'ringer' for syllable adjustment below
-        if 'ringer' in file and interval.text == 'N':
-            ringer_N_offset = interval.xmax
-    
-    
-    
-    ## Syllable tier
-    for count, interval in enumerate(tg['SYLLABLE']):
-        
-        
-        # Move the right boundary of the first syllable in 'ringer' in line
-        # with the offset of N obtained above
-        if 'ringer' in file and interval.text == 'r I N':
-            interval.xmax = ringer_N_offset
-        
-        # Move the left boundary of the second syllable in 'ringer' in line
-        # with the offset of N obtained above
-        if 'ringer' in file and interval.text == '@r':
-            interval.xmin = ringer_N_offset
+To export every interval of the processed TextGrids to one table for analysis
+(see textgrid_export.py), add the --export option, e.g.:
     
+    python process_textgrid_tiers_en_safe.py --export tiers.npz
 
-    ### End of specific interval changes
+To save the durations in the region of interest of each processed TextGrid
+(the phrase, the target sound and the sound before it) to one table, with one
+row per file (see textgrid_measure.py), add the --measure option, e.g.:
     
+    python process_textgrid_tiers_en_safe.py --measure durations.csv
+
+To see how long each stage (loading, renaming tiers, finding the region of
+interest, the fixes, the sound and syllable tiers, writing) takes, add the
+--profile option, optionally followed by the name of a JSON file for the
+summary (default: profile.json). The progress is printed every few seconds,
+with the number of files processed per second and the estimated time left:
+
+    python process_textgrid_tiers_en_safe.py --profile
+
+To keep the script running during a recording session and process each new
+TextGrid as soon as it is saved in the folder, add the --watch option. A file
+is processed once it hasn't changed for two seconds (or the number of seconds
+given after --watch). Press Ctrl+C to stop the script:
+
+    python process_textgrid_tiers_en_safe.py --watch
+
+You may not be able to run this file from the IPS server, in which case,
+just copy everything to your computer and run it locally.
+
+If you do run it on TextGrids on a network drive, the script reads the next
+few files and writes the finished ones while it processes each file, so it
+spends less time waiting for the network. The number of files read ahead can
+be changed with the --prefetch option (0 turns this off).
+
+The TextGrids can also be read from a single bundle file made with
+textgrid_bundle.py (e.g. one per speaker), which is much quicker to read and
+write than hundreds of separate files, by adding the --bundle option followed
+by the bundle, e.g.:
+
+    python process_textgrid_tiers_en_safe.py --bundle 0012.tgb
+
+In this case, the processed TextGrids are written to a bundle with the same
+name in the TextGrids_copy folder.
+
+The results of a WebMAUS batch run can be processed straight from the zip (or
+tar) archive they are downloaded in, without extracting it first, by adding
+the --archive option followed by the archive. The processed TextGrids are
+written to a new folder named after the archive (e.g. results_processed), so
+that they are kept apart from the TextGrids that the script processes without
+--archive, or to a new archive or folder given with the --output option, e.g.:
 
-    # Write the new TextGrid into the copy of the TextGrids folder   
-    tg.write(copy_path + file)
+    python process_textgrid_tiers_en_safe.py --archive results.zip --output processed.zip
+
+The boundaries of the sounds that the script adds ([i:] in "he'll" and [d] in
+'Leonard') are put at a fixed proportion of the interval they are split from.
+To place them where the sound changes most in the recording instead, add the
+--acoustic-boundaries option, optionally followed by the feature to use
+(energy, spectral or zcr; default: energy), e.g.:
+
+    python process_textgrid_tiers_en_safe.py --acoustic-boundaries spectral
+
+The WAV file of each TextGrid must be saved in the same folder with the same
+name. See the textgrid_audio.py module for details.
+
+The script loads and writes the TextGrids with the textgrid_arrays.py module,
+which stores each tier as arrays rather than as one Python object per
+interval. This makes large folders of TextGrids much quicker to process. The
+textgrid_*.py and stimulus_ids.py modules used by this script must be saved
+in the same folder as this script.
+
+You may need to install the numpy library if it isn't already on your
+computer. You can do this by entering the following into the command prompt:
     
-    # Print a message to check that the file has been successfully processed
-    print('Successfully processed {}!'.format(file))
\ No newline at end of file
+    pip install numpy
+
+"""
+# import required libraries
+import textgrid_batch
+from process_textgrid_tiers_en import process_textgrid, source_path
+
+# Specify folder path for the copy
+copy_path = "TextGrids_copy/"
+
+# Process each TextGrid file from the original folder into the copy
+if __name__ == '__main__':
+    textgrid_batch.main(process_textgrid, source_path, copy_path, description = 'Process English MAUS TextGrids into a copy of the TextGrids folder.')
\ No newline at end of file
@@ -34,72 +34,273 @@ folder and entering a command in the following format:
     
 If using Linux, you may need to replace 'python' with 'python3'.
 
+The files are processed in parallel, using one process per processor core. To
+use fewer processes (e.g. to keep the computer usable while the script runs),
+add the --jobs option, e.g.:
+    
+    python process_textgrid_tiers_fr.py --jobs 2
+
+If a file can't be processed (e.g. because MAUS has missed one of the sounds
+used to find the region of interest), the script carries on with the other
+files and lists the failed files and their errors at the end. The failed files
+are left unchanged.
+
+The script keeps a record of the files it has processed in a file called
+'processing_manifest.json' in the output folder. If the script is run again
+(e.g. after more TextGrids have come back from WebMAUS), only new or changed
+TextGrids are processed, unless the script itself has been edited since the
+last run. To process every file again, add the --force option.
+
+If a run is interrupted (e.g. by a crash or a power cut), just run the script
+again and it will carry on where it stopped. Each TextGrid is only replaced
+once its processed version has been written completely, and the files
+processed so far are noted in 'processing_journal.jsonl' until the manifest
+is saved, so no file is left half-processed or processed twice.
+
+The processed TextGrids are written in Praat's long text format. To write them
+in Praat's more compact short text or binary format instead (e.g. for
+intermediate files that will be processed further), add the --format option,
+e.g.:
+    
+    python process_textgrid_tiers_fr.py --format binary
+
+TextGrids in any of these formats can be read by the script.
+
+To export every interval of the processed TextGrids to one table for analysis
+(see textgrid_export.py), add the --export option, e.g.:
+    
+    python process_textgrid_tiers_fr.py --export tiers.npz
+
+To save the durations in the region of interest of each processed TextGrid
+(the phrase, the target sound and the sound before it) to one table, with one
+row per file (see textgrid_measure.py), add the --measure option, e.g.:
+    
+    python process_textgrid_tiers_fr.py --measure durations.csv
+
+To see how long each stage (loading, renaming tiers, finding the region of
+interest, the fixes, the sound and syllable tiers, writing) takes, add the
+--profile option, optionally followed by the name of a JSON file for the
+summary (default: profile.json). The progress is printed every few seconds,
+with the number of files processed per second and the estimated time left:
+
+    python process_textgrid_tiers_fr.py --profile
+
+To keep the script running during a recording session and process each new
+TextGrid as soon as it is saved in the folder, add the --watch option. A file
+is processed once it hasn't changed for two seconds (or the number of seconds
+given after --watch). Press Ctrl+C to stop the script:
+
+    python process_textgrid_tiers_fr.py --watch
+
 You may not be able to run this file from the IPS server, in which case,
 just copy everything to your computer and run it locally.
 
-You may need to install the textgrids library if it isn't already on your
+If you do run it on TextGrids on a network drive, the script reads the next
+few files and writes the finished ones while it processes each file, so it
+spends less time waiting for the network. The number of files read ahead can
+be changed with the --prefetch option (0 turns this off).
+
+The TextGrids can also be read from a single bundle file made with
+textgrid_bundle.py (e.g. one per speaker), which is much quicker to read and
+write than hundreds of separate files, by adding the --bundle option followed
+by the bundle, e.g.:
+
+    python process_textgrid_tiers_fr.py --bundle 0012.tgb
+
+In this case, the bundle is replaced with the processed one once all the
+TextGrids have been processed.
+
+The results of a WebMAUS batch run can be processed straight from the zip (or
+tar) archive they are downloaded in, without extracting it first, by adding
+the --archive option followed by the archive. The processed TextGrids are
+written to a new folder named after the archive (e.g. results_processed), so
+that they are kept apart from the TextGrids that the script processes without
+--archive, or to a new archive or folder given with the --output option, e.g.:
+
+    python process_textgrid_tiers_fr.py --archive results.zip --output processed.zip
+
+The boundaries of the sounds that the script adds ([R] in "l'enfer" and [s] in
+"l'anis" and "l'apis") are put at a fixed proportion of the interval they are
+split from. To place them where the sound changes most in the recording
+instead, add the --acoustic-boundaries option, optionally followed by the
+feature to use (energy, spectral or zcr; default: energy), e.g.:
+
+    python process_textgrid_tiers_fr.py --acoustic-boundaries spectral
+
+The WAV file of each TextGrid must be saved in the same folder with the same
+name. See the textgrid_audio.py module for details.
+
+The script loads and writes the TextGrids with the textgrid_arrays.py module,
+which stores each tier as arrays rather than as one Python object per
+interval. This makes large folders of TextGrids much quicker to process. The
+textgrid_*.py and stimulus_ids.py modules used by this script must be saved
+in the same folder as this script.
+
+You may need to install the numpy library if it isn't already on your
 computer. You can do this by entering the following into the command prompt:
     
-    pip install praat-textgrids
-    
-There is currently a bug in the library's set-up files that causes some Windows
-computers to fail to install the library correctly via pip. If this occurs,
-download the library as a zip file from the project's GitHub page and then 
-extract it manually to the relevant folder in your computer's Python 
-installation. See links below for details.
-
-https://github.com/Legisign/Praat-textgrids
-https://youtu.be/DKR0VYSOqLc
+    pip install numpy
 
 """
 # import required libraries
-import os
 import re
-import textgrids
+import textgrid_arrays
+import textgrid_batch
+import textgrid_edits
+import textgrid_profile
+import textgrid_roi
+import textgrid_rules
+import stimulus_ids
+from textgrid_rules import Rule
 
-def fix_sound_syllable(interval):
+# Simple transcription corrections for the sound and syllable tiers, applied in
+# the order listed. See the textgrid_rules module for details.
+sound_syllable_rules = textgrid_rules.RuleSet([
+    Rule('A', 'a', condition = stimulus_ids.word_condition('lane', 'lame')),
+    Rule('a~', 'a', condition = stimulus_ids.word_condition('Yann')),
+    Rule('9', '2', condition = stimulus_ids.word_condition('noeud')),
+    Rule('n 2 d', 'n 2', condition = stimulus_ids.word_condition('noeud')),
+    Rule('a~', 'A~'),
+    Rule('o~', 'O~'),
+    Rule('9~', 'E~'),
+    Rule('e~', 'E~'),
+    Rule('o z', 'o'), # for [k l e][o z] in the syllable tier
+    Rule('l a j', 'l e'), # this line for "l'aîné" doesn't work as intended because of problems with the l' part of the syllable tier editing
+    ])
+
+def fix_sound_syllable(tier, file):
     """
-    Applies simple transcription corrections to intervals in the the sound and
-    / or syllable tiers of the French nasality TextGrids by replacing the text.
+    Applies simple transcription corrections to all the intervals in the sound
+    or syllable tier of the French nasality TextGrids by replacing the text.
+    The corrections are listed in sound_syllable_rules above.
 
     Parameters
     ----------
-    interval : object class of an IntervalTier from the textgrids library
-        The interval whose text you want to edit. See the library documentation
-        for details on interval objects.
+    tier : Tier object from the textgrid_arrays module
+        The tier whose intervals you want to edit. See the module documentation
+        for details on tier objects.
+    file : str
+        The file name of the TextGrid, used for word-specific corrections.
 
     Returns
     -------
     None.
 
     """
-    if 'lane' in file or 'lame' in file:
-        interval.text = interval.text.replace('A', 'a')
-    elif 'Yann' in file:
-        interval.text = interval.text.replace('a~', 'a')
-    elif 'noeud' in file:
-        interval.text = interval.text.replace('9', '2')
-        interval.text = interval.text.replace('n 2 d', 'n 2')
-    interval.text = interval.text.replace('a~', 'A~')
-    interval.text = interval.text.replace('o~', 'O~')
-    interval.text = interval.text.replace('9~', 'E~')
-    interval.text = interval.text.replace('e~', 'E~')
-    interval.text = interval.text.replace('o z', 'o') # for [k l e][o z] in the syllable tier
-    interval.text = interval.text.replace('l a j', 'l e') # this line for "l'aîné" doesn't work as intended because of problems with the l' part of the syllable tier editing
+    sound_syllable_rules.apply(tier, file)
+
+# Word-specific changes to the sound and syllable tiers. Each function is
+# called for each interval that is left after the general changes in
+# process_textgrid(), with the changes to the tier (a TierEdits object from the
+# textgrid_edits module) and the position of the interval.
+
+def fix_yack_sound(sound, count):
+    """yack - replace [i] with [j]"""
+    if sound.previous_text(count) != 'd': # avoid 'i's in 'dis' and 'samedi'
+        sound.relabel(count, sound.texts[count].replace('i', 'j'))
+
+def fix_yack_syllable(syllables, count):
+    """yack part 1 - replace [i] with [j] - this might be redundant"""
+    if syllables.texts[count] != 'd i': # avoid 'i' in 'dis' and 'samedi'
+        syllables.relabel(count, syllables.texts[count].replace('i', 'j'))
+
+def fix_lenfer_sound(sound, count):
+    """l'enfer - replace [e] with [E] and add [R]"""
+    if sound.previous_text(count) == 'f':
+        sound.relabel(count, sound.texts[count].replace('e', 'E')) # replace vowel
+        sound.split(count, 'R', 0.67) # split the current interval at a certain proportion of its duration, adding a new [R] interval to its right
+
+def fix_lenfer_syllable(syllables, count):
+    """l'enfer - replace [e] with [E] and add [R]"""
+    syllables.relabel(count, syllables.texts[count].replace('f e', 'f E R').replace('f E R t', 'f E R'))
+
+def fix_laine_sound(sound, count):
+    """l'aîné - replace [a] with [e] and remove [j]"""
+    if sound.texts[count] == 'j' and sound.previous_text(count) == 'a':
+        sound.merge_left(count, text = 'e') # remove this interval, extend the previous interval's right boundary to cover it and over-write its text as 'e'
+
+def fix_laine(tg):
+    """
+    l'aîné
+    This part needs to be addressed once the syllable tier has been changed
+    because the l' part causes problems with the relevant line in the
+    fix_sound_syllable() function. re.match is used because the whole
+    interval.text needs replacing.
+    """
+    for interval in tg['SYLLABLE']:
+        if re.match(r'.+j', interval.text):
+            interval.text = 'l e'
+
+def add_s(previous, syllable):
+    """
+    l'anis and l'apis - returns the functions that add [s] after [i] on the
+    sound tier (where the previous sound is the given one) and the syllable
+    tier (to the given syllable).
+    """
+    def fix_sound(sound, count):
+        if sound.previous_text(count) == previous:
+            sound.split(count, 's', 0.67) # split the current interval at a certain proportion of its duration, adding a new [s] interval to its right
+
+    def fix_syllable(syllables, count):
+        if syllables.texts[count] == syllable:
+            syllables.relabel(count, syllable + ' s')
+
+    return fix_sound, fix_syllable
 
+# The word-specific changes for each word, looked up once per file by the word
+# in the file name (see the stimulus_ids module)
+word_fixes = {'yack': stimulus_ids.WordFixes(sound = fix_yack_sound, syllable = fix_yack_syllable),
+              'lenfer': stimulus_ids.WordFixes(sound = fix_lenfer_sound, syllable = fix_lenfer_syllable),
+              'laine': stimulus_ids.WordFixes(sound = fix_laine_sound, finish = fix_laine),
+              'lanis': stimulus_ids.WordFixes(*add_s('n', 'n i')),
+              'lapis': stimulus_ids.WordFixes(*add_s('p', 'p i'))}
 
 # Specify folder path where the TextGrids are located
 source_path = "TextGrids/"
 
-# Get a list of TextGrid files in the folder
-dir_list = os.listdir(source_path)
-tg_list = [file for file in dir_list if 'practice' not in file and file.endswith('.TextGrid')]
+# Specify the region of interest, which starts at the [e] in 'Cléo' and ends
+# at the target nasal sound or its oral counterpart (see process_textgrid()
+# for details).
 
-# For each TextGrid file in the list...
-for file in tg_list:
-    
-    # Load the file as a TextGrid in Python
-    tg = textgrids.TextGrid(source_path + file)
+# Some words require the end of the region of interest to be the fourth nasal /
+# oral sound (index [3]) rather than the third (index [2]). This is because
+# they have an extra vowel before the target sound. The word 'lotte' appears in
+# both the nasal vowel and nasal consonant sets, which have different
+# requirements for the region of interest (it ends after the vowel for the
+# former and after the consonant for the latter), so only the 'fin_or' member
+# of pair 13 is listed. The words are matched exactly, so "l'homme" is listed
+# with and without the l' (the old scripts searched the file name for 'homme').
+region_of_interest = textgrid_roi.RegionOfInterest(start_labels = ['e'],
+                                                   end_labels = ['a~', 'a', 'e~', '9~', 'E', 'o~', 'O', 'n', 'm', 'J', 'p', 't', 'k'],
+                                                   end_index = 2,
+                                                   overrides = {('fin_or', 13, 'lotte'): 3,
+                                                                'Alain': 3, 'allais': 3, 'Yann': 3, 'homme': 3, 'lhomme': 3, 'latte': 3, 'yack': 3,
+                                                                'lac': 3, 'lanis': 3, 'lapis': 3, 'lannee': 3, 'lathee': 3, 'laine': 3})
+
+def process_textgrid(tg, file, timer = textgrid_profile.no_timer, place_boundary = None):
+    """
+    Applies the steps listed in the preamble to one French TextGrid.
+
+    Parameters
+    ----------
+    tg : TextGrid object from the textgrid_arrays module
+        The loaded TextGrid, which is changed in place.
+    file : str
+        The file name of the TextGrid.
+    timer : StageTimer object from the textgrid_profile module, optional
+        Measures how long each stage takes. The default is no_timer, which
+        measures nothing.
+    place_boundary : function, optional
+        Places the boundaries of the sounds that are added to the sound tier,
+        e.g. a BoundaryPlacer object from the textgrid_audio module. The
+        default is None (put them at a fixed proportion of the interval they
+        are split from).
+
+    Returns
+    -------
+    None.
+
+    """
     
     
     ### Apply basic steps (steps 1-3 from the preamble)
@@ -110,84 +311,53 @@ for file in tg_list:
     
     # Rename the word tier
     tg['WORD'] = tg.pop('ORT-MAU')
+    timer.lap('tiers')
        
     # Get the end time of the final interval on the sound (MAU) tier.
     # This is so that the end time of the new phrase tier can be specified 
     # correctly.
     file_end = tg['MAU'][-1].xmax
     
-    # Get the start time of all [e] intervals on the sound (MAU) tier.
-    # The first of these (corresponding to the [e] in 'Cléo') will be used as 
-    # the start of the 'phrase' interval on the phrase tier.
-    e_start_time = []
-    for interval in tg['MAU']:
-        if interval.text == 'e':
-            e_start_time.append(interval.xmin) 
-    #print(e_start_time)
-    
-    # Get the end time of the target nasal / oral interval on the sound (MAU) 
-    # tier.
-    # This will be used as the end of the 'phrase' interval on the phrase tier.
-    nasals_orals = ['a~', 'a', 'e~', '9~', 'E', 'o~', 'O', 'n', 'm', 'J', 'p', 't', 'k', ]
-    nasal_oral_end_time = []
-    for interval in tg['MAU']:
-        if interval.text in nasals_orals:
-            nasal_oral_end_time.append(interval.xmax)
-    #print(nasal_oral_end_time)
-
-    # Specify the three intervals for the new phrase tier
-    
-    # The first item (index [0]) in e_start_time is used, i.e. the [e] in
-    # 'Cléo'. This is because some items have another [e] later (e.g. 'l'année').
-    
-    # For most files, the third item (index [2]) in nasal_oral_end_time is used.
-    # This is because all items have a [k] in Cléo, then an [a] in à, then the 
-    # target, then potentially more of the same sound (e.g. another [k] in 
-    # 'lac'), then the [m] in 'samedi'. However, these other sounds always come
-    # after our target sound in the region of interest, so index [2] is reliable.
-    
-    # The extra_sound_files list refers to files that require the boundary
-    # between the second and third intervals to match the fourth item (index [3])
-    # in nasal_oral_end_time. This is because they have an extra vowel before
-    # the target sound. The word 'lotte' appears in both the nasal vowel and
-    # nasal consonant sets, which have different requirements for the region
-    # of interest (it ends after the vowel for the former and after the 
-    # consonant for the latter).
+    # Find the start and end times of the region of interest on the sound
+    # (MAU) tier. These will be used as the boundaries of the 'phrase' interval
+    # on the phrase tier.
     
-    # If a word is in the extra_sound_file list, the index changes from 2 to 3.
+    # The first [e] is used as the start, i.e. the [e] in 'Cléo'. This is
+    # because some items have another [e] later (e.g. 'l'année').
     
-    # Specify the file names that require a different index number as above
-    extra_sound_files = ['fin_or_p13_lotte', 'Alain', 'allais', 'Yann', 'homme', 'latte', 'yack', 'lac', 'anis', 'lapis', 'lannee', 'lathee', 'laine']
-    
-    # Specify the default index number
-    variable_index = 2
+    # For most files, the third nasal / oral sound (index [2]) is used as the
+    # end. This is because all items have a [k] in Cléo, then an [a] in à, then
+    # the target, then potentially more of the same sound (e.g. another [k] in 
+    # 'lac'), then the [m] in 'samedi'. However, these other sounds always come
+    # after our target sound in the region of interest, so index [2] is reliable.
     
-    # Change the index number if the file is one of those in extra_sound_files
-    for string in extra_sound_files:
-        if string in file:
-            variable_index = 3
-            break
+    # The words listed in the overrides of region_of_interest use the fourth
+    # nasal / oral sound (index [3]) instead (see above).
+    phrase_start, phrase_end = region_of_interest.find(tg['MAU'], file)
     
     # Create the three intervals for the phrase tier
-    interval_1 = textgrids.Interval(text = '', xmin = 0.0, xmax = e_start_time[0])
+    interval_1 = textgrid_arrays.Interval(text = '', xmin = 0.0, xmax = phrase_start)
     
-    interval_2 = textgrids.Interval(text = 'phrase', xmin = e_start_time[0], xmax = nasal_oral_end_time[variable_index])
+    interval_2 = textgrid_arrays.Interval(text = 'phrase', xmin = phrase_start, xmax = phrase_end)
     
-    interval_3 = textgrids.Interval(text = '', xmin = nasal_oral_end_time[variable_index], xmax = file_end)
+    interval_3 = textgrid_arrays.Interval(text = '', xmin = phrase_end, xmax = file_end)
     
    
     # Create the new phrase tier with the three intervals
-    tg['PHRASE'] = textgrids.Tier(data = [interval_1, interval_2, interval_3])
+    tg['PHRASE'] = textgrid_arrays.Tier(data = [interval_1, interval_2, interval_3])
+    timer.lap('roi')
                
     # Over-write empty labels on the word tier with '<p:>'
     for interval in tg['WORD']:
         if interval.text == '':
             interval.text = '<p:>'
+    timer.lap('fixes')
     
     # Rename the sound and syllable tiers
     # This has to be done last to preserve the tier order.
     tg['SOUND'] = tg.pop('MAU')
     tg['SYLLABLE'] = tg.pop('MAS')
+    timer.lap('tiers')
     
     
     ### End of basic steps
@@ -198,122 +368,78 @@ for file in tg_list:
     # Make simple transcription fixes in the sound and syllable tiers
     # for some reason, putting this line in the main for-loops sometimes does not work
     # for words with "l'", so it has to go here separately instead.
-    for interval in tg['SOUND']:
-        fix_sound_syllable(interval)
+    fix_sound_syllable(tg['SOUND'], file)
+    fix_sound_syllable(tg['SYLLABLE'], file)
+    timer.lap('fixes')
     
-    for interval in tg['SYLLABLE']:
-        fix_sound_syllable(interval)
+    # Look up the word-specific changes for this file (e.g. adding [R] to
+    # "l'enfer") once, rather than checking the file name at every interval
+    fixes = stimulus_ids.lookup(word_fixes, file, stimulus_ids.no_fixes)
            
     ## Sound tier
-    for count, interval in enumerate(tg['SOUND']):
-       
-        # yack - replace [i] with [j]
-        if 'yack' in file and tg['SOUND'][count - 1].text != 'd': # avoid 'i's in 'dis' and 'samedi'
-            interval.text = interval.text.replace('i', 'j')
+    # The changes are noted first and then made all at once, so that removing
+    # or adding an interval doesn't move the intervals still to be checked (see
+    # the textgrid_edits module).
+    sound = textgrid_edits.TierEdits(tg['SOUND'], place_boundary)
+    for count in range(len(sound)):
             
         # l' - remove following schwa [@]
         # Cléo - remove following [z] 
         # samedi - remove schwa [@] before [d]
         # nœud - remove following [d]
-        if (interval.text == '@' and tg['SOUND'][count - 1].text == 'l') or interval.text == 'z' or (interval.text == '@' and tg['SOUND'][count + 1].text == 'd' and tg['SOUND'][count - 1].text != 'Z') or (interval.text == 'd' and tg['SOUND'][count - 1].text == '2'): # if those intervals appear...
-            index_no = count # save index of this interval, as this will be needed to save the new one
-            new_boundary = interval.xmax # get time of right boundary of this interval
-            removed_interval = tg['SOUND'].pop(count) # remove this interval
-            tg['SOUND'][index_no - 1].xmax = new_boundary # over-write the previous interval's right boundary with the one from the removed interval   
-    
-        # l'enfer - replace [e] with [E] and add [R]
-        if 'lenfer' in file and tg['SOUND'][count - 1].text == 'f':
-            index_no = count # save index of this interval, as this will be needed to add the new one
-            interval.text = interval.text.replace('e', 'E') # replace vowel
-            duration_proportion = interval.xmin + interval.dur * 0.67 # define the boundary between the current interval and its new neighbour to the right as a certain proportion of its current duration
-            tg['SOUND'].insert(index_no + 1, textgrids.Interval(text = 'R', xmin = duration_proportion, xmax = interval.xmax)) # insert a new interval to the right of the current interval, using the proportion defined earlier as its left boundary, and the right boundary of the current interval as its right boundary
-            interval.xmax = duration_proportion # update the right boundary of the current interval to match the left boundary of its new neighbour to the right
+        text = sound.texts[count]
+        if (text == '@' and sound.previous_text(count) == 'l') or text == 'z' or (text == '@' and sound.next_text(count) == 'd' and sound.previous_text(count) != 'Z') or (text == 'd' and sound.previous_text(count) == '2'): # if those intervals appear...
+            sound.merge_left(count) # remove this interval and extend the previous interval's right boundary to cover it
+            continue
+    
+        # Word-specific changes (yack, l'enfer, l'aîné, l'anis and l'apis)
+        if fixes.sound is not None:
+            fixes.sound(sound, count)
+    
+    # Make the changes to the sound tier
+    sound.apply()
+    timer.lap('sound')
             
-        # l'aîné - replace [a] with [e] and remove [j]
-        if 'laine' in file and interval.text == 'j' and tg['SOUND'][count - 1].text == 'a':
-            index_no = count # save index of this interval, as this will be needed to save the new one
-            new_boundary = interval.xmax # get time of right boundary of this interval
-            removed_interval = tg['SOUND'].pop(count) # remove this interval
-            tg['SOUND'][index_no - 1].xmax = new_boundary # over-write the previous interval's right boundary with the one from the removed interval
-            tg['SOUND'][index_no - 1].text = 'e'
-            
-            
-        # l'anis and l'apis - add [s]
-        if ('lanis' in file and tg['SOUND'][count - 1].text == 'n') or ('lapis' in file and tg['SOUND'][count - 1].text == 'p'):
-            index_no = count # save index of this interval, as this will be needed to add the new one
-            duration_proportion = interval.xmin + interval.dur * 0.67 # define the boundary between the current interval and its new neighbour to the right as a certain proportion of its current duration
-            tg['SOUND'].insert(index_no + 1, textgrids.Interval(text = 's', xmin = duration_proportion, xmax = interval.xmax)) # insert a new interval to the right of the current interval, using the proportion defined earlier as its left boundary, and the right boundary of the current interval as its right boundary
-            interval.xmax = duration_proportion # update the right boundary of the current interval to match the left boundary of its new neighbour to the right
-            
-        
-        # simple transcription fixes (redundant as used elsewhere)
-        fix_sound_syllable(interval)
-      
+
     
     
     ## syllable tier
-    for count, interval in enumerate(tg['SYLLABLE']):
-    
-        # yack part 1 - replace [i] with [j] - this might be redundant
-        if 'yack' in file and interval.text != 'd i': # avoid 'i' in 'dis' and 'samedi'
-            interval.text = interval.text.replace('i', 'j')
+    syllables = textgrid_edits.TierEdits(tg['SYLLABLE'])
+    for count in range(len(syllables)):
             
-        # l' - remove schwa [@] syllable
-        # This section messes up the result of the fix_sound_syllable() function.
-        # The whole script works if you apply the function elsewhere, as I have
-        # done, but ideally this part should be edited so that it doesn't cause
-        # problems with the function.
-        if interval.text == 'l' or interval.text == 'l @': # if those intervals appear...
-            index_no = count # save index of this interval, as this will be needed to save the new one
-            new_boundary = interval.xmin # get time of left boundary of this interval
-            removed_interval = tg['SYLLABLE'].pop(count) # remove this interval
-            tg['SYLLABLE'][index_no].text = 'l ' + tg['SYLLABLE'][index_no].text # over-write the text of the interval at the same index (the one to the right of the old one, now moved up a slot) as [l target]
-            tg['SYLLABLE'][index_no].xmin = new_boundary # over-write that interval's left boundary with the one from the removed interval
+        # l' - remove schwa [@] syllable and add [l] to the following syllable
+        # The following syllable is changed once all the changes below have
+        # been made to it, so it doesn't need to be fixed separately any more.
+        text = syllables.texts[count]
+        if text == 'l' or text == 'l @': # if those intervals appear...
+            syllables.merge_right(count, text = lambda text: 'l ' + text) # remove this interval, extend the next interval's left boundary to cover it and add [l] to its text
+            continue
             
         # samedi - remove schwa [@] syllable and move [m] to the previous syllable
-        if interval.text == 'm @' and tg['SYLLABLE'][count - 1].text == 's a': # if those intervals appear...
-            index_no = count # save index of this interval, as this will be needed to save the new one
-            new_boundary = interval.xmax # get time of right boundary of this interval
-            removed_interval = tg['SYLLABLE'].pop(count) # remove this interval
-            tg['SYLLABLE'][index_no - 1].text = 's a m' # over-write the previous interval's text as 's a m'
-            tg['SYLLABLE'][index_no - 1].xmax = new_boundary # over-write the previous interval's right boundary with the one from the removed interval
+        if text == 'm @' and syllables.previous_text(count) == 's a': # if those intervals appear...
+            syllables.merge_left(count, text = 's a m') # remove this interval, extend the previous interval's right boundary to cover it and over-write its text as 's a m'
+            continue
             
         # yack part 2- remove separate [a k] syllable and move these sounds to the previous syllable
-        if interval.text == 'a k' and tg['SYLLABLE'][count - 1].text == 'j': # if those intervals appear...
-            index_no = count # save index of this interval, as this will be needed to save the new one
-            new_boundary = interval.xmax # get time of right boundary of this interval
-            removed_interval = tg['SYLLABLE'].pop(count) # remove this interval
-            tg['SYLLABLE'][index_no - 1].text = 'j a k ' # over-write the previous interval's text as 'j a k'
-            tg['SYLLABLE'][index_no - 1].xmax = new_boundary # over-write the previous interval's right boundary with the one from the removed interval
-            
-            
-        # l'enfer - replace [e] with [E] and add [R]
-        if 'lenfer' in file:
-            interval.text = interval.text.replace('f e', 'f E R')
-            interval.text = interval.text.replace('f E R t', 'f E R')
-            
-        # l'anis and l'apis - add [s]
-        if (interval.text == 'n i' and 'lanis' in file) or (interval.text == 'p i' and 'lapis' in file):
-            interval.text = interval.text.replace('n i', 'n i s')
-            interval.text = interval.text.replace('p i', 'p i s')
+        if text == 'a k' and syllables.previous_text(count) == 'j': # if those intervals appear...
+            syllables.merge_left(count, text = 'j a k ') # remove this interval, extend the previous interval's right boundary to cover it and over-write its text as 'j a k'
+            continue
             
-        # simple transcription fixes (redundant as used elsewhere)
-        fix_sound_syllable(interval)
+        # Word-specific changes (yack part 1, l'enfer, l'anis and l'apis)
+        if fixes.syllable is not None:
+            fixes.syllable(syllables, count)
     
-    # l'aîné
-    # This part needs to be addressed here separately because the l' part above
-    # causes problems with the relevant line in the fix_sound_syllable() function.
-    # re.match is used because the whole interval.text needs replacing.
-    for interval in tg['SYLLABLE']:
-        if 'laine' in file and re.match(r'.+j', interval.text):
-            interval.text = 'l e'
+    # Make the changes to the syllable tier
+    syllables.apply()
+    
+    # Word-specific changes to the finished tiers (l'aîné)
+    if fixes.finish is not None:
+        fixes.finish(tg)
+    timer.lap('syllable')
 
 
     ### End of specific interval changes
-    
 
-    # Over-write the TextGrid  
-    tg.write(source_path + file)
-    
-    # Print a message to check that the file has been successfully processed
-    print('Successfully processed {}!'.format(file))
\ No newline at end of file
+# Process each TextGrid file in the folder (over-writing the old files)
+if __name__ == '__main__':
+    textgrid_batch.main(process_textgrid, source_path, description = 'Process French MAUS TextGrids.')
\ No newline at end of file
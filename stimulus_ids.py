@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 13:20:11 2026
+
+@author: Roy Alderton
+
+This module splits the file names of the recordings (and their TextGrids) from
+the nasality experiments into their parts, so that scripts can look up
+word-specific settings directly instead of searching the file name for each
+word in turn.
+
+The file names are made up of the speaker ID, the stimulus code from the
+SpeechRecorder XML files produced by get_xml.py (which contains the
+condition, the pair number and the word), the block and order numbers and
+the repetition number, e.g.:
+
+    0012fr_nasals_fin_or_p13_lotte_1_05__01.TextGrid
+
+which is parsed as:
+
+    StimulusID(speaker='0012', condition='fin_or', pair=13, word='lotte',
+               block=1, order=5, repetition=1)
+
+Any part that can't be found in a file name is set to None. Each file name is
+only parsed once, however many settings are looked up for it.
+
+The word-specific changes that the process_textgrid_tiers_* scripts make to
+the sound and syllable tiers (e.g. adding the [d] in 'Leonard') are listed in
+a dict of WordFixes, keyed by word, which is looked up once per file with
+lookup(). Each WordFixes has up to three functions:
+
+    1. sound: called for each interval on the sound tier, after the general
+    changes to that interval have been noted, with the tier's TierEdits
+    object (see the textgrid_edits module) and the position of the interval.
+    2. syllable: the same for the syllable tier.
+    3. finish: called with the whole TextGrid once the tiers have been
+    changed.
+
+For example:
+
+    word_fixes = {'Leonard': stimulus_ids.WordFixes(sound = fix_leonard_sound)}
+    fixes = stimulus_ids.lookup(word_fixes, file, stimulus_ids.no_fixes)
+
+This replaces checking the file name for each word (e.g. 'Leonard' in file)
+at every interval of every tier with a single lookup.
+
+The module should be saved in the same folder as the scripts that use it.
+"""
+
+import os
+import re
+import functools
+from collections import namedtuple
+
+# The parts of a stimulus file name
+StimulusID = namedtuple('StimulusID', ['speaker', 'condition', 'pair', 'word', 'block', 'order', 'repetition'])
+
+# Regex patterns for the parts of a file name
+# The condition is the two parts before the pair number (e.g. 'fin_or').
+speaker_pattern = re.compile(r'^(\d+)')
+stimulus_pattern = re.compile(r'(?:([A-Za-z]+_[A-Za-z]+)_)?p(\d{2})_([^_]+)')
+numbers_pattern = re.compile(r'_(\d+)_(\d+)(?:_+(\d+))?$')
+
+# The word-specific changes made by a processing script. See the module
+# docstring for details.
+WordFixes = namedtuple('WordFixes', ['sound', 'syllable', 'finish'], defaults = [None, None, None])
+
+# The WordFixes for words that don't need any changes
+no_fixes = WordFixes()
+
+
+@functools.lru_cache(maxsize = 4096)
+def parse_stimulus_id(file):
+    '''
+    Splits a file name into its parts. See the module docstring for details.
+
+    Parameters
+    ----------
+    file : str
+        The file name, with or without a path and extension.
+
+    Returns
+    -------
+    StimulusID
+        The parts of the file name. Any part that can't be found is None. If
+        the file name has no pair number and word, word is None.
+
+    '''
+    name = os.path.splitext(os.path.basename(file))[0]
+
+    speaker = speaker_pattern.match(name)
+    stimulus = stimulus_pattern.search(name)
+    numbers = numbers_pattern.search(name)
+
+    return StimulusID(speaker = speaker.group(1) if speaker else None,
+                      condition = stimulus.group(1) if stimulus else None,
+                      pair = int(stimulus.group(2)) if stimulus else None,
+                      word = stimulus.group(3) if stimulus else None,
+                      block = int(numbers.group(1)) if numbers else None,
+                      order = int(numbers.group(2)) if numbers else None,
+                      repetition = int(numbers.group(3)) if numbers and numbers.group(3) else None)
+
+
+def lookup(table, file, default = None):
+    '''
+    Looks up the setting for a file in a dict whose keys are either words
+    (e.g. 'lotte') or (condition, pair, word) tuples (e.g. ('fin_or', 13,
+    'lotte')) for settings that only apply to one member of a pair. The more
+    specific key is checked first.
+
+    Words are matched exactly, so a word that is written in more than one
+    way in the file names must be listed under each spelling (e.g. 'homme'
+    and 'lhomme'). Only if the word can't be found in the file name is each
+    key searched for in the file name instead, as the scripts did before this
+    module was added. A (condition, pair, word) key is then searched for as
+    it is written in the file name, e.g. 'fin_or_p13_lotte'.
+
+    Parameters
+    ----------
+    table : dict
+        The settings, as described above.
+    file : str
+        The file name.
+    default : optional
+        The value returned if there is no setting for the file. The default is
+        None.
+
+    Returns
+    -------
+    The setting for the file, or default.
+
+    '''
+    stimulus_id = parse_stimulus_id(file)
+    if stimulus_id.word is None:
+        for key, value in table.items():
+            if isinstance(key, tuple):
+                key = '{}_p{:02d}_{}'.format(*key)
+            if key in file:
+                return value
+        return default
+
+    value = table.get((stimulus_id.condition, stimulus_id.pair, stimulus_id.word))
+    if value is None:
+        value = table.get(stimulus_id.word, default)
+    return value
+
+
+def word_condition(*words):
+    '''
+    Returns a condition for a textgrid_rules.Rule that is true for the files
+    of the given words, e.g. word_condition('lane', 'lame').
+    '''
+    table = dict.fromkeys(words, True)
+    return lambda file: lookup(table, file, False)
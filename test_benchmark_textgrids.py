@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 01:48:35 2026
+
+@author: Roy Alderton
+
+Tests for benchmark_textgrids.py.
+"""
+
+import os
+import numpy as np
+import pytest
+import benchmark_textgrids
+import stimulus_ids
+import textgrid_arrays
+
+
+@pytest.mark.parametrize('language', sorted(benchmark_textgrids.target_words))
+def test_make_corpus(language, make_corpus):
+    path, file_list = make_corpus(language, 20)
+    assert sorted(os.listdir(path)) == sorted(file_list)
+    words = {word[0] for word in benchmark_textgrids.target_words[language]}
+    for file in file_list:
+        stimulus_id = stimulus_ids.parse_stimulus_id(file)
+        assert stimulus_id.word in words
+
+        # The tiers line up: each word's sounds and syllables fill it exactly
+        tg = textgrid_arrays.TextGrid(os.path.join(path, file))
+        assert list(tg) == ['ORT-MAU', 'KAN-MAU', 'KAS-MAU', 'MAU', 'MAS']
+        assert stimulus_id.word in tg['ORT-MAU'].texts
+        for name in ('KAN-MAU', 'KAS-MAU', 'MAS', 'MAU'):
+            assert tg[name].xmins[0] == 0.0 and tg[name].xmaxs[-1] == tg.xmax
+            assert np.array_equal(tg[name].xmins[1:], tg[name].xmaxs[:-1])
+        assert set(tg['ORT-MAU'].xmaxs.tolist()) <= set(tg['MAS'].xmaxs.tolist()) <= set(tg['MAU'].xmaxs.tolist())
+
+
+def test_make_corpus_is_repeatable(tmp_path):
+    first = str(tmp_path / 'first')
+    second = str(tmp_path / 'second')
+    file_list = benchmark_textgrids.make_corpus(first, 'de', 6, words = ['Mann', 'Tat'], seed = 3)
+    assert benchmark_textgrids.make_corpus(second, 'de', 6, words = ['Mann', 'Tat'], seed = 3) == file_list
+    assert {stimulus_ids.parse_stimulus_id(file).word for file in file_list} == {'Mann', 'Tat'}
+    for file in file_list:
+        with open(os.path.join(first, file), 'rb') as infile, open(os.path.join(second, file), 'rb') as other:
+            assert infile.read() == other.read()
+    with pytest.raises(ValueError):
+        benchmark_textgrids.make_corpus(first, 'de', 6, words = ['Leonard'])
+
+
+def test_run_benchmark(make_corpus):
+    path, file_list = make_corpus('en')
+    result = benchmark_textgrids.run_benchmark('en', path, file_list, repeat = 2)
+    assert result['files'] == len(file_list)
+    assert result['seconds'] == pytest.approx(sum(result['stages'].values()))
+    assert {'load', 'tiers', 'roi', 'fixes', 'write'} <= set(result['stages'])
+    assert 'files/s' in benchmark_textgrids.format_result('en', result)
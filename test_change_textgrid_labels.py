@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 04:37:12 2026
+
+@author: Roy Alderton
+
+Tests for change_textgrid_labels.py.
+"""
+
+import os
+import sys
+import subprocess
+import pytest
+from textgrid_arrays import Tier, TextGrid
+
+# The script uses the textgrids library
+pytest.importorskip('textgrids')
+import change_textgrid_labels
+
+script_path = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_recordings(path, names):
+    # Empty WAV files, recorded in the order given
+    os.makedirs(path, exist_ok = True)
+    for count, name in enumerate(names):
+        file = os.path.join(path, name + '.wav')
+        open(file, 'wb').close()
+        os.utime(file, (1000 + count, 1000 + count))
+
+
+def make_block_textgrid(path, n_items):
+    # A TextGrid like those from Praat's 'Annotate to TextGrid (silences)...'
+    bounds = [float(count) for count in range(2 * n_items + 2)]
+    tg = TextGrid(xmin = 0.0, xmax = bounds[-1])
+    tg['silences'] = Tier.from_arrays(bounds[:-1], bounds[1:], ['', 'speech'] * n_items + [''])
+    tg.write(path)
+
+
+def test_textgrid_block():
+    assert change_textgrid_labels.textgrid_block('RECS/0012_nasalance_1.TextGrid') == ('0012', 1)
+    assert change_textgrid_labels.textgrid_block('nasalance_12.TextGrid') == (None, 12)
+    assert change_textgrid_labels.textgrid_block('labels.TextGrid') is None
+
+
+def test_scan_wav_files(tmp_path):
+    path = str(tmp_path / 'RECS_mono')
+    make_recordings(path, ['0012de_nasals_fin_nas_p03_Mann_2_01__01',
+                           '0012de_nasals_fin_or_p03_Tat_1_01__01',
+                           '0012de_practice_1_01',
+                           '0012de_instructions_1_02',
+                           '0013de_nasals_ini_nas_p01_Mann_1_01__01',
+                           'item_1_b',
+                           '0012de_nasals_fin_nas_p05_Sonne_1_02__01',
+                           'notes'])
+    assert change_textgrid_labels.scan_wav_files(path) == {
+        1: [('0012', '0012de_nasals_fin_or_p03_Tat_1_01__01'), ('0013', '0013de_nasals_ini_nas_p01_Mann_1_01__01'),
+            (None, 'item_1_b'), ('0012', '0012de_nasals_fin_nas_p05_Sonne_1_02__01')],
+        2: [('0012', '0012de_nasals_fin_nas_p03_Mann_2_01__01')]}
+
+
+def test_label_textgrid(tmp_path, capsys):
+    # Only the items of the TextGrid's speaker (or with no speaker) and block
+    # are used, in the order they were recorded
+    blocks = {1: [('0012', 'first'), ('0013', 'other'), (None, 'second')], 2: [('0012', 'later')]}
+    textgrid_name = str(tmp_path / '0012_nasalance_1.TextGrid')
+    make_block_textgrid(textgrid_name, 2)
+    assert change_textgrid_labels.label_textgrid(textgrid_name, blocks) == str(tmp_path / '0012_nasalance_1_labelled.TextGrid')
+    assert TextGrid(str(tmp_path / '0012_nasalance_1_labelled.TextGrid'))['silences'].texts == ['', 'first', '', 'second', '']
+    assert 'first\nsecond\n' in capsys.readouterr().out
+
+
+def test_script(tmp_path):
+    # Without any TextGrids given, every block TextGrid in the folder is
+    # labelled, except those already labelled
+    make_recordings(str(tmp_path / 'RECS_mono'), ['0012de_nasals_fin_nas_p03_Mann_1_01__01', '0012de_nasals_fin_or_p03_Tat_2_01__01',
+                                                  '0012de_nasals_fin_or_p04_Bett_1_02__01'])
+    make_block_textgrid(str(tmp_path / '0012_nasalance_1.TextGrid'), 2)
+    make_block_textgrid(str(tmp_path / '0012_nasalance_2.TextGrid'), 1)
+    make_block_textgrid(str(tmp_path / 'practice.TextGrid'), 1)
+    script = os.path.join(script_path, 'change_textgrid_labels.py')
+    subprocess.run([sys.executable, script], cwd = str(tmp_path), check = True, stdout = subprocess.PIPE)
+    assert TextGrid(str(tmp_path / '0012_nasalance_1_labelled.TextGrid'))['silences'].texts == \
+        ['', '0012de_nasals_fin_nas_p03_Mann_1_01__01', '', '0012de_nasals_fin_or_p04_Bett_1_02__01', '']
+    assert TextGrid(str(tmp_path / '0012_nasalance_2_labelled.TextGrid'))['silences'].texts == ['', '0012de_nasals_fin_or_p03_Tat_2_01__01', '']
+    assert not os.path.exists(str(tmp_path / 'practice_labelled.TextGrid'))
+
+    subprocess.run([sys.executable, script], cwd = str(tmp_path), check = True, stdout = subprocess.PIPE)
+    assert not os.path.exists(str(tmp_path / '0012_nasalance_1_labelled_labelled.TextGrid'))
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 00:34:02 2026
+
+@author: Roy Alderton
+
+Tests that the process_textgrid_tiers_* scripts still give the same results as
+the original scripts, which used the textgrids library.
+
+The files in test_data (e.g. baseline_de.json) were made by generating a
+corpus with benchmark_textgrids.make_corpus(), with the number of files and
+the seed saved in the file, and processing it with the original scripts. They
+hold every interval of every tier of each processed TextGrid. The only
+difference expected is in the French 'yack' items (see load_baseline()).
+"""
+
+import os
+import sys
+import json
+import subprocess
+import numpy as np
+import pytest
+import benchmark_textgrids
+import textgrid_arrays
+import textgrid_batch
+import process_textgrid_tiers_de
+import process_textgrid_tiers_en
+import process_textgrid_tiers_fr
+
+script_path = os.path.dirname(os.path.abspath(__file__))
+data_path = os.path.join(script_path, 'test_data')
+languages = {'de': process_textgrid_tiers_de, 'en': process_textgrid_tiers_en, 'fr': process_textgrid_tiers_fr}
+
+
+def load_baseline(language):
+    '''
+    Loads the results of the original script for a language, and the corpus
+    they were made from.
+
+    The original French script skipped the interval after each one it removed,
+    so the [i] after the removed liaison [z] of 'yack' was never changed to [j]
+    (see the textgrid_edits module). It is changed here.
+    '''
+    with open(os.path.join(data_path, 'baseline_{}.json'.format(language)), encoding = 'UTF-8') as infile:
+        baseline = json.load(infile)
+    if language == 'fr':
+        for file, tiers in baseline['outputs'].items():
+            if '_yack_' in file:
+                start = next(xmin for xmin, _, text in tiers['WORD'] if text == 'yack')
+                interval = next(interval for interval in tiers['SOUND'] if interval[0] == start)
+                assert interval[2] == 'i'
+                interval[2] = 'j'
+    return baseline
+
+
+def make_inputs(baseline, path, file_format = 'long'):
+    '''Generates the corpus that a baseline was made from.'''
+    file_list = benchmark_textgrids.make_corpus(path, baseline['language'], baseline['files'], file_format = file_format, seed = baseline['seed'])
+    assert sorted(file_list) == sorted(baseline['outputs'])
+    return file_list
+
+
+def assert_matches_baseline(path, baseline):
+    '''Checks that the processed TextGrids in a folder match a baseline.'''
+    for file, tiers in baseline['outputs'].items():
+        tg = textgrid_arrays.TextGrid(os.path.join(path, file))
+        assert list(tg) == list(tiers), file
+        for name, intervals in tiers.items():
+            assert tg[name].texts == [text for _, _, text in intervals], (file, name)
+            assert np.allclose(tg[name].xmins, [xmin for xmin, _, _ in intervals], rtol = 0, atol = 1e-9), (file, name)
+            assert np.allclose(tg[name].xmaxs, [xmax for _, xmax, _ in intervals], rtol = 0, atol = 1e-9), (file, name)
+
+
+@pytest.mark.parametrize('language', sorted(languages))
+def test_matches_baseline(language, tmp_path):
+    baseline = load_baseline(language)
+    path = str(tmp_path / 'TextGrids')
+    file_list = make_inputs(baseline, path)
+    report = textgrid_batch.run_batch(languages[language].process_textgrid, file_list, path, n_jobs = 1)
+    assert report.failed == {}
+    assert sorted(report.processed) == sorted(file_list)
+    assert_matches_baseline(path, baseline)
+
+
+@pytest.mark.parametrize('input_format, output_format', [('short', 'long'), ('binary', 'long'), ('long', 'short'), ('long', 'binary')])
+def test_formats_match_baseline(input_format, output_format, tmp_path):
+    # The same results are given whatever format the TextGrids are read and
+    # written in
+    baseline = load_baseline('fr')
+    path = str(tmp_path / 'TextGrids')
+    file_list = make_inputs(baseline, path, input_format)
+    report = textgrid_batch.run_batch(process_textgrid_tiers_fr.process_textgrid, file_list, path, n_jobs = 1, output_format = output_format)
+    assert report.failed == {}
+    assert_matches_baseline(path, baseline)
+    assert textgrid_arrays.TextGrid(os.path.join(path, file_list[0])).file_format == output_format
+
+
+def _read_folder(path):
+    contents = {}
+    for folder, _, file_names in os.walk(path):
+        for name in file_names:
+            with open(os.path.join(folder, name), 'rb') as infile:
+                contents[os.path.relpath(os.path.join(folder, name), path)] = infile.read()
+    return contents
+
+
+@pytest.mark.parametrize('language', ['en', 'fr'])
+def test_safe_script(language, tmp_path):
+    # The safe scripts are run as they would be from the command line, in a
+    # folder with the TextGrids folder and some other files in it
+    baseline = load_baseline(language)
+    path = str(tmp_path / 'TextGrids')
+    make_inputs(baseline, path)
+    os.makedirs(os.path.join(path, 'audio'))
+    with open(os.path.join(path, 'audio', 'notes.txt'), 'w') as outfile:
+        outfile.write('not a TextGrid')
+    with open(os.path.join(path, '0001{}_practice_1.TextGrid'.format(language)), 'w') as outfile:
+        outfile.write('practice items are not processed')
+    originals = _read_folder(path)
+
+    script = os.path.join(script_path, 'process_textgrid_tiers_{}_safe.py'.format(language))
+    for run in range(2):
+        output = subprocess.run([sys.executable, script, '-j', '1'], cwd = str(tmp_path), check = True, stdout = subprocess.PIPE).stdout
+        assert ('Skipped {} files'.format(len(baseline['outputs'])).encode() in output) == (run == 1)
+
+        # The originals are unchanged, the processed TextGrids match the
+        # original scripts, and the other files are passed through
+        assert _read_folder(path) == originals
+        copy_path = str(tmp_path / 'TextGrids_copy')
+        assert_matches_baseline(copy_path, baseline)
+        copied = _read_folder(copy_path)
+        for name, data in originals.items():
+            if name not in baseline['outputs']:
+                assert copied[name] == data
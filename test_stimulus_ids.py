@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 02:31:08 2026
+
+@author: Roy Alderton
+
+Tests for the stimulus_ids module.
+"""
+
+import stimulus_ids
+from stimulus_ids import StimulusID
+import process_textgrid_tiers_en
+import process_textgrid_tiers_fr
+
+
+def test_parse_stimulus_id():
+    assert stimulus_ids.parse_stimulus_id('TextGrids/0012fr_nasals_fin_or_p13_lotte_1_05__01.TextGrid') == \
+        StimulusID(speaker = '0012', condition = 'fin_or', pair = 13, word = 'lotte', block = 1, order = 5, repetition = 1)
+
+    # Missing parts are None
+    assert stimulus_ids.parse_stimulus_id('0003de_nasals_ini_nas_p02_Mann_2_11') == \
+        StimulusID(speaker = '0003', condition = 'ini_nas', pair = 2, word = 'Mann', block = 2, order = 11, repetition = None)
+    assert stimulus_ids.parse_stimulus_id('p07_Leonard.wav') == \
+        StimulusID(speaker = None, condition = None, pair = 7, word = 'Leonard', block = None, order = None, repetition = None)
+    assert stimulus_ids.parse_stimulus_id('0001de_practice_1.TextGrid').word is None
+
+
+def test_lookup():
+    table = {'lotte': 'word', ('fin_or', 13, 'lotte'): 'pair', 'lanis': 'lanis'}
+    assert stimulus_ids.lookup(table, '0012fr_nasals_fin_or_p13_lotte_1_05__01.TextGrid') == 'pair'
+    assert stimulus_ids.lookup(table, '0012fr_nasals_fin_nas_p13_lotte_1_05__01.TextGrid') == 'word'
+    assert stimulus_ids.lookup(table, '0012fr_nasals_fin_or_p12_lotte_1_05__01.TextGrid') == 'word'
+
+    # Words are matched exactly, not as part of a longer word
+    assert stimulus_ids.lookup({'anis': 'anis'}, '0012fr_nasals_ini_nas_p04_lanis_1_02__01.TextGrid', 'none') == 'none'
+    assert stimulus_ids.lookup({'lot': 'lot'}, '0012fr_nasals_fin_or_p13_lotte_1_05__01.TextGrid') is None
+
+    # File names without a word are searched for each key instead
+    assert stimulus_ids.lookup(table, 'lotte_recording.TextGrid') == 'word'
+    assert stimulus_ids.lookup(table, 'extra_fin_or_p13_lotte.TextGrid') == 'pair'
+    assert stimulus_ids.lookup(table, '0001fr_practice_1.TextGrid', 'none') == 'none'
+
+
+def test_word_condition():
+    condition = stimulus_ids.word_condition('lane', 'lame')
+    assert condition('0004en_nasals_fin_nas_p03_lane_1_07__01.TextGrid')
+    assert not condition('0004en_nasals_fin_nas_p03_plane_1_07__01.TextGrid')
+    assert not condition('0004en_nasals_fin_nas_p03_lame2_1_07__01.TextGrid')
+
+
+def test_word_fixes():
+    assert stimulus_ids.no_fixes == (None, None, None)
+    fixes = stimulus_ids.WordFixes(sound = len)
+    assert fixes.sound is len and fixes.syllable is None and fixes.finish is None
+
+    # The scripts' word-specific changes are found for the words in the file
+    # names, and no others
+    lookup = stimulus_ids.lookup
+    assert lookup(process_textgrid_tiers_en.word_fixes, '0004en_nasals_fin_nas_p05_Leonard_1_03__01.TextGrid') is process_textgrid_tiers_en.word_fixes['Leonard']
+    assert lookup(process_textgrid_tiers_en.word_fixes, '0004en_nasals_fin_nas_p05_Leo_1_03__01.TextGrid', stimulus_ids.no_fixes) is stimulus_ids.no_fixes
+    assert lookup(process_textgrid_tiers_fr.word_fixes, '0012fr_nasals_ini_nas_p04_lanis_1_02__01.TextGrid') is process_textgrid_tiers_fr.word_fixes['lanis']
+    assert lookup(process_textgrid_tiers_fr.word_fixes, '0012fr_nasals_ini_or_p04_anis_1_02__01.TextGrid', stimulus_ids.no_fixes) is stimulus_ids.no_fixes
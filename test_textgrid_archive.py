@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 23:58:12 2026
+
+@author: Roy Alderton
+
+Tests for the textgrid_archive module.
+"""
+
+import os
+import tarfile
+import zipfile
+import pytest
+import textgrid_archive
+
+
+def _make_archives(path, file_list, tmp_path):
+    # The same TextGrids in a zip and a compressed tar archive, in a
+    # sub-folder as in the WebMAUS results, with a folder entry and a text file
+    zip_path = str(tmp_path / 'results.zip')
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        archive.writestr('results/', b'')
+        for file in file_list:
+            archive.write(os.path.join(path, file), 'results/' + file)
+        archive.writestr('results/README.txt', b'notes')
+    tar_path = str(tmp_path / 'results.tar.gz')
+    with tarfile.open(tar_path, 'w:gz') as archive:
+        for file in file_list:
+            archive.add(os.path.join(path, file), 'results/' + file)
+    return zip_path, tar_path
+
+
+def test_iter_members_and_member_names(make_corpus, tmp_path):
+    path, file_list = make_corpus('de')
+    zip_path, tar_path = _make_archives(path, file_list, tmp_path)
+    for archive_path in (zip_path, tar_path):
+        members = list(textgrid_archive.iter_members(archive_path, lambda name: name.endswith('.TextGrid')))
+        assert [name for name, _ in members] == file_list
+        for name, data in members:
+            with open(os.path.join(path, name), 'rb') as infile:
+                assert data == infile.read()
+        assert textgrid_archive.member_names(archive_path, lambda name: name.endswith('.TextGrid')) == file_list
+
+    assert textgrid_archive.member_names(zip_path) == file_list + ['README.txt']
+    assert textgrid_archive.count_members(zip_path) == len(file_list) + 1
+    assert textgrid_archive.count_members(tar_path) is None
+
+
+def test_iter_members_skips_unselected(tmp_path):
+    # A member that isn't selected is never read, so a damaged one does no harm
+    zip_path = str(tmp_path / 'results.zip')
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        archive.writestr('a.TextGrid', b'a')
+        archive.writestr('b.txt', b'b')
+    with open(zip_path, 'r+b') as outfile:
+        data = outfile.read()
+        outfile.seek(data.index(b'b', data.index(b'b.txt') + 5))
+        outfile.write(b'x')
+    assert list(textgrid_archive.iter_members(zip_path, lambda name: name.endswith('.TextGrid'))) == [('a.TextGrid', b'a')]
+
+
+def test_not_an_archive(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('not an archive')
+    assert not textgrid_archive.is_archive(str(path))
+    with pytest.raises(textgrid_archive.ArchiveError):
+        textgrid_archive.member_names(str(path))
+
+
+@pytest.mark.parametrize('output', ['out.zip', 'out.tar', 'out.tar.gz', 'out'])
+def test_archive_writer(tmp_path, output):
+    output = str(tmp_path / output)
+    with textgrid_archive.ArchiveWriter(output) as writer:
+        writer.add('a.TextGrid', b'first')
+        writer.add('b.TextGrid', b'second')
+    if textgrid_archive.output_kind(output) is None:
+        assert sorted(os.listdir(output)) == ['a.TextGrid', 'b.TextGrid']
+    else:
+        assert list(textgrid_archive.iter_members(output)) == [('a.TextGrid', b'first'), ('b.TextGrid', b'second')]
+
+
+def test_default_output():
+    assert textgrid_archive.default_output('results.zip') == 'results_processed'
+    assert textgrid_archive.default_output('results.tar.gz') == 'results_processed'
+    assert textgrid_archive.output_kind('results.tgz') == 'w:gz'
+    assert textgrid_archive.output_kind('TextGrids') is None
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 00:21:37 2026
+
+@author: Roy Alderton
+
+Tests for the textgrid_arrays module.
+"""
+
+import re
+import codecs
+import numpy as np
+import pytest
+import benchmark_textgrids
+import textgrid_arrays
+from textgrid_arrays import Interval, Tier, TextGrid
+
+
+def make_textgrid():
+    # A small TextGrid with an interval tier (including a label with
+    # quotation marks and one with non-ASCII characters) and a point tier
+    tg = TextGrid(xmin = 0.0, xmax = 1.5)
+    tg['ORT-MAU'] = Tier.from_arrays([0.0, 0.25, 1.0], [0.25, 1.0, 1.5], ['', 'say "Cléo"', ''])
+    tg['MAU'] = Tier.from_arrays([0.0, 0.25, 0.5, 0.75, 1.0], [0.25, 0.5, 0.75, 1.0, 1.5], ['<p:>', 'k', 'l', 'e', '<p:>'])
+    tg['POINTS'] = Tier.from_arrays([0.3, 0.9], [0.3, 0.9], ['a', 'b'], xmin = 0.0, xmax = 1.5, point_tier = True)
+    return tg
+
+
+def assert_same(tg, other):
+    assert (tg.xmin, tg.xmax) == (other.xmin, other.xmax)
+    assert list(tg) == list(other)
+    for name, tier in tg.items():
+        assert tier.is_point_tier == other[name].is_point_tier
+        assert tier.texts == other[name].texts
+        assert np.array_equal(tier.xmins, other[name].xmins)
+        assert np.array_equal(tier.xmaxs, other[name].xmaxs)
+
+
+def test_long_round_trip(tmp_path):
+    tg = make_textgrid()
+    path = str(tmp_path / 'example.TextGrid')
+    tg.write(path)
+    loaded = TextGrid(path)
+    assert loaded.file_format == 'long'
+    assert_same(loaded, tg)
+    assert loaded.to_bytes() == tg.to_bytes()
+    assert 'text = "say ""Cléo"""' in tg.format()
+
+
+def test_long_format_matches_textgrids_library(tmp_path):
+    textgrids = pytest.importorskip('textgrids')
+    path = str(tmp_path / 'library.TextGrid')
+    tg = textgrids.TextGrid()
+    tg.xmin, tg.xmax = 0.0, 1.5
+    tg['WORD'] = textgrids.Tier([textgrids.Interval('', 0.0, 0.25), textgrids.Interval('Mann', 0.25, 1.0), textgrids.Interval('', 1.0, 1.5)])
+    tg['SOUND'] = textgrids.Tier([textgrids.Interval('<p:>', 0.0, 0.25), textgrids.Interval('m', 0.25, 0.5), textgrids.Interval('a', 0.5, 0.75),
+                                  textgrids.Interval('n', 0.75, 1.0), textgrids.Interval('<p:>', 1.0, 1.5)])
+    tg.write(path)
+    with open(path, 'rb') as infile:
+        data = infile.read()
+    loaded = TextGrid(path)
+
+    # The library numbers every tier 'item [1]', so only the tier numbers
+    # are allowed to differ
+    assert re.sub(rb'item \[\d+\]:', b'item []:', loaded.to_bytes()) == re.sub(rb'item \[\d+\]:', b'item []:', data)
+
+
+@pytest.mark.parametrize('file_format', textgrid_arrays.file_formats)
+def test_formats_round_trip(tmp_path, file_format):
+    # Each format reads back to the same TextGrid, and gives the same long
+    # text format as the original
+    tg = make_textgrid()
+    path = str(tmp_path / 'example.TextGrid')
+    tg.write(path, file_format)
+    loaded = TextGrid(path)
+    assert loaded.file_format == file_format
+    assert_same(loaded, tg)
+    assert loaded.to_bytes() == tg.to_bytes()
+    assert loaded.to_bytes(file_format) == tg.to_bytes(file_format)
+
+
+@pytest.mark.parametrize('file_format', textgrid_arrays.file_formats)
+def test_empty_tier(tmp_path, file_format):
+    # An empty tier keeps its start and end times
+    tg = TextGrid(xmin = 0.0, xmax = 1.5)
+    tg['EMPTY'] = Tier.from_arrays([], [], [], xmin = 0.0, xmax = 1.5)
+    assert (tg['EMPTY'].xmin, tg['EMPTY'].xmax) == (0.0, 1.5)
+    path = str(tmp_path / 'example.TextGrid')
+    tg.write(path, file_format)
+    loaded = TextGrid(path)
+    assert len(loaded['EMPTY']) == 0
+    assert (loaded['EMPTY'].xmin, loaded['EMPTY'].xmax) == (0.0, 1.5)
+
+
+def test_short_and_binary_are_smaller():
+    # For a TextGrid like those from MAUS, with times to six decimal places
+    tg = benchmark_textgrids.make_textgrid('de', benchmark_textgrids.target_words['de'][0], np.random.default_rng(1))
+    sizes = {file_format: len(tg.to_bytes(file_format)) for file_format in textgrid_arrays.file_formats}
+    assert sizes['binary'] < sizes['short'] < sizes['long']
+
+
+def test_binary_labels():
+    # Plain ASCII labels are stored as bytes, others as UTF-16
+    assert textgrid_arrays.binary_text('n') == b'\x00\x01n'
+    encoded = textgrid_arrays.binary_text('é')
+    assert encoded == b'\xff\xff\x00\x01\x00\xe9'
+    assert textgrid_arrays.read_binary_text(encoded + b'rest', 0) == ('é', len(encoded))
+
+
+def test_short_format_from_praat():
+    # The short text format as Praat writes it, with a point tier
+    data = '\n'.join(['File type = "ooTextFile"', 'Object class = "TextGrid"', '', '0', '2.5', '<exists>', '2',
+                      '"IntervalTier"', '"words"', '0', '2.5', '2', '0', '1.5', '"say ""hi"""', '1.5', '2.5', '""',
+                      '"TextTier"', '"points"', '0', '2.5', '1', '1.25', '"mid"', ''])
+    tg = TextGrid()
+    tg.parse(data.encode('UTF-8'))
+    assert tg.file_format == 'short'
+    assert (tg.xmin, tg.xmax) == (0.0, 2.5)
+    assert tg['words'].texts == ['say "hi"', '']
+    assert tg['words'].xmaxs.tolist() == [1.5, 2.5]
+    assert tg['points'].is_point_tier and tg['points'].xmins.tolist() == [1.25]
+
+
+@pytest.mark.parametrize('encoding, bom', [('UTF-8', b''), ('UTF-8', codecs.BOM_UTF8),
+                                           ('UTF-16-LE', b''), ('UTF-16-LE', codecs.BOM_UTF16_LE),
+                                           ('UTF-16-BE', b''), ('UTF-16-BE', codecs.BOM_UTF16_BE)])
+def test_encodings(tmp_path, encoding, bom, monkeypatch):
+    # Praat writes UTF-16 with a byte order mark, but other programs may leave
+    # it out or add one to UTF-8
+    tg = make_textgrid()
+    text = tg.format()
+    data = bom + text.encode(encoding)
+    assert textgrid_arrays.decode_textgrid_bytes(data) == text
+    assert textgrid_arrays.decode_textgrid_bytes(memoryview(data)) == text
+    assert textgrid_arrays.decode_textgrid_bytes(bytearray(data)) == text
+
+    # The same is read from a file, whether or not it is memory-mapped
+    path = str(tmp_path / 'example.TextGrid')
+    with open(path, 'wb') as outfile:
+        outfile.write(data)
+    for threshold in (1 << 30, 0):
+        monkeypatch.setattr(textgrid_arrays, 'mmap_threshold', threshold)
+        assert_same(TextGrid(path), tg)
+
+
+def test_decode_short_and_invalid():
+    assert textgrid_arrays.decode_textgrid_bytes(b'') == ''
+    assert textgrid_arrays.decode_textgrid_bytes(b'F') == 'F'
+    with pytest.raises(UnicodeDecodeError):
+        textgrid_arrays.decode_textgrid_bytes(b'File type = "\xff"')
+
+
+def test_damaged_binary():
+    data = make_textgrid().to_bytes('binary')
+    with pytest.raises(textgrid_arrays.ParseError):
+        TextGrid().parse(data[:len(data) // 2])
+
+
+def test_interval_views_follow_edits():
+    tier = Tier.from_arrays([0.0, 1.0, 2.0], [1.0, 2.0, 3.0], ['a', 'b', 'c'])
+    second = tier[1]
+    tier.insert(0, Interval('z', -1.0, 0.0))
+    assert second.text == 'b' and tier.texts == ['z', 'a', 'b', 'c']
+
+    # A view of a popped interval refers to the detached interval
+    removed = tier.pop(2)
+    assert removed.text == 'b'
+    second.text = 'x'
+    assert second.text == 'x' and tier.texts == ['z', 'a', 'c']
+
+    tier[-1].text = 'c2'
+    tier[0].xmin = -0.5
+    assert tier.texts[-1] == 'c2' and tier.xmins[0] == -0.5
+    assert [interval.text for interval in tier[1:]] == ['a', 'c2']
+    with pytest.raises(IndexError):
+        tier[3]
+
+
+def test_iteration_sees_edits():
+    # As with a list, an interval popped while iterating moves the next one
+    # into its place
+    tier = Tier.from_arrays([0.0, 1.0, 2.0, 3.0], [1.0, 2.0, 3.0, 4.0], ['a', 'x', 'b', 'c'])
+    seen = []
+    for count, interval in enumerate(tier):
+        seen.append(interval.text)
+        if interval.text == 'x':
+            tier.pop(count)
+    assert seen == ['a', 'x', 'c']
+    assert tier.texts == ['a', 'b', 'c']
+
+
+def test_labels_are_interned():
+    tier = Tier.from_arrays([0.0, 1.0, 2.0], [1.0, 2.0, 3.0], ['n', 'a', 'n'])
+    assert tier.labels == ['n', 'a']
+    assert tier.codes.tolist() == [0, 1, 0]
+    tier.texts = ['a', 'a', 'm']
+    assert tier.texts == ['a', 'a', 'm']
+    assert np.allclose(tier.durs, 1.0)
+
+
+def test_textgrid_tier_order():
+    # Popping a tier and assigning it to a new name puts it at the end, as in
+    # the textgrids library
+    tg = make_textgrid()
+    tg['WORD'] = tg.pop('ORT-MAU')
+    assert list(tg) == ['MAU', 'POINTS', 'WORD']
+
+
+def test_parse_errors():
+    with pytest.raises(textgrid_arrays.ParseError):
+        TextGrid().parse(b'File type = "ooTextFile"\nObject class = "Sound"\n')
+    data = make_textgrid().format().replace('intervals: size = 5', 'intervals: size = 6')
+    with pytest.raises(textgrid_arrays.ParseError):
+        TextGrid().parse(data)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 03:41:27 2026
+
+@author: Roy Alderton
+
+Tests for the textgrid_audio module.
+"""
+
+import os
+import wave
+import struct
+import numpy as np
+import pytest
+import textgrid_audio
+import textgrid_batch
+import process_textgrid_tiers_en
+from textgrid_arrays import TextGrid
+from textgrid_audio import WavError, WavFile
+
+
+def write_wav(path, samples, sample_rate = 16000, width = 2):
+    '''
+    Writes samples between -1 and 1 (one column per channel) as integer PCM
+    with the wave module.
+    '''
+    samples = np.asarray(samples, dtype = np.float64)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    scale = 2 ** (8 * width - 1)
+    values = np.clip(np.round(samples * scale), -scale, scale - 1).astype(np.int64)
+    if width == 1:
+        data = (values + 128).astype(np.uint8).tobytes()
+    else:
+        data = b''.join(int(value).to_bytes(width, 'little', signed = True) for value in values.ravel())
+    with wave.open(path, 'wb') as outfile:
+        outfile.setnchannels(samples.shape[1])
+        outfile.setsampwidth(width)
+        outfile.setframerate(sample_rate)
+        outfile.writeframes(data)
+    return values / scale
+
+
+def write_float_wav(path, samples, sample_rate = 16000):
+    # The wave module can only write integer samples
+    data = np.asarray(samples, dtype = '<f4').tobytes()
+    with open(path, 'wb') as outfile:
+        outfile.write(b'RIFF' + struct.pack('<I', 36 + 8 + len(data)) + b'WAVE')
+        outfile.write(b'fmt ' + struct.pack('<IHHIIHH', 16, textgrid_audio.WAVE_FORMAT_IEEE_FLOAT, 1, sample_rate, sample_rate * 4, 4, 32))
+        outfile.write(b'LIST' + struct.pack('<I', 3) + b'abc\x00')
+        outfile.write(b'data' + struct.pack('<I', len(data)) + data)
+
+
+@pytest.mark.parametrize('width', [1, 2, 3, 4])
+def test_integer_samples(tmp_path, width):
+    path = str(tmp_path / 'example.wav')
+    samples = np.random.default_rng(width).uniform(-1, 1, (400, 2))
+    expected = write_wav(path, samples, width = width)
+    with WavFile(path) as wav:
+        assert (wav.n_channels, wav.sample_rate, wav.n_samples, wav.sample_width) == (2, 16000, 400, width)
+        assert wav.duration == 0.025
+        assert np.allclose(wav.read_samples(0, 400), expected, rtol = 0, atol = 1e-12)
+        assert np.allclose(wav.read(0.0025, 0.005), expected[40:80].mean(axis = 1), rtol = 0, atol = 1e-12)
+        assert wav.read(0.0, 0.01, mono = False).shape == (160, 2)
+
+
+def test_float_samples(tmp_path):
+    # A float WAV file with another chunk (of odd length) before the data
+    path = str(tmp_path / 'example.wav')
+    samples = np.linspace(-1, 1, 100, dtype = np.float32)
+    write_float_wav(path, samples, 1000)
+    with WavFile(path) as wav:
+        assert wav.format_code == textgrid_audio.WAVE_FORMAT_IEEE_FLOAT
+        assert np.array_equal(wav.read(0.0, 1.0), samples.astype(np.float64))
+
+        # Times outside the recording are clipped to it
+        assert wav.sample_range(-1.0, 0.05) == (0, 50)
+        assert wav.sample_range(0.08, 5.0) == (80, 100)
+        assert wav.sample_range(0.06, 0.05) == (60, 60)
+
+
+def test_wav_errors(tmp_path):
+    path = str(tmp_path / 'example.wav')
+    with open(path, 'wb') as outfile:
+        outfile.write(b'File type = "ooTextFile"\n')
+    with pytest.raises(WavError):
+        WavFile(path)
+    with open(path, 'wb') as outfile:
+        outfile.write(b'RIFF' + struct.pack('<I', 4) + b'WAVE')
+    with pytest.raises(WavError):
+        WavFile(path)
+
+    # 64-bit integer samples
+    with open(path, 'wb') as outfile:
+        outfile.write(b'RIFF' + struct.pack('<I', 36) + b'WAVE')
+        outfile.write(b'fmt ' + struct.pack('<IHHIIHH', 16, textgrid_audio.WAVE_FORMAT_PCM, 1, 16000, 16000 * 8, 8, 64))
+        outfile.write(b'data' + struct.pack('<I', 0))
+    with pytest.raises(WavError):
+        WavFile(path)
+
+
+def test_frame_features():
+    sample_rate = 1000
+    tone = 0.5 * np.sin(2 * np.pi * 100 * np.arange(1000) / sample_rate)
+    energy, length, step = textgrid_audio.frame_features(tone, sample_rate)
+    assert (length, step) == (10, 5) and len(energy) == 199
+    assert np.allclose(energy, 10 * np.log10(0.125), atol = 0.01)
+
+    alternating = np.tile([0.5, -0.5], 50)
+    assert np.allclose(textgrid_audio.frame_features(alternating, sample_rate, 'zcr')[0], 1.0)
+    spectra = textgrid_audio.frame_features(tone, sample_rate, 'spectral')[0]
+    assert spectra.shape == (199, 6)
+    assert np.allclose(np.linalg.norm(spectra, axis = 1), 1.0)
+
+    assert len(textgrid_audio.frame_features(tone[:5], sample_rate)[0]) == 0
+    with pytest.raises(ValueError):
+        textgrid_audio.frame_features(tone, sample_rate, 'pitch')
+
+
+def tone(sample_rate, n_samples):
+    return 0.5 * np.sin(2 * np.pi * 200 * np.arange(n_samples) / sample_rate)
+
+
+@pytest.mark.parametrize('feature', textgrid_audio.boundary_features)
+def test_find_boundary(feature):
+    sample_rate = 16000
+    # A tone that becomes silent or noisy part of the way through
+    samples = tone(sample_rate, 3200)
+    if feature == 'energy':
+        samples[1920:] = 0.0
+    else:
+        samples[1920:] = 0.2 * np.random.default_rng(0).standard_normal(1280)
+    proportion = textgrid_audio.find_boundary(samples, sample_rate, 0.75, feature)
+    assert abs(proportion - 0.6) <= 0.02
+
+    # The boundary isn't moved further than reach, or when there are too few
+    # frames
+    assert textgrid_audio.find_boundary(samples, sample_rate, 0.75, feature, reach = 0.1) >= 0.65
+    assert textgrid_audio.find_boundary(samples[:200], sample_rate, 0.75, feature) == 0.75
+
+
+def test_acoustic_boundaries(make_corpus, tmp_path):
+    # The [d] added to 'Leonard' starts where the [@r] becomes silent, a little
+    # over half way through it, rather than three quarters of the way through
+    path, file_list = make_corpus('en')
+    file = next(file for file in file_list if '_Leonard_' in file)
+    original = TextGrid(os.path.join(path, file))
+    mau = original['MAU']
+    position = next(count for count, text in enumerate(mau.texts) if text == '3`' and mau.texts[count + 1] == 's')
+    xmin, xmax = float(mau.xmins[position]), float(mau.xmaxs[position])
+
+    sample_rate = 16000
+    samples = tone(sample_rate, int(round(original.xmax * sample_rate)))
+    change = xmin + 0.55 * (xmax - xmin)
+    samples[int(round(change * sample_rate)):] = 0.0
+    write_wav(os.path.join(path, file[:-len('.TextGrid')] + '.wav'), samples, sample_rate)
+
+    report = textgrid_batch.run_batch(process_textgrid_tiers_en.process_textgrid, [file], path, n_jobs = 1, boundary_feature = 'energy')
+    assert report.failed == {}
+    sound = TextGrid(os.path.join(path, file))['SOUND']
+    position = sound.texts.index('d')
+    assert sound.xmaxs[position] == xmax
+    # The loudness drops most in the first frame (10 ms) after the tone stops
+    assert change <= sound.xmins[position] <= change + 0.01
+
+    placer = textgrid_audio.BoundaryPlacer.for_textgrid(os.path.join(path, file))
+    assert placer(xmin, xmax, 0.75) == sound.xmins[position]
+    placer.close()
+    with pytest.raises(ValueError):
+        textgrid_audio.BoundaryPlacer.for_textgrid(os.path.join(path, file), 'pitch')
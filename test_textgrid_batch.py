@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 23:44:19 2026
+
+@author: Roy Alderton
+
+Tests for the textgrid_batch module.
+"""
+
+import os
+import zipfile
+import pytest
+import textgrid_archive
+import textgrid_batch
+import textgrid_bundle
+import process_textgrid_tiers_en
+import process_textgrid_tiers_fr
+
+
+process_textgrid = process_textgrid_tiers_en.process_textgrid
+
+
+def _read_folder(path):
+    contents = {}
+    for file in sorted(os.listdir(path)):
+        with open(os.path.join(path, file), 'rb') as infile:
+            contents[file] = infile.read()
+    return contents
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_run_batch_isolates_failures(make_corpus, tmp_path, n_jobs):
+    path, file_list = make_corpus('en', 12)
+    broken = file_list[3]
+    with open(os.path.join(path, broken), 'wb') as outfile:
+        outfile.write(b'not a TextGrid')
+    output_path = str(tmp_path / 'TextGrids_copy')
+    os.makedirs(output_path)
+
+    report = textgrid_batch.run_batch(process_textgrid, file_list, path, output_path, n_jobs = n_jobs)
+    assert list(report.failed) == [broken]
+    assert sorted(report.processed) == sorted(file for file in file_list if file != broken)
+    assert sorted(os.listdir(output_path)) == sorted(report.processed)
+    assert broken in report.summary()
+
+
+def test_run_batch_parallel_matches_serial(make_corpus, tmp_path):
+    path, file_list = make_corpus('fr', 21)
+    for n_jobs in (1, 3):
+        output_path = str(tmp_path / 'output_{}'.format(n_jobs))
+        os.makedirs(output_path)
+        report = textgrid_batch.run_batch(process_textgrid_tiers_fr.process_textgrid, file_list, path, output_path, n_jobs = n_jobs, batch_size = 4)
+        assert sorted(report.processed) == sorted(file_list)
+    assert _read_folder(str(tmp_path / 'output_1')) == _read_folder(str(tmp_path / 'output_3'))
+
+
+def _process_all(file_list, path, output_path, **options):
+    os.makedirs(output_path)
+    results = list(textgrid_batch.process_files(file_list, process_textgrid, path, output_path, **options))
+    return [(result['file'], result['error']) for result in results]
+
+
+def test_process_files_prefetch_matches_serial(make_corpus, tmp_path):
+    # Reading ahead and writing behind gives the same files and results, in
+    # the same order, as processing one file at a time, including files that
+    # can't be read or processed
+    path, file_list = make_corpus('en', 15)
+    with open(os.path.join(path, file_list[4]), 'wb') as outfile:
+        outfile.write(b'not a TextGrid')
+    file_list.insert(9, 'missing.TextGrid')
+    serial = _process_all(file_list, path, str(tmp_path / 'serial'), prefetch = 0)
+    assert [file for file, _ in serial] == file_list
+    assert [file for file, error in serial if error is not None] == [file_list[4], 'missing.TextGrid']
+    for prefetch in (1, 3, 8):
+        output_path = str(tmp_path / 'prefetch_{}'.format(prefetch))
+        assert _process_all(file_list, path, output_path, prefetch = prefetch) == serial
+        assert _read_folder(output_path) == _read_folder(str(tmp_path / 'serial'))
+
+
+def test_process_files_reads_ahead_a_few_files(make_corpus, tmp_path, monkeypatch):
+    path, file_list = make_corpus('en', 20)
+    read = []
+    processed = []
+    ahead = []
+    read_file = textgrid_batch.read_file
+
+    def counting_read_file(file, source_path):
+        read.append(file)
+        return read_file(file, source_path)
+
+    def counting_process_textgrid(tg, file, *args):
+        processed.append(file)
+        ahead.append(len(read) - len(processed))
+        process_textgrid(tg, file, *args)
+
+    monkeypatch.setattr(textgrid_batch, 'read_file', counting_read_file)
+    output_path = str(tmp_path / 'TextGrids_copy')
+    os.makedirs(output_path)
+    results = textgrid_batch.process_files(file_list, counting_process_textgrid, path, output_path, prefetch = 3)
+    assert [result['file'] for result in results] == file_list
+    assert processed == file_list
+    assert max(ahead) <= 3
+
+
+def test_deferred_outputs_are_committed(make_corpus, tmp_path):
+    path, file_list = make_corpus('en')
+    output_path = str(tmp_path / 'TextGrids_copy')
+    os.makedirs(output_path)
+    results = list(textgrid_batch.process_files(file_list, process_textgrid, path, output_path, prefetch = 2, deferred = True))
+    assert sorted(os.listdir(output_path)) == sorted(file + textgrid_batch.temp_suffix for file in file_list)
+    assert all(result['output_size'] == os.path.getsize(result['temp_file']) for result in results)
+
+    textgrid_batch.commit_outputs(results)
+    assert sorted(os.listdir(output_path)) == sorted(file_list)
+
+
+def test_write_error(make_corpus, tmp_path):
+    # A file that can't be written is reported as failed
+    path, file_list = make_corpus('en', 1)
+    result = textgrid_batch.process_file(file_list[0], process_textgrid, path, str(tmp_path / 'missing'))
+    assert result['error'].startswith('FileNotFoundError')
+    assert set(result) == {'file', 'error'}
+
+
+def _pack(make_corpus, tmp_path):
+    path, file_list = make_corpus('en')
+    bundle_path = str(tmp_path / 'TextGrids.tgb')
+    textgrid_bundle.pack(path, bundle_path)
+    return bundle_path, sorted(file_list)
+
+
+def test_run_bundle_new_bundle_skips_up_to_date(make_corpus, tmp_path):
+    bundle_path, file_list = _pack(make_corpus, tmp_path)
+    output_bundle = str(tmp_path / 'processed.tgb')
+
+    report = textgrid_batch.run_bundle(process_textgrid, bundle_path, output_bundle, n_jobs = 1, version = 'v1')
+    assert sorted(report.processed) == file_list
+    first = textgrid_bundle.Bundle(output_bundle)
+
+    # A second run with the same version skips every TextGrid and keeps the
+    # processed ones, rather than copying the originals
+    report = textgrid_batch.run_bundle(process_textgrid, bundle_path, output_bundle, n_jobs = 1, version = 'v1')
+    assert report.processed == []
+    assert sorted(report.skipped) == file_list
+    assert report.outdated == []
+    second = textgrid_bundle.Bundle(output_bundle)
+    assert all(second.read(name) == first.read(name) for name in file_list)
+
+    # A new version processes them all again, from the originals
+    report = textgrid_batch.run_bundle(process_textgrid, bundle_path, output_bundle, n_jobs = 1, version = 'v2')
+    assert sorted(report.processed) == file_list
+    third = textgrid_bundle.Bundle(output_bundle)
+    assert all(third.read(name) == first.read(name) for name in file_list)
+    assert {third.notes(name)['version'] for name in file_list} == {'v2'}
+
+
+def test_run_bundle_new_bundle_processes_changed_originals(make_corpus, tmp_path):
+    bundle_path, file_list = _pack(make_corpus, tmp_path)
+    output_bundle = str(tmp_path / 'processed.tgb')
+    textgrid_batch.run_bundle(process_textgrid, bundle_path, output_bundle, n_jobs = 1, version = 'v1')
+
+    # Replace one original with another TextGrid
+    original = textgrid_bundle.Bundle(bundle_path)
+    with textgrid_bundle.BundleWriter(bundle_path) as writer:
+        for name in original.names():
+            writer.add(name, original.read(file_list[1] if name == file_list[0] else name))
+
+    report = textgrid_batch.run_bundle(process_textgrid, bundle_path, output_bundle, n_jobs = 1, version = 'v1')
+    assert report.processed == [file_list[0]]
+    assert sorted(report.skipped) == file_list[1:]
+
+
+def test_run_bundle_in_place(make_corpus, tmp_path):
+    bundle_path, file_list = _pack(make_corpus, tmp_path)
+    reference = str(tmp_path / 'reference.tgb')
+    textgrid_batch.run_bundle(process_textgrid, bundle_path, reference, n_jobs = 1, version = 'v1')
+
+    report = textgrid_batch.run_bundle(process_textgrid, bundle_path, n_jobs = 1, version = 'v1')
+    assert sorted(report.processed) == file_list
+    report = textgrid_batch.run_bundle(process_textgrid, bundle_path, n_jobs = 1, version = 'v1')
+    assert sorted(report.skipped) == file_list
+    assert report.outdated == [] and report.failed == {}
+
+    # After the script has changed, the processed TextGrids can't be
+    # processed again, so they are skipped and reported as outdated
+    report = textgrid_batch.run_bundle(process_textgrid, bundle_path, n_jobs = 1, version = 'v2')
+    assert report.processed == [] and report.failed == {}
+    assert sorted(report.outdated) == file_list
+    assert 'restore the original TextGrids' in report.summary()
+
+    bundle = textgrid_bundle.Bundle(bundle_path)
+    expected = textgrid_bundle.Bundle(reference)
+    assert all(bundle.read(name) == expected.read(name) for name in file_list)
+    assert {bundle.notes(name)['version'] for name in file_list} == {'v2'}
+
+    # The next run with the same version has nothing outdated
+    report = textgrid_batch.run_bundle(process_textgrid, bundle_path, n_jobs = 1, version = 'v2')
+    assert report.outdated == []
+
+
+def test_run_bundle_force(make_corpus, tmp_path):
+    bundle_path, file_list = _pack(make_corpus, tmp_path)
+    output_bundle = str(tmp_path / 'processed.tgb')
+    textgrid_batch.run_bundle(process_textgrid, bundle_path, output_bundle, n_jobs = 1, version = 'v1')
+    report = textgrid_batch.run_bundle(process_textgrid, bundle_path, output_bundle, n_jobs = 1, version = 'v1', force = True)
+    assert sorted(report.processed) == file_list
+
+
+def test_run_bundle_parallel_matches_serial(make_corpus, tmp_path):
+    bundle_path, file_list = _pack(make_corpus, tmp_path)
+    serial = str(tmp_path / 'serial.tgb')
+    parallel = str(tmp_path / 'parallel.tgb')
+    textgrid_batch.run_bundle(process_textgrid, bundle_path, serial, n_jobs = 1)
+    textgrid_batch.run_bundle(process_textgrid, bundle_path, parallel, n_jobs = 2)
+    serial, parallel = textgrid_bundle.Bundle(serial), textgrid_bundle.Bundle(parallel)
+    assert serial.names() == parallel.names()
+    assert all(serial.read(name) == parallel.read(name) for name in file_list)
+
+
+@pytest.mark.parametrize('output, n_jobs', [('processed', 1), ('processed.zip', 2), ('processed.tar.gz', 1)])
+def test_run_archive(make_corpus, tmp_path, output, n_jobs):
+    # An archive with the TextGrids in two folders, a practice TextGrid, a
+    # file that isn't a TextGrid and a second TextGrid with the same name as
+    # one of the others
+    path, file_list = make_corpus('en', 8)
+    archive_path = str(tmp_path / 'results.zip')
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        for count, file in enumerate(file_list):
+            archive.write(os.path.join(path, file), '{}/{}'.format('first' if count < 4 else 'second', file))
+        archive.write(os.path.join(path, file_list[0]), 'second/' + file_list[0])
+        archive.writestr('0001en_practice_1.TextGrid', b'practice')
+        archive.writestr('notes.txt', b'notes')
+
+    output = str(tmp_path / output)
+    report = textgrid_batch.run_archive(process_textgrid, archive_path, output, n_jobs = n_jobs, batch_size = 3)
+    assert report.processed == file_list
+    assert list(report.failed) == [file_list[0]]
+
+    # The results are the same as processing the folder
+    output_path = str(tmp_path / 'TextGrids_copy')
+    os.makedirs(output_path)
+    textgrid_batch.run_batch(process_textgrid, file_list, path, output_path, n_jobs = 1)
+    if textgrid_archive.output_kind(output) is not None:
+        unpacked = str(tmp_path / 'unpacked')
+        os.makedirs(unpacked)
+        for name, data in textgrid_archive.iter_members(output):
+            with open(os.path.join(unpacked, name), 'wb') as outfile:
+                outfile.write(data)
+        output = unpacked
+    assert _read_folder(output) == _read_folder(output_path)
+
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 03:15:40 2026
+
+@author: Roy Alderton
+
+Tests for the textgrid_bundle module.
+"""
+
+import os
+import shutil
+import pytest
+import textgrid_bundle
+from textgrid_bundle import Bundle, BundleError, BundleWriter
+
+
+def _read_folder(path):
+    contents = {}
+    for file in sorted(os.listdir(path)):
+        with open(os.path.join(path, file), 'rb') as infile:
+            contents[file] = infile.read()
+    return contents
+
+
+def test_pack_and_unpack(make_corpus, tmp_path):
+    path, file_list = make_corpus('de')
+    bundle_path = str(tmp_path / 'TextGrids.tgb')
+    assert textgrid_bundle.pack(path, bundle_path) == len(file_list)
+    assert textgrid_bundle.is_bundle(bundle_path) and not textgrid_bundle.is_bundle(path)
+
+    bundle = Bundle(bundle_path)
+    assert len(bundle) == len(file_list)
+    assert bundle.names() == sorted(file_list)
+    assert file_list[0] in bundle and 'other.TextGrid' not in bundle
+    assert bundle.notes(file_list[0]) == {}
+
+    unpacked_path = str(tmp_path / 'unpacked')
+    assert textgrid_bundle.unpack(bundle_path, unpacked_path) == len(file_list)
+    assert _read_folder(unpacked_path) == _read_folder(path)
+
+
+def test_index(tmp_path):
+    # Files are found by the index, in the order they were added, with their
+    # notes, whatever their contents
+    bundle_path = str(tmp_path / 'example.tgb')
+    with BundleWriter(bundle_path) as bundle:
+        bundle.add('b.TextGrid', b'second', {'version': 'v1'})
+        bundle.add('a.TextGrid', b'')
+        bundle.add('notes.txt', textgrid_bundle.bundle_magic + b'\x00' * 20)
+    bundle = Bundle(bundle_path)
+    assert bundle.names() == ['b.TextGrid', 'a.TextGrid', 'notes.txt']
+    assert bundle.read('b.TextGrid') == b'second'
+    assert bundle.read('a.TextGrid') == b''
+    assert bundle.read('notes.txt') == textgrid_bundle.bundle_magic + b'\x00' * 20
+    assert bundle.notes('b.TextGrid') == {'version': 'v1'}
+
+
+def test_writer(tmp_path):
+    bundle_path = str(tmp_path / 'example.tgb')
+    with BundleWriter(bundle_path) as bundle:
+        bundle.add('a.TextGrid', b'first')
+        with pytest.raises(ValueError):
+            bundle.add('a.TextGrid', b'again')
+
+    # A bundle can be replaced while it is being read, and is only replaced
+    # once the new one is complete
+    old = Bundle(bundle_path)
+    with pytest.raises(RuntimeError):
+        with BundleWriter(bundle_path) as bundle:
+            bundle.add('a.TextGrid', old.read('a.TextGrid') + b' changed')
+            raise RuntimeError
+    assert os.listdir(str(tmp_path)) == ['example.tgb']
+    assert Bundle(bundle_path).read('a.TextGrid') == b'first'
+
+    with BundleWriter(bundle_path) as bundle:
+        bundle.add('a.TextGrid', old.read('a.TextGrid') + b' changed')
+    assert Bundle(bundle_path).read('a.TextGrid') == b'first changed'
+
+
+def test_damaged_bundles(tmp_path):
+    bundle_path = str(tmp_path / 'example.tgb')
+    with BundleWriter(bundle_path) as bundle:
+        bundle.add('a.TextGrid', b'first')
+    with open(bundle_path, 'rb') as infile:
+        data = infile.read()
+
+    damaged_path = str(tmp_path / 'damaged.tgb')
+    for damaged in (data[:-4], b'File type = "ooTextFile"\n', data[:len(textgrid_bundle.bundle_header)]):
+        with open(damaged_path, 'wb') as outfile:
+            outfile.write(damaged)
+        with pytest.raises(BundleError):
+            Bundle(damaged_path)
+
+
+def test_pack_by_speaker(make_corpus, tmp_path):
+    path, file_list = make_corpus('en')
+    speaker = file_list[0][:4]
+    for file in file_list[:2]:
+        shutil.copy(os.path.join(path, file), os.path.join(path, '9999' + file[4:]))
+    output_path = str(tmp_path / 'Bundles')
+    assert textgrid_bundle.pack_by_speaker(path, output_path) == {speaker: len(file_list), '9999': 2}
+    assert sorted(os.listdir(output_path)) == sorted([speaker + '.tgb', '9999.tgb'])
+    assert Bundle(os.path.join(output_path, '9999.tgb')).names() == sorted('9999' + file[4:] for file in file_list[:2])
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 03:02:16 2026
+
+@author: Roy Alderton
+
+Tests for textgrid_diff.py.
+"""
+
+import os
+import sys
+import subprocess
+import textgrid_batch
+import textgrid_diff
+import process_textgrid_tiers_en
+from textgrid_arrays import Tier, TextGrid
+
+script_path = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_tier(bounds, texts):
+    return Tier.from_arrays(bounds[:-1], bounds[1:], texts)
+
+
+def test_unchanged():
+    tier = make_tier([0.0, 1.0, 2.0, 3.0], ['a', 'b', 'c'])
+    assert textgrid_diff.diff_tiers(tier, make_tier([0.0, 1.0, 2.0 + 1e-7, 3.0], ['a', 'b', 'c'])) == []
+    assert textgrid_diff.diff_tiers(make_tier([0.0], []), make_tier([0.0], [])) == []
+
+
+def test_kinds():
+    old = make_tier([0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0], ['a', 'b', 'c', 'd', 'e', 'f', 'g'])
+    new = make_tier([0.0, 1.0, 1.5, 2.0, 4.0, 5.0, 5.25, 6.5, 7.0], ['x', 'b', 'd', 'c', 'e', 'f', 'g', 'h'])
+    assert textgrid_diff.diff_tiers(old, new) == [(0.0, 1.0, 'relabel', ['a'], ['x']),
+                                                   (1.0, 2.0, 'split', ['b'], ['b', 'd']),
+                                                   (2.0, 4.0, 'merge', ['c', 'd'], ['c']),
+                                                   (5.0, 7.0, 'resegment', ['f', 'g'], ['f', 'g', 'h'])]
+
+    # A moved start (or the end of the last interval) is a boundary change
+    old = make_tier([0.0, 1.0, 2.0], ['a', 'b'])
+    assert textgrid_diff.diff_tiers(old, make_tier([0.0, 1.0, 2.5], ['a', 'b'])) == [(1.0, 2.5, 'boundary', ['b'], ['b'])]
+    old = Tier.from_arrays([0.0, 1.0], [0.5, 2.0], ['a', 'b'])
+    assert textgrid_diff.diff_tiers(old, make_tier([0.0, 0.5, 2.0], ['a', 'b'])) == [(0.5, 2.0, 'boundary', ['b'], ['b'])]
+
+    # An emptied tier is resegmented
+    assert textgrid_diff.diff_tiers(old, make_tier([0.0], [])) == [(0.0, 2.0, 'resegment', ['a', 'b'], [])]
+
+
+def test_tolerance():
+    old = make_tier([0.0, 1.0, 2.0], ['a', 'b'])
+    new = make_tier([0.0, 1.001, 2.0], ['a', 'b'])
+    assert textgrid_diff.diff_tiers(old, new, tolerance = 0.01) == []
+    assert [change[2] for change in textgrid_diff.diff_tiers(old, new)] == ['resegment']
+
+
+def test_diff_textgrids():
+    old = TextGrid(xmin = 0.0, xmax = 2.0)
+    old['ORT-MAU'] = make_tier([0.0, 2.0], ['Leonard'])
+    old['KAN-MAU'] = make_tier([0.0, 2.0], ['lEn@d'])
+    old['MAU'] = make_tier([0.0, 1.0, 2.0], ['n', '@'])
+    new = TextGrid(xmin = 0.0, xmax = 2.0)
+    new['WORD'] = make_tier([0.0, 2.0], ['Leonard'])
+    new['SOUND'] = make_tier([0.0, 1.0, 1.75, 2.0], ['n', '@r', 'd'])
+    new['PHRASE'] = make_tier([0.0, 2.0], ['Cleo Leonard'])
+    changes, removed, added = textgrid_diff.diff_textgrids(old, new)
+    assert changes == [('SOUND', 1.0, 2.0, 'split', ['@'], ['@r', 'd'])]
+    assert removed == ['KAN-MAU'] and added == ['PHRASE']
+    assert textgrid_diff.format_labels(['@r', 'd']) == '[@r] [d]'
+
+
+def test_processed_corpus(make_corpus, tmp_path):
+    # Only the changes made by the English script are listed, e.g. the [d]
+    # added to 'Leonard'
+    path, file_list = make_corpus('en', 12)
+    output_path = str(tmp_path / 'TextGrids_copy')
+    os.makedirs(output_path)
+    report = textgrid_batch.run_batch(process_textgrid_tiers_en.process_textgrid, file_list, path, output_path, n_jobs = 1)
+    assert report.failed == {}
+    assert any('_Leonard_' in file for file in file_list)
+    for file in file_list:
+        changes, removed, added = textgrid_diff.diff_textgrids(TextGrid(os.path.join(path, file)), TextGrid(os.path.join(output_path, file)))
+        assert set(added) == {'PHRASE'}
+        if '_Leonard_' in file:
+            assert any(name == 'SOUND' and kind == 'split' and new_labels[-1] == 'd' for name, _, _, kind, _, new_labels in changes)
+
+    output = subprocess.run([sys.executable, os.path.join(script_path, 'textgrid_diff.py'), path, output_path, '--summary'],
+                            check = True, stdout = subprocess.PIPE, universal_newlines = True).stdout
+    assert 'Compared 12 files' in output
+    assert 'Tiers added: PHRASE (12 files)' in output
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 01:31:12 2026
+
+@author: Roy Alderton
+
+Tests for the textgrid_edits module.
+"""
+
+import numpy as np
+import pytest
+import textgrid_edits
+from textgrid_arrays import Interval, Tier
+
+
+def make_tier(texts):
+    return Tier.from_arrays(np.arange(len(texts), dtype = float), np.arange(1, len(texts) + 1, dtype = float), texts)
+
+
+def intervals(tier):
+    return list(zip(tier.xmins.tolist(), tier.xmaxs.tolist(), tier.texts))
+
+
+def test_merge_and_relabel_sees_neighbours():
+    # The liaison [z] in 'Cléo yack' is removed, and the [i] after it, which
+    # the scripts used to skip, is then checked against its new neighbour
+    tier = make_tier(['o', 'z', 'i', 'a', 'k'])
+    edits = textgrid_edits.TierEdits(tier)
+    for count in range(len(edits)):
+        if edits.texts[count] == 'z':
+            edits.merge_left(count)
+        elif edits.texts[count] == 'i' and edits.previous_text(count) == 'o':
+            edits.relabel(count, 'j')
+    assert edits.next_text(0) == 'j'
+    edits.apply()
+    assert intervals(tier) == [(0.0, 2.0, 'o'), (2.0, 3.0, 'j'), (3.0, 4.0, 'a'), (4.0, 5.0, 'k')]
+
+
+def test_split():
+    tier = make_tier(['l', 'E', 'n', '3`'])
+    edits = textgrid_edits.TierEdits(tier)
+    edits.split(3, 'd', 0.75)
+    edits.apply()
+    assert intervals(tier) == [(0.0, 1.0, 'l'), (1.0, 2.0, 'E'), (2.0, 3.0, 'n'), (3.0, 3.75, '3`'), (3.75, 4.0, 'd')]
+
+    # The boundary can be placed by a function instead
+    edits = textgrid_edits.TierEdits(tier, place_boundary = lambda xmin, xmax, proportion: xmin + 0.1)
+    edits.split(0, 'x', 0.5)
+    edits.apply()
+    assert intervals(tier)[:2] == [(0.0, 0.1, 'l'), (0.1, 1.0, 'x')]
+
+
+def test_merge_right_with_function():
+    tier = make_tier(['<p:>', 'l', 'a~', 'f e'])
+    edits = textgrid_edits.TierEdits(tier)
+    edits.merge_right(1, lambda text: 'l ' + text)
+    edits.apply()
+    assert intervals(tier) == [(0.0, 1.0, '<p:>'), (1.0, 3.0, 'l a~'), (3.0, 4.0, 'f e')]
+
+
+def test_removed_intervals_are_detached():
+    tier = make_tier(['a', 'b', 'c'])
+    middle = tier[1]
+    edits = textgrid_edits.TierEdits(tier)
+    edits.merge_left(1)
+    edits.apply()
+    assert middle.text == 'b' and (middle.xmin, middle.xmax) == (1.0, 2.0)
+    assert tier[1].text == 'c'
+
+
+def test_errors():
+    edits = textgrid_edits.TierEdits(make_tier(['a', 'b', 'c']))
+    edits.merge_left(1)
+    with pytest.raises(ValueError):
+        edits.split(1, 'x', 0.5)
+    with pytest.raises(ValueError):
+        edits.relabel(1, 'x')
+    with pytest.raises(IndexError):
+        edits.relabel(3, 'x')
+    edits.split(2, 'x', 0.5)
+    with pytest.raises(ValueError):
+        edits.split(2, 'y', 0.5)
+
+    edits = textgrid_edits.TierEdits(make_tier(['a', 'b']))
+    edits.merge_left(0)
+    with pytest.raises(ValueError):
+        edits.apply()
+
+
+def test_matches_insert_and_pop():
+    # Many splits and removals made in one go give the same tier as making
+    # them one at a time with insert() and pop(), from the end of the tier
+    rng = np.random.default_rng(7)
+    for _ in range(20):
+        texts = [str(label) for label in rng.integers(0, 5, 60)]
+        tier = make_tier(texts)
+        reference = make_tier(texts)
+        edits = textgrid_edits.TierEdits(tier)
+        changes = {}
+        for position in range(1, len(texts) - 1, 3):
+            kind = rng.integers(0, 4)
+            if kind == 1:
+                edits.merge_left(position)
+            elif kind == 2:
+                edits.merge_right(position, 'r')
+            elif kind == 3:
+                edits.split(position, 's', 0.25)
+            changes[position] = kind
+        edits.apply()
+
+        for position, kind in sorted(changes.items(), reverse = True):
+            interval = reference[position]
+            if kind == 1:
+                reference[position - 1] = Interval(reference[position - 1].text, reference[position - 1].xmin, interval.xmax)
+                reference.pop(position)
+            elif kind == 2:
+                reference[position + 1] = Interval('r', interval.xmin, reference[position + 1].xmax)
+                reference.pop(position)
+            elif kind == 3:
+                boundary = interval.xmin + 0.25 * (interval.xmax - interval.xmin)
+                reference.insert(position + 1, Interval('s', boundary, interval.xmax))
+                interval.xmax = boundary
+        assert intervals(tier) == intervals(reference)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 00:06:51 2026
+
+@author: Roy Alderton
+
+Tests for the textgrid_export module.
+"""
+
+import os
+import tarfile
+import zipfile
+import numpy as np
+import pytest
+import textgrid_arrays
+import textgrid_archive
+import textgrid_bundle
+import textgrid_export
+
+
+def _rows(table):
+    # The rows of a table as (file, tier, xmin, xmax, label), so that tables
+    # can be compared whatever order the codes were given out in
+    return sorted(zip(table['files'][table['file_id']].tolist(), table['tiers'][table['tier_id']].tolist(),
+                      table['xmin'].tolist(), table['xmax'].tolist(), table['labels'][table['label_id']].tolist()))
+
+
+def test_build_table_folder(make_corpus):
+    path, file_list = make_corpus('de')
+    table = textgrid_export.build_table(path, file_list)
+    assert table['files'].tolist() == file_list
+    assert table['speakers'].tolist() == ['0001']
+
+    expected = []
+    for file in file_list:
+        tg = textgrid_arrays.TextGrid(os.path.join(path, file))
+        for name, tier in tg.items():
+            expected.extend((file, name, xmin, xmax, text) for xmin, xmax, text in zip(tier.xmins.tolist(), tier.xmaxs.tolist(), tier.texts))
+    assert _rows(table) == sorted(expected)
+
+
+def test_build_table_bundle_and_archives(make_corpus, tmp_path):
+    path, file_list = make_corpus('fr')
+    (tmp_path / 'TextGrids' / 'practice_1.TextGrid').write_bytes(b'')
+    expected = _rows(textgrid_export.build_table(path, file_list))
+
+    bundle_path = str(tmp_path / 'TextGrids.tgb')
+    textgrid_bundle.pack(path, bundle_path, file_list)
+    zip_path = str(tmp_path / 'results.zip')
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        for file in sorted(os.listdir(path)):
+            archive.write(os.path.join(path, file), 'results/' + file)
+    tar_path = str(tmp_path / 'results.tar.gz')
+    with tarfile.open(tar_path, 'w:gz') as archive:
+        for file in sorted(os.listdir(path)):
+            archive.add(os.path.join(path, file), 'results/' + file)
+
+    for source in (path, bundle_path, zip_path, tar_path):
+        tg_list = textgrid_export.list_textgrids(source)
+        assert sorted(tg_list) == sorted(file_list)
+        assert _rows(textgrid_export.build_table(source, tg_list)) == expected
+
+
+def test_build_table_archive_missing_file(make_corpus, tmp_path):
+    path, file_list = make_corpus('en')
+    zip_path = str(tmp_path / 'results.zip')
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        archive.write(os.path.join(path, file_list[0]), file_list[0])
+    with pytest.raises(textgrid_archive.ArchiveError):
+        textgrid_export.build_table(zip_path, file_list[:2])
+
+
+@pytest.mark.parametrize('output', ['tiers.npz', 'tiers'])
+def test_save_and_load_table(make_corpus, tmp_path, output):
+    path, file_list = make_corpus('en')
+    output = str(tmp_path / output)
+    table = textgrid_export.export_table(path, file_list, output)
+    loaded = textgrid_export.load_table(output, mmap = not output.endswith('.npz'))
+    assert sorted(loaded) == sorted(table)
+    for name in table:
+        assert np.array_equal(loaded[name], table[name])
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 01:03:26 2026
+
+@author: Roy Alderton
+
+Tests for the textgrid_manifest module.
+"""
+
+import os
+import textgrid_batch
+import textgrid_manifest
+import process_textgrid_tiers_de
+
+process_textgrid = process_textgrid_tiers_de.process_textgrid
+
+
+def run(path, output_path, file_list, version = 'v1', **options):
+    manifest = textgrid_manifest.Manifest(output_path, version)
+    return textgrid_batch.run_batch(process_textgrid, file_list, path, output_path, n_jobs = 1, manifest = manifest, **options)
+
+
+def test_source_files():
+    # The version covers the script and the modules it uses from this folder
+    names = [os.path.basename(path) for path in textgrid_manifest.source_files(process_textgrid)]
+    assert names[0] == 'process_textgrid_tiers_de.py'
+    assert {'textgrid_arrays.py', 'textgrid_roi.py', 'stimulus_ids.py'} <= set(names)
+    assert not any(name.startswith('numpy') for name in names)
+    assert len(textgrid_manifest.script_version(process_textgrid)) == 12
+
+
+def test_new_folder_skips_unchanged(make_corpus, tmp_path):
+    path, file_list = make_corpus('de')
+    output_path = str(tmp_path / 'TextGrids_copy')
+    os.makedirs(output_path)
+
+    report = run(path, output_path, file_list)
+    assert sorted(report.processed) == sorted(file_list)
+    assert os.path.isfile(os.path.join(output_path, textgrid_manifest.manifest_name))
+    assert not os.path.exists(os.path.join(output_path, textgrid_manifest.journal_name))
+
+    report = run(path, output_path, file_list)
+    assert report.processed == [] and sorted(report.skipped) == sorted(file_list)
+
+    # A file whose modification time has changed is hashed again, and is
+    # still skipped if its contents haven't changed
+    os.utime(os.path.join(path, file_list[0]), ns = (1, 1))
+    # A changed input, or a deleted output, is processed again
+    with open(os.path.join(path, file_list[1]), 'ab') as outfile:
+        outfile.write(b'\n')
+    os.remove(os.path.join(output_path, file_list[2]))
+    report = run(path, output_path, file_list)
+    assert sorted(report.processed) == sorted(file_list[1:3])
+    assert report.outdated == []
+
+    # A new version of the script processes everything again
+    report = run(path, output_path, file_list, version = 'v2')
+    assert sorted(report.processed) == sorted(file_list)
+
+    report = run(path, output_path, file_list, version = 'v2', force = True)
+    assert sorted(report.processed) == sorted(file_list)
+
+
+def test_in_place_outdated(make_corpus):
+    path, file_list = make_corpus('de')
+    report = run(path, path, file_list)
+    assert sorted(report.processed) == sorted(file_list)
+    with open(os.path.join(path, file_list[0]), 'rb') as infile:
+        processed = infile.read()
+
+    report = run(path, path, file_list)
+    assert report.processed == [] and report.outdated == []
+
+    # The processed files can't be processed again by a new version, so they
+    # are skipped, left as they are and listed as outdated
+    report = run(path, path, file_list, version = 'v2')
+    assert report.processed == [] and report.failed == {}
+    assert sorted(report.outdated) == sorted(file_list)
+    assert 'restore the original TextGrids' in report.summary()
+    with open(os.path.join(path, file_list[0]), 'rb') as infile:
+        assert infile.read() == processed
+
+    report = run(path, path, file_list, version = 'v2')
+    assert report.outdated == []
+
+
+def test_journal_replay(make_corpus, tmp_path):
+    # A run interrupted after journalling a batch, but before moving it into
+    # place, and while journalling the next one
+    path, file_list = make_corpus('de')
+    output_path = str(tmp_path / 'TextGrids_copy')
+    os.makedirs(output_path)
+    results = list(textgrid_batch.process_files(file_list, process_textgrid, path, output_path, prefetch = 0, deferred = True))
+    assert all(result['error'] is None for result in results)
+    manifest = textgrid_manifest.Manifest(output_path, 'v1')
+    manifest.journal(results[:2])
+    with open(manifest.journal_path, 'a', encoding = 'UTF-8') as outfile:
+        outfile.write('{"file": "' + results[2]['file'])
+    processed = {}
+    for result in results:
+        with open(result['temp_file'], 'rb') as infile:
+            processed[result['file']] = infile.read()
+
+    # The journalled batch is moved into place and recorded, and the rest is
+    # left for run_batch() to clean up and process again
+    manifest = textgrid_manifest.Manifest(output_path, 'v1')
+    assert sorted(manifest.files) == sorted(file_list[:2])
+    for result in results[:2]:
+        assert not os.path.exists(result['temp_file'])
+        with open(result['output_file'], 'rb') as infile:
+            assert infile.read() == processed[result['file']]
+    assert all(os.path.exists(result['temp_file']) for result in results[2:])
+
+    report = textgrid_batch.run_batch(process_textgrid, file_list, path, output_path, n_jobs = 1, manifest = manifest)
+    assert sorted(report.skipped) == sorted(file_list[:2])
+    assert sorted(report.processed) == sorted(file_list[2:])
+    assert not os.path.exists(manifest.journal_path)
+    assert sorted(os.listdir(output_path)) == sorted(file_list + [textgrid_manifest.manifest_name])
+    for file in file_list:
+        with open(os.path.join(output_path, file), 'rb') as infile:
+            assert infile.read() == processed[file]
+
+
+def test_journal_skips_changed_temp_file(make_corpus, tmp_path):
+    # A temporary file that doesn't match its journal entry isn't moved into
+    # place, so the output isn't replaced by a damaged file
+    path, file_list = make_corpus('de', 1)
+    output_path = str(tmp_path / 'TextGrids_copy')
+    os.makedirs(output_path)
+    results = list(textgrid_batch.process_files(file_list, process_textgrid, path, output_path, prefetch = 0, deferred = True))
+    textgrid_manifest.Manifest(output_path, 'v1').journal(results)
+    with open(results[0]['temp_file'], 'r+b') as outfile:
+        outfile.truncate(10)
+
+    manifest = textgrid_manifest.Manifest(output_path, 'v1')
+    assert not os.path.exists(results[0]['output_file'])
+    assert not manifest.is_up_to_date(file_list[0], path, output_path)
+
+
+def test_interrupted_run_resumes(make_corpus, tmp_path):
+    path, file_list = make_corpus('de')
+    output_path = str(tmp_path / 'TextGrids_copy')
+    os.makedirs(output_path)
+
+    def interrupted(tg, file, *args):
+        if file == file_list[3]:
+            raise KeyboardInterrupt
+        process_textgrid(tg, file, *args)
+
+    # The files processed before the interruption are moved into place and
+    # recorded, even those in an unfinished batch
+    manifest = textgrid_manifest.Manifest(output_path, 'v1')
+    try:
+        textgrid_batch.run_batch(interrupted, file_list, path, output_path, n_jobs = 1, manifest = manifest, batch_size = 2, prefetch = 0)
+    except KeyboardInterrupt:
+        pass
+    assert sorted(os.listdir(output_path)) == sorted(file_list[:3] + [textgrid_manifest.manifest_name])
+
+    report = run(path, output_path, file_list)
+    assert sorted(report.skipped) == sorted(file_list[:3])
+    assert sorted(report.processed) == sorted(file_list[3:])
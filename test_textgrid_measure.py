@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 04:06:33 2026
+
+@author: Roy Alderton
+
+Tests for textgrid_measure.py.
+"""
+
+import os
+import csv
+import numpy as np
+import pytest
+import textgrid_batch
+import textgrid_export
+import textgrid_measure
+import process_textgrid_tiers_de
+import process_textgrid_tiers_fr
+from textgrid_arrays import Tier, TextGrid
+
+languages = {'de': process_textgrid_tiers_de, 'fr': process_textgrid_tiers_fr}
+
+
+def measure_file(tg, tolerance = 1e-6):
+    # The measurements of one TextGrid, found one interval at a time
+    row = dict.fromkeys(['phrase_start', 'phrase_end', 'target_start', 'target_end', 'preceding_start', 'preceding_end'], np.nan)
+    row.update(target_label = '', preceding_label = '')
+    if 'PHRASE' in tg:
+        for interval in tg['PHRASE']:
+            if interval.text == 'phrase':
+                row.update(phrase_start = interval.xmin, phrase_end = interval.xmax)
+    if 'SOUND' in tg:
+        sound = tg['SOUND']
+        for count, interval in enumerate(sound):
+            if abs(interval.xmax - row['phrase_end']) <= tolerance:
+                row.update(target_label = interval.text, target_start = interval.xmin, target_end = interval.xmax)
+                if count > 0:
+                    row.update(preceding_label = sound[count - 1].text, preceding_start = sound[count - 1].xmin, preceding_end = sound[count - 1].xmax)
+                else:
+                    row.update(preceding_label = '', preceding_start = np.nan, preceding_end = np.nan)
+    return row
+
+
+def assert_matches_files(measurements, path, file_list):
+    assert measurements['file_name'].tolist() == file_list
+    for count, file in enumerate(file_list):
+        row = measure_file(TextGrid(os.path.join(path, file)))
+        assert measurements['target_label'][count] == row['target_label']
+        assert measurements['preceding_label'][count] == row['preceding_label']
+        expected = {'phrase_start': row['phrase_start'],
+                    'phrase_duration': row['phrase_end'] - row['phrase_start'],
+                    'target_end': row['target_end'],
+                    'target_duration': row['target_end'] - row['target_start'],
+                    'preceding_duration': row['preceding_end'] - row['preceding_start'],
+                    'target_onset': row['target_start'] - row['phrase_start'],
+                    'preceding_onset': row['preceding_start'] - row['phrase_start'],
+                    'target_share': (row['target_end'] - row['target_start']) / (row['phrase_end'] - row['phrase_start'])}
+        for column, value in expected.items():
+            assert np.isclose(measurements[column][count], value, rtol = 0, atol = 1e-12, equal_nan = True), (file, column)
+
+
+@pytest.mark.parametrize('language', sorted(languages))
+def test_measure(make_corpus, language):
+    path, file_list = make_corpus(language, 12)
+    report = textgrid_batch.run_batch(languages[language].process_textgrid, file_list, path, n_jobs = 1)
+    assert report.failed == {}
+    measurements = textgrid_measure.measure(textgrid_export.build_table(path, file_list))
+    assert list(measurements) == list(textgrid_measure.measurement_columns)
+    assert not np.isnan(measurements['target_duration']).any()
+    assert_matches_files(measurements, path, file_list)
+    assert measurements['speaker'][0] == file_list[0][:4]
+    assert measurements['pair'].min() >= 1
+
+
+def test_missing_parts(tmp_path):
+    # A file without a region of interest, one whose target is the first
+    # sound, and one with no sound ending where the region of interest ends
+    path = str(tmp_path)
+    tg = TextGrid(xmin = 0.0, xmax = 1.0)
+    tg['SOUND'] = Tier.from_arrays([0.0, 0.5], [0.5, 1.0], ['a', 'b'])
+    tg.write(os.path.join(path, 'a_no_phrase.TextGrid'))
+    tg['PHRASE'] = Tier.from_arrays([0.0, 0.5], [0.5, 1.0], ['phrase', ''])
+    tg.write(os.path.join(path, 'b_first.TextGrid'))
+    tg['PHRASE'] = Tier.from_arrays([0.0, 0.25, 0.75], [0.25, 0.75, 1.0], ['', 'phrase', ''])
+    tg.write(os.path.join(path, 'c_no_target.TextGrid'))
+    file_list = sorted(os.listdir(path))
+
+    measurements = textgrid_measure.measure(textgrid_export.build_table(path, file_list))
+    assert_matches_files(measurements, path, file_list)
+    assert measurements['target_label'].tolist() == ['', 'a', '']
+    assert np.isnan(measurements['preceding_start'][1])
+    assert measurements['pair'].tolist() == [-1, -1, -1]
+
+
+def test_save_measurements(make_corpus, tmp_path):
+    path, file_list = make_corpus('de')
+    textgrid_batch.run_batch(process_textgrid_tiers_de.process_textgrid, file_list, path, n_jobs = 1)
+    csv_path = str(tmp_path / 'durations.csv')
+    npz_path = str(tmp_path / 'durations.npz')
+    textgrid_batch.export_results(path, file_list, measure = csv_path)
+    measurements = textgrid_measure.measure_table(textgrid_export.build_table(path, file_list), npz_path)
+
+    with open(csv_path, newline = '', encoding = 'UTF-8') as infile:
+        rows = list(csv.DictReader(infile))
+    assert [row['file_name'] for row in rows] == file_list
+    assert np.allclose([float(row['target_duration']) for row in rows], measurements['target_duration'])
+    loaded = textgrid_export.load_table(npz_path)
+    assert np.array_equal(loaded['target_share'], measurements['target_share'])
+
+    # A saved table of intervals can be measured in the same way
+    table_path = str(tmp_path / 'tiers')
+    textgrid_export.save_table(textgrid_export.build_table(path, file_list), table_path)
+    assert textgrid_measure.is_table(table_path) and not textgrid_measure.is_table(path)
+    remeasured = textgrid_measure.measure(textgrid_export.load_table(table_path, mmap = True))
+    assert np.array_equal(remeasured['target_end'], measurements['target_end'])
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 04:20:58 2026
+
+@author: Roy Alderton
+
+Tests for textgrid_nasalance.py.
+"""
+
+import os
+import sys
+import csv
+import subprocess
+import numpy as np
+import pytest
+import textgrid_nasalance
+from textgrid_arrays import Tier, TextGrid
+from textgrid_audio import WavFile
+from test_textgrid_audio import write_wav
+
+script_path = os.path.dirname(os.path.abspath(__file__))
+sample_rate = 1000
+
+
+def make_recording(path, nasal = 0.3, oral = 0.1, n_samples = 6000):
+    # A stereo recording with a tone on each channel, louder on the left
+    tone = np.sin(2 * np.pi * 50 * np.arange(n_samples) / sample_rate)
+    write_wav(path, np.column_stack([nasal * tone, oral * tone]), sample_rate)
+
+
+def make_tier():
+    return Tier.from_arrays([0.0, 1.0, 2.5, 4.0], [1.0, 2.5, 4.0, 6.0], ['', 'Mann', '', 'Tat'])
+
+
+@pytest.mark.parametrize('chunk_size', [1, 37, 1000, 1 << 19])
+def test_interval_energies(tmp_path, chunk_size):
+    # The sums match summing each interval's samples directly, however the
+    # recording is split into chunks, including for intervals that are
+    # empty, overlap or go past the end of the recording
+    path = str(tmp_path / 'example.wav')
+    samples = write_wav(path, np.random.default_rng(1).uniform(-1, 1, (3000, 2)), sample_rate)
+    xmins = np.array([0.0, 0.1234, 1.5, 2.0, 2.9, 1.0, 2.5])
+    xmaxs = np.array([0.5, 2.7, 1.5, 2.4, 4.0, 1.0005, 2.45])
+    with WavFile(path) as wav:
+        energies, counts = textgrid_nasalance.interval_energies(wav, xmins, xmaxs, chunk_size)
+    for count, (xmin, xmax) in enumerate(zip(xmins, xmaxs)):
+        first = min(int(round(xmin * sample_rate)), 3000)
+        last = min(max(int(round(xmax * sample_rate)), first), 3000)
+        assert counts[count] == last - first
+        assert np.allclose(energies[count], (samples[first:last] ** 2).sum(axis = 0), rtol = 1e-9, atol = 1e-9)
+
+    with WavFile(path) as wav:
+        energies, counts = textgrid_nasalance.interval_energies(wav, np.zeros(0), np.zeros(0))
+    assert energies.shape == (0, 2) and len(counts) == 0
+
+
+def test_only_needed_chunks_are_read(tmp_path):
+    path = str(tmp_path / 'example.wav')
+    make_recording(path, n_samples = 10000)
+    reads = []
+    with WavFile(path) as wav:
+        read_samples = wav.read_samples
+        wav.read_samples = lambda first, last: reads.append((first, last)) or read_samples(first, last)
+        textgrid_nasalance.interval_energies(wav, np.array([0.5, 9.0]), np.array([0.7, 9.5]), chunk_size = 1000)
+    assert reads == [(500, 1500), (8500, 9500)]
+
+
+def test_measure_nasalance(tmp_path):
+    path = str(tmp_path / 'example.wav')
+    make_recording(path)
+    with WavFile(path) as wav:
+        results = textgrid_nasalance.measure_nasalance(make_tier(), wav, chunk_size = 700)
+        assert list(results) == list(textgrid_nasalance.nasalance_columns)
+        assert results['label'].tolist() == ['Mann', 'Tat']
+        assert results['duration'].tolist() == [1.5, 2.0]
+        assert np.allclose(results['nasal_rms'], 0.3 / np.sqrt(2), rtol = 1e-3)
+        assert np.allclose(results['oral_rms'], 0.1 / np.sqrt(2), rtol = 1e-3)
+        assert np.allclose(results['nasalance'], 75.0, rtol = 1e-3)
+
+        results = textgrid_nasalance.measure_nasalance(make_tier(), wav, nasal_channel = 1)
+        assert np.allclose(results['nasalance'], 25.0, rtol = 1e-3)
+
+    write_wav(path, np.zeros(100), sample_rate)
+    with WavFile(path) as wav:
+        with pytest.raises(ValueError):
+            textgrid_nasalance.measure_nasalance(make_tier(), wav)
+
+
+def test_script(tmp_path):
+    # The recording and the output are found from the name of the TextGrid
+    make_recording(str(tmp_path / '0012_nasalance_1.wav'))
+    tg = TextGrid(xmin = 0.0, xmax = 6.0)
+    tg['silences'] = make_tier()
+    tg.write(str(tmp_path / '0012_nasalance_1_labelled.TextGrid'))
+    output = subprocess.run([sys.executable, os.path.join(script_path, 'textgrid_nasalance.py'), '0012_nasalance_1_labelled.TextGrid'],
+                            cwd = str(tmp_path), check = True, stdout = subprocess.PIPE, universal_newlines = True).stdout
+    assert 'Mann\t75.0' in output
+
+    with open(str(tmp_path / '0012_nasalance_1_labelled_nasalance.csv'), newline = '', encoding = 'UTF-8') as infile:
+        rows = list(csv.reader(infile))
+    assert tuple(rows[0]) == textgrid_nasalance.nasalance_columns
+    assert [row[0] for row in rows[1:]] == ['Mann', 'Tat']
+    assert float(rows[2][3]) == 2.0
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 01:57:20 2026
+
+@author: Roy Alderton
+
+Tests for the textgrid_profile module.
+"""
+
+import json
+import textgrid_batch
+import textgrid_profile
+import process_textgrid_tiers_en
+
+
+def test_stage_timer():
+    timer = textgrid_profile.StageTimer()
+    timer.lap('load')
+    timer.lap('roi')
+    timer.lap('load')
+    assert list(timer.times) == ['load', 'roi']
+    assert all(seconds >= 0 for seconds in timer.times.values())
+
+    # The default timer does nothing
+    textgrid_profile.no_timer.start()
+    textgrid_profile.no_timer.lap('load')
+
+
+def test_batch_profile(tmp_path, capsys):
+    profile = textgrid_profile.BatchProfile(3, interval = 1000.0)
+    profile.add('a.TextGrid', {'load': 0.002, 'write': 0.001})
+    profile.add('b.TextGrid', {'load': 0.004, 'write': 0.001})
+    assert capsys.readouterr().err == ''
+    profile.add('c.TextGrid')
+    assert '[3/3 files' in capsys.readouterr().err
+
+    summary = profile.summary()
+    assert summary['files'] == 3 and summary['profiled_files'] == 2
+    assert summary['stages']['load']['slowest_file'] == 'b.TextGrid'
+    assert abs(summary['stages']['load']['mean_ms'] - 3.0) < 1e-9
+    assert abs(summary['stages']['load']['share'] - 0.75) < 1e-9
+
+    path = str(tmp_path / 'profile.json')
+    profile.save(path)
+    with open(path, encoding = 'UTF-8') as infile:
+        assert json.load(infile)['per_file']['a.TextGrid'] == {'load': 0.002, 'write': 0.001}
+    assert 'load' in capsys.readouterr().out
+
+    assert '[0 files' in textgrid_profile.BatchProfile(None).progress()
+
+
+def test_run_batch_profile(make_corpus):
+    path, file_list = make_corpus('en')
+    report = textgrid_batch.run_batch(process_textgrid_tiers_en.process_textgrid, file_list, path, n_jobs = 1, profile = True)
+    summary = report.profile.summary()
+    assert summary['profiled_files'] == len(file_list)
+    assert {'load', 'tiers', 'roi', 'fixes', 'sound', 'syllable', 'write'} <= set(summary['stages'])
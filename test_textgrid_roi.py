@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 01:16:48 2026
+
+@author: Roy Alderton
+
+Tests for the textgrid_roi module.
+"""
+
+import pytest
+import textgrid_roi
+import process_textgrid_tiers_fr
+from textgrid_arrays import Tier
+
+
+def sound_tier(labels):
+    return Tier.from_arrays(range(len(labels)), range(1, len(labels) + 1), labels)
+
+
+def test_find():
+    region = textgrid_roi.RegionOfInterest(start_labels = ['e:'], end_labels = ['m', 'n', 'k'], end_index = 1)
+    # <p:> E6 l a: s k l e: o: m a n ...
+    tier = sound_tier(['<p:>', 'E6', 'l', 'a:', 's', 'k', 'l', 'e:', 'o:', 'm', 'a', 'n', 'ts'])
+    assert region.find(tier, '0012de_nasals_fin_nas_p03_Mann_1_03__01.TextGrid') == (7.0, 10.0)
+
+
+def test_overrides():
+    region = textgrid_roi.RegionOfInterest(start_labels = ['e'], end_labels = ['n', 'k', 't'], end_index = 1,
+                                           overrides = {('fin_or', 13, 'lotte'): 2, 'Yann': 3})
+    tier = sound_tier(['k', 'l', 'e', 'n', 'O', 't', 'k', 'n'])
+    assert region.find(tier, '0001fr_nasals_fin_nas_p01_other_1_01__01.TextGrid') == (2.0, 4.0)
+    assert region.find(tier, '0001fr_nasals_fin_or_p13_lotte_1_01__01.TextGrid') == (2.0, 6.0)
+    assert region.find(tier, '0001fr_nasals_fin_nas_p13_lotte_1_01__01.TextGrid') == (2.0, 4.0)
+    assert region.find(tier, '0001fr_nasals_fin_nas_p11_Yann_1_01__01.TextGrid') == (2.0, 7.0)
+
+
+def test_french_overrides_use_parsed_words():
+    region = process_textgrid_tiers_fr.region_of_interest
+    assert region.end_index_for('0001fr_nasals_ini_nas_p07_lanis_1_01__01.TextGrid') == 3
+    assert region.end_index_for('0001fr_nasals_ini_or_p07_lapis_1_01__01.TextGrid') == 3
+    assert region.end_index_for('0001fr_nasals_ini_nas_p05_homme_1_01__01.TextGrid') == 3
+    assert region.end_index_for('0001fr_nasals_ini_nas_p05_lhomme_1_01__01.TextGrid') == 3
+    assert region.end_index_for('0001fr_nasals_fin_or_p13_lotte_1_01__01.TextGrid') == 3
+    assert region.end_index_for('0001fr_nasals_ini_nas_p09_noeud_1_01__01.TextGrid') == 2
+
+    # Part of a word no longer matches another word's override
+    assert region.end_index_for('0001fr_nasals_ini_nas_p20_lacet_1_01__01.TextGrid') == 2
+
+
+def test_missing_sounds():
+    region = textgrid_roi.RegionOfInterest(start_labels = ['i:'], end_labels = ['n', 't'], end_index = 2)
+    with pytest.raises(ValueError, match = r'no \[i:\]'):
+        region.find(sound_tier(['t', 'E', 'l', 'n']), 'any.TextGrid')
+    with pytest.raises(ValueError, match = 'only 2'):
+        region.find(sound_tier(['t', 'i:', 'n']), 'any.TextGrid')
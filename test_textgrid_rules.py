@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 00:52:44 2026
+
+@author: Roy Alderton
+
+Tests for the textgrid_rules module.
+"""
+
+import re
+import textgrid_rules
+import process_textgrid_tiers_en
+import process_textgrid_tiers_fr
+from textgrid_arrays import Tier
+from textgrid_rules import Rule
+
+
+def apply_in_turn(rules, text, file):
+    # The rules applied as a chain of str.replace() and re.sub() calls, as
+    # the scripts did before the rules were compiled
+    for rule in rules:
+        if rule.condition is not None and not rule.condition(file):
+            continue
+        if rule.whole:
+            text = rule.replacement if text == rule.pattern else text
+        elif rule.regex:
+            text = re.sub(rule.pattern, rule.replacement, text)
+        else:
+            text = text.replace(rule.pattern, rule.replacement)
+    return text
+
+
+def test_chained_rules():
+    # A rule sees the changes made by the rules before it
+    rules = textgrid_rules.RuleSet([Rule(r'u$|u\s', 'u:', regex = True), Rule('s u:n', 's u: n'), Rule('n @r', 'n @r d', whole = True)])
+    compiled = rules.for_file('any.TextGrid')
+    assert compiled.apply_to_label('s u n') == 's u: n'
+    assert compiled.apply_to_label('n @r') == 'n @r d'
+    assert compiled.apply_to_label('l E n @r') == 'l E n @r'
+    assert compiled.apply_to_label('k') == 'k'
+
+
+def test_conditions():
+    rules = textgrid_rules.RuleSet([Rule('?', 't', condition = lambda file: 'p13' not in file), Rule('Q', 'A')])
+    assert rules.for_file('x_p12_y.TextGrid').apply_to_label('? Q') == 't A'
+    assert rules.for_file('x_p13_y.TextGrid').apply_to_label('? Q') == '? A'
+
+    # The rules are compiled once for each combination of conditions
+    assert rules.for_file('a_p01_b.TextGrid') is rules.for_file('x_p12_y.TextGrid')
+
+
+def test_apply_to_tier():
+    rules = textgrid_rules.RuleSet([Rule('a~', 'A~'), Rule('o z', 'o')])
+    tier = Tier.from_arrays([0, 1, 2, 3], [1, 2, 3, 4], ['a~', 'o z', 'a~', 'k'])
+    rules.apply(tier, 'any.TextGrid')
+    assert tier.texts == ['A~', 'o', 'A~', 'k']
+
+    empty = Tier()
+    rules.apply(empty, 'any.TextGrid')
+    assert len(empty) == 0
+
+
+def test_script_rules_match_chained_replacements():
+    # Labels that the rules look for (and some they don't), corrected with
+    # each script's rules for files with and without word-specific rules
+    labels = ['s u n', 'u', 'h l', '@U', 'Q', 'R', '3`', 'n 3`', 'n @r', 'l E n @r', 'r I', 'N @r', '?', 'I ? N',
+              'A', 'a~', 'o~', '9~', 'e~', '9', 'n 2 d', 'n 9 d', 'o z', 'l a j', 'j a~ n', 'l A m', 'a', '']
+    files = ['0001en_nasals_fin_nas_p01_Leonard_1_01__01.TextGrid', '0001en_nasals_fin_nas_p02_ringer_1_02__01.TextGrid',
+             '0001en_nasals_fin_nas_p13_own_1_03__01.TextGrid', '0001fr_nasals_fin_nas_p09_noeud_1_05__01.TextGrid',
+             '0001fr_nasals_fin_nas_p11_Yann_1_06__01.TextGrid', '0001fr_nasals_ini_nas_p08_lame_1_01__01.TextGrid',
+             'unparsed_name.TextGrid']
+    for rule_set in (process_textgrid_tiers_en.sound_syllable_rules, process_textgrid_tiers_fr.sound_syllable_rules):
+        for file in files:
+            compiled = rule_set.for_file(file)
+            for label in labels:
+                assert compiled.apply_to_label(label) == apply_in_turn(rule_set.rules, label, file), (file, label)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 04:52:40 2026
+
+@author: Roy Alderton
+
+Tests for textgrid_silences.py.
+"""
+
+import os
+import sys
+import subprocess
+import numpy as np
+import pytest
+import textgrid_silences
+from textgrid_arrays import TextGrid
+from textgrid_audio import WavFile
+from test_textgrid_audio import write_wav
+
+script_path = os.path.dirname(os.path.abspath(__file__))
+sample_rate = 8000
+
+
+def make_block(path, items, duration = 3.0, channels = 1):
+    # A recording with a tone for each (start, end) item and quiet noise
+    # elsewhere
+    n_samples = int(duration * sample_rate)
+    samples = 0.001 * np.random.default_rng(0).standard_normal(n_samples)
+    tone = 0.5 * np.sin(2 * np.pi * 220 * np.arange(n_samples) / sample_rate)
+    for start, end in items:
+        samples[int(start * sample_rate):int(end * sample_rate)] += tone[int(start * sample_rate):int(end * sample_rate)]
+    write_wav(path, np.column_stack([samples] * channels), sample_rate)
+
+
+def reference_intensity(wav, pitch_floor = 100.0):
+    # Praat's intensity, measured one frame at a time
+    times, _ = textgrid_silences.intensity(wav, pitch_floor)
+    half_window = int(0.5 * 6.4 / pitch_floor * wav.sample_rate)
+    window = np.kaiser(2 * half_window + 1, 2 * np.pi ** 2 + 0.5)
+    samples = wav.read_samples(0, wav.n_samples)
+    values = []
+    for time in times:
+        centre = min(max(int(round(time * wav.sample_rate - 0.5)), half_window), wav.n_samples - half_window - 1)
+        frame = samples[centre - half_window:centre + half_window + 1]
+        frame = frame - frame.mean(axis = 0)
+        values.append(10 * np.log10(np.mean((frame * frame).T @ window) / window.sum() / 4e-10))
+    return np.array(values)
+
+
+@pytest.mark.parametrize('channels', [1, 2])
+def test_intensity(tmp_path, channels):
+    path = str(tmp_path / 'block.wav')
+    make_block(path, [(0.5, 1.0)], 2.0, channels)
+    with WavFile(path) as wav:
+        times, values = textgrid_silences.intensity(wav)
+        assert np.allclose(np.diff(times), 0.008)
+        assert abs(times[0] + times[-1] - wav.duration) < 1e-9
+        assert np.allclose(values, reference_intensity(wav), rtol = 0, atol = 1e-9)
+        assert np.allclose(textgrid_silences.intensity(wav, block_frames = 7)[1], values, rtol = 0, atol = 1e-9)
+
+        # A tone's intensity is its mean square, in dB above the auditory
+        # threshold
+        middle = np.abs(times - 0.75) < 0.1
+        assert np.allclose(values[middle], 10 * np.log10(0.125 / 4e-10), atol = 0.05)
+
+        times, _ = textgrid_silences.intensity(wav, pitch_floor = 50.0, time_step = 0.01)
+        assert np.allclose(np.diff(times), 0.01)
+
+
+def test_intensity_of_silence_and_short_recordings(tmp_path):
+    path = str(tmp_path / 'block.wav')
+    write_wav(path, np.zeros(4000), sample_rate)
+    with WavFile(path) as wav:
+        assert (textgrid_silences.intensity(wav)[1] == -300.0).all()
+    write_wav(path, np.zeros(400), sample_rate)
+    with WavFile(path) as wav:
+        with pytest.raises(ValueError):
+            textgrid_silences.intensity(wav)
+
+
+def test_detect_silences(tmp_path):
+    # Two items, one with a short pause in it, and a short click that isn't
+    # an item
+    path = str(tmp_path / 'block.wav')
+    make_block(path, [(0.5, 1.0), (1.5, 2.0), (2.08, 2.5), (2.8, 2.83)], 3.5)
+    with WavFile(path) as wav:
+        edges, sounding = textgrid_silences.detect_silences(wav)
+        assert sounding.tolist() == [False, True, False, True, False]
+        assert np.allclose(edges, [0.0, 0.5, 1.0, 1.5, 2.5, 3.5], atol = 0.04)
+
+        # With shorter minimum durations, the pause and the click are kept
+        edges, sounding = textgrid_silences.detect_silences(wav, min_silent = 0.01, min_sounding = 0.01)
+        assert sounding.tolist() == [False, True, False, True, False, True, False, True, False]
+
+
+def test_remove_short():
+    edges = np.array([0.0, 1.0, 1.05, 2.0, 2.05, 3.0])
+    sounding = np.array([False, True, False, True, False])
+    new_edges, new_sounding = textgrid_silences._remove_short(edges, sounding, True, 0.1)
+    assert new_edges.tolist() == [0.0, 3.0] and new_sounding.tolist() == [False]
+    new_edges, new_sounding = textgrid_silences._remove_short(edges, sounding, False, 0.1)
+    assert new_edges.tolist() == edges.tolist() and new_sounding.tolist() == sounding.tolist()
+
+    sounding = ~sounding
+    new_edges, new_sounding = textgrid_silences._remove_short(edges, sounding, False, 0.1)
+    assert new_edges.tolist() == [0.0, 3.0] and new_sounding.tolist() == [True]
+
+
+def test_silences_textgrid(tmp_path):
+    path = str(tmp_path / 'block.wav')
+    make_block(path, [(0.5, 1.0), (1.5, 2.5)], 3.0, 2)
+    with WavFile(path) as wav:
+        tg = textgrid_silences.silences_textgrid(wav, silence_threshold = -30.0)
+    assert list(tg) == ['silences'] and tg.xmax == 3.0
+    tier = tg['silences']
+    assert tier.texts == ['', 'speech', '', 'speech', '']
+    assert (tier.xmin, tier.xmax) == (0.0, 3.0)
+    assert np.array_equal(tier.xmins[1:], tier.xmaxs[:-1])
+
+
+def test_script(tmp_path):
+    # A TextGrid is made for every WAV file, but existing ones are kept
+    make_block(str(tmp_path / '0012_nasalance_1.wav'), [(0.5, 1.0), (1.5, 2.5)], 3.0, 2)
+    make_block(str(tmp_path / '0012_nasalance_2.wav'), [(0.5, 1.0)], 2.0, 2)
+    with open(str(tmp_path / '0012_nasalance_2.TextGrid'), 'w') as outfile:
+        outfile.write('corrected by hand')
+    script = os.path.join(script_path, 'textgrid_silences.py')
+    output = subprocess.run([sys.executable, script], cwd = str(tmp_path), check = True, stdout = subprocess.PIPE, universal_newlines = True).stdout
+    assert 'Saved 0012_nasalance_1.TextGrid (2 items)' in output
+    assert 'Skipping 0012_nasalance_2.wav' in output
+    assert TextGrid(str(tmp_path / '0012_nasalance_1.TextGrid'))['silences'].texts.count('speech') == 2
+    with open(str(tmp_path / '0012_nasalance_2.TextGrid')) as infile:
+        assert infile.read() == 'corrected by hand'
+
+    output = subprocess.run([sys.executable, script, '0012_nasalance_2.wav', '--force'], cwd = str(tmp_path), check = True, stdout = subprocess.PIPE, universal_newlines = True).stdout
+    assert 'Saved 0012_nasalance_2.TextGrid (1 items)' in output
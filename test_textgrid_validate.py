@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 02:44:52 2026
+
+@author: Roy Alderton
+
+Tests for textgrid_validate.py.
+"""
+
+import os
+import sys
+import subprocess
+import pytest
+import textgrid_batch
+import textgrid_validate
+import process_textgrid_tiers_de
+from textgrid_arrays import Tier, TextGrid
+
+script_path = os.path.dirname(os.path.abspath(__file__))
+
+
+def write_problems(path):
+    # A TextGrid with one of each problem
+    tg = TextGrid(xmin = 0.0, xmax = 3.0)
+    tg['SOUND'] = Tier.from_arrays([0.0, 1.2, 1.9], [1.0, 2.0, 3.0], ['a', 'b', 'c'])
+    tg['PHRASE'] = Tier.from_arrays([0.0, 0.5, 0.4], [0.5, 0.4, 3.0], ['', 'Cleo', ''])
+    tg['WORD'] = Tier.from_arrays([0.1, 1.0, 1.0], [1.0, 1.0, 2.5], ['', 'x', ''])
+    tg['MAS'] = Tier.from_arrays([0.0], [3.25], [''])
+    tg['POINTS'] = Tier.from_arrays([1.0, 0.5, 3.5], [1.0, 0.5, 3.5], ['a', 'b', 'c'], point_tier = True)
+
+    # Every tier is written with the times of the file, so the end of the
+    # WORD tier is changed afterwards
+    text = tg.format()
+    start = text.index('name = "WORD"')
+    end = text.index('xmax = 3.0', start) + len('xmax = 3.0')
+    with open(path, 'w', encoding = 'UTF-8') as outfile:
+        outfile.write(text[:start] + text[start:end].replace('xmax = 3.0', 'xmax = 2.5') + text[end:])
+
+
+def test_each_problem(tmp_path):
+    write_problems(str(tmp_path / 'problems.TextGrid'))
+    problems = [(name, kind, round(time, 9), round(value, 9)) for file, name, kind, time, value in textgrid_validate.validate(str(tmp_path), ['problems.TextGrid'])]
+    assert problems == [('SOUND', 'gap', 1.0, 0.2),
+                        ('SOUND', 'overlap', 2.0, 0.1),
+                        ('PHRASE', 'backwards phrase', 0.5, -0.1),
+                        ('WORD', 'tier start', 0.1, 0.1),
+                        ('WORD', 'duration', 1.0, 0.0),
+                        ('WORD', 'file end', 2.5, -0.5),
+                        ('MAS', 'tier end', 3.25, 0.25),
+                        ('POINTS', 'point order', 0.5, 0.5),
+                        ('POINTS', 'point outside tier', 3.5, 3.5)]
+
+
+def test_tolerance(tmp_path):
+    tg = TextGrid(xmin = 0.0, xmax = 2.0)
+    tg['SOUND'] = Tier.from_arrays([0.0, 1.0 + 1e-12], [1.0, 2.0], ['a', 'b'])
+    tg.write(str(tmp_path / 'rounded.TextGrid'))
+    assert textgrid_validate.validate(str(tmp_path), ['rounded.TextGrid']) == []
+    assert [problem[2] for problem in textgrid_validate.validate(str(tmp_path), ['rounded.TextGrid'], tolerance = 1e-13)] == ['gap']
+
+
+def test_files_and_tiers(tmp_path):
+    # Problems are reported with the right file and tier when there are
+    # several files, including one with an empty tier
+    write_problems(str(tmp_path / 'b.TextGrid'))
+    tg = TextGrid(xmin = 0.0, xmax = 1.0)
+    tg['EMPTY'] = Tier.from_arrays([], [], [], xmin = 0.0, xmax = 1.0)
+    tg['SOUND'] = Tier.from_arrays([0.0, 0.5], [0.4, 1.0], ['a', 'b'])
+    tg.write(str(tmp_path / 'a.TextGrid'))
+    problems = textgrid_validate.validate(str(tmp_path), ['a.TextGrid', 'b.TextGrid'])
+    assert problems[0][:3] == ('a.TextGrid', 'SOUND', 'gap')
+    assert all(file == 'b.TextGrid' for file, *_ in problems[1:])
+    assert len(problems) == 10
+
+
+def test_processed_corpus(make_corpus):
+    # The processing scripts leave no problems
+    path, file_list = make_corpus('de', 12)
+    report = textgrid_batch.run_batch(process_textgrid_tiers_de.process_textgrid, file_list, path, n_jobs = 1)
+    assert report.failed == {}
+    assert textgrid_validate.validate(path, file_list) == []
+
+
+@pytest.mark.parametrize('problem', [False, True])
+def test_script(tmp_path, problem):
+    path = str(tmp_path / 'TextGrids')
+    os.makedirs(path)
+    if problem:
+        write_problems(os.path.join(path, 'problems.TextGrid'))
+    else:
+        tg = TextGrid(xmin = 0.0, xmax = 1.0)
+        tg['SOUND'] = Tier.from_arrays([0.0, 0.5], [0.5, 1.0], ['a', 'b'])
+        tg.write(os.path.join(path, 'fine.TextGrid'))
+    completed = subprocess.run([sys.executable, os.path.join(script_path, 'textgrid_validate.py'), path], stdout = subprocess.PIPE, universal_newlines = True)
+    assert completed.returncode == (1 if problem else 0)
+    if problem:
+        assert 'SOUND  gap at 1.000000 s (+0.200000 s)' in completed.stdout
+        assert '1 backwards phrase' in completed.stdout
+    else:
+        assert 'no problems found' in completed.stdout
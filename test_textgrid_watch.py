@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 02:14:45 2026
+
+@author: Roy Alderton
+
+Tests for the textgrid_watch module.
+"""
+
+import os
+import time
+import pytest
+import textgrid_watch
+from textgrid_watch import FolderWatcher
+
+
+def write(path, file, text = 'TextGrid'):
+    with open(os.path.join(path, file), 'w') as outfile:
+        outfile.write(text)
+
+
+def test_is_textgrid():
+    assert textgrid_watch.is_textgrid('0001de_fin_or_p01_Mann_1.TextGrid')
+    assert not textgrid_watch.is_textgrid('0001de_practice_1.TextGrid')
+    assert not textgrid_watch.is_textgrid('0001de_fin_or_p01_Mann_1.wav')
+    assert not textgrid_watch.is_textgrid('0001de_fin_or_p01_Mann_1.TextGrid.tmp')
+
+
+def test_polling(tmp_path, monkeypatch):
+    monkeypatch.setattr(FolderWatcher, '_start_inotify', staticmethod(lambda path: None))
+    path = str(tmp_path)
+    write(path, 'old.TextGrid')
+    watcher = FolderWatcher(path, poll_interval = 0.01)
+    assert watcher.method == 'polling'
+    assert watcher.changes(None) == set()
+
+    write(path, 'new.TextGrid')
+    write(path, 'old.TextGrid', 'changed TextGrid')
+    write(path, '0001de_practice_1.TextGrid')
+    assert watcher.changes(1.0) == {'new.TextGrid', 'old.TextGrid'}
+    assert watcher.changes(1.0) == set()
+    watcher.close()
+
+
+def test_inotify(tmp_path):
+    path = str(tmp_path)
+    watcher = FolderWatcher(path)
+    if watcher.method != 'inotify':
+        pytest.skip('inotify is not available')
+    try:
+        assert watcher.changes(0.01) == set()
+        write(path, 'new.TextGrid')
+        write(path, 'notes.txt')
+        # A file moved into the folder is reported too, as the scripts write
+        # their outputs to a temporary file first
+        write(path, 'moved.TextGrid.tmp')
+        os.replace(os.path.join(path, 'moved.TextGrid.tmp'), os.path.join(path, 'moved.TextGrid'))
+        files = set()
+        deadline = time.monotonic() + 5.0
+        while files != {'new.TextGrid', 'moved.TextGrid'} and time.monotonic() < deadline:
+            files.update(watcher.changes(0.5))
+        assert files == {'new.TextGrid', 'moved.TextGrid'}
+    finally:
+        watcher.close()
+
+
+class FakeWatcher(object):
+    # Reports a list of changes, one set per call, waiting for each timeout,
+    # and then stops the watch as Ctrl+C would
+    changes_list = []
+    timeouts = []
+
+    def __init__(self, path):
+        self.method = 'test'
+
+    def changes(self, timeout):
+        FakeWatcher.timeouts.append(timeout)
+        if not FakeWatcher.changes_list:
+            raise KeyboardInterrupt
+        if timeout is not None:
+            time.sleep(timeout)
+        return FakeWatcher.changes_list.pop(0)
+
+    def close(self):
+        pass
+
+
+def test_watch(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path)
+    for file in ('a.TextGrid', 'b.TextGrid', 'done.TextGrid'):
+        write(path, file)
+    monkeypatch.setattr(textgrid_watch, 'FolderWatcher', FakeWatcher)
+    monkeypatch.setattr(FakeWatcher, 'changes_list', [{'a.TextGrid', 'done.TextGrid', 'deleted.TextGrid'}, {'a.TextGrid'}, {'b.TextGrid'}, set()])
+    monkeypatch.setattr(FakeWatcher, 'timeouts', [])
+    batches = []
+
+    # A file saved again before the debounce time has passed is processed
+    # once, and deleted files and those already up to date are ignored
+    textgrid_watch.watch(batches.append, path, lambda file: file == 'done.TextGrid', debounce = 0.05)
+    assert batches == [['a.TextGrid'], ['b.TextGrid']]
+    assert FakeWatcher.timeouts[0] is None
+    assert all(0.0 <= timeout <= 0.05 for timeout in FakeWatcher.timeouts[1:-1])
+    assert FakeWatcher.timeouts[-1] is None
+    assert 'Stopped watching' in capsys.readouterr().out
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 20:14:36 2026
+
+@author: Roy Alderton
+
+This module reads TextGrids straight out of zip and tar archives (e.g. the
+results of a WebMAUS batch run from the BAS web services) and writes processed
+TextGrids to a new archive or folder, so that the archive doesn't have to be
+extracted before it is processed.
+
+The members of an archive are read one after another and handed over as
+bytes, without being written to the disk. A tar archive (including .tar.gz,
+.tgz, .tar.bz2 and .tar.xz) is read as a stream from start to finish, so even
+a compressed one is only decompressed once. Members in sub-folders of the
+archive are named by their file names alone, as they would be if they had
+been extracted into the TextGrids folder.
+
+The output is a zip archive if its path ends in '.zip', a tar archive if it
+ends in '.tar', '.tar.gz', '.tgz', '.tar.bz2' or '.tar.xz', and a folder
+otherwise. A new archive is written to a temporary file, which only replaces
+any existing archive once it is complete.
+
+The module is used through the --archive option of the processing scripts,
+e.g.:
+
+    python process_textgrid_tiers_de.py --archive results.zip
+
+The module should be saved in the same folder as the scripts that use it.
+"""
+
+import io
+import os
+import time
+import tarfile
+import zipfile
+
+# Compression used for tar archives with each file name ending
+tar_modes = {'.tar': 'w', '.tar.gz': 'w:gz', '.tgz': 'w:gz', '.tar.bz2': 'w:bz2', '.tar.xz': 'w:xz'}
+
+
+class ArchiveError(Exception):
+    '''Raised when a file isn't a zip or tar archive.'''
+    pass
+
+
+def is_archive(path):
+    '''Checks whether a path is a zip or tar archive rather than a folder.'''
+    return os.path.isfile(path) and (zipfile.is_zipfile(path) or tarfile.is_tarfile(path))
+
+
+def output_kind(path):
+    '''
+    Returns what kind of output a path is for: 'zip', one of the tar modes in
+    tar_modes (e.g. 'w:gz') or None for a folder.
+    '''
+    lower = path.lower()
+    if lower.endswith('.zip'):
+        return 'zip'
+    for ending, mode in tar_modes.items():
+        if lower.endswith(ending):
+            return mode
+    return None
+
+
+def default_output(path):
+    '''
+    Returns the folder that the TextGrids from an archive are written to if no
+    output is given: the archive's name without its ending, plus '_processed'
+    (e.g. results_processed for results.zip).
+    '''
+    lower = path.lower()
+    for ending in ('.zip',) + tuple(sorted(tar_modes, key = len, reverse = True)):
+        if lower.endswith(ending):
+            return path[:-len(ending)] + '_processed'
+    return path + '_processed'
+
+
+def iter_members(path, select = None):
+    '''
+    Reads the files in a zip or tar archive one at a time.
+
+    Parameters
+    ----------
+    path : str
+        The path of the archive.
+    select : function, optional
+        Checks whether a file should be read, given its name. Files that
+        aren't selected are skipped without being read. The default is None
+        (read every file).
+
+    Raises
+    ------
+    ArchiveError
+        If the file isn't a zip or tar archive.
+
+    Yields
+    ------
+    name : str
+        The file name of the member, without any sub-folders.
+    data : bytes
+        The contents of the member.
+
+    '''
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                name = info.filename.rsplit('/', 1)[-1]
+                if info.is_dir() or (select is not None and not select(name)):
+                    continue
+                yield name, archive.read(info)
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path, 'r|*') as archive:
+            for member in archive:
+                name = member.name.rsplit('/', 1)[-1]
+                if not member.isfile() or (select is not None and not select(name)):
+                    continue
+                yield name, archive.extractfile(member).read()
+    else:
+        raise ArchiveError('{} is not a zip or tar archive'.format(path))
+
+
+def member_names(path, select = None):
+    '''
+    Lists the names of the files in a zip or tar archive without reading
+    their contents.
+
+    The names of a zip archive's files are in its directory at the end of the
+    file. A tar archive has no directory, so the header of each file has to
+    be found by going through the archive (and decompressing it, if it is
+    compressed), but the contents of the files are skipped.
+
+    Parameters
+    ----------
+    path : str
+        The path of the archive.
+    select : function, optional
+        Checks whether a file should be listed, given its name. The default is
+        None (list every file).
+
+    Raises
+    ------
+    ArchiveError
+        If the file isn't a zip or tar archive.
+
+    Returns
+    -------
+    names : list
+        The file names of the members, without any sub-folders, in the order
+        they are read by iter_members().
+
+    '''
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            names = [name.rsplit('/', 1)[-1] for name in archive.namelist() if not name.endswith('/')]
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path) as archive:
+            names = [member.name.rsplit('/', 1)[-1] for member in archive.getmembers() if member.isfile()]
+    else:
+        raise ArchiveError('{} is not a zip or tar archive'.format(path))
+    return [name for name in names if select is None or select(name)]
+
+
+def count_members(path, select = None):
+    '''
+    Counts the selected files in a zip archive from its directory, without
+    reading them. Returns None for a tar archive, which would have to be read
+    from start to finish to count them.
+    '''
+    if not zipfile.is_zipfile(path):
+        return None
+    with zipfile.ZipFile(path) as archive:
+        return sum(1 for info in archive.infolist() if not info.is_dir() and (select is None or select(info.filename.rsplit('/', 1)[-1])))
+
+
+class ArchiveWriter(object):
+    '''
+    Writes files to a new zip or tar archive, or to a folder (see
+    output_kind()). Can be used as a context manager, e.g.:
+
+        with textgrid_archive.ArchiveWriter('processed.zip') as output:
+            output.add('0012de_nasals_fin_nas_p03_Mann_1_03__01.TextGrid', data)
+    '''
+
+    def __init__(self, path):
+        '''
+        Parameters
+        ----------
+        path : str
+            The path of the new archive, or the output folder.
+
+        '''
+        self.path = path
+        self.kind = output_kind(path)
+        self._names = set()
+        self._archive = None
+        if self.kind is None:
+            os.makedirs(path, exist_ok = True)
+        else:
+            self.temp_path = path + '.tmp'
+            if self.kind == 'zip':
+                self._archive = zipfile.ZipFile(self.temp_path, 'w', zipfile.ZIP_DEFLATED)
+            else:
+                self._archive = tarfile.open(self.temp_path, self.kind)
+
+    def add(self, name, data):
+        '''
+        Adds a file to the archive or folder.
+
+        Parameters
+        ----------
+        name : str
+            The file name.
+        data : bytes
+            The contents of the file.
+
+        Raises
+        ------
+        ValueError
+            If a file with the same name has already been added (e.g. from two
+            sub-folders of the original archive). Nothing is written, and
+            other files can still be added.
+
+        Returns
+        -------
+        None.
+
+        '''
+        if name in self._names:
+            raise ValueError('another file called {} has already been written (the archive has files with the same name in different folders)'.format(name))
+        self._names.add(name)
+        if self.kind is None:
+            # Write each file in the folder to a temporary file first, so that
+            # an interrupted run never leaves a half-written file
+            output_file = os.path.join(self.path, name)
+            with open(output_file + '.tmp', 'wb') as outfile:
+                outfile.write(data)
+            os.replace(output_file + '.tmp', output_file)
+        elif self.kind == 'zip':
+            self._archive.writestr(name, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = time.time()
+            self._archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        '''Finishes the archive and moves it into place.'''
+        if self._archive is None:
+            return
+        self._archive.close()
+        self._archive = None
+        os.replace(self.temp_path, self.path)
+
+    def discard(self):
+        '''Stops writing the archive and deletes the temporary file.'''
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+            os.remove(self.temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        if error_type is None:
+            self.close()
+        else:
+            self.discard()
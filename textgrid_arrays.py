@@ -0,0 +1,888 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 10:12:05 2026
+
+@author: Roy Alderton
+
+This module is a lightweight replacement for the TextGrid, Tier and Interval
+classes of the textgrids library (praat-textgrids), designed for processing
+large numbers of the TextGrids produced by the 'B2P -> MAUS -> PHO2SYLL'
+pipeline in BAS Web Services.
+
+Instead of building a Python object for every interval, each tier stores its
+intervals as parallel arrays:
+
+    1. xmins and xmaxs, two numpy arrays of floats holding the boundaries.
+    2. codes, a numpy array of integers pointing into an interned label table
+    (labels), so that a label such as 'n' or '<p:>' is only stored once per
+    tier however often it appears.
+
+The classes keep the parts of the textgrids library's API that the
+process_textgrid_tiers_* scripts use, so a TextGrid can be loaded, edited and
+written in the same way as before, e.g.:
+
+    tg = textgrid_arrays.TextGrid('TextGrids/example.TextGrid')
+    del tg['KAN-MAU']
+    tg['WORD'] = tg.pop('ORT-MAU')
+    for interval in tg['WORD']:
+        if interval.text == '':
+            interval.text = '<p:>'
+    tg.write('TextGrids/example.TextGrid')
+
+TextGrids can be read in any of Praat's file formats (the long text format,
+the short text format and the binary format), which are detected
+automatically. They are written in the long text format unless another format
+is given, e.g. tg.write('example.TextGrid', file_format = 'binary'). The short
+text and binary formats are much smaller and quicker to read.
+
+The encoding of a text file (UTF-8, or UTF-16 as Praat uses for labels with
+non-ASCII characters such as ç, é or ß) is found from its first few bytes and
+the file is decoded in one step, without copying its contents first (see
+decode_textgrid_bytes()). Large files are memory-mapped rather than read.
+
+Iterating over a tier (or indexing it) returns Interval objects that read from
+and write to the tier's arrays, so changes to them are saved in the tier. Code
+that needs to look at a whole tier at once can use the arrays directly, e.g.
+tier.xmins, tier.xmaxs or tier.texts.
+
+The module should be saved in the same folder as the scripts that use it. It
+requires numpy, which you can install by entering the following into the
+command prompt:
+
+    pip install numpy
+"""
+
+import os
+import re
+import mmap
+import codecs
+import struct
+import numpy as np
+from itertools import chain
+
+# Regex patterns for the tier headers and the intervals / points in Praat's
+# long text format. Quotation marks in labels are written by Praat as "".
+tier_pattern = re.compile(r'item \[\d+\]:\s*class = "(\w+)"\s*name = "((?:[^"]|"")*)"\s*xmin = (\S+)\s*xmax = (\S+)\s*(?:intervals|points): size = (\d+)')
+interval_pattern = re.compile(r'intervals \[\d+\]:\s*xmin = (\S+)\s*xmax = (\S+)\s*text = "((?:[^"]|"")*)"')
+point_pattern = re.compile(r'points \[\d+\]:\s*(?:xpos|number) = (\S+)\s*(?:text|mark) = "((?:[^"]|"")*)"')
+header_pattern = re.compile(r'xmin = (\S+)\s*xmax = (\S+)\s*tiers\? <exists>')
+
+# Formatting templates for Praat's long text format
+# These follow the layout written by the textgrids library, so that files
+# written by either produce the same output.
+long_header = '''File type = "ooTextFile"
+Object class = "TextGrid"
+
+xmin = {}
+xmax = {}
+tiers? <exists>
+size = {}
+item []:'''
+
+long_tier = '''
+    item [{}]:
+        class = "{}"
+        name = "{}"
+        xmin = {}
+        xmax = {}
+        {}: size = {}'''
+
+long_interval = '''
+            intervals [{}]:
+                xmin = {}
+                xmax = {}
+                text = "{}"'''
+
+long_point = '''
+            points [{}]:
+                xpos = {}
+                text = "{}"'''
+
+# Regex pattern for the items in Praat's short text format, which are strings
+# (in quotation marks), flags such as <exists> and numbers
+short_token_pattern = re.compile(r'"((?:[^"]|"")*)"|(<\w+>)|([^\s"<]+)')
+
+# Formatting templates for Praat's short text format
+short_header = '''File type = "ooTextFile"
+Object class = "TextGrid"
+
+{}
+{}
+<exists>
+{}
+'''
+
+short_tier = '''"{}"
+"{}"
+{}
+{}
+{}
+'''
+
+short_interval = '''{}
+{}
+"{}"
+'''
+
+short_point = '''{}
+"{}"
+'''
+
+# Start of a TextGrid in Praat's binary format
+binary_header = b'ooBinaryFile\x08TextGrid'
+
+# The file formats that TextGrids can be written in
+file_formats = ('long', 'short', 'binary')
+
+# Files at least this large (in bytes) are memory-mapped when they are read.
+# For the small TextGrids that MAUS produces, setting up the mapping takes
+# longer than simply reading the file.
+mmap_threshold = 1 << 17
+
+
+class ParseError(Exception):
+    '''Read error for TextGrid files that cannot be parsed.'''
+    pass
+
+
+def decode_textgrid_bytes(data):
+    '''
+    Decodes the contents of a TextGrid file. Praat writes TextGrids as UTF-16
+    (with a byte order mark) if any of the labels contain non-ASCII characters
+    and as UTF-8 otherwise.
+
+    The encoding is found from the first few bytes, and the contents are then
+    decoded in one step straight from data with the decoder for that
+    encoding, skipping the codec lookup of data.decode(). Most MAUS output is
+    plain ASCII starting with 'File type', which is recognised from its first
+    two bytes and decoded by the UTF-8 decoder's own fast path for ASCII. UTF-16
+    files without a byte order mark are recognised by the zero bytes of 'File
+    type'.
+
+    Parameters
+    ----------
+    data : bytes-like object
+        The raw contents of the file, e.g. bytes or a memory-mapped file.
+
+    Returns
+    -------
+    str
+        The decoded contents of the file.
+
+    '''
+    if len(data) < 2:
+        return codecs.utf_8_decode(data, 'strict', True)[0]
+
+    # Plain ASCII or UTF-8, which starts with 'Fi' of 'File type'
+    first = data[0]
+    if first == 0x46 and data[1]:
+        return codecs.utf_8_decode(data, 'strict', True)[0]
+
+    # Otherwise, find the encoding from the byte order mark, or from the zero
+    # bytes of UTF-16 if there isn't one
+    head = bytes(data[:3])
+    if head[:2] in (codecs.BOM_UTF16_BE, codecs.BOM_UTF16_LE):
+        return codecs.utf_16_decode(data, 'strict', True)[0]
+    if first == 0:
+        return codecs.utf_16_be_decode(data, 'strict', True)[0]
+    if head[1:2] == b'\x00':
+        return codecs.utf_16_le_decode(data, 'strict', True)[0]
+    if head == codecs.BOM_UTF8:
+        # Skip the byte order mark without copying the rest of the contents
+        with memoryview(data) as view:
+            return codecs.utf_8_decode(view[3:], 'strict', True)[0]
+    return codecs.utf_8_decode(data, 'strict', True)[0]
+
+
+def read_binary_text(data, position):
+    '''
+    Reads a string from a TextGrid in Praat's binary format. Praat stores the
+    length of the string first. Strings that aren't plain ASCII are marked with
+    a length of 0xFFFF and stored as UTF-16, after their real length.
+
+    Parameters
+    ----------
+    data : bytes-like object
+        The contents of the file.
+    position : int
+        The position of the string in data.
+
+    Returns
+    -------
+    text : str
+        The string.
+    position : int
+        The position after the end of the string.
+
+    '''
+    length, = struct.unpack_from('>H', data, position)
+    position += 2
+    if length == 0xFFFF:
+        length, = struct.unpack_from('>H', data, position)
+        position += 2
+        return str(data[position:position + 2 * length], 'utf-16-be'), position + 2 * length
+    return str(data[position:position + length], 'latin-1'), position + length
+
+
+def binary_text(text):
+    '''Converts a string to Praat's binary format (see read_binary_text()).'''
+    if text.isascii():
+        return struct.pack('>H', len(text)) + text.encode('ascii')
+    encoded = text.encode('utf-16-be')
+    return struct.pack('>HH', 0xFFFF, len(encoded) // 2) + encoded
+
+
+def unescape(text):
+    '''Converts a label from Praat's file format (with "" for ") to plain text.'''
+    return text.replace('""', '"')
+
+
+def escape(text):
+    '''Converts a label from plain text to Praat's file format (with "" for ").'''
+    return text.replace('"', '""')
+
+
+class Interval(object):
+    '''
+    A single interval (or point) with a label (text) and boundaries (xmin and
+    xmax). Standalone Interval objects are used to create new intervals, e.g.
+    for Tier.insert(). Intervals returned by a Tier are views of one row of the
+    Tier's arrays.
+    '''
+
+    __slots__ = ('_text', '_xmin', '_xmax')
+
+    def __init__(self, text = '', xmin = 0.0, xmax = 0.0):
+        self._text = '' if text is None else str(text)
+        self._xmin = float(xmin)
+        self._xmax = float(xmax)
+        if self._xmin > self._xmax:
+            raise ValueError('xmin > xmax')
+
+    def __repr__(self):
+        return '<Interval text="{}" xmin={} xmax={}>'.format(self.text, self.xmin, self.xmax)
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        self._text = str(value)
+
+    @property
+    def xmin(self):
+        return self._xmin
+
+    @xmin.setter
+    def xmin(self, value):
+        self._xmin = float(value)
+
+    @property
+    def xmax(self):
+        return self._xmax
+
+    @xmax.setter
+    def xmax(self, value):
+        self._xmax = float(value)
+
+    @property
+    def xpos(self):
+        '''Return the time of a point (points are stored with xmin == xmax).'''
+        return self.xmin
+
+    @property
+    def dur(self):
+        '''Return the duration of the interval.'''
+        return self.xmax - self.xmin
+
+    @property
+    def mid(self):
+        '''Return the temporal midpoint of the interval.'''
+        return self.xmin + self.dur / 2
+
+
+class _IntervalView(Interval):
+    '''
+    An Interval that reads from and writes to one row of a Tier's arrays.
+    Not intended to be created directly.
+
+    Each row of a Tier has a permanent ID, so the view still refers to the same
+    interval after other intervals are inserted or popped. If its own interval
+    is popped, the view refers to the detached Interval returned by pop(), as
+    it would with the textgrids library.
+    '''
+
+    __slots__ = ('_tier', '_id', '_pos')
+
+    def __init__(self, tier, pos):
+        self._tier = tier
+        self._id = tier._ids[pos]
+        self._pos = pos
+
+    def _locate(self):
+        # Check the cached position first, as it is almost always still right
+        tier = self._tier
+        pos = self._pos
+        if pos < len(tier._ids) and tier._ids[pos] == self._id:
+            return pos
+        hits = np.flatnonzero(tier._ids == self._id)
+        if len(hits) == 0:
+            return None
+        self._pos = int(hits[0])
+        return self._pos
+
+    @property
+    def text(self):
+        pos = self._locate()
+        if pos is None:
+            return self._tier._detached[self._id].text
+        return self._tier.labels[self._tier.codes[pos]]
+
+    @text.setter
+    def text(self, value):
+        pos = self._locate()
+        if pos is None:
+            self._tier._detached[self._id].text = value
+        else:
+            self._tier.codes[pos] = self._tier.intern(str(value))
+
+    @property
+    def xmin(self):
+        pos = self._locate()
+        if pos is None:
+            return self._tier._detached[self._id].xmin
+        return float(self._tier.xmins[pos])
+
+    @xmin.setter
+    def xmin(self, value):
+        pos = self._locate()
+        if pos is None:
+            self._tier._detached[self._id].xmin = value
+        else:
+            self._tier.xmins[pos] = value
+
+    @property
+    def xmax(self):
+        pos = self._locate()
+        if pos is None:
+            return self._tier._detached[self._id].xmax
+        return float(self._tier.xmaxs[pos])
+
+    @xmax.setter
+    def xmax(self, value):
+        pos = self._locate()
+        if pos is None:
+            self._tier._detached[self._id].xmax = value
+        else:
+            self._tier.xmaxs[pos] = value
+
+
+class Tier(object):
+    '''
+    A tier of intervals (or points) stored as parallel arrays. See the module
+    docstring for details.
+    '''
+
+    def __init__(self, data = None, xmin = 0.0, xmax = 0.0, point_tier = False):
+        '''
+        Parameters
+        ----------
+        data : list, optional
+            A list of Interval objects to fill the tier with. The default is
+            None (an empty tier).
+        xmin : float, optional
+            The start time of the tier. The default is 0.0, in which case the
+            start time of the first interval in data is used.
+        xmax : float, optional
+            The end time of the tier. The default is 0.0, in which case the
+            end time of the last interval in data is used.
+        point_tier : bool, optional
+            Whether the tier is a point tier rather than an interval tier. The
+            default is False.
+
+        '''
+        data = list(data) if data else []
+
+        # Use data for xmin and xmax unless they are explicitly given
+        if data and xmin == 0.0 and xmax == 0.0:
+            xmin = data[0].xmin
+            xmax = data[-1].xmax
+        self.xmin = float(xmin)
+        self.xmax = float(xmax)
+        self.is_point_tier = point_tier
+
+        self.labels = []
+        self._label_codes = {}
+        self.xmins = np.array([interval.xmin for interval in data], dtype = np.float64)
+        self.xmaxs = np.array([interval.xmax for interval in data], dtype = np.float64)
+        self.codes = np.array([self.intern(interval.text) for interval in data], dtype = np.int32)
+        self._ids = np.arange(len(data), dtype = np.int64)
+        self._next_id = len(data)
+        self._detached = {}
+
+    @classmethod
+    def from_arrays(cls, xmins, xmaxs, texts, xmin = None, xmax = None, point_tier = False):
+        '''
+        Creates a tier directly from boundary arrays and a list of labels,
+        without creating any Interval objects.
+
+        Parameters
+        ----------
+        xmins : sequence of float
+            The start times of the intervals.
+        xmaxs : sequence of float
+            The end times of the intervals.
+        texts : sequence of str
+            The labels of the intervals.
+        xmin : float, optional
+            The start time of the tier. The default is None, in which case the
+            first value in xmins is used.
+        xmax : float, optional
+            The end time of the tier. The default is None, in which case the
+            last value in xmaxs is used.
+        point_tier : bool, optional
+            Whether the tier is a point tier. The default is False.
+
+        Returns
+        -------
+        tier : Tier
+            The new tier.
+
+        '''
+        tier = cls(point_tier = point_tier)
+        tier.xmins = np.asarray(xmins, dtype = np.float64).copy()
+        tier.xmaxs = np.asarray(xmaxs, dtype = np.float64).copy()
+
+        # Build the label table from the unique labels first, so that each
+        # interval only needs one dict lookup
+        tier.labels = list(dict.fromkeys(texts))
+        tier._label_codes = {text: code for code, text in enumerate(tier.labels)}
+        label_codes = tier._label_codes
+        tier.codes = np.array([label_codes[text] for text in texts], dtype = np.int32)
+        tier._ids = np.arange(len(tier.codes), dtype = np.int64)
+        tier._next_id = len(tier.codes)
+        if xmin is not None:
+            tier.xmin = float(xmin)
+        elif len(tier.xmins):
+            tier.xmin = float(tier.xmins[0])
+        if xmax is not None:
+            tier.xmax = float(xmax)
+        elif len(tier.xmaxs):
+            tier.xmax = float(tier.xmaxs[-1])
+        return tier
+
+    def intern(self, text):
+        '''
+        Returns the code of a label in the tier's label table, adding the label
+        to the table if it isn't there yet.
+        '''
+        code = self._label_codes.get(text)
+        if code is None:
+            code = len(self.labels)
+            self.labels.append(text)
+            self._label_codes[text] = code
+        return code
+
+    @property
+    def texts(self):
+        '''Return a list of the labels of all intervals in the tier.'''
+        labels = self.labels
+        return [labels[code] for code in self.codes.tolist()]
+
+    @texts.setter
+    def texts(self, values):
+        self.codes = np.array([self.intern(str(text)) for text in values], dtype = np.int32)
+
+    @property
+    def durs(self):
+        '''Return an array of the durations of all intervals in the tier.'''
+        return self.xmaxs - self.xmins
+
+    @property
+    def tier_type(self):
+        '''Return the tier type as a string (for convenience).'''
+        return 'PointTier' if self.is_point_tier else 'IntervalTier'
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _index(self, index):
+        # Follow Python's list indexing, including negative indices
+        length = len(self.codes)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('tier index out of range')
+        return index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            positions = range(len(self.codes))[index]
+            return Tier(data = [Interval(self.labels[self.codes[i]], self.xmins[i], self.xmaxs[i]) for i in positions], point_tier = self.is_point_tier)
+        return _IntervalView(self, self._index(index))
+
+    def __setitem__(self, index, interval):
+        index = self._index(index)
+        self.xmins[index] = interval.xmin
+        self.xmaxs[index] = interval.xmax
+        self.codes[index] = self.intern(interval.text)
+
+    def __iter__(self):
+        # Like a list, the length is checked again at every step, so inserting
+        # or popping intervals while iterating behaves as it did with the
+        # textgrids library.
+        index = 0
+        while index < len(self.codes):
+            yield _IntervalView(self, index)
+            index += 1
+
+    def __repr__(self):
+        return '<Tier {} with {} {}>'.format(self.tier_type, len(self), 'points' if self.is_point_tier else 'intervals')
+
+    def insert(self, index, interval):
+        '''
+        Inserts a new interval before the given index, like list.insert().
+
+        Parameters
+        ----------
+        index : int
+            The index the new interval will have.
+        interval : Interval
+            The interval to insert.
+
+        Returns
+        -------
+        None.
+
+        '''
+        length = len(self.codes)
+        if index < 0:
+            index = max(index + length, 0)
+        index = min(index, length)
+        self.xmins = np.insert(self.xmins, index, interval.xmin)
+        self.xmaxs = np.insert(self.xmaxs, index, interval.xmax)
+        self.codes = np.insert(self.codes, index, self.intern(interval.text))
+        self._ids = np.insert(self._ids, index, self._next_id)
+        self._next_id += 1
+
+    def append(self, interval):
+        '''Adds a new interval to the end of the tier, like list.append().'''
+        self.insert(len(self.codes), interval)
+
+    def pop(self, index = -1):
+        '''
+        Removes an interval from the tier and returns it, like list.pop().
+
+        Parameters
+        ----------
+        index : int, optional
+            The index of the interval to remove. The default is -1 (the last
+            interval).
+
+        Returns
+        -------
+        removed : Interval
+            The removed interval, detached from the tier.
+
+        '''
+        index = self._index(index)
+        removed = Interval(self.labels[self.codes[index]], self.xmins[index], self.xmaxs[index])
+        self._detached[self._ids[index]] = removed
+        self.xmins = np.delete(self.xmins, index)
+        self.xmaxs = np.delete(self.xmaxs, index)
+        self.codes = np.delete(self.codes, index)
+        self._ids = np.delete(self._ids, index)
+        return removed
+
+
+class TextGrid(dict):
+    '''
+    A TextGrid is a dict of tier names (keys) and Tiers (values). As in the
+    textgrids library, popping a tier and assigning it to a new name puts it at
+    the end of the tier order.
+    '''
+
+    def __init__(self, filename = None, xmin = 0.0, xmax = 0.0):
+        super().__init__()
+        self.xmin = xmin
+        self.xmax = xmax
+        self.filename = filename
+        self.file_format = 'long'
+        if filename:
+            self.read(filename)
+
+    def read(self, filename):
+        '''
+        Reads a TextGrid file in any of Praat's formats. Files of at least
+        mmap_threshold bytes are memory-mapped and parsed without being read
+        into memory first.
+
+        Parameters
+        ----------
+        filename : str
+            The path of the TextGrid file.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.filename = filename
+        with open(filename, 'rb') as infile:
+            if os.fstat(infile.fileno()).st_size >= mmap_threshold:
+                try:
+                    data = mmap.mmap(infile.fileno(), 0, access = mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    # Some file systems (e.g. some network drives) can't be
+                    # memory-mapped
+                    pass
+                else:
+                    with data:
+                        self.parse(data)
+                    return
+            data = infile.read()
+        self.parse(data)
+
+    def parse(self, data):
+        '''
+        Parses the contents of a TextGrid file. The format (Praat's long text,
+        short text or binary format) is detected automatically and saved as
+        file_format.
+
+        Parameters
+        ----------
+        data : bytes-like object or str
+            The contents of the file (e.g. bytes, a memoryview or a
+            memory-mapped file). Files in the binary format must not be given
+            as str.
+
+        Returns
+        -------
+        None.
+
+        '''
+        if isinstance(data, str):
+            text = data
+        elif data[:len(binary_header)] == binary_header:
+            self._parse_binary(data)
+            self.file_format = 'binary'
+            return
+        else:
+            text = decode_textgrid_bytes(data)
+
+        if 'Object class = "TextGrid"' not in text[:200]:
+            raise ParseError('not a TextGrid file')
+        header = header_pattern.search(text)
+        if header is None:
+            self._parse_short(text)
+            self.file_format = 'short'
+            return
+        self.xmin = float(header.group(1))
+        self.xmax = float(header.group(2))
+        self.file_format = 'long'
+
+        # Find the start of each tier, then parse all intervals between the
+        # start of that tier and the start of the next one in one go
+        tier_matches = list(tier_pattern.finditer(text))
+        for number, match in enumerate(tier_matches):
+            tier_class, name, xmin, xmax, size = match.groups()
+            end = tier_matches[number + 1].start() if number + 1 < len(tier_matches) else len(text)
+            point_tier = tier_class != 'IntervalTier'
+
+            if point_tier:
+                rows = point_pattern.findall(text, match.end(), end)
+                xmins = [float(row[0]) for row in rows]
+                xmaxs = xmins
+                texts = [row[1] for row in rows]
+            else:
+                rows = interval_pattern.findall(text, match.end(), end)
+                xmins = [float(row[0]) for row in rows]
+                xmaxs = [float(row[1]) for row in rows]
+                texts = [row[2] for row in rows]
+
+            if len(rows) != int(size):
+                raise ParseError('tier "{}" should have {} items but {} were found'.format(name, size, len(rows)))
+
+            self._add_tier(name, xmins, xmaxs, texts, xmin, xmax, point_tier)
+
+    def _add_tier(self, name, xmins, xmaxs, texts, xmin, xmax, point_tier, escaped = True):
+        tier = Tier.from_arrays(xmins, xmaxs, texts, xmin = xmin, xmax = xmax, point_tier = point_tier)
+
+        # Labels only need unescaping once each, in the label table
+        if escaped and any('""' in label for label in tier.labels):
+            tier.labels = [unescape(label) for label in tier.labels]
+            tier._label_codes = {label: code for code, label in enumerate(tier.labels)}
+
+        self[unescape(name) if escaped else name] = tier
+
+    def _parse_short(self, text):
+        # Each token is a (string, flag, number) tuple with only one part set
+        tokens = short_token_pattern.findall(text, text.index('Object class = "TextGrid"') + 25)
+        try:
+            self.xmin = float(tokens[0][2])
+            self.xmax = float(tokens[1][2])
+            if tokens[2][1] != '<exists>':
+                return
+            size = int(tokens[3][2])
+            position = 4
+            for _ in range(size):
+                tier_class, name = tokens[position][0], tokens[position + 1][0]
+                xmin, xmax, count = tokens[position + 2][2], tokens[position + 3][2], int(tokens[position + 4][2])
+                position += 5
+
+                # Intervals have three items each, points have two
+                point_tier = tier_class != 'IntervalTier'
+                width = 2 if point_tier else 3
+                rows = tokens[position:position + width * count]
+                position += width * count
+                if len(rows) != width * count:
+                    raise ParseError('tier "{}" should have {} items but {} were found'.format(name, count, len(rows) // width))
+
+                xmins = [float(row[2]) for row in rows[0::width]]
+                xmaxs = xmins if point_tier else [float(row[2]) for row in rows[1::width]]
+                texts = [row[0] for row in rows[width - 1::width]]
+                self._add_tier(name, xmins, xmaxs, texts, xmin, xmax, point_tier)
+        except (IndexError, ValueError) as error:
+            raise ParseError('TextGrid could not be read in the long or short text format ({})'.format(error))
+
+    def _parse_binary(self, data):
+        try:
+            position = len(binary_header)
+            self.xmin, self.xmax, exists, size = struct.unpack_from('>ddbi', data, position)
+            position += 21
+            if not exists:
+                return
+            for _ in range(size):
+                length = data[position]
+                tier_class = str(data[position + 1:position + 1 + length], 'ascii')
+                name, position = read_binary_text(data, position + 1 + length)
+                xmin, xmax, count = struct.unpack_from('>ddi', data, position)
+                position += 20
+
+                point_tier = tier_class != 'IntervalTier'
+                times_format = struct.Struct('>d' if point_tier else '>dd')
+                xmins = []
+                xmaxs = []
+                texts = []
+                for _ in range(count):
+                    times = times_format.unpack_from(data, position)
+                    text, position = read_binary_text(data, position + times_format.size)
+                    xmins.append(times[0])
+                    xmaxs.append(times[-1])
+                    texts.append(text)
+                self._add_tier(name, xmins, xmaxs, texts, xmin, xmax, point_tier, escaped = False)
+        except (IndexError, struct.error, UnicodeDecodeError) as error:
+            raise ParseError('TextGrid could not be read in the binary format ({})'.format(error))
+
+    def format(self, file_format = 'long'):
+        '''
+        Formats the TextGrid in one of Praat's text formats.
+
+        Parameters
+        ----------
+        file_format : str, optional
+            'long' or 'short'. The default is 'long'. Use to_bytes() for the
+            binary format.
+
+        Returns
+        -------
+        str
+            The formatted TextGrid.
+
+        '''
+        if file_format == 'short':
+            return self._format_short()
+        if file_format != 'long':
+            raise ValueError('unknown text format: {}'.format(file_format))
+
+        out = [long_header.format(self.xmin, self.xmax, len(self))]
+        for tier_count, (name, tier) in enumerate(self.items(), 1):
+
+            # Escape each label in the label table once, rather than every
+            # interval's label
+            labels = [escape(label) if '"' in label else label for label in tier.labels]
+            texts = [labels[code] for code in tier.codes.tolist()]
+
+            if tier.is_point_tier:
+                out.append(long_tier.format(tier_count, 'TextTier', escape(name), self.xmin, self.xmax, 'points', len(tier)))
+                out.extend([long_point.format(count, xpos, text) for count, (xpos, text) in enumerate(zip(tier.xmins.tolist(), texts), 1)])
+            else:
+                out.append(long_tier.format(tier_count, 'IntervalTier', escape(name), self.xmin, self.xmax, 'intervals', len(tier)))
+                out.extend([long_interval.format(count, xmin, xmax, text) for count, (xmin, xmax, text) in enumerate(zip(tier.xmins.tolist(), tier.xmaxs.tolist(), texts), 1)])
+        return ''.join(out)
+
+    def _format_short(self):
+        out = [short_header.format(self.xmin, self.xmax, len(self))]
+        for name, tier in self.items():
+            labels = [escape(label) if '"' in label else label for label in tier.labels]
+            texts = [labels[code] for code in tier.codes.tolist()]
+
+            if tier.is_point_tier:
+                out.append(short_tier.format('TextTier', escape(name), self.xmin, self.xmax, len(tier)))
+                out.extend([short_point.format(xpos, text) for xpos, text in zip(tier.xmins.tolist(), texts)])
+            else:
+                out.append(short_tier.format('IntervalTier', escape(name), self.xmin, self.xmax, len(tier)))
+                out.extend([short_interval.format(xmin, xmax, text) for xmin, xmax, text in zip(tier.xmins.tolist(), tier.xmaxs.tolist(), texts)])
+        return ''.join(out)
+
+    def _format_binary(self):
+        out = [binary_header, struct.pack('>ddbi', self.xmin, self.xmax, 1, len(self))]
+        for name, tier in self.items():
+            tier_class = b'TextTier' if tier.is_point_tier else b'IntervalTier'
+            out.append(bytes([len(tier_class)]) + tier_class + binary_text(name))
+            out.append(struct.pack('>ddi', self.xmin, self.xmax, len(tier)))
+
+            # Convert all the times at once, and each label in the label table
+            # once, then put them in order
+            if tier.is_point_tier:
+                times = tier.xmins.astype('>f8').tobytes()
+                width = 8
+            else:
+                times = np.column_stack([tier.xmins, tier.xmaxs]).astype('>f8').tobytes()
+                width = 16
+            labels = [binary_text(label) for label in tier.labels]
+            rows = [times[start:start + width] for start in range(0, len(times), width)]
+            out.append(b''.join(chain.from_iterable(zip(rows, [labels[code] for code in tier.codes.tolist()]))))
+        return b''.join(out)
+
+    def to_bytes(self, file_format = 'long'):
+        '''
+        Returns the contents of a TextGrid file in one of Praat's formats.
+
+        Parameters
+        ----------
+        file_format : str, optional
+            'long' (long text format), 'short' (short text format) or 'binary'
+            (binary format). The text formats are encoded as UTF-8. The default
+            is 'long'.
+
+        Returns
+        -------
+        bytes
+            The contents of the file.
+
+        '''
+        if file_format == 'binary':
+            return self._format_binary()
+        return self.format(file_format).encode('UTF-8')
+
+    def write(self, filename, file_format = 'long'):
+        '''
+        Writes the TextGrid to a file.
+
+        Parameters
+        ----------
+        filename : str
+            The path of the new file.
+        file_format : str, optional
+            The format of the file: 'long', 'short' or 'binary' (see
+            to_bytes()). The default is 'long'.
+
+        Returns
+        -------
+        None.
+
+        '''
+        with open(filename, 'wb') as outfile:
+            outfile.write(self.to_bytes(file_format))
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 20:52:19 2026
+
+@author: Roy Alderton
+
+This module reads the WAV recordings that go with the TextGrids and places new
+boundaries from the audio, e.g. for the sounds that the process_textgrid_tiers_*
+scripts add when MAUS has missed them ([i:] in "he'll", [d] in 'Leonard', [R]
+in "l'enfer" and [s] in "l'anis" and "l'apis").
+
+By default, the scripts put each new boundary at a fixed proportion of the
+interval it is split from (e.g. 0.75 of the way through the [@r] of
+'Leonard'). With the --acoustic-boundaries option, the boundary is instead put
+where the sound changes most, using one of the following features of short,
+overlapping frames of the recording (10 ms long, every 5 ms):
+
+    1. 'energy': the loudness of each frame, in decibels, e.g. for the drop in
+    loudness at the closure of [d].
+    2. 'spectral': the shape of the spectrum of each frame, e.g. for the change
+    from a vowel to [R] or [s].
+    3. 'zcr': how often the waveform crosses zero in each frame, which is high
+    for fricatives such as [s] and low for vowels.
+
+The change is only looked for near the fixed proportion (within a quarter of
+the interval either side, and not in the first or last tenth of the
+interval), so the boundary can't end up in the wrong place altogether. If the
+interval is too short to compare at least three frames, the fixed proportion
+is used.
+
+The WAV file is memory-mapped rather than read, and only the samples inside
+the interval being split are used, so only those parts of the file are ever
+read from the disk. This keeps the option cheap even for thousands of files.
+WAV files with 8, 16, 24 or 32-bit integer samples or 32 or 64-bit float
+samples can be read, and stereo recordings are mixed to mono.
+
+The recording of each TextGrid must be saved in the same folder with the same
+name, ending in '.wav' (as when the files are uploaded to WebMAUS), e.g.:
+
+    python process_textgrid_tiers_en.py --acoustic-boundaries spectral
+
+The module should be saved in the same folder as the scripts that use it. It
+requires numpy, which you can install by entering the following into the
+command prompt:
+
+    pip install numpy
+"""
+
+import os
+import struct
+import numpy as np
+
+# The features that boundaries can be placed with (see the module docstring)
+boundary_features = ('energy', 'spectral', 'zcr')
+
+# WAV format codes
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavError(Exception):
+    '''Raised when a file isn't a WAV file that can be read.'''
+    pass
+
+
+class WavFile(object):
+    '''
+    A memory-mapped WAV file. Samples are only read from the disk when they
+    are used, e.g. by read(). Can be used as a context manager, e.g.:
+
+        with textgrid_audio.WavFile('TextGrids/example.wav') as wav:
+            samples = wav.read(1.25, 1.5)
+    '''
+
+    def __init__(self, path):
+        '''
+        Parameters
+        ----------
+        path : str
+            The path of the WAV file.
+
+        Raises
+        ------
+        WavError
+            If the file isn't a WAV file, or its samples are in a format that
+            can't be read.
+
+        '''
+        self.path = path
+        with open(path, 'rb') as infile:
+            header = infile.read(12)
+            if len(header) < 12 or header[:4] != b'RIFF' or header[8:] != b'WAVE':
+                raise WavError('{} is not a WAV file'.format(path))
+
+            # Find the format and data chunks, skipping any others (e.g. LIST)
+            format_chunk = None
+            while True:
+                chunk_header = infile.read(8)
+                if len(chunk_header) < 8:
+                    raise WavError('{} has no audio data'.format(path))
+                chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+                if chunk_id == b'fmt ':
+                    format_chunk = infile.read(chunk_size)
+                elif chunk_id == b'data':
+                    data_offset = infile.tell()
+                    data_size = min(chunk_size, os.fstat(infile.fileno()).st_size - data_offset)
+                    break
+                else:
+                    infile.seek(chunk_size, os.SEEK_CUR)
+                if chunk_size % 2:
+                    infile.seek(1, os.SEEK_CUR)
+
+        if format_chunk is None or len(format_chunk) < 16:
+            raise WavError('{} has no format chunk'.format(path))
+        format_code, self.n_channels, self.sample_rate, _, block_align, bits = struct.unpack_from('<HHIIHH', format_chunk)
+        if format_code == WAVE_FORMAT_EXTENSIBLE and len(format_chunk) >= 26:
+            format_code, = struct.unpack_from('<H', format_chunk, 24)
+        width = bits // 8
+        if format_code == WAVE_FORMAT_PCM and width in (1, 2, 3, 4):
+            dtype = {1: np.uint8, 2: '<i2', 3: np.uint8, 4: '<i4'}[width]
+        elif format_code == WAVE_FORMAT_IEEE_FLOAT and width in (4, 8):
+            dtype = '<f{}'.format(width)
+        else:
+            raise WavError('{} has samples in a format that can\'t be read (format {}, {} bits)'.format(path, format_code, bits))
+        if block_align != width * self.n_channels:
+            raise WavError('{} has an unexpected block size'.format(path))
+
+        self.format_code = format_code
+        self.sample_width = width
+        self.n_samples = data_size // block_align
+        shape = (self.n_samples, self.n_channels, 3) if width == 3 else (self.n_samples, self.n_channels)
+        if self.n_samples:
+            self.samples = np.memmap(path, dtype = dtype, mode = 'r', offset = data_offset, shape = shape)
+        else:
+            self.samples = np.zeros(shape, dtype = dtype)
+
+    @property
+    def duration(self):
+        '''The length of the recording in seconds.'''
+        return self.n_samples / self.sample_rate
+
+    def sample_range(self, start, end):
+        '''Returns the first and last + 1 samples between two times (in seconds).'''
+        first = min(max(int(round(start * self.sample_rate)), 0), self.n_samples)
+        last = min(max(int(round(end * self.sample_rate)), first), self.n_samples)
+        return first, last
+
+    def read_samples(self, first, last):
+        '''
+        Returns the samples from first to last (not including last) as floats
+        between -1 and 1, with one column per channel. Only these samples are
+        read from the disk.
+        '''
+        raw = self.samples[first:last]
+        if self.sample_width == 3:
+            # Put the three bytes of each 24-bit sample in the top of a 32-bit
+            # integer, keeping the sign
+            raw = np.asarray(raw, dtype = np.uint8)
+            values = (raw[..., 0].astype(np.int32) << 8) | (raw[..., 1].astype(np.int32) << 16) | (raw[..., 2].astype(np.int32) << 24)
+            return values / 2.0 ** 31
+        if self.sample_width == 1:
+            return (np.asarray(raw, dtype = np.float64) - 128) / 128
+        if self.format_code == WAVE_FORMAT_IEEE_FLOAT:
+            return np.asarray(raw, dtype = np.float64)
+        return np.asarray(raw, dtype = np.float64) / 2.0 ** (8 * self.sample_width - 1)
+
+    def read(self, start, end, mono = True):
+        '''
+        Returns the samples between two times (in seconds), mixed to mono by
+        default. See read_samples().
+        '''
+        samples = self.read_samples(*self.sample_range(start, end))
+        return samples.mean(axis = 1) if mono else samples
+
+    def close(self):
+        '''
+        Lets go of the memory-mapped file, which is closed once no arrays read
+        from it are left.
+        '''
+        self.samples = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        self.close()
+
+
+def frame_features(samples, sample_rate, feature = 'energy', frame_length = 0.01, frame_step = 0.005):
+    '''
+    Measures a feature of short, overlapping frames of a recording, for all
+    the frames at once.
+
+    Parameters
+    ----------
+    samples : numpy array
+        The samples (mono).
+    sample_rate : int
+        The number of samples per second.
+    feature : str, optional
+        'energy', 'spectral' or 'zcr' (see the module docstring). The default
+        is 'energy'.
+    frame_length : float, optional
+        The length of each frame in seconds. The default is 0.01.
+    frame_step : float, optional
+        The time from the start of one frame to the start of the next in
+        seconds. The default is 0.005.
+
+    Returns
+    -------
+    values : numpy array
+        The feature of each frame: one value per frame for 'energy' and 'zcr',
+        and one row of spectrum values per frame for 'spectral'.
+    length : int
+        The frame length in samples.
+    step : int
+        The frame step in samples.
+
+    '''
+    length = max(int(round(frame_length * sample_rate)), 2)
+    step = max(int(round(frame_step * sample_rate)), 1)
+    if len(samples) < length:
+        return np.zeros((0,)), length, step
+    frames = np.lib.stride_tricks.sliding_window_view(samples, length)[::step]
+
+    if feature == 'energy':
+        values = 10 * np.log10(np.mean(frames ** 2, axis = 1) + 1e-10)
+    elif feature == 'zcr':
+        values = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis = 1)
+    elif feature == 'spectral':
+        # Normalise each spectrum, so that only its shape is compared
+        spectra = np.abs(np.fft.rfft(frames * np.hanning(length), axis = 1))
+        values = spectra / (np.linalg.norm(spectra, axis = 1, keepdims = True) + 1e-10)
+    else:
+        raise ValueError('unknown feature {!r} (use one of {})'.format(feature, ', '.join(boundary_features)))
+    return values, length, step
+
+
+def find_boundary(samples, sample_rate, proportion, feature = 'energy', reach = 0.25, margin = 0.1):
+    '''
+    Finds where the sound changes most in an interval, near a given
+    proportion of its duration.
+
+    Parameters
+    ----------
+    samples : numpy array
+        The samples of the interval (mono).
+    sample_rate : int
+        The number of samples per second.
+    proportion : float
+        Where the boundary would be put without the audio, as a proportion of
+        the interval's duration.
+    feature : str, optional
+        See frame_features(). The default is 'energy'.
+    reach : float, optional
+        How far from proportion the boundary can be moved, as a proportion of
+        the interval's duration. The default is 0.25.
+    margin : float, optional
+        How close to the start or end of the interval the boundary can be, as
+        a proportion of the interval's duration. The default is 0.1.
+
+    Returns
+    -------
+    proportion : float
+        The position of the boundary, as a proportion of the interval's
+        duration. This is the given proportion if there are too few frames to
+        compare.
+
+    '''
+    values, length, step = frame_features(samples, sample_rate, feature)
+    if len(values) < 3:
+        return proportion
+
+    # The change between each frame and the next, placed half way between
+    # the centres of the two frames
+    change = np.abs(np.diff(values, axis = 0))
+    if change.ndim > 1:
+        change = np.linalg.norm(change, axis = 1)
+    times = (np.arange(len(change)) * step + step / 2 + length / 2) / len(samples)
+
+    allowed = (np.abs(times - proportion) <= reach) & (times >= margin) & (times <= 1 - margin)
+    if not allowed.any():
+        return proportion
+    return float(times[allowed][np.argmax(change[allowed])])
+
+
+class BoundaryPlacer(object):
+    '''
+    Places new boundaries in the intervals of one TextGrid from its recording.
+    It is called with the start and end of an interval and the fixed
+    proportion, and returns the time of the new boundary, so it can be given
+    to textgrid_edits.TierEdits as place_boundary.
+    '''
+
+    def __init__(self, wav_path, feature = 'energy'):
+        '''
+        Parameters
+        ----------
+        wav_path : str
+            The path of the recording.
+        feature : str, optional
+            See frame_features(). The default is 'energy'.
+
+        '''
+        if feature not in boundary_features:
+            raise ValueError('unknown feature {!r} (use one of {})'.format(feature, ', '.join(boundary_features)))
+        self.wav = WavFile(wav_path)
+        self.feature = feature
+
+    @classmethod
+    def for_textgrid(cls, textgrid_path, feature = 'energy'):
+        '''Opens the recording saved with the same name as a TextGrid.'''
+        return cls(os.path.splitext(textgrid_path)[0] + '.wav', feature)
+
+    def __call__(self, xmin, xmax, proportion):
+        samples = self.wav.read(xmin, xmax)
+        return xmin + (xmax - xmin) * find_boundary(samples, self.wav.sample_rate, proportion, self.feature)
+
+    def close(self):
+        '''Closes the recording.'''
+        self.wav.close()
@@ -0,0 +1,1104 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 11:02:47 2026
+
+@author: Roy Alderton
+
+This module runs the language-specific process_textgrid_tiers_* scripts over
+a whole folder of TextGrids. The files are spread across all the computer's
+processor cores, and a file that can't be processed (e.g. because MAUS missed
+the vowel that starts the region of interest, so there is no [e:] to find) no
+longer stops the whole run. Instead, the error is noted and all the failed
+files are listed in a report at the end, so they can be checked in Praat.
+
+Files that have already been processed by the same version of the script, and
+haven't changed since, are skipped (see the textgrid_manifest module).
+
+Each processed TextGrid is first written to a temporary file next to the
+original, which is only renamed to replace the original once it has been
+written completely, so an interrupted run never leaves a half-written
+TextGrid. The files are moved into place in batches, with one journal entry
+and one save of the folder per batch (see commit_outputs()), so that a run
+that is interrupted can carry on exactly where it stopped.
+
+While each file is processed, the next few files are read and the finished
+ones are written in the background (see process_files()), so that a run over
+a network drive isn't held up waiting for each file in turn.
+
+With the --bundle option, the TextGrids are read from a single bundle file
+(see the textgrid_bundle module) and written to a new bundle in one go, rather
+than being read and written as separate files (see run_bundle()).
+
+With the --archive option, the TextGrids are read straight out of a zip or tar
+archive (e.g. the results of a WebMAUS batch run) without extracting it first,
+and written to a new folder or archive (see run_archive()).
+
+With the --acoustic-boundaries option, the boundaries of the sounds that the
+English and French scripts add to the sound tier are placed from the
+recording of each TextGrid rather than at a fixed proportion of the interval
+they are split from (see the textgrid_audio module).
+
+With the --export and --measure options, all the intervals of the processed
+TextGrids and the durations in their regions of interest are saved in tables
+at the end of the run (see the textgrid_export and textgrid_measure modules).
+
+With the --profile option, the time spent on each stage of each file is
+measured, the progress is printed every few seconds and a summary is saved
+as a JSON file at the end (see the textgrid_profile module).
+
+With the --watch option, the script keeps running after processing the
+folder and processes new TextGrids as they are saved in it (see the
+textgrid_watch module).
+
+Each processing script defines a function called process_textgrid(tg, file)
+which makes its changes to a loaded TextGrid, and then hands it to main() in
+this module, e.g.:
+
+    if __name__ == '__main__':
+        textgrid_batch.main(process_textgrid, source_path)
+
+The module should be saved in the same folder as the scripts that use it.
+"""
+
+import os
+import sys
+import time
+import inspect
+import shutil
+import argparse
+import itertools
+import traceback
+import functools
+import collections
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import textgrid_arrays
+import textgrid_archive
+import textgrid_audio
+import textgrid_bundle
+import textgrid_export
+import textgrid_manifest
+import textgrid_measure
+import textgrid_profile
+import textgrid_watch
+
+# Ending added to the name of a processed TextGrid until it is moved into place
+temp_suffix = '.tmp'
+
+
+class BatchReport(object):
+    '''
+    Keeps track of which files were processed successfully and which failed
+    during a batch run.
+    '''
+
+    def __init__(self):
+        self.processed = []
+        self.skipped = []
+        self.outdated = []
+        self.failed = {}
+        self.profile = None
+
+    def add(self, file, error = None):
+        '''Records the result for one file (error is None if it succeeded).'''
+        if error is None:
+            self.processed.append(file)
+        else:
+            self.failed[file] = error
+
+    def summary(self):
+        '''
+        Returns a short text report of the batch run, listing any files that
+        failed together with the error that was raised for each of them.
+        '''
+        lines = ['\nProcessed {} of {} files.'.format(len(self.processed), len(self.processed) + len(self.failed))]
+        if self.skipped:
+            lines.append('Skipped {} files that were already up to date.'.format(len(self.skipped)))
+        if self.outdated:
+            lines.append('{} of them had been processed by another version of the script (or with other options), but have been over-written, so they can\'t be processed again. To process them with this version, restore the original TextGrids and run the script with --force:\n'.format(len(self.outdated)))
+            lines.extend(sorted(self.outdated))
+        if self.failed:
+            lines.append('The following {} files could not be processed and have not been changed:\n'.format(len(self.failed)))
+            for file, error in sorted(self.failed.items()):
+                lines.append('{}\n    {}'.format(file, error))
+        return '\n'.join(lines)
+
+
+def get_textgrid_list(path):
+    '''
+    Returns a list of the TextGrid files in a folder, excluding practice items.
+    '''
+    return sorted(file for file in os.listdir(path) if 'practice' not in file and file.endswith('.TextGrid'))
+
+
+def read_file(file, source_path):
+    '''
+    Reads the contents of a TextGrid.
+
+    Returns
+    -------
+    data : bytes
+        The contents of the file.
+    input_stat : os.stat_result
+        The size, modification time etc. of the file.
+
+    '''
+    with open(os.path.join(source_path, file), 'rb') as infile:
+        input_stat = os.fstat(infile.fileno())
+        return infile.read(), input_stat
+
+
+def _error_result(file, error):
+    # Keep the line of the processing script where the error happened, as
+    # that is usually enough to see which step failed
+    location = traceback.extract_tb(error.__traceback__)[-1]
+    return {'file': file, 'error': '{}: {} (line {} in {})'.format(type(error).__name__, error, location.lineno, os.path.basename(location.filename))}
+
+
+def process_file(file, process_textgrid, source_path, output_path, output_format = 'long', timer = None, profile = False, deferred = False, loaded = None, write = True, boundary_feature = None):
+    '''
+    Loads one TextGrid, applies process_textgrid() to it and writes the result.
+
+    Parameters
+    ----------
+    file : str
+        The file name of the TextGrid.
+    process_textgrid : function
+        The language-specific function that makes the changes to the loaded
+        TextGrid. It is called as process_textgrid(tg, file).
+    source_path : str
+        The folder the TextGrid is read from.
+    output_path : str
+        The folder the processed TextGrid is written to. This can be the same
+        as source_path.
+    output_format : str, optional
+        The format of the processed TextGrid: 'long', 'short' or 'binary' (see
+        textgrid_arrays.TextGrid.to_bytes()). The default is 'long'.
+    timer : StageTimer object from the textgrid_profile module, optional
+        Measures how long each stage takes, including loading and writing the
+        file. It is also passed to process_textgrid() as a third argument. The
+        default is None (measure nothing).
+    profile : bool, optional
+        Whether to measure each stage with a new StageTimer if no timer is
+        given. The default is False.
+    deferred : bool, optional
+        Whether to leave the processed TextGrid in its temporary file, for
+        commit_outputs() to move into place along with the rest of its batch.
+        The default is False (move it into place straight away).
+    loaded : tuple or Exception, optional
+        The result of read_file() for the TextGrid if it has already been read,
+        or the error raised while reading it. The default is None (read it
+        here).
+    write : bool, optional
+        Whether to write the processed TextGrid. If False, the result includes
+        the contents of the processed TextGrid ('output') for write_output()
+        to write. The default is True.
+    boundary_feature : str, optional
+        The feature of the recording used to place the boundaries of added
+        sounds (see the textgrid_audio module). The default is None (use the
+        fixed proportions).
+
+    Returns
+    -------
+    result : dict
+        The file name ('file') and a description of the error raised while
+        processing the file ('error'), which is None if the file was processed
+        successfully. Successful results also include the hashes, sizes and
+        modification times of the input and output files for the manifest,
+        and the time spent on each stage ('stages') if a timer was used.
+        Deferred results also include the paths of the temporary and final
+        output files ('temp_file' and 'output_file').
+
+    '''
+    if timer is None and profile:
+        timer = textgrid_profile.StageTimer()
+    input_file = os.path.join(source_path, file)
+    stage_timer = timer or textgrid_profile.no_timer
+    try:
+        stage_timer.start()
+        if loaded is None:
+            loaded = read_file(file, source_path)
+        elif isinstance(loaded, Exception):
+            raise loaded
+        data, input_stat = loaded
+        output = process_data(file, data, process_textgrid, output_format, timer, filename = input_file, boundary_feature = boundary_feature)
+    except Exception as error:
+        return _error_result(file, error)
+
+    output_file = os.path.join(output_path, file)
+    result = {'file': file,
+              'error': None,
+              'input_hash': textgrid_manifest.hash_bytes(data),
+              'input_size': input_stat.st_size,
+              'input_mtime_ns': input_stat.st_mtime_ns,
+              'output': output,
+              'temp_file': output_file + temp_suffix,
+              'output_file': output_file}
+    if write:
+        stage_timer.start()
+        result = write_output(result, deferred)
+        stage_timer.lap('write')
+    if timer is not None and result['error'] is None:
+        result['stages'] = dict(timer.times)
+    return result
+
+
+def process_data(file, data, process_textgrid, output_format = 'long', timer = None, filename = None, boundary_feature = None):
+    '''
+    Parses the contents of one TextGrid, applies process_textgrid() to it and
+    returns the contents of the processed TextGrid.
+
+    Parameters
+    ----------
+    file : str
+        The file name of the TextGrid.
+    data : bytes
+        The contents of the TextGrid.
+    process_textgrid, output_format, timer :
+        See process_file(). If there is a timer, the time since it was last
+        started (or lapped) is added to the 'load' stage once the TextGrid has
+        been parsed.
+    filename : str, optional
+        The path of the TextGrid, saved with the loaded TextGrid. The default
+        is None (use file).
+    boundary_feature : str, optional
+        If given, the recording saved with the TextGrid is opened, and a
+        BoundaryPlacer from the textgrid_audio module using this feature is
+        passed to process_textgrid() as place_boundary. The default is None.
+
+    Raises
+    ------
+    Any error raised while parsing or processing the TextGrid.
+
+    Returns
+    -------
+    output : bytes
+        The contents of the processed TextGrid.
+
+    '''
+    tg = textgrid_arrays.TextGrid()
+    tg.filename = filename or file
+    tg.parse(data)
+
+    options = {}
+    if boundary_feature is not None:
+        options['place_boundary'] = textgrid_audio.BoundaryPlacer.for_textgrid(tg.filename, boundary_feature)
+    try:
+        if timer is None:
+            process_textgrid(tg, file, **options)
+        else:
+            timer.lap('load')
+            process_textgrid(tg, file, timer, **options)
+    finally:
+        if options:
+            options['place_boundary'].close()
+
+    return tg.to_bytes(output_format)
+
+
+def write_output(result, deferred = False):
+    '''
+    Writes a TextGrid processed by process_file() with write = False.
+
+    Parameters
+    ----------
+    result : dict
+        The result returned by process_file(). It is completed with the hash,
+        size and modification time of the output file.
+    deferred : bool, optional
+        Whether to leave the TextGrid in its temporary file (see
+        process_file()). The default is False.
+
+    Returns
+    -------
+    result : dict
+        The completed result, or the error raised while writing the file.
+
+    '''
+    start = time.perf_counter()
+    output = result.pop('output')
+    temp_file = result['temp_file']
+    try:
+        # Write to a temporary file, which replaces the output file (or a
+        # hard link to the original file) rather than writing through it
+        with open(temp_file, 'wb') as outfile:
+            outfile.write(output)
+            outfile.flush()
+            output_stat = os.fstat(outfile.fileno())
+        if not deferred:
+            os.replace(temp_file, result['output_file'])
+    except Exception as error:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        return _error_result(result['file'], error)
+
+    result['output_hash'] = textgrid_manifest.hash_bytes(output)
+    result['output_size'] = output_stat.st_size
+    result['output_mtime_ns'] = output_stat.st_mtime_ns
+    # Add the time spent writing to the stages of a file written in the
+    # background by process_files()
+    if 'stages' in result:
+        result['stages']['write'] = result['stages'].get('write', 0.0) + time.perf_counter() - start
+    if not deferred:
+        del result['temp_file'], result['output_file']
+    return result
+
+
+def process_files(file_list, process_textgrid, source_path, output_path, prefetch = 8, deferred = False, **options):
+    '''
+    Processes a list of TextGrids one after another with process_file(), while
+    background threads read the next few files and write the ones that have
+    already been processed.
+
+    Reading and writing files mostly means waiting for the disk (or for the
+    network, if the files are on a server), so this hides most of that
+    waiting behind the processing, rather than processing nothing while each
+    file is read and written. At most prefetch files are read ahead of and
+    waiting to be written behind the file being processed, so that no more
+    than a few files are held in memory at once.
+
+    Parameters
+    ----------
+    file_list : list
+        The file names of the TextGrids to process.
+    process_textgrid, source_path, output_path, deferred :
+        See process_file().
+    prefetch : int, optional
+        The number of files to read ahead and write behind. The default is 8.
+        With 0, each file is read, processed and written in turn.
+    **options :
+        Any other arguments of process_file() (output_format, timer or
+        profile).
+
+    Yields
+    ------
+    result : dict
+        The result for each file, in the same order as file_list.
+
+    '''
+    if prefetch < 1:
+        for file in file_list:
+            yield process_file(file, process_textgrid, source_path, output_path, deferred = deferred, **options)
+        return
+
+    def read(file):
+        try:
+            return read_file(file, source_path)
+        except Exception as error:
+            return error
+
+    files = iter(file_list)
+    reads = collections.deque()
+    writes = collections.deque()
+    with ThreadPoolExecutor(max_workers = prefetch) as io:
+        for file in itertools.islice(files, prefetch):
+            reads.append((file, io.submit(read, file)))
+        while reads:
+            file, loaded = reads.popleft()
+            for next_file in itertools.islice(files, 1):
+                reads.append((next_file, io.submit(read, next_file)))
+
+            result = process_file(file, process_textgrid, source_path, output_path, deferred = deferred, loaded = loaded.result(), write = False, **options)
+            if result['error'] is None:
+                writes.append(io.submit(write_output, result, deferred))
+            else:
+                writes.append(result)
+
+            # Hand back the results in order, waiting for the oldest write if
+            # too many are queued
+            while writes and (len(writes) > prefetch or not isinstance(writes[0], Future) or writes[0].done()):
+                write = writes.popleft()
+                yield write.result() if isinstance(write, Future) else write
+        for write in writes:
+            yield write.result() if isinstance(write, Future) else write
+
+
+def process_chunk(file_list, **options):
+    '''
+    Processes a chunk of the files in a worker process with process_files(),
+    and returns the list of results.
+    '''
+    return list(process_files(file_list, **options))
+
+
+def commit_outputs(results, manifest = None):
+    '''
+    Moves a batch of processed TextGrids from their temporary files into place.
+
+    The temporary files are saved to the disk first, then the batch is added
+    to the manifest's journal, and only then are the files renamed. Finally,
+    the folders are saved to the disk, so that the renames can't be lost. This
+    way, a crash at any point leaves every file in the batch either unchanged
+    or recorded in the journal with its processed version complete on the
+    disk. Saving whole batches at once is much quicker than saving each file
+    as it is written.
+
+    Parameters
+    ----------
+    results : list
+        The results returned by process_file() with deferred = True for the
+        files that were processed successfully.
+    manifest : Manifest object from the textgrid_manifest module, optional
+        The manifest whose journal the batch is added to. The default is None
+        (no journal).
+
+    Returns
+    -------
+    None.
+
+    '''
+    if not results:
+        return
+    for result in results:
+        textgrid_manifest.fsync_path(result['temp_file'])
+    if manifest is not None:
+        manifest.journal(results)
+
+    folders = set()
+    for result in results:
+        os.replace(result['temp_file'], result['output_file'])
+        folders.add(os.path.dirname(result['output_file']) or '.')
+    for folder in folders:
+        textgrid_manifest.fsync_path(folder)
+
+
+def run_batch(process_textgrid, file_list, source_path, output_path = None, n_jobs = None, manifest = None, force = False, output_format = 'long', profile = None, batch_size = 100, prefetch = 8, boundary_feature = None):
+    '''
+    Processes a list of TextGrids in parallel and reports any failures.
+
+    Parameters
+    ----------
+    process_textgrid : function
+        The language-specific function that makes the changes to each loaded
+        TextGrid. It must be defined at the top level of its script so that it
+        can be sent to the worker processes.
+    file_list : list
+        The file names of the TextGrids to process.
+    source_path : str
+        The folder the TextGrids are read from.
+    output_path : str, optional
+        The folder the processed TextGrids are written to. The default is None,
+        in which case the originals in source_path are over-written.
+    n_jobs : int, optional
+        The number of worker processes. The default is None, which uses all
+        processor cores. With 1, the files are processed one after another
+        without starting any worker processes.
+    manifest : Manifest object from the textgrid_manifest module, optional
+        A record of the files that have already been processed. If given,
+        files that are up to date are skipped, and the manifest is updated and
+        saved at the end. The default is None (process every file).
+    force : bool, optional
+        Whether to process files that the manifest shows are up to date. The
+        manifest is still updated. The default is False.
+    output_format : str, optional
+        The format of the processed TextGrids (see process_file()). The
+        default is 'long'.
+    profile : BatchProfile object from the textgrid_profile module, optional
+        Collects the time spent on each stage of each file and prints the
+        progress. It is created here, once the number of files to process is
+        known, if profile is True. The default is None (measure nothing).
+    batch_size : int, optional
+        The number of processed files that are moved into place at once with
+        commit_outputs(). The default is 100.
+    prefetch : int, optional
+        The number of files each process reads ahead and writes behind the
+        file it is processing (see process_files()). The default is 8.
+    boundary_feature : str, optional
+        See process_file(). The default is None.
+
+    Returns
+    -------
+    report : BatchReport
+        The files that were processed successfully, skipped or failed.
+
+    '''
+    if output_path is None:
+        output_path = source_path
+
+    report = BatchReport()
+
+    # Remove any temporary files left by an interrupted run that were never
+    # journalled (the journalled ones were moved into place when the manifest
+    # was loaded)
+    for file in file_list:
+        temp_file = os.path.join(output_path, file + temp_suffix)
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    # Skip the files that have already been processed
+    if manifest is not None and not force:
+        report.skipped = [file for file in file_list if manifest.is_up_to_date(file, source_path, output_path)]
+        report.outdated = [file for file in report.skipped if file in manifest.outdated]
+        skipped = set(report.skipped)
+        file_list = [file for file in file_list if file not in skipped]
+
+    if profile is True:
+        profile = textgrid_profile.BatchProfile(len(file_list))
+    report.profile = profile or None
+
+    options = dict(process_textgrid = process_textgrid, source_path = source_path, output_path = output_path, output_format = output_format, profile = bool(profile), deferred = True, prefetch = prefetch, boundary_feature = boundary_feature)
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    # Processed files waiting to be moved into place
+    pending = []
+
+    def add_result(result):
+        if result['error'] is not None:
+            report_result(report, result, manifest, profile)
+            return
+        pending.append(result)
+        if len(pending) >= batch_size:
+            commit_pending()
+
+    def commit_pending():
+        commit_outputs(pending, manifest)
+        for result in pending:
+            report_result(report, result, manifest, profile)
+        del pending[:]
+
+    try:
+        if n_jobs == 1 or len(file_list) <= 1:
+            for result in process_files(file_list, **options):
+                add_result(result)
+        else:
+            # Send the files to the workers in chunks, so that the cost of
+            # passing each one to another process doesn't outweigh processing
+            # it, and each worker can read and write the files of its chunk
+            # while processing them
+            chunksize = max(1, len(file_list) // (n_jobs * 4))
+            chunks = [file_list[position:position + chunksize] for position in range(0, len(file_list), chunksize)]
+            with ProcessPoolExecutor(max_workers = n_jobs) as executor:
+                for results in executor.map(functools.partial(process_chunk, **options), chunks):
+                    for result in results:
+                        add_result(result)
+    finally:
+        # Move the files processed so far into place and save the manifest,
+        # even if the run is interrupted, so that they are skipped next time
+        commit_pending()
+        if manifest is not None:
+            manifest.save()
+
+    return report
+
+
+def process_members(members, process_textgrid, output_format = 'long', profile = False):
+    '''
+    Processes a list of TextGrids that have already been read (in a worker
+    process, if there are several).
+
+    Parameters
+    ----------
+    members : list
+        A (name, contents) tuple for each TextGrid (e.g. from a bundle or an
+        archive).
+    process_textgrid, output_format, profile :
+        See process_file().
+
+    Returns
+    -------
+    results : list
+        A result for each TextGrid, as returned by process_file(), with the
+        contents of the processed TextGrid ('output') instead of the details
+        of the input and output files.
+
+    '''
+    results = []
+    for name, data in members:
+        timer = textgrid_profile.StageTimer() if profile else None
+        try:
+            output = process_data(name, data, process_textgrid, output_format, timer)
+        except Exception as error:
+            results.append(_error_result(name, error))
+            continue
+        result = {'file': name, 'error': None, 'output': output}
+        if timer is not None:
+            result['stages'] = dict(timer.times)
+        results.append(result)
+    return results
+
+
+def run_bundle(process_textgrid, bundle_path, output_bundle = None, n_jobs = None, version = None, force = False, output_format = 'long', profile = None):
+    '''
+    Processes the TextGrids in a bundle (see the textgrid_bundle module) and
+    writes them all to a new bundle at once.
+
+    The version of the script that processed each TextGrid is noted in the
+    new bundle's index, along with a hash of the original TextGrid when the
+    new bundle is a different one. TextGrids that are already in the new
+    bundle, processed by the same version from the same original, are skipped
+    and copied from it as they are. When the original bundle is replaced,
+    TextGrids that have already been processed by another version are also
+    skipped, as they can't be processed again (in the same way as the
+    manifest in run_batch()), and are listed in the report's outdated
+    files.
+
+    The new bundle only replaces the old one (if they are the same) once it
+    has been written completely, so an interrupted run leaves the old bundle
+    as it was. TextGrids that fail to be processed and any other files in the
+    bundle are copied to the new bundle unchanged.
+
+    Parameters
+    ----------
+    process_textgrid : function
+        The language-specific function that makes the changes to each loaded
+        TextGrid.
+    bundle_path : str
+        The bundle the TextGrids are read from.
+    output_bundle : str, optional
+        The bundle the processed TextGrids are written to. The default is None,
+        in which case the original bundle is replaced.
+    n_jobs : int, optional
+        The number of worker processes (see run_batch()). The default is None.
+    version : str, optional
+        The version of the processing script, as returned by
+        textgrid_manifest.script_version(). The default is None (process every
+        TextGrid and don't note the version).
+    force : bool, optional
+        Whether to process TextGrids that have already been processed by the
+        same version. The default is False.
+    output_format : str, optional
+        The format of the processed TextGrids (see process_file()). The
+        default is 'long'.
+    profile : BatchProfile object from the textgrid_profile module, optional
+        See run_batch(). The default is None.
+
+    Returns
+    -------
+    report : BatchReport
+        The files that were processed successfully, skipped or failed.
+
+    '''
+    bundle = textgrid_bundle.Bundle(bundle_path)
+    report = BatchReport()
+
+    # The TextGrids already processed are found in the bundle being replaced,
+    # which is the original bundle when it is over-written
+    in_place = output_bundle is None or os.path.abspath(output_bundle) == os.path.abspath(bundle_path)
+    if in_place:
+        output_bundle = bundle_path
+        previous = bundle
+    elif os.path.exists(output_bundle):
+        previous = textgrid_bundle.Bundle(output_bundle)
+    else:
+        previous = None
+
+    file_list = [name for name in bundle.names() if 'practice' not in name and name.endswith('.TextGrid')]
+    input_hashes = {}
+    if version is not None and not force and previous is not None:
+        for name in file_list:
+            notes = previous.notes(name) if name in previous else {}
+            if in_place:
+                if 'version' in notes:
+                    report.skipped.append(name)
+                    if notes['version'] != version:
+                        report.outdated.append(name)
+            else:
+                input_hashes[name] = textgrid_manifest.hash_bytes(bundle.read(name))
+                if notes.get('version') == version and notes.get('input_hash') == input_hashes[name]:
+                    report.skipped.append(name)
+        skipped = set(report.skipped)
+        file_list = [name for name in file_list if name not in skipped]
+
+    if profile is True:
+        profile = textgrid_profile.BatchProfile(len(file_list))
+    report.profile = profile or None
+
+    worker = functools.partial(process_members, process_textgrid = process_textgrid, output_format = output_format, profile = bool(profile))
+    n_jobs = n_jobs or os.cpu_count() or 1
+    members = [(name, bundle.read(name)) for name in file_list]
+
+    outputs = {}
+    def add_results(results):
+        for result in results:
+            report_result(report, result, profile = profile)
+            if result['error'] is None:
+                outputs[result['file']] = result['output']
+
+    if n_jobs == 1 or len(members) <= 1:
+        add_results(worker(members))
+    else:
+        chunksize = max(1, len(members) // (n_jobs * 4))
+        with ProcessPoolExecutor(max_workers = n_jobs) as executor:
+            for results in executor.map(worker, [members[position:position + chunksize] for position in range(0, len(members), chunksize)]):
+                add_results(results)
+
+    # Write every file back in its original order, noting the version of the
+    # script (and the original's hash) for the processed TextGrids. Skipped
+    # TextGrids are copied from the bundle being replaced, and outdated ones
+    # are noted with the current version.
+    skipped = set(report.skipped)
+    with textgrid_bundle.BundleWriter(output_bundle) as writer:
+        for name in bundle.names():
+            if name in skipped:
+                notes = dict(previous.notes(name))
+                if version is not None:
+                    notes['version'] = version
+                writer.add(name, previous.read(name), notes)
+            elif name in outputs:
+                notes = dict(bundle.notes(name))
+                if version is not None:
+                    notes['version'] = version
+                    if not in_place:
+                        notes['input_hash'] = input_hashes.get(name) or textgrid_manifest.hash_bytes(bundle.read(name))
+                writer.add(name, outputs[name], notes)
+            else:
+                writer.add(name, bundle.read(name), bundle.notes(name))
+    return report
+
+
+def run_archive(process_textgrid, archive_path, output, n_jobs = None, output_format = 'long', profile = None, batch_size = 100):
+    '''
+    Processes the TextGrids in a zip or tar archive (see the textgrid_archive
+    module) as they are read from it, and writes them to a folder or a new
+    archive.
+
+    The members are read in batches of batch_size, and each batch is processed
+    while the next ones are being read, so at most a few batches are held in
+    memory at once. Every TextGrid in the archive is processed, as the output
+    is always new, and other files (including practice TextGrids) are not
+    written to the output. A TextGrid with the same file name as one already
+    written (from another folder in the archive) is reported as failed rather
+    than stopping the run.
+
+    Parameters
+    ----------
+    process_textgrid : function
+        The language-specific function that makes the changes to each loaded
+        TextGrid.
+    archive_path : str
+        The archive the TextGrids are read from.
+    output : str
+        The folder or archive the processed TextGrids are written to (see
+        textgrid_archive.output_kind()).
+    n_jobs : int, optional
+        The number of worker processes (see run_batch()). The default is None.
+    output_format : str, optional
+        The format of the processed TextGrids (see process_file()). The
+        default is 'long'.
+    profile : BatchProfile object from the textgrid_profile module, optional
+        See run_batch(). The default is None.
+    batch_size : int, optional
+        The number of TextGrids read and handed to a worker process at a time.
+        The default is 100.
+
+    Returns
+    -------
+    report : BatchReport
+        The files that were processed successfully and those that failed.
+
+    '''
+    report = BatchReport()
+    if profile is True:
+        profile = textgrid_profile.BatchProfile(textgrid_archive.count_members(archive_path, textgrid_watch.is_textgrid))
+    report.profile = profile or None
+
+    worker = functools.partial(process_members, process_textgrid = process_textgrid, output_format = output_format, profile = bool(profile))
+    members = textgrid_archive.iter_members(archive_path, textgrid_watch.is_textgrid)
+    batches = iter(lambda: list(itertools.islice(members, batch_size)), [])
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    with textgrid_archive.ArchiveWriter(output) as writer:
+        def write_results(results):
+            for result in results:
+                if result['error'] is None:
+                    try:
+                        writer.add(result['file'], result['output'])
+                    except ValueError as error:
+                        result = _error_result(result['file'], error)
+                report_result(report, result, profile = profile)
+
+        if n_jobs == 1:
+            for batch in batches:
+                write_results(worker(batch))
+        else:
+            # Keep a couple of batches per worker waiting, so the workers are
+            # never idle while the archive is being read, but the whole
+            # archive is never held in memory
+            with ProcessPoolExecutor(max_workers = n_jobs) as executor:
+                pending = collections.deque()
+                for batch in batches:
+                    pending.append(executor.submit(worker, batch))
+                    if len(pending) >= 2 * n_jobs:
+                        write_results(pending.popleft().result())
+                while pending:
+                    write_results(pending.popleft().result())
+    return report
+
+
+def report_result(report, result, manifest = None, profile = None):
+    '''
+    Adds the result for one file to the report (and the manifest and profile,
+    if there are any) and prints a message.
+    '''
+    report.add(result['file'], result['error'])
+    if profile:
+        profile.add(result['file'], result.get('stages'))
+    if result['error'] is None:
+        if manifest is not None:
+            manifest.record(result)
+        print('Successfully processed {}!'.format(result['file']))
+    else:
+        print('Failed to process {}!'.format(result['file']), file = sys.stderr)
+
+
+def export_results(path, file_list, export = None, measure = None):
+    '''
+    Exports all the intervals of the processed TextGrids to one table (see the
+    textgrid_export module) and/or saves the durations in their regions of
+    interest (see the textgrid_measure module), reading the TextGrids once.
+
+    Parameters
+    ----------
+    path : str
+        The folder, bundle or archive with the processed TextGrids.
+    file_list : list
+        The file names of the TextGrids.
+    export : str, optional
+        The path of the table of intervals. The default is None (don't save
+        it).
+    measure : str, optional
+        The path of the table of measurements. The default is None (don't
+        save it).
+
+    Returns
+    -------
+    None.
+
+    '''
+    if not export and not measure:
+        return
+    table = textgrid_export.build_table(path, file_list)
+    if export:
+        textgrid_export.save_table(table, export)
+        print('Exported {} intervals from {} files to {}.'.format(len(table['label_id']), len(file_list), export))
+    if measure:
+        textgrid_measure.measure_table(table, measure)
+        print('Measured {} files and saved the durations to {}.'.format(len(file_list), measure))
+
+
+def link_file(source_file, output_file):
+    '''
+    Makes a file available at a new path without copying its contents where
+    possible. A reflink (a copy-on-write clone, supported by e.g. Btrfs and
+    XFS on Linux) is tried first, as the two files can then be edited
+    separately. If that isn't possible, a hard link is made, and if that isn't
+    possible either (e.g. on some network drives), the file is copied.
+
+    Parameters
+    ----------
+    source_file : str
+        The path of the existing file.
+    output_file : str
+        The path of the new file.
+
+    Returns
+    -------
+    method : str
+        How the file was made available: 'reflink', 'hardlink' or 'copy'.
+
+    '''
+    if sys.platform.startswith('linux'):
+        import fcntl
+        FICLONE = 0x40049409
+        try:
+            with open(source_file, 'rb') as infile, open(output_file, 'wb') as outfile:
+                fcntl.ioctl(outfile.fileno(), FICLONE, infile.fileno())
+            shutil.copystat(source_file, output_file)
+            return 'reflink'
+        except OSError:
+            os.remove(output_file)
+
+    try:
+        os.link(source_file, output_file)
+        return 'hardlink'
+    except OSError:
+        shutil.copy2(source_file, output_file)
+        return 'copy'
+
+
+def pass_through_files(source_path, output_path, exclude = ()):
+    '''
+    Makes all the files in a folder (and its sub-folders) that aren't going to
+    be processed available in the output folder, using link_file(). Files
+    that are already there and unchanged are left alone.
+
+    Parameters
+    ----------
+    source_path : str
+        The folder with the original files.
+    output_path : str
+        The output folder.
+    exclude : collection, optional
+        The names of files in source_path itself (not its sub-folders) that are
+        not passed through, i.e. the TextGrids being processed. The default is
+        an empty tuple.
+
+    Returns
+    -------
+    counts : dict
+        The number of files passed through with each method, as returned by
+        link_file().
+
+    '''
+    counts = {}
+    for folder, folder_names, file_names in os.walk(source_path):
+        relative_folder = os.path.relpath(folder, source_path)
+        new_folder = os.path.normpath(os.path.join(output_path, relative_folder))
+
+        # Don't pass the output folder through into itself if it is inside
+        # the source folder
+        folder_names[:] = [name for name in folder_names if os.path.abspath(os.path.join(folder, name)) != os.path.abspath(output_path)]
+
+        os.makedirs(new_folder, exist_ok = True)
+        for name in file_names:
+            if relative_folder == '.' and name in exclude:
+                continue
+            source_file = os.path.join(folder, name)
+            output_file = os.path.join(new_folder, name)
+
+            # Skip files that are already linked or unchanged since the last run
+            if os.path.exists(output_file):
+                source_stat = os.stat(source_file)
+                output_stat = os.stat(output_file)
+                if os.path.samestat(source_stat, output_stat) or (source_stat.st_size == output_stat.st_size and source_stat.st_mtime_ns == output_stat.st_mtime_ns):
+                    continue
+                os.remove(output_file)
+
+            method = link_file(source_file, output_file)
+            counts[method] = counts.get(method, 0) + 1
+    return counts
+
+
+def main(process_textgrid, source_path, output_path = None, description = None):
+    '''
+    Runs a processing script from the command line. See the docstring of each
+    process_textgrid_tiers_* script for the available options.
+
+    Parameters
+    ----------
+    process_textgrid : function
+        The language-specific function that makes the changes to each loaded
+        TextGrid.
+    source_path : str
+        The folder the TextGrids are read from.
+    output_path : str, optional
+        The folder the processed TextGrids are written to. The default is None,
+        in which case the originals in source_path are over-written. Any other
+        files in source_path are passed through to this folder with
+        pass_through_files().
+    description : str, optional
+        A description of the script for the --help message.
+
+    Returns
+    -------
+    report : BatchReport
+        The files that were processed successfully and those that failed.
+
+    '''
+    parser = argparse.ArgumentParser(description = description)
+    parser.add_argument('-j', '--jobs', type = int, default = None,
+                        help = 'number of files to process at once (default: one per processor core)')
+    parser.add_argument('--force', action = 'store_true',
+                        help = 'process every file, even those the manifest shows are up to date')
+    parser.add_argument('--format', choices = textgrid_arrays.file_formats, default = 'long',
+                        help = 'file format of the processed TextGrids (default: long, the format Praat uses for text files)')
+    parser.add_argument('--export', metavar = 'OUTPUT', default = None,
+                        help = 'also export all intervals of the processed TextGrids to one table (a .npz file, or a folder of .npy files)')
+    parser.add_argument('--measure', metavar = 'OUTPUT', default = None,
+                        help = 'also save the durations in the region of interest of each processed TextGrid to one table (a .csv or .npz file, or a folder of .npy files)')
+    parser.add_argument('--profile', metavar = 'JSON', nargs = '?', const = 'profile.json', default = None,
+                        help = 'measure the time spent on each stage of each file, print the progress and save a summary (default: profile.json)')
+    parser.add_argument('--prefetch', metavar = 'N', type = int, default = 8,
+                        help = 'number of files to read ahead and write behind while processing (default: 8, 0 to turn off)')
+    parser.add_argument('--acoustic-boundaries', metavar = 'FEATURE', nargs = '?', const = 'energy', choices = textgrid_audio.boundary_features, default = None,
+                        help = 'place the boundaries of added sounds from the WAV file saved with each TextGrid, using energy, spectral or zcr (default: energy)')
+    parser.add_argument('--bundle', metavar = 'PATH', default = None,
+                        help = 'process the TextGrids in a bundle made with textgrid_bundle.py instead of the TextGrids folder')
+    parser.add_argument('--archive', metavar = 'PATH', default = None,
+                        help = 'process the TextGrids in a zip or tar archive (e.g. WebMAUS results) without extracting it first')
+    parser.add_argument('--output', metavar = 'PATH', default = None,
+                        help = 'with --archive, the folder or archive (.zip, .tar, .tar.gz, ...) to write the processed TextGrids to (default: a folder named after the archive, e.g. results_processed)')
+    parser.add_argument('--watch', metavar = 'SECONDS', type = float, nargs = '?', const = 2.0, default = None,
+                        help = 'keep running and process new TextGrids once they have been unchanged for this long (default: 2 seconds)')
+    args = parser.parse_args()
+    if args.bundle and args.archive:
+        parser.error('--bundle and --archive can\'t be used together')
+    if (args.bundle or args.archive) and args.watch is not None:
+        parser.error('--watch can\'t be used with --bundle or --archive')
+    if args.output and not args.archive:
+        parser.error('--output can only be used with --archive')
+    if args.acoustic_boundaries and (args.bundle or args.archive):
+        parser.error('--acoustic-boundaries needs the WAV files in the TextGrids folder, so it can\'t be used with --bundle or --archive')
+    if args.acoustic_boundaries and 'place_boundary' not in inspect.signature(process_textgrid).parameters:
+        parser.error('--acoustic-boundaries can\'t be used with this script, as it doesn\'t add any sounds')
+
+    # Files written in a different format (or with boundaries placed from the
+    # recordings) count as out of date
+    version = textgrid_manifest.script_version(process_textgrid)
+    if args.format != 'long':
+        version += '-' + args.format
+    if args.acoustic_boundaries:
+        version += '-' + args.acoustic_boundaries
+
+    # Process a bundle, writing the processed TextGrids to a bundle with the
+    # same name in the output folder (or over-writing the original bundle)
+    if args.bundle:
+        output_bundle = args.bundle
+        if output_path is not None:
+            os.makedirs(output_path, exist_ok = True)
+            output_bundle = os.path.join(output_path, os.path.basename(args.bundle))
+        report = run_bundle(process_textgrid, args.bundle, output_bundle, n_jobs = args.jobs, version = version, force = args.force, output_format = args.format, profile = bool(args.profile))
+        print(report.summary())
+        if report.profile is not None:
+            report.profile.save(args.profile)
+        export_results(output_bundle, report.processed + report.skipped, args.export, args.measure)
+        return report
+
+    if output_path is None:
+        output_path = source_path
+
+    # Process an archive, writing the processed TextGrids to the folder or
+    # archive given with --output, or else to a new folder named after the
+    # archive. They are never written to the TextGrids folder, where they
+    # aren't in the manifest and would be processed again by the next run.
+    if args.archive:
+        output = args.output or textgrid_archive.default_output(args.archive)
+        report = run_archive(process_textgrid, args.archive, output, n_jobs = args.jobs, output_format = args.format, profile = bool(args.profile))
+        print(report.summary())
+        if report.profile is not None:
+            report.profile.save(args.profile)
+        export_results(output, report.processed, args.export, args.measure)
+        return report
+
+    tg_list = get_textgrid_list(source_path)
+
+    # When writing to a separate folder, only the processed TextGrids are
+    # written there. Everything else (e.g. WAV files) is linked, not copied.
+    if os.path.abspath(output_path) != os.path.abspath(source_path):
+        counts = pass_through_files(source_path, output_path, exclude = set(tg_list) | {textgrid_manifest.manifest_name, textgrid_manifest.journal_name})
+        if counts:
+            print('Passed through {} other files ({}).'.format(sum(counts.values()), ', '.join('{} {}'.format(count, method) for method, count in sorted(counts.items()))))
+
+    # Load the record of the files processed by earlier runs
+    manifest = textgrid_manifest.Manifest(output_path, version)
+
+    report = run_batch(process_textgrid, tg_list, source_path, output_path, n_jobs = args.jobs, manifest = manifest, force = args.force, output_format = args.format, profile = bool(args.profile), prefetch = args.prefetch, boundary_feature = args.acoustic_boundaries)
+    print(report.summary())
+    if report.profile is not None:
+        report.profile.save(args.profile)
+
+    # Export the intervals and measurements of all the processed TextGrids
+    # (including skipped ones) to one table each
+    export_results(output_path, [file for file in tg_list if file not in report.failed], args.export, args.measure)
+
+    # Process new TextGrids as they arrive, in this process, where the script
+    # is already loaded
+    if args.watch is not None:
+        def process_batch(files):
+            batch_report = run_batch(process_textgrid, files, source_path, output_path, n_jobs = 1, manifest = manifest, force = True, output_format = args.format, boundary_feature = args.acoustic_boundaries)
+            print(batch_report.summary())
+
+        def is_up_to_date(file):
+            return manifest.is_up_to_date(file, source_path, output_path)
+
+        textgrid_watch.watch(process_batch, source_path, is_up_to_date, debounce = args.watch)
+    return report
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 19:21:08 2026
+
+@author: Roy Alderton
+
+This module (and script) packs many TextGrids into a single bundle file, so
+that a whole speaker's TextGrids can be read with one sequential read and
+written with one write. Opening and closing hundreds of tiny files takes much
+longer than reading their contents, especially on a network drive.
+
+A bundle (ending in '.tgb') contains:
+
+    1. A short header that identifies the file as a bundle.
+    2. The contents of each TextGrid, one after another, exactly as they
+    would be saved as separate files (in any of Praat's formats).
+    3. An index, which lists the name of each TextGrid, where its contents
+    start in the bundle and how long they are, plus any notes about it (e.g.
+    the version of the script that processed it).
+    4. The position of the index, at the very end of the file.
+
+Other files (e.g. transcripts) can be stored in a bundle in the same way.
+
+To pack a folder of TextGrids into a bundle, or to unpack a bundle into a
+folder (e.g. to open the TextGrids in Praat), navigate to the correct folder in
+the command line and enter commands in the following format:
+
+    python textgrid_bundle.py pack TextGrids/ TextGrids.tgb
+    python textgrid_bundle.py unpack TextGrids.tgb TextGrids/
+
+To make one bundle per speaker instead (e.g. 0012.tgb, 0013.tgb), give a
+folder for the bundles and add the --by-speaker option:
+
+    python textgrid_bundle.py pack TextGrids/ Bundles/ --by-speaker
+
+To list the TextGrids in a bundle:
+
+    python textgrid_bundle.py list TextGrids.tgb
+
+If using Linux, you may need to replace 'python' with 'python3'.
+
+The process_textgrid_tiers_* scripts can process a bundle directly with their
+--bundle option, and textgrid_export.py and transcribe_textgrids.py can read
+one directly instead of a folder.
+
+The stimulus_ids.py module must be saved in the same folder as this script.
+"""
+
+import os
+import json
+import struct
+import argparse
+import stimulus_ids
+
+# The header at the start of each bundle, and the end of the trailer that
+# gives the position of the index
+bundle_header = b'TGBUNDLE\x01\n'
+bundle_trailer = struct.Struct('>Q8s')
+bundle_magic = b'TGBUNDLE'
+
+# The file name ending used for bundles
+bundle_extension = '.tgb'
+
+
+class BundleError(Exception):
+    '''Raised when a file isn't a bundle or is damaged.'''
+    pass
+
+
+def is_bundle(path):
+    '''Checks whether a path is a bundle rather than a folder.'''
+    return path.endswith(bundle_extension) and not os.path.isdir(path)
+
+
+class Bundle(object):
+    '''
+    A bundle that has been read into memory. The TextGrids can be listed with
+    names() and read with read(). See the module docstring for details.
+    '''
+
+    def __init__(self, path):
+        '''
+        Parameters
+        ----------
+        path : str
+            The path of the bundle, which is read in one go.
+
+        '''
+        self.path = path
+        with open(path, 'rb') as infile:
+            self.data = infile.read()
+        if not self.data.startswith(bundle_header) or len(self.data) < len(bundle_header) + bundle_trailer.size:
+            raise BundleError('{} is not a TextGrid bundle'.format(path))
+        index_start, magic = bundle_trailer.unpack_from(self.data, len(self.data) - bundle_trailer.size)
+        if magic != bundle_magic:
+            raise BundleError('{} is damaged (it has no index)'.format(path))
+        index = json.loads(self.data[index_start:len(self.data) - bundle_trailer.size].decode('UTF-8'))
+        self.members = {name: (offset, size, notes) for name, offset, size, notes in index['members']}
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, name):
+        return name in self.members
+
+    def names(self):
+        '''Returns the names of the files in the bundle, in the order they were added.'''
+        return list(self.members)
+
+    def read(self, name):
+        '''Returns the contents of one file in the bundle as bytes.'''
+        offset, size, _ = self.members[name]
+        return self.data[offset:offset + size]
+
+    def notes(self, name):
+        '''Returns the notes saved with one file in the bundle, as a dict.'''
+        return self.members[name][2]
+
+
+class BundleWriter(object):
+    '''
+    Writes a new bundle, file by file. The bundle is written to a temporary
+    file, which only replaces any existing bundle when close() is called, so
+    the bundle being read can also be the one being written. Can be used as a
+    context manager, e.g.:
+
+        with textgrid_bundle.BundleWriter('0012.tgb') as bundle:
+            bundle.add('0012de_nasals_fin_nas_p03_Mann_1_03__01.TextGrid', data)
+    '''
+
+    def __init__(self, path):
+        '''
+        Parameters
+        ----------
+        path : str
+            The path of the new bundle.
+
+        '''
+        self.path = path
+        self.temp_path = path + '.tmp'
+        self._file = open(self.temp_path, 'wb')
+        self._file.write(bundle_header)
+        self._position = len(bundle_header)
+        self._index = []
+        self._names = set()
+
+    def add(self, name, data, notes = None):
+        '''
+        Adds a file to the bundle.
+
+        Parameters
+        ----------
+        name : str
+            The file name.
+        data : bytes
+            The contents of the file.
+        notes : dict, optional
+            Any notes about the file that can be saved as JSON. The default is
+            None (no notes).
+
+        Raises
+        ------
+        ValueError
+            If a file with the same name has already been added.
+
+        Returns
+        -------
+        None.
+
+        '''
+        if name in self._names:
+            raise ValueError('{} is already in the bundle'.format(name))
+        self._names.add(name)
+        self._file.write(data)
+        self._index.append([name, self._position, len(data), notes or {}])
+        self._position += len(data)
+
+    def close(self):
+        '''Writes the index and moves the bundle into place.'''
+        if self._file is None:
+            return
+        self._file.write(json.dumps({'members': self._index}).encode('UTF-8'))
+        self._file.write(bundle_trailer.pack(self._position, bundle_magic))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        os.replace(self.temp_path, self.path)
+
+    def discard(self):
+        '''Stops writing the bundle and deletes the temporary file.'''
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self.temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        if error_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def pack(path, bundle_path, file_list = None):
+    '''
+    Packs the TextGrids in a folder into a bundle.
+
+    Parameters
+    ----------
+    path : str
+        The folder with the TextGrids.
+    bundle_path : str
+        The path of the new bundle.
+    file_list : list, optional
+        The file names of the TextGrids to pack. The default is None (all the
+        TextGrids in the folder, in alphabetical order).
+
+    Returns
+    -------
+    n_files : int
+        The number of TextGrids packed.
+
+    '''
+    if file_list is None:
+        file_list = sorted(file for file in os.listdir(path) if file.endswith('.TextGrid'))
+    with BundleWriter(bundle_path) as bundle:
+        for file in file_list:
+            with open(os.path.join(path, file), 'rb') as infile:
+                bundle.add(file, infile.read())
+    return len(file_list)
+
+
+def pack_by_speaker(path, output_path):
+    '''
+    Packs the TextGrids in a folder into one bundle per speaker, named after
+    the speaker ID at the start of the file names (see the stimulus_ids
+    module).
+
+    Returns
+    -------
+    speakers : dict
+        The number of TextGrids packed for each speaker.
+
+    '''
+    speakers = {}
+    for file in sorted(os.listdir(path)):
+        if file.endswith('.TextGrid'):
+            speaker = stimulus_ids.parse_stimulus_id(file).speaker or 'unknown'
+            speakers.setdefault(speaker, []).append(file)
+    os.makedirs(output_path, exist_ok = True)
+    for speaker, file_list in speakers.items():
+        pack(path, os.path.join(output_path, speaker + bundle_extension), file_list)
+    return {speaker: len(file_list) for speaker, file_list in speakers.items()}
+
+
+def unpack(bundle_path, path):
+    '''
+    Writes each file in a bundle to a folder as a separate file.
+
+    Returns
+    -------
+    n_files : int
+        The number of files written.
+
+    '''
+    bundle = Bundle(bundle_path)
+    os.makedirs(path, exist_ok = True)
+    for name in bundle.names():
+        with open(os.path.join(path, name), 'wb') as outfile:
+            outfile.write(bundle.read(name))
+    return len(bundle)
+
+
+# Pack, unpack or list bundles
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Pack TextGrids into single-file bundles, or unpack them again.')
+    commands = parser.add_subparsers(dest = 'command', required = True)
+    pack_parser = commands.add_parser('pack', help = 'pack a folder of TextGrids into a bundle')
+    pack_parser.add_argument('path', help = 'folder with the TextGrids')
+    pack_parser.add_argument('bundle', help = 'the new bundle, or a folder for the bundles with --by-speaker')
+    pack_parser.add_argument('--by-speaker', action = 'store_true', help = 'make one bundle per speaker')
+    unpack_parser = commands.add_parser('unpack', help = 'write the TextGrids in a bundle to a folder')
+    unpack_parser.add_argument('bundle', help = 'the bundle')
+    unpack_parser.add_argument('path', help = 'folder for the TextGrids')
+    list_parser = commands.add_parser('list', help = 'list the TextGrids in a bundle')
+    list_parser.add_argument('bundle', help = 'the bundle')
+    args = parser.parse_args()
+
+    if args.command == 'pack' and args.by_speaker:
+        speakers = pack_by_speaker(args.path, args.bundle)
+        print('Packed {} TextGrids into {} bundles in {}.'.format(sum(speakers.values()), len(speakers), args.bundle))
+    elif args.command == 'pack':
+        print('Packed {} TextGrids into {}.'.format(pack(args.path, args.bundle), args.bundle))
+    elif args.command == 'unpack':
+        print('Unpacked {} files into {}.'.format(unpack(args.bundle, args.path), args.path))
+    else:
+        bundle = Bundle(args.bundle)
+        for name in bundle.names():
+            offset, size, notes = bundle.members[name]
+            print('{}  {} bytes{}'.format(name, size, '  (processed by version {})'.format(notes['version']) if 'version' in notes else ''))
+        print('\n{} files.'.format(len(bundle)))
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 18:40:52 2026
+
+@author: Roy Alderton
+
+This script compares the original TextGrids with the processed ones (e.g. the
+TextGrids and TextGrids_copy folders after running one of the
+process_textgrid_tiers_*_safe scripts) and lists only the intervals that were
+changed, so that they can be checked in Praat without going through every
+file.
+
+The tiers of each pair of files are matched by name. Tiers renamed by the
+processing scripts are matched with their new names (MAU with SOUND, MAS
+with SYLLABLE and ORT-MAU with WORD), and any tiers that were removed (e.g.
+KAN-MAU) or added (e.g. PHRASE) are counted but not compared.
+
+For each pair of tiers, the boundaries that are in both tiers (within a
+tolerance) are found in a single pass over the two sorted lists of interval
+end times. These divide the tiers into sections, each of which has one or
+more intervals in each tier. A section with one interval in each tier with
+the same label and start time is unchanged and isn't listed. Any other
+section is listed as one of the following changes:
+
+    1. 'relabel': the text of an interval was changed.
+    2. 'boundary': the start (or the end of the last interval) of an interval
+    was moved.
+    3. 'split': an interval was split into several, e.g. adding [d] to
+    'Leonard'.
+    4. 'merge': several intervals were merged into one, e.g. removing the
+    schwa after l'.
+    5. 'resegment': the intervals were changed in some other way, e.g. a
+    boundary was moved.
+
+The script should be run in the command line by navigating to the correct
+folder and entering a command in the following format:
+
+    python textgrid_diff.py TextGrids/ TextGrids_copy/
+
+If using Linux, you may need to replace 'python' with 'python3'.
+
+Each change is listed under its file, with the tier, the start and end times
+of the section, the type of change and the labels before and after, e.g.:
+
+    SOUND  1.2345-1.4567  split  [@r] -> [@r] [d]
+
+followed by a summary of the changes in all the files. To see only the
+summary, add the --summary option. The tolerance for boundaries to count as
+the same (1 microsecond by default) can be changed with the --tolerance
+option.
+
+The textgrid_arrays.py module must be saved in the same folder as this script.
+
+You may need to install the numpy library if it isn't already on your
+computer. You can do this by entering the following into the command prompt:
+
+    pip install numpy
+
+"""
+
+import os
+import argparse
+from collections import Counter
+import numpy as np
+import textgrid_arrays
+
+# New names of the tiers renamed by the processing scripts
+tier_renames = {'ORT-MAU': 'WORD', 'MAU': 'SOUND', 'MAS': 'SYLLABLE'}
+
+
+def diff_tiers(old, new, tolerance = 1e-6):
+    '''
+    Lists the changes between two versions of a tier.
+
+    Parameters
+    ----------
+    old : Tier object from the textgrid_arrays module
+        The original tier.
+    new : Tier object from the textgrid_arrays module
+        The processed tier.
+    tolerance : float, optional
+        The largest difference between two boundaries, in seconds, that still
+        counts as no difference. The default is 1e-6.
+
+    Returns
+    -------
+    changes : list
+        A (start, end, kind, old labels, new labels) tuple for each changed
+        section (see the module docstring).
+
+    '''
+    if len(old) == 0 or len(new) == 0:
+        if len(old) == len(new):
+            return []
+        tiers = [tier for tier in (old, new) if len(tier)]
+        start = min(float(tier.xmins[0]) for tier in tiers)
+        end = max(float(tier.xmaxs[-1]) for tier in tiers)
+        return [(start, end, 'resegment', old.texts, new.texts)]
+
+    # Find the end times that are in both tiers
+    old_ends = old.xmaxs
+    new_ends = new.xmaxs
+    nearest = np.minimum(np.searchsorted(new_ends, old_ends - tolerance), len(new_ends) - 1)
+    shared = np.abs(new_ends[nearest] - old_ends) <= tolerance
+    old_sync = np.flatnonzero(shared)
+    new_sync = nearest[shared]
+
+    # Keep only the matches that move forward in both tiers, and make sure
+    # the last section reaches the end of both tiers
+    if len(new_sync):
+        forward = np.concatenate([[True], new_sync[1:] > new_sync[:-1]])
+        old_sync = old_sync[forward]
+        new_sync = new_sync[forward]
+    if not len(old_sync) or old_sync[-1] != len(old_ends) - 1 or new_sync[-1] != len(new_ends) - 1:
+        old_sync = np.append(old_sync, len(old_ends) - 1)
+        new_sync = np.append(new_sync, len(new_ends) - 1)
+
+    # The first interval of each section, and the number of intervals in it
+    old_first = np.concatenate([[0], old_sync[:-1] + 1])
+    new_first = np.concatenate([[0], new_sync[:-1] + 1])
+    old_count = old_sync - old_first + 1
+    new_count = new_sync - new_first + 1
+
+    # Sections with one interval in each tier with the same start and label
+    # are unchanged. (The ends of the sections are the same, apart from the
+    # last one if the tiers end at different times.)
+    old_labels = np.array(old.labels, dtype = object)[old.codes]
+    new_labels = np.array(new.labels, dtype = object)[new.codes]
+    single = (old_count == 1) & (new_count == 1)
+    same_bounds = np.abs(old.xmins[old_first] - new.xmins[new_first]) <= tolerance
+    same_bounds &= np.abs(old_ends[old_sync] - new_ends[new_sync]) <= tolerance
+    same_label = old_labels[old_first] == new_labels[new_first]
+    changed = np.flatnonzero(~(single & same_bounds & same_label))
+
+    changes = []
+    for section in changed.tolist():
+        old_range = slice(old_first[section], old_sync[section] + 1)
+        new_range = slice(new_first[section], new_sync[section] + 1)
+        if single[section]:
+            kind = 'relabel' if same_bounds[section] else 'boundary'
+        elif old_count[section] == 1 and same_bounds[section]:
+            kind = 'split'
+        elif new_count[section] == 1 and same_bounds[section]:
+            kind = 'merge'
+        else:
+            kind = 'resegment'
+        start = min(float(old.xmins[old_first[section]]), float(new.xmins[new_first[section]]))
+        end = max(float(old_ends[old_sync[section]]), float(new_ends[new_sync[section]]))
+        changes.append((start, end, kind, old_labels[old_range].tolist(), new_labels[new_range].tolist()))
+    return changes
+
+
+def diff_textgrids(old, new, tolerance = 1e-6):
+    '''
+    Lists the changes between two versions of a TextGrid.
+
+    Parameters
+    ----------
+    old : TextGrid object from the textgrid_arrays module
+        The original TextGrid.
+    new : TextGrid object from the textgrid_arrays module
+        The processed TextGrid.
+    tolerance : float, optional
+        See diff_tiers(). The default is 1e-6.
+
+    Returns
+    -------
+    changes : list
+        A (tier name, start, end, kind, old labels, new labels) tuple for each
+        changed section, using the processed tier names.
+    removed : list
+        The names of the original tiers with no processed version.
+    added : list
+        The names of the processed tiers with no original version.
+
+    '''
+    changes = []
+    removed = []
+    matched = set()
+    for name, tier in old.items():
+        new_name = name if name in new else tier_renames.get(name)
+        if new_name not in new:
+            removed.append(name)
+            continue
+        matched.add(new_name)
+        changes.extend((new_name,) + change for change in diff_tiers(tier, new[new_name], tolerance))
+    added = [name for name in new if name not in matched]
+    return changes, removed, added
+
+
+def format_labels(labels):
+    '''Returns a list of labels as text, e.g. '[@r] [d]'.'''
+    return ' '.join('[{}]'.format(label) for label in labels)
+
+
+# Compare the TextGrids in the two folders given
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'List the intervals changed between original and processed TextGrids.')
+    parser.add_argument('original', help = 'folder with the original TextGrids')
+    parser.add_argument('processed', help = 'folder with the processed TextGrids')
+    parser.add_argument('--tolerance', type = float, default = 1e-6,
+                        help = 'largest difference between boundaries, in seconds, that counts as none (default: 1e-6)')
+    parser.add_argument('--summary', action = 'store_true',
+                        help = 'only print the summary, not every change')
+    args = parser.parse_args()
+
+    tg_list = sorted(file for file in os.listdir(args.original) if 'practice' not in file and file.endswith('.TextGrid'))
+    kinds = Counter()
+    tiers = Counter()
+    removed_tiers = Counter()
+    added_tiers = Counter()
+    changed_files = 0
+    missing = []
+    for file in tg_list:
+        processed_file = os.path.join(args.processed, file)
+        if not os.path.isfile(processed_file):
+            missing.append(file)
+            continue
+        changes, removed, added = diff_textgrids(textgrid_arrays.TextGrid(os.path.join(args.original, file)), textgrid_arrays.TextGrid(processed_file), args.tolerance)
+        removed_tiers.update(removed)
+        added_tiers.update(added)
+        if not changes:
+            continue
+        changed_files += 1
+        kinds.update(change[3] for change in changes)
+        tiers.update(change[0] for change in changes)
+        if not args.summary:
+            print('{} ({} changes)'.format(file, len(changes)))
+            for name, start, end, kind, old_labels, new_labels in changes:
+                print('    {}  {:.4f}-{:.4f}  {}  {} -> {}'.format(name, start, end, kind, format_labels(old_labels), format_labels(new_labels)))
+
+    print('\nCompared {} files: {} with changed intervals.'.format(len(tg_list) - len(missing), changed_files))
+    if kinds:
+        print('Changes by type: {}'.format(', '.join('{} {}'.format(count, kind) for kind, count in kinds.most_common())))
+        print('Changes by tier: {}'.format(', '.join('{} {}'.format(count, name) for name, count in tiers.most_common())))
+    if removed_tiers:
+        print('Tiers removed: {}'.format(', '.join('{} ({} files)'.format(name, count) for name, count in sorted(removed_tiers.items()))))
+    if added_tiers:
+        print('Tiers added: {}'.format(', '.join('{} ({} files)'.format(name, count) for name, count in sorted(added_tiers.items()))))
+    if missing:
+        print('{} files have no processed version, e.g. {}'.format(len(missing), missing[0]))
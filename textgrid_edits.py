@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 14:26:09 2026
+
+@author: Roy Alderton
+
+This module makes the interval-level changes of the process_textgrid_tiers_*
+scripts (e.g. adding the missing [d] in 'Leonard' or removing the schwa after
+l') to a tier all at once.
+
+The scripts used to insert and pop intervals while looping over the same tier.
+Each insert or pop moves every interval after it along by one, and after a pop
+the loop skipped the interval that moved into the popped interval's place, so
+that interval was never checked. Instead, a TierEdits object is created for
+the tier, the changes are noted while looping over it, and then they are all
+made in one go with apply(), e.g.:
+
+    edits = textgrid_edits.TierEdits(tg['SOUND'])
+    for count in range(len(edits)):
+        if edits.texts[count] == 'z':
+            edits.merge_left(count)
+    edits.apply()
+
+The following changes can be noted, always using the positions of the
+intervals in the tier as it was before any changes were made:
+
+    1. relabel(): change the text of an interval.
+    2. split(): split an interval at a proportion of its duration, putting a
+    new interval with the given text on the right, e.g. split(count, 'd', 0.75)
+    adds a [d] in the last quarter of the interval.
+    3. merge_left() and merge_right(): remove an interval and move the
+    boundary of its left (or right) neighbour to cover it, optionally changing
+    the neighbour's text.
+
+While the changes are being noted, texts holds the text of each interval with
+the changes noted so far, and previous_text() and next_text() return the
+text of the nearest neighbours that haven't been removed. So a check on the
+previous interval sees that interval as it will be after the changes, as it
+did when the tier was changed directly.
+
+When apply() is called, the new texts are used first, then the removed
+intervals are covered by their neighbours and finally the intervals are split
+(at the proportion of their new duration). The tier is then rebuilt once,
+however many changes were noted.
+
+A function can be given as place_boundary to put the new boundaries somewhere
+other than at the fixed proportion, e.g. from the recording (see the
+textgrid_audio module). It is given the start and end of the interval being
+split and the proportion, and returns the time of the new boundary.
+
+The module should be saved in the same folder as the scripts that use it.
+"""
+
+import numpy as np
+import textgrid_arrays
+
+
+class TierEdits(object):
+    '''
+    A list of changes to one tier, made all at once by apply(). See the module
+    docstring for details.
+    '''
+
+    def __init__(self, tier, place_boundary = None):
+        '''
+        Parameters
+        ----------
+        tier : Tier object from the textgrid_arrays module
+            The tier to change. It isn't changed until apply() is called.
+        place_boundary : function, optional
+            Finds the time of the boundary of each split, given the start and
+            end of the interval and the proportion passed to split(). The
+            default is None (use the proportion of the interval's duration).
+
+        '''
+        self.tier = tier
+        self.place_boundary = place_boundary
+        self.texts = tier.texts
+        self.removed = [False] * len(self.texts)
+        self.relabelled = set()
+        self.merges = {}
+        self.splits = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _check(self, position):
+        if not 0 <= position < len(self.texts):
+            raise IndexError('tier index out of range')
+        if self.removed[position]:
+            raise ValueError('interval {} has already been removed'.format(position))
+
+    def previous_text(self, position):
+        '''
+        Returns the text of the nearest interval to the left that hasn't been
+        removed, or None if there isn't one.
+        '''
+        position -= 1
+        while position >= 0 and self.removed[position]:
+            position -= 1
+        return self.texts[position] if position >= 0 else None
+
+    def next_text(self, position):
+        '''
+        Returns the text of the nearest interval to the right that hasn't been
+        removed, or None if there isn't one.
+        '''
+        position += 1
+        while position < len(self.texts) and self.removed[position]:
+            position += 1
+        return self.texts[position] if position < len(self.texts) else None
+
+    def relabel(self, position, text):
+        '''
+        Notes a change to the text of an interval.
+
+        Parameters
+        ----------
+        position : int
+            The position of the interval in the original tier.
+        text : str
+            The new text.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self._check(position)
+        self.texts[position] = text
+        self.relabelled.add(position)
+
+    def split(self, position, text, proportion):
+        '''
+        Notes that an interval should be split, adding a new interval to its
+        right.
+
+        Parameters
+        ----------
+        position : int
+            The position of the interval in the original tier.
+        text : str
+            The text of the new interval.
+        proportion : float
+            Where to put the new boundary, as a proportion of the interval's
+            duration, e.g. 0.75 puts it three quarters of the way through.
+
+        Raises
+        ------
+        ValueError
+            If the interval is already being split.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self._check(position)
+        if position in self.splits:
+            raise ValueError('interval {} is already being split'.format(position))
+        self.splits[position] = (text, proportion)
+
+    def _merge(self, position, direction, text):
+        self._check(position)
+        if position in self.splits:
+            raise ValueError('interval {} is being split, so it can\'t be removed'.format(position))
+        self.removed[position] = True
+        self.merges[position] = (direction, text)
+
+    def merge_left(self, position, text = None):
+        '''
+        Notes that an interval should be removed, and its left neighbour
+        extended to cover it.
+
+        Parameters
+        ----------
+        position : int
+            The position of the interval in the original tier.
+        text : str or function, optional
+            The new text of the left neighbour, or a function that takes the
+            neighbour's text and returns the new text. The default is None
+            (keep the neighbour's text).
+
+        Returns
+        -------
+        None.
+
+        '''
+        self._merge(position, 'left', text)
+
+    def merge_right(self, position, text = None):
+        '''
+        Notes that an interval should be removed, and its right neighbour
+        extended to cover it.
+
+        Parameters
+        ----------
+        position : int
+            The position of the interval in the original tier.
+        text : str or function, optional
+            The new text of the right neighbour, or a function that takes the
+            neighbour's text and returns the new text (e.g.
+            lambda text: 'l ' + text). The default is None (keep the
+            neighbour's text).
+
+        Returns
+        -------
+        None.
+
+        '''
+        self._merge(position, 'right', text)
+
+    def apply(self):
+        '''
+        Makes all the noted changes to the tier.
+
+        Raises
+        ------
+        ValueError
+            If a removed interval has no neighbour left to cover it, or an
+            interval that is being split has been removed.
+
+        Returns
+        -------
+        None.
+
+        '''
+        tier = self.tier
+        texts = list(self.texts)
+        xmins = tier.xmins.copy()
+        xmaxs = tier.xmaxs.copy()
+        kept = np.flatnonzero(~np.array(self.removed, dtype = bool))
+
+        # Cover each removed interval with its nearest remaining neighbour
+        changed = set(self.relabelled)
+        for position in sorted(self.merges):
+            direction, text = self.merges[position]
+            index = np.searchsorted(kept, position)
+            if direction == 'left':
+                if index == 0:
+                    raise ValueError('interval {} has no interval to its left to cover it'.format(position))
+                neighbour = int(kept[index - 1])
+                xmaxs[neighbour] = max(xmaxs[neighbour], xmaxs[position])
+            else:
+                if index == len(kept):
+                    raise ValueError('interval {} has no interval to its right to cover it'.format(position))
+                neighbour = int(kept[index])
+                xmins[neighbour] = min(xmins[neighbour], xmins[position])
+            if text is not None:
+                texts[neighbour] = text(texts[neighbour]) if callable(text) else text
+                changed.add(neighbour)
+
+        codes = tier.codes.copy()
+        for position in changed:
+            codes[position] = tier.intern(texts[position])
+
+        # Split the intervals, using their new boundaries
+        split_positions = np.array(sorted(self.splits), dtype = np.int64)
+        split_xmins = []
+        split_xmaxs = []
+        split_codes = []
+        for position in split_positions.tolist():
+            if self.removed[position]:
+                raise ValueError('interval {} has been removed, so it can\'t be split'.format(position))
+            text, proportion = self.splits[position]
+            if self.place_boundary is None:
+                boundary = xmins[position] + (xmaxs[position] - xmins[position]) * proportion
+            else:
+                boundary = self.place_boundary(float(xmins[position]), float(xmaxs[position]), proportion)
+            split_xmins.append(boundary)
+            split_xmaxs.append(xmaxs[position])
+            split_codes.append(tier.intern(text))
+            xmaxs[position] = boundary
+
+        # Keep the removed intervals for any Interval objects that refer to
+        # them, as Tier.pop() does
+        for position in np.flatnonzero(np.array(self.removed, dtype = bool)).tolist():
+            tier._detached[tier._ids[position]] = textgrid_arrays.Interval(tier.labels[tier.codes[position]], tier.xmins[position], tier.xmaxs[position])
+
+        # Rebuild the tier, with each new interval after the one it was split
+        # from
+        insert_at = np.searchsorted(kept, split_positions, side = 'right')
+        new_ids = np.arange(tier._next_id, tier._next_id + len(split_positions), dtype = np.int64)
+        tier.xmins = np.insert(xmins[kept], insert_at, split_xmins)
+        tier.xmaxs = np.insert(xmaxs[kept], insert_at, split_xmaxs)
+        tier.codes = np.insert(codes[kept], insert_at, np.array(split_codes, dtype = np.int32))
+        tier._ids = np.insert(tier._ids[kept], insert_at, new_ids)
+        tier._next_id += len(split_positions)
+
+        # Start again with the new tier, in case more changes are noted
+        self.__init__(tier, self.place_boundary)
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 15:12:40 2026
+
+@author: Roy Alderton
+
+This script takes a folder of processed TextGrids (e.g. from the
+process_textgrid_tiers_* scripts) and exports every interval of every tier of
+every file into one table, so that durations etc. can be analysed without
+reading thousands of TextGrids again.
+
+The table has one row per interval (or point) and the following columns, each
+stored as a numpy array:
+
+    1. file_id: the number of the file in the 'files' list.
+    2. speaker_id: the number of the speaker in the 'speakers' list (from the
+    start of the file name, see the stimulus_ids module).
+    3. tier_id: the number of the tier name in the 'tiers' list.
+    4. xmin and xmax: the start and end times of the interval.
+    5. label_id: the number of the interval's text in the 'labels' list.
+
+The lists of file names, speakers, tier names and labels are saved with the
+table, so, for example, the durations of all [n] intervals on the SOUND tiers
+can be found with:
+
+    table = textgrid_export.load_table('tiers.npz')
+    rows = (table['tier_id'] == table['tiers'].tolist().index('SOUND')) & (table['label_id'] == table['labels'].tolist().index('n'))
+    durations = table['xmax'][rows] - table['xmin'][rows]
+
+The table can be saved in two ways:
+
+    1. As a single .npz file (if the output path ends in '.npz').
+    2. As a folder with one .npy file per column (otherwise). The columns can
+    then be loaded as memory-mapped arrays with load_table(path, mmap = True),
+    so that only the parts of the table that are actually used are read from
+    the disk.
+
+The script should be run in the command line by navigating to the correct
+folder and entering a command in the following format:
+
+    python textgrid_export.py TextGrids/ tiers.npz
+
+If using Linux, you may need to replace 'python' with 'python3'.
+
+Instead of a folder, the TextGrids can be read from a bundle made with
+textgrid_bundle.py or from a zip or tar archive, e.g.:
+
+    python textgrid_export.py TextGrids.tgb tiers.npz
+    python textgrid_export.py results.zip tiers.npz
+
+The process_textgrid_tiers_* scripts can also export the table straight after
+processing the TextGrids, with the --export option, e.g.:
+
+    python process_textgrid_tiers_de.py --export tiers.npz
+
+The textgrid_arrays.py, textgrid_archive.py, textgrid_bundle.py and
+stimulus_ids.py modules must be saved in the same folder as this script.
+
+You may need to install the numpy library if it isn't already on your
+computer. You can do this by entering the following into the command prompt:
+
+    pip install numpy
+
+"""
+
+import os
+import argparse
+import numpy as np
+import stimulus_ids
+import textgrid_arrays
+import textgrid_archive
+import textgrid_bundle
+
+# Names of the columns of the table, and of the lists they refer to
+columns = ('file_id', 'speaker_id', 'tier_id', 'xmin', 'xmax', 'label_id')
+tables = ('files', 'speakers', 'tiers', 'labels')
+
+
+class _CodeTable(object):
+    # A list of unique strings and the position of each one, like the label
+    # table of a textgrid_arrays Tier
+
+    def __init__(self):
+        self.items = []
+        self.codes = {}
+
+    def intern(self, item):
+        code = self.codes.get(item)
+        if code is None:
+            code = len(self.items)
+            self.items.append(item)
+            self.codes[item] = code
+        return code
+
+
+def build_table(path, file_list):
+    '''
+    Reads a list of TextGrids and puts all their intervals into one table.
+
+    Parameters
+    ----------
+    path : str
+        The folder the TextGrids are in, a bundle (see the textgrid_bundle
+        module) or a zip or tar archive (see the textgrid_archive module).
+    file_list : list
+        The file names of the TextGrids.
+
+    Returns
+    -------
+    table : dict
+        The columns of the table and the lists they refer to, as numpy arrays
+        (see the module docstring).
+
+    '''
+    speakers = _CodeTable()
+    tiers = _CodeTable()
+    labels = _CodeTable()
+    parts = {column: [] for column in columns}
+
+    def add_textgrid(file_code, file, tg):
+        speaker_code = speakers.intern(stimulus_ids.parse_stimulus_id(file).speaker or '')
+        for name, tier in tg.items():
+            rows = len(tier)
+
+            # Convert the tier's own label codes to codes in the shared label
+            # table, once per label rather than once per interval
+            label_codes = np.array([labels.intern(label) for label in tier.labels], dtype = np.int32)
+
+            parts['file_id'].append(np.full(rows, file_code, dtype = np.int32))
+            parts['speaker_id'].append(np.full(rows, speaker_code, dtype = np.int32))
+            parts['tier_id'].append(np.full(rows, tiers.intern(name), dtype = np.int32))
+            parts['xmin'].append(tier.xmins)
+            parts['xmax'].append(tier.xmaxs)
+            parts['label_id'].append(label_codes[tier.codes] if rows else np.zeros(0, dtype = np.int32))
+
+    if textgrid_archive.is_archive(path):
+        # Parse each TextGrid as it is read from the archive, so that the
+        # archive is only read once and only one TextGrid is held in memory
+        # at a time. The rows are in the order of the archive, and only the
+        # first of several files with the same name is used.
+        file_codes = {file: file_code for file_code, file in enumerate(file_list)}
+        for file, data in textgrid_archive.iter_members(path, file_codes.__contains__):
+            tg = textgrid_arrays.TextGrid()
+            tg.parse(data)
+            add_textgrid(file_codes.pop(file), file, tg)
+        if file_codes:
+            raise textgrid_archive.ArchiveError('{} not found in {}'.format(', '.join(file_codes), path))
+    else:
+        # Get the contents of each file by name from a bundle. Files in a
+        # folder are read one at a time.
+        read = textgrid_bundle.Bundle(path).read if textgrid_bundle.is_bundle(path) else None
+        for file_code, file in enumerate(file_list):
+            if read is None:
+                tg = textgrid_arrays.TextGrid(os.path.join(path, file))
+            else:
+                tg = textgrid_arrays.TextGrid()
+                tg.parse(read(file))
+            add_textgrid(file_code, file, tg)
+
+    table = {column: np.concatenate(parts[column]) if parts[column] else np.zeros(0, dtype = np.float64 if column in ('xmin', 'xmax') else np.int32) for column in columns}
+    table['files'] = np.array(file_list, dtype = str)
+    table['speakers'] = np.array(speakers.items, dtype = str)
+    table['tiers'] = np.array(tiers.items, dtype = str)
+    table['labels'] = np.array(labels.items, dtype = str)
+    return table
+
+
+def save_table(table, output):
+    '''
+    Saves a table made by build_table().
+
+    Parameters
+    ----------
+    table : dict
+        The table.
+    output : str
+        The path of a .npz file, or of a folder for one .npy file per column
+        (see the module docstring).
+
+    Returns
+    -------
+    None.
+
+    '''
+    if output.endswith('.npz'):
+        np.savez(output, **table)
+        return
+    os.makedirs(output, exist_ok = True)
+    for name, array in table.items():
+        np.save(os.path.join(output, name + '.npy'), array)
+
+
+def load_table(output, mmap = False):
+    '''
+    Loads a table saved by save_table().
+
+    Parameters
+    ----------
+    output : str
+        The path of the .npz file or folder.
+    mmap : bool, optional
+        Whether to load the columns as read-only memory-mapped arrays. Only
+        possible for tables saved as a folder. The default is False.
+
+    Returns
+    -------
+    table : dict
+        The columns of the table and the lists they refer to.
+
+    '''
+    if output.endswith('.npz'):
+        if mmap:
+            raise ValueError('tables saved as .npz files can\'t be memory-mapped, save the table as a folder instead')
+        with np.load(output) as data:
+            return {name: data[name] for name in data.files}
+    return {name: np.load(os.path.join(output, name + '.npy'), mmap_mode = 'r' if mmap else None) for name in columns + tables}
+
+
+def list_textgrids(path):
+    '''
+    Lists the TextGrids to export in a folder, a bundle or a zip or tar
+    archive, leaving out the practice items.
+    '''
+    if textgrid_bundle.is_bundle(path):
+        tg_list = textgrid_bundle.Bundle(path).names()
+    elif textgrid_archive.is_archive(path):
+        tg_list = textgrid_archive.member_names(path)
+    else:
+        tg_list = sorted(os.listdir(path))
+    return [file for file in tg_list if 'practice' not in file and file.endswith('.TextGrid')]
+
+
+def export_table(path, file_list, output):
+    '''
+    Builds a table from a list of TextGrids and saves it. See build_table()
+    and save_table() for details.
+
+    Returns
+    -------
+    table : dict
+        The table.
+
+    '''
+    table = build_table(path, file_list)
+    save_table(table, output)
+    return table
+
+
+# Export the table of the TextGrids in the given folder
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Export all intervals of a folder of TextGrids to one table.')
+    parser.add_argument('path', help = 'folder, bundle or zip/tar archive with the TextGrids')
+    parser.add_argument('output', help = 'a .npz file, or a folder for one memory-mappable .npy file per column')
+    args = parser.parse_args()
+
+    tg_list = list_textgrids(args.path)
+    table = export_table(args.path, tg_list, args.output)
+    print('Exported {} intervals from {} files to {}.'.format(len(table['label_id']), len(tg_list), args.output))
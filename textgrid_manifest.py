@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 12:31:54 2026
+
+@author: Roy Alderton
+
+This module keeps a record (a manifest) of the TextGrids that have already been
+processed by the process_textgrid_tiers_* scripts, so that re-running a script
+after a few new TextGrids have come back from WebMAUS only processes the new
+or changed files.
+
+For each file, the manifest records:
+
+    1. A hash of the input TextGrid (plus its size and modification time).
+    2. The version of the processing script that was used. This is a hash of
+    the script itself and of the modules in the same folder that it uses
+    (e.g. textgrid_rules, textgrid_roi, textgrid_edits and stimulus_ids), so
+    it changes whenever the script, its table of correction rules or any of
+    those modules is edited.
+    3. A hash of the output TextGrid (plus its size and modification time).
+
+A file is skipped on the next run if the script version is the same, the
+output file is still there and unchanged, and the input file is unchanged.
+When a script over-writes the original TextGrids, the input and output are the
+same file, so a file that has already been processed is recognised by its
+output hash. This also stops a file from being processed twice.
+
+This holds even if the version has changed since the file was processed
+(e.g. because a rule has been edited or the --format option is different):
+the original TextGrid has been over-written, so processing it again would
+fail or change it twice. Such a file is skipped and recorded with the new
+version instead, and the script lists it at the end of the run, so that the
+originals can be restored and processed again with the --force option.
+
+The sizes and modification times mean that unchanged files don't even need to
+be read again to be skipped. A file is only hashed again if its modification
+time has changed, e.g. because it has been copied.
+
+The manifest is saved as 'processing_manifest.json' in the output folder. To
+process every file again, delete the manifest or use the script's --force
+option.
+
+The manifest itself is only saved at the end of a run, so that it isn't
+rewritten after every file. So that a run that is interrupted (e.g. by a
+crash or a power cut) can carry on where it stopped, each batch of processed
+files is also added to a journal, 'processing_journal.jsonl', before the
+processed TextGrids replace the old ones (see textgrid_batch.commit_outputs()).
+When the manifest is loaded, any journal left by an interrupted run is read
+back into it, and any processed TextGrid that was written to its temporary
+file but not yet moved into place is moved into place. Every file is then
+either recorded as processed or still exactly as it was, so it is neither
+processed twice nor left half-processed. The journal is deleted once the
+manifest has been saved.
+
+The module should be saved in the same folder as the scripts that use it.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import inspect
+
+# Names of the manifest and journal files in the output folder
+manifest_name = 'processing_manifest.json'
+journal_name = 'processing_journal.jsonl'
+
+
+def hash_bytes(data):
+    '''Returns a hash of the contents of a file as a hexadecimal string.'''
+    return hashlib.blake2b(data, digest_size = 16).hexdigest()
+
+
+def hash_file(path):
+    '''Returns a hash of a file's contents as a hexadecimal string.'''
+    with open(path, 'rb') as infile:
+        return hash_bytes(infile.read())
+
+
+def source_files(function):
+    '''
+    Returns the paths of the script that a function is defined in and of all
+    the modules in the same folder that it uses, directly or through other
+    modules (e.g. textgrid_rules and textgrid_edits). Modules from elsewhere
+    (e.g. numpy) are left out.
+    '''
+    script = os.path.abspath(inspect.getsourcefile(function))
+    folder = os.path.dirname(script)
+    found = set()
+    namespaces = [function.__globals__]
+    while namespaces:
+        for value in list(namespaces.pop().values()):
+            # Modules are found whether they were imported themselves or
+            # something was imported from them
+            if inspect.ismodule(value):
+                module = value
+            else:
+                module_name = getattr(value, '__module__', None)
+                module = sys.modules.get(module_name) if isinstance(module_name, str) else None
+            path = getattr(module, '__file__', None)
+            if not path or not path.endswith('.py'):
+                continue
+            path = os.path.abspath(path)
+            if path != script and path not in found and os.path.dirname(path) == folder:
+                found.add(path)
+                namespaces.append(vars(module))
+    return [script] + sorted(found)
+
+
+def script_version(function):
+    '''
+    Returns a short hash of the source code of the script that a function is
+    defined in and of the modules it uses (see source_files()), which changes
+    whenever any of them is edited.
+    '''
+    digest = hashlib.blake2b(digest_size = 16)
+    for path in source_files(function):
+        with open(path, 'rb') as infile:
+            digest.update(infile.read())
+    return digest.hexdigest()[:12]
+
+
+def fsync_path(path):
+    '''
+    Makes sure that a file (or the list of files in a folder) has been written
+    to the disk rather than just to the operating system's cache.
+    '''
+    # Folders can't be opened on Windows, where renames are saved anyway
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except (PermissionError, IsADirectoryError):
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Manifest(object):
+    '''
+    A record of the processed TextGrids in one output folder. See the module
+    docstring for details.
+    '''
+
+    def __init__(self, output_path, version):
+        '''
+        Parameters
+        ----------
+        output_path : str
+            The folder the processed TextGrids are written to. The manifest is
+            loaded from (and saved to) this folder.
+        version : str
+            The version of the processing script, as returned by
+            script_version().
+
+        '''
+        self.path = os.path.join(output_path, manifest_name)
+        self.journal_path = os.path.join(output_path, journal_name)
+        self.version = version
+        self.files = {}
+        self.outdated = set()
+        if os.path.isfile(self.path):
+            with open(self.path, encoding = 'UTF-8') as infile:
+                self.files = json.load(infile).get('files', {})
+        if os.path.isfile(self.journal_path):
+            self._replay_journal()
+
+    def _replay_journal(self):
+        # Finish the batches journalled by an interrupted run
+        with open(self.journal_path, encoding = 'UTF-8') as infile:
+            for line in infile:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line may have been cut off by the interruption.
+                    # Its batch was never moved into place, so it is ignored.
+                    break
+                temp_file = record.pop('temp_file')
+                output_file = record.pop('output_file')
+                if os.path.isfile(temp_file) and hash_file(temp_file) == record['output_hash']:
+                    os.replace(temp_file, output_file)
+                self.files[record.pop('file')] = record
+
+    def _entry(self, result):
+        # The part of a process_file() result that is kept in the manifest
+        entry = {'version': self.version}
+        for prefix in ('input', 'output'):
+            for key in ('hash', 'size', 'mtime_ns'):
+                entry[prefix + '_' + key] = result[prefix + '_' + key]
+        return entry
+
+    def _matches(self, path, stat, entry, prefix):
+        # A file with the same size and modification time is assumed to be
+        # unchanged. Otherwise, it is only unchanged if its hash is the same.
+        if stat.st_size != entry[prefix + '_size']:
+            return False
+        if stat.st_mtime_ns == entry[prefix + '_mtime_ns']:
+            return True
+        if hash_file(path) != entry[prefix + '_hash']:
+            return False
+        entry[prefix + '_mtime_ns'] = stat.st_mtime_ns
+        return True
+
+    def is_up_to_date(self, file, source_path, output_path):
+        '''
+        Checks whether a TextGrid has already been processed by the current
+        version of the script and hasn't changed since.
+
+        When the original TextGrids are over-written, a TextGrid that has
+        already been processed by another version of the script is also
+        skipped, as it can't be processed again. It is recorded with the
+        current version and added to outdated.
+
+        Parameters
+        ----------
+        file : str
+            The file name of the TextGrid.
+        source_path : str
+            The folder the TextGrid is read from.
+        output_path : str
+            The folder the processed TextGrid is written to.
+
+        Returns
+        -------
+        bool
+            True if the file can be skipped.
+
+        '''
+        input_file = os.path.join(source_path, file)
+        output_file = os.path.join(output_path, file)
+        in_place = os.path.abspath(input_file) == os.path.abspath(output_file)
+        entry = self.files.get(file)
+        if entry is None or (entry['version'] != self.version and not in_place):
+            return False
+
+        try:
+            if not self._matches(output_file, os.stat(output_file), entry, 'output'):
+                return False
+
+            # When the original TextGrids are over-written, the output is the
+            # input, so there is nothing more to check. A file processed by
+            # another version is not processed a second time.
+            if in_place:
+                if entry['version'] != self.version:
+                    entry['version'] = self.version
+                    self.outdated.add(file)
+                return True
+
+            return self._matches(input_file, os.stat(input_file), entry, 'input')
+        except (FileNotFoundError, KeyError):
+            return False
+
+    def record(self, result):
+        '''
+        Records a successfully processed file.
+
+        Parameters
+        ----------
+        result : dict
+            The result returned by textgrid_batch.process_file(), including
+            the hashes, sizes and modification times of the input and output.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.files[result['file']] = self._entry(result)
+
+    def journal(self, results):
+        '''
+        Adds a batch of processed files to the journal and makes sure it has
+        been written to the disk, before the files are moved into place.
+
+        Parameters
+        ----------
+        results : list
+            The results returned by textgrid_batch.process_file(), including
+            the temporary and final paths of each processed TextGrid.
+
+        Returns
+        -------
+        None.
+
+        '''
+        lines = []
+        for result in results:
+            record = self._entry(result)
+            record.update(file = result['file'], temp_file = result['temp_file'], output_file = result['output_file'])
+            lines.append(json.dumps(record, sort_keys = True) + '\n')
+        with open(self.journal_path, 'a', encoding = 'UTF-8') as outfile:
+            outfile.writelines(lines)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+
+    def save(self):
+        '''
+        Saves the manifest, replacing the old one only once the new one has
+        been written completely, and then deletes the journal.
+        '''
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding = 'UTF-8') as outfile:
+            json.dump({'files': self.files}, outfile, indent = 1, sort_keys = True)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.replace(temp_path, self.path)
+        if os.path.exists(self.journal_path):
+            fsync_path(os.path.dirname(self.path) or '.')
+            os.remove(self.journal_path)
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 21:30:44 2026
+
+@author: Roy Alderton
+
+This script measures the durations in the region of interest of each processed
+TextGrid (e.g. from the process_textgrid_tiers_* scripts) and saves them for
+all the files in one table, one row per file, instead of measuring them with
+separate scripts afterwards.
+
+The region of interest is the 'phrase' interval on the PHRASE tier, which ends
+at the end of the target nasal sound or its oral counterpart. For each file,
+the table has the following columns:
+
+    1. file_name, speaker, condition, pair and word: the file name and its parts
+    (see the stimulus_ids module).
+    2. phrase_start, phrase_end and phrase_duration: the region of interest.
+    3. target_label, target_start, target_end and target_duration: the
+    interval on the SOUND tier that ends at the end of the region of interest,
+    i.e. the target sound.
+    4. preceding_label, preceding_start and preceding_duration: the interval
+    on the SOUND tier just before the target, e.g. the vowel before a final
+    nasal.
+    5. target_onset and preceding_onset: the start of the target and
+    preceding sounds relative to the start of the region of interest.
+    6. target_share: the target's duration as a proportion of the duration of
+    the region of interest.
+
+Times are in seconds. Files without a region of interest, or without a sound
+that ends where it ends, have NaN for the missing times and an empty label.
+
+All the intervals of all the files are first put into one table with the
+textgrid_export module. The region of interest, target and preceding sound of
+every file are then found at once with numpy, by comparing the end of every
+interval on the SOUND tier with the end of its file's region of interest,
+rather than by looping over the files in Python.
+
+The script should be run in the command line by navigating to the correct
+folder and entering a command in the following format:
+
+    python textgrid_measure.py TextGrids/ durations.csv
+
+If using Linux, you may need to replace 'python' with 'python3'.
+
+The TextGrids can also be read from a bundle or a zip or tar archive, or the
+measurements can be made from a table that has already been exported with
+textgrid_export.py (a .npz file or a folder of .npy files), e.g.:
+
+    python textgrid_measure.py tiers.npz durations.csv
+
+The measurements are saved as a CSV file if the output path ends in '.csv',
+and otherwise in the same way as the textgrid_export module saves its tables
+(a .npz file, or a folder with one .npy file per column).
+
+The process_textgrid_tiers_* scripts can also save the measurements straight
+after processing the TextGrids, with the --measure option, e.g.:
+
+    python process_textgrid_tiers_de.py --measure durations.csv
+
+The textgrid_export.py module (and the modules it uses) must be saved in the
+same folder as this script.
+
+You may need to install the numpy library if it isn't already on your
+computer. You can do this by entering the following into the command prompt:
+
+    pip install numpy
+
+"""
+
+import os
+import csv
+import argparse
+import numpy as np
+import stimulus_ids
+import textgrid_export
+
+# Names of the tiers and the label of the region of interest, as written by
+# the processing scripts
+phrase_tier_name = 'PHRASE'
+sound_tier_name = 'SOUND'
+phrase_label = 'phrase'
+
+# The columns of the measurement table, in order
+measurement_columns = ('file_name', 'speaker', 'condition', 'pair', 'word',
+                       'phrase_start', 'phrase_end', 'phrase_duration',
+                       'target_label', 'target_start', 'target_end', 'target_duration',
+                       'preceding_label', 'preceding_start', 'preceding_duration',
+                       'target_onset', 'preceding_onset', 'target_share')
+
+
+def _code(items, item):
+    # The position of an item in one of the table's lists, or -1 if it isn't
+    # there
+    matches = np.flatnonzero(items == item)
+    return int(matches[0]) if len(matches) else -1
+
+
+def measure(table, tolerance = 1e-6):
+    '''
+    Measures the region of interest of every file in a table.
+
+    Parameters
+    ----------
+    table : dict
+        A table made by textgrid_export.build_table() or loaded with
+        textgrid_export.load_table().
+    tolerance : float, optional
+        The largest difference, in seconds, between the end of the target
+        sound and the end of the region of interest. The default is 1e-6.
+
+    Returns
+    -------
+    measurements : dict
+        The columns listed in the module docstring, as numpy arrays with one
+        entry per file.
+
+    '''
+    files = np.asarray(table['files'])
+    n_files = len(files)
+    file_id = np.asarray(table['file_id'])
+    tier_id = np.asarray(table['tier_id'])
+    label_id = np.asarray(table['label_id'])
+    xmin = np.asarray(table['xmin'])
+    xmax = np.asarray(table['xmax'])
+    labels = np.asarray(table['labels'], dtype = object)
+    phrase_tier = _code(np.asarray(table['tiers']), phrase_tier_name)
+    sound_tier = _code(np.asarray(table['tiers']), sound_tier_name)
+
+    # The region of interest of each file
+    rows = np.flatnonzero((tier_id == phrase_tier) & (label_id == _code(labels, phrase_label)))
+    phrase_start = np.full(n_files, np.nan)
+    phrase_end = np.full(n_files, np.nan)
+    phrase_start[file_id[rows]] = xmin[rows]
+    phrase_end[file_id[rows]] = xmax[rows]
+
+    # The sound that ends at the end of each file's region of interest. (NaN
+    # never matches, so files without a region of interest have no target.)
+    rows = np.flatnonzero(tier_id == sound_tier)
+    rows = rows[np.abs(xmax[rows] - phrase_end[file_id[rows]]) <= tolerance]
+    target = np.full(n_files, -1, dtype = np.int64)
+    target[file_id[rows]] = rows
+
+    # The sound before it, if it is on the same tier of the same file
+    preceding = target - 1
+    has_preceding = target > 0
+    has_preceding[has_preceding] = (file_id[preceding[has_preceding]] == np.flatnonzero(has_preceding)) & (tier_id[preceding[has_preceding]] == sound_tier)
+    preceding[~has_preceding] = -1
+
+    def times(column, positions):
+        found = positions >= 0
+        values = np.full(n_files, np.nan)
+        values[found] = column[positions[found]]
+        return values
+
+    def texts(positions):
+        found = positions >= 0
+        values = np.full(n_files, '', dtype = object)
+        values[found] = labels[label_id[positions[found]]]
+        return values.astype(str)
+
+    target_start = times(xmin, target)
+    target_end = times(xmax, target)
+    preceding_start = times(xmin, preceding)
+    phrase_duration = phrase_end - phrase_start
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        target_share = (target_end - target_start) / phrase_duration
+
+    ids = [stimulus_ids.parse_stimulus_id(file) for file in files.tolist()]
+    return {'file_name': files.astype(str),
+            'speaker': np.array([stimulus.speaker or '' for stimulus in ids], dtype = str),
+            'condition': np.array([stimulus.condition or '' for stimulus in ids], dtype = str),
+            'pair': np.array([stimulus.pair if stimulus.pair is not None else -1 for stimulus in ids], dtype = np.int64),
+            'word': np.array([stimulus.word or '' for stimulus in ids], dtype = str),
+            'phrase_start': phrase_start,
+            'phrase_end': phrase_end,
+            'phrase_duration': phrase_duration,
+            'target_label': texts(target),
+            'target_start': target_start,
+            'target_end': target_end,
+            'target_duration': target_end - target_start,
+            'preceding_label': texts(preceding),
+            'preceding_start': preceding_start,
+            'preceding_duration': times(xmax, preceding) - preceding_start,
+            'target_onset': target_start - phrase_start,
+            'preceding_onset': preceding_start - phrase_start,
+            'target_share': target_share}
+
+
+def save_measurements(measurements, output):
+    '''
+    Saves the measurements as a CSV file (if output ends in '.csv') or with
+    textgrid_export.save_table() otherwise.
+    '''
+    if not output.lower().endswith('.csv'):
+        textgrid_export.save_table(measurements, output)
+        return
+    with open(output, 'w', newline = '', encoding = 'UTF-8') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(measurement_columns)
+        writer.writerows(zip(*(measurements[column].tolist() for column in measurement_columns)))
+
+
+def measure_table(table, output, tolerance = 1e-6):
+    '''
+    Measures the region of interest of every file in a table and saves the
+    measurements. See measure() and save_measurements() for details.
+
+    Returns
+    -------
+    measurements : dict
+        The measurements.
+
+    '''
+    measurements = measure(table, tolerance)
+    save_measurements(measurements, output)
+    return measurements
+
+
+def is_table(path):
+    '''Checks whether a path is a table saved by textgrid_export.save_table().'''
+    return path.endswith('.npz') or os.path.isfile(os.path.join(path, 'file_id.npy'))
+
+
+# Measure the TextGrids (or exported table) given
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Measure the region of interest of processed TextGrids and save the durations of all files in one table.')
+    parser.add_argument('path', help = 'folder, bundle or zip/tar archive with the TextGrids, or a table exported with textgrid_export.py')
+    parser.add_argument('output', help = 'a .csv file, a .npz file, or a folder for one .npy file per column')
+    parser.add_argument('--tolerance', type = float, default = 1e-6,
+                        help = 'largest difference, in seconds, between the end of the target and the end of the phrase (default: 1e-6)')
+    args = parser.parse_args()
+
+    if is_table(args.path):
+        table = textgrid_export.load_table(args.path, mmap = not args.path.endswith('.npz'))
+    else:
+        table = textgrid_export.build_table(args.path, textgrid_export.list_textgrids(args.path))
+    measurements = measure_table(table, args.output, args.tolerance)
+    missing = int(np.isnan(measurements['target_duration']).sum())
+    print('Measured {} files ({} without a target sound) and saved them to {}.'.format(len(measurements['file_name']), missing, args.output))
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 22:14:52 2026
+
+@author: Roy Alderton
+
+This script measures the nasalance of each item in a long stereo recording of
+a block of the nasalance experiment (e.g. 0012_nasalance_1), using the TextGrid
+labelled by change_textgrid_labels.py. It is the next step after that script,
+so that nasalance doesn't have to be measured with a separate program.
+
+The script assumes the following:
+
+    1. The TextGrid has a 'silences' tier, on which the interval of each item
+    is labelled with the name of the item (e.g. by change_textgrid_labels.py)
+    and the other intervals are blank.
+
+    2. The recording is a stereo WAV file from the nasometer, with the nasal
+    microphone on one channel and the oral microphone on the other (by
+    default, the nasal microphone on the left channel).
+
+For each labelled interval, the root mean square (RMS) amplitude of each
+channel is measured, and the nasalance is worked out as:
+
+    nasalance = 100 * nasal RMS / (nasal RMS + oral RMS)
+
+The results are saved as a CSV file with one row per item and the columns
+label, xmin, xmax, duration, nasal_rms, oral_rms and nasalance.
+
+The recording is memory-mapped rather than read into memory, and is gone
+through from start to finish in chunks of about ten seconds (see
+interval_energies()). The energy of every interval that overlaps a chunk is
+found at once with numpy from the running total of the squared samples, and
+chunks with no labelled intervals (e.g. long pauses between items) aren't read
+from the disk at all. Only one chunk is in memory at a time, so even an
+hour-long block recording can be measured on a computer with little memory.
+
+The script should be run in the command line by navigating to the correct
+folder and entering a command in the following format:
+
+    python textgrid_nasalance.py [TextGrid_file]
+
+An example for German speaker 12, block 1 in Windows is shown below:
+
+    python textgrid_nasalance.py 0012_nasalance_1_labelled.TextGrid
+
+By default, the recording is the WAV file with the same name as the TextGrid
+without '_labelled' (e.g. 0012_nasalance_1.wav), and the results are saved in
+a CSV file with the same name as the TextGrid with '_nasalance' instead of
+'.TextGrid' (e.g. 0012_nasalance_1_labelled_nasalance.csv). Both can be given
+instead, along with the channel of the nasal microphone (0 for left, 1 for
+right) and the tier, e.g.:
+
+    python textgrid_nasalance.py 0012_nasalance_1_labelled.TextGrid --wav block1.wav --output block1.csv --nasal-channel 1
+
+If using Linux, you may need to replace 'python' with 'python3'.
+
+The textgrid_arrays.py and textgrid_audio.py modules must be saved in the same
+folder as this script.
+
+You may need to install the numpy library if it isn't already on your
+computer. You can do this by entering the following into the command prompt:
+
+    pip install numpy
+"""
+
+import re
+import csv
+import argparse
+import numpy as np
+import textgrid_audio
+import textgrid_arrays
+
+# The columns of the results table, in order
+nasalance_columns = ('label', 'xmin', 'xmax', 'duration', 'nasal_rms', 'oral_rms', 'nasalance')
+
+
+def interval_energies(wav, xmins, xmaxs, chunk_size = 1 << 19):
+    '''
+    Adds up the squared samples of each channel in each of a number of
+    intervals, going through the recording once in chunks.
+
+    Within each chunk, the running total of the squared samples is worked out
+    once, and the total for each interval that overlaps the chunk is the
+    difference between the running totals at its ends, so all the intervals
+    in the chunk are measured at once. Chunks that no interval overlaps are
+    skipped without being read.
+
+    Parameters
+    ----------
+    wav : textgrid_audio.WavFile
+        The recording.
+    xmins : numpy array
+        The start of each interval in seconds.
+    xmaxs : numpy array
+        The end of each interval in seconds.
+    chunk_size : int, optional
+        The number of samples (per channel) read at a time. The default is
+        1 << 19 (about 12 seconds at 44.1 kHz).
+
+    Returns
+    -------
+    energies : numpy array
+        The sum of the squared samples of each interval, with one row per
+        interval and one column per channel.
+    counts : numpy array
+        The number of samples in each interval.
+
+    '''
+    first = np.clip(np.round(np.asarray(xmins) * wav.sample_rate).astype(np.int64), 0, wav.n_samples)
+    last = np.clip(np.round(np.asarray(xmaxs) * wav.sample_rate).astype(np.int64), first, wav.n_samples)
+    energies = np.zeros((len(first), wav.n_channels))
+    if not len(first):
+        return energies, last - first
+
+    for start in range(int(first.min()), int(last.max()), chunk_size):
+        end = min(start + chunk_size, wav.n_samples)
+        overlapping = np.flatnonzero((first < end) & (last > start))
+        if not len(overlapping):
+            continue
+
+        # Running totals of the squared samples, starting from 0 so that the
+        # total between samples a and b is totals[b] - totals[a]
+        samples = wav.read_samples(start, end)
+        totals = np.zeros((len(samples) + 1, wav.n_channels))
+        np.cumsum(samples * samples, axis = 0, out = totals[1:])
+        a = np.clip(first[overlapping] - start, 0, len(samples))
+        b = np.clip(last[overlapping] - start, 0, len(samples))
+        energies[overlapping] += totals[b] - totals[a]
+    return energies, last - first
+
+
+def measure_nasalance(tier, wav, nasal_channel = 0, chunk_size = 1 << 19):
+    '''
+    Measures the nasalance of each labelled interval on a tier.
+
+    Parameters
+    ----------
+    tier : textgrid_arrays.Tier
+        The tier with the items (e.g. 'silences'). Blank intervals are
+        ignored.
+    wav : textgrid_audio.WavFile
+        The stereo recording.
+    nasal_channel : int, optional
+        The channel of the nasal microphone (0 for left, 1 for right). The
+        other channel is taken to be the oral microphone. The default is 0.
+    chunk_size : int, optional
+        See interval_energies(). The default is 1 << 19.
+
+    Raises
+    ------
+    ValueError
+        If the recording isn't stereo.
+
+    Returns
+    -------
+    results : dict
+        The columns listed in nasalance_columns, as numpy arrays with one
+        entry per labelled interval.
+
+    '''
+    if wav.n_channels != 2:
+        raise ValueError('{} has {} channel(s), but nasalance needs a stereo recording'.format(wav.path, wav.n_channels))
+    labels = np.array(tier.texts, dtype = object)
+    labelled = np.flatnonzero(labels != '')
+    xmins = tier.xmins[labelled]
+    xmaxs = tier.xmaxs[labelled]
+
+    energies, counts = interval_energies(wav, xmins, xmaxs, chunk_size)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        rms = np.sqrt(energies / counts[:, np.newaxis])
+        nasal = rms[:, nasal_channel]
+        oral = rms[:, 1 - nasal_channel]
+        nasalance = 100 * nasal / (nasal + oral)
+
+    return {'label': labels[labelled].astype(str),
+            'xmin': xmins,
+            'xmax': xmaxs,
+            'duration': xmaxs - xmins,
+            'nasal_rms': nasal,
+            'oral_rms': oral,
+            'nasalance': nasalance}
+
+
+def save_nasalance(results, output):
+    '''Saves the results of measure_nasalance() as a CSV file.'''
+    with open(output, 'w', newline = '', encoding = 'UTF-8') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(nasalance_columns)
+        writer.writerows(zip(*(results[column].tolist() for column in nasalance_columns)))
+
+
+# Measure the nasalance of each item in the TextGrid given
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Measure the nasalance of each labelled item in a stereo block recording.')
+    parser.add_argument('textgrid', help = 'the TextGrid labelled by change_textgrid_labels.py')
+    parser.add_argument('--wav', default = None,
+                        help = 'the stereo recording (default: the TextGrid name without _labelled, ending in .wav)')
+    parser.add_argument('--output', default = None,
+                        help = 'the CSV file for the results (default: the TextGrid name ending in _nasalance.csv)')
+    parser.add_argument('--tier', default = 'silences', help = 'the tier with the items (default: silences)')
+    parser.add_argument('--nasal-channel', type = int, choices = (0, 1), default = 0,
+                        help = 'the channel of the nasal microphone: 0 for left, 1 for right (default: 0)')
+    args = parser.parse_args()
+
+    textgrid_stem = re.sub(r'\.TextGrid$', '', args.textgrid)
+    wav_name = args.wav or re.sub(r'_labelled$', '', textgrid_stem) + '.wav'
+    output = args.output or textgrid_stem + '_nasalance.csv'
+
+    tg = textgrid_arrays.TextGrid(args.textgrid)
+    with textgrid_audio.WavFile(wav_name) as wav:
+        results = measure_nasalance(tg[args.tier], wav, args.nasal_channel)
+    save_nasalance(results, output)
+
+    # Print the nasalance of each item to check whether it's done it correctly
+    for label, nasalance in zip(results['label'].tolist(), results['nasalance'].tolist()):
+        print('{}\t{:.1f}'.format(label, nasalance))
+    print('\nMeasured {} items and saved them to {}.'.format(len(results['label']), output))
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 15:48:22 2026
+
+@author: Roy Alderton
+
+This module measures how long each stage of processing a TextGrid takes, e.g.
+loading the file, deleting and renaming tiers, finding the region of interest,
+making the transcription fixes, changing the sound and syllable tiers, and
+writing the file.
+
+A StageTimer is started before the first stage, and lap() is called at the end
+of each stage with the name of the stage, which adds the time since the last
+call to that stage, e.g.:
+
+    timer = textgrid_profile.StageTimer()
+    tg = textgrid_arrays.TextGrid(path + file)
+    timer.lap('load')
+    process_textgrid(tg, file, timer)
+    tg.write(path + file)
+    timer.lap('write')
+
+The process_textgrid() function of each process_textgrid_tiers_* script takes
+a timer as an optional third argument and calls lap() after each of its
+stages. By default, it is given no_timer, which does nothing, so the scripts
+are no slower when nothing is being measured.
+
+For whole batch runs, a BatchProfile collects the stage times of every file,
+prints the progress (files per second and the estimated time left) every few
+seconds, and saves a summary as a JSON file at the end. This is what the
+--profile option of the processing scripts and transcribe_textgrids.py uses.
+
+The module should be saved in the same folder as the scripts that use it.
+"""
+
+import sys
+import time
+import json
+
+
+class StageTimer(object):
+    '''
+    Adds up the time spent in each stage. See the module docstring for
+    details.
+    '''
+
+    def __init__(self):
+        self.times = {}
+        self.start()
+
+    def start(self):
+        '''Starts timing the next stage from now.'''
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        '''
+        Adds the time since the last lap (or start) to the given stage.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage that has just finished.
+
+        Returns
+        -------
+        None.
+
+        '''
+        now = time.perf_counter()
+        self.times[stage] = self.times.get(stage, 0.0) + now - self._last
+        self._last = now
+
+
+class _NoTimer(object):
+    # A timer that does nothing, used when nothing is being measured
+
+    def start(self):
+        pass
+
+    def lap(self, stage):
+        pass
+
+
+# The default timer for process_textgrid()
+no_timer = _NoTimer()
+
+
+class BatchProfile(object):
+    '''
+    Collects the stage times of each file in a batch run, prints the progress
+    and summarises the results. See the module docstring for details.
+    '''
+
+    def __init__(self, n_files, interval = 5.0):
+        '''
+        Parameters
+        ----------
+        n_files : int or None
+            The number of files that will be processed, or None if this isn't
+            known in advance (e.g. when reading a tar archive), in which case
+            no estimate of the time left is given.
+        interval : float, optional
+            How often to print the progress, in seconds. The default is 5.0.
+
+        '''
+        self.n_files = n_files
+        self.interval = interval
+        self.files = {}
+        self.n_done = 0
+        self.start_time = time.perf_counter()
+        self._last_print = self.start_time
+
+    def add(self, file, stages = None):
+        '''
+        Records the stage times of one file (None if it failed) and prints the
+        progress if it hasn't been printed for a while.
+        '''
+        self.n_done += 1
+        if stages is not None:
+            self.files[file] = dict(stages)
+        now = time.perf_counter()
+        if now - self._last_print >= self.interval or self.n_done == self.n_files:
+            self._last_print = now
+            print(self.progress(now), file = sys.stderr)
+
+    def progress(self, now = None):
+        '''Returns the progress so far as text, with an estimate of the time left.'''
+        elapsed = (now or time.perf_counter()) - self.start_time
+        rate = self.n_done / elapsed if elapsed > 0 else 0.0
+        if self.n_files is None:
+            return '[{} files, {:.1f} files/s]'.format(self.n_done, rate)
+        remaining = (self.n_files - self.n_done) / rate if rate > 0 else float('nan')
+        return '[{}/{} files, {:.1f} files/s, about {:.0f} s left]'.format(self.n_done, self.n_files, rate, remaining)
+
+    def summary(self):
+        '''
+        Summarises the run.
+
+        Returns
+        -------
+        summary : dict
+            The number of files, the wall time, the number of files processed
+            per second, and for each stage the total time, the mean and
+            maximum time per file, the file that took longest and the stage's
+            share of the total. The stage times of each file are included
+            under 'per_file'.
+
+        '''
+        wall_time = time.perf_counter() - self.start_time
+        stages = {}
+        for file, file_stages in self.files.items():
+            for stage, seconds in file_stages.items():
+                entry = stages.setdefault(stage, {'total_seconds': 0.0, 'max_ms': 0.0, 'slowest_file': None})
+                entry['total_seconds'] += seconds
+                if 1000 * seconds >= entry['max_ms']:
+                    entry['max_ms'] = 1000 * seconds
+                    entry['slowest_file'] = file
+
+        total = sum(entry['total_seconds'] for entry in stages.values())
+        for entry in stages.values():
+            entry['mean_ms'] = 1000 * entry['total_seconds'] / len(self.files)
+            entry['share'] = entry['total_seconds'] / total if total else 0.0
+
+        return {'files': self.n_done,
+                'profiled_files': len(self.files),
+                'wall_seconds': wall_time,
+                'files_per_second': self.n_done / wall_time if wall_time > 0 else 0.0,
+                'stages': stages,
+                'per_file': self.files}
+
+    def report(self, summary = None):
+        '''Returns a table of the time spent in each stage as text.'''
+        summary = summary or self.summary()
+        lines = ['\nProcessed {} files in {:.1f} s ({:.1f} files/s).'.format(summary['files'], summary['wall_seconds'], summary['files_per_second']),
+                 '    {:<10} {:>10} {:>14} {:>7}'.format('stage', 'total (s)', 'per file (ms)', 'share')]
+        for stage, entry in summary['stages'].items():
+            lines.append('    {:<10} {:>10.3f} {:>14.3f} {:>6.1f}%'.format(stage, entry['total_seconds'], entry['mean_ms'], 100 * entry['share']))
+        return '\n'.join(lines)
+
+    def save(self, path):
+        '''
+        Prints the stage table and saves the summary as a JSON file.
+
+        Parameters
+        ----------
+        path : str
+            The path of the JSON file.
+
+        Returns
+        -------
+        None.
+
+        '''
+        summary = self.summary()
+        print(self.report(summary))
+        with open(path, 'w', encoding = 'UTF-8') as outfile:
+            json.dump(summary, outfile, indent = 1)
+        print('Saved the profile to {}.'.format(path))
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 13:41:36 2026
+
+@author: Roy Alderton
+
+This module finds the region of interest in the stimuli, which the
+process_textgrid_tiers_* scripts mark with the 'phrase' interval on the new
+PHRASE tier.
+
+The region of interest is described in the same way for all three languages:
+
+    1. It starts at the beginning of the first interval on the sound (MAU)
+    tier with one of the start labels, e.g. the [e:] in 'Kleo' for German.
+    2. It ends at the end of a given interval (counting from 0) out of those
+    with one of the end labels, i.e. the target nasal sounds and their oral
+    counterparts, plus the other nasals and stops that always come before the
+    target in the carrier phrase. For example, the end index is 1 for German,
+    because each German item has a [k] in 'Kleo' before the target.
+    3. Some words need a different end index, e.g. French words with an extra
+    vowel or nasal before the target. These are given as overrides, which are
+    looked up by word (e.g. 'Yann') or, for settings that only apply to one
+    member of a pair, by (condition, pair, word) (e.g. ('fin_or', 13, 'lotte'))
+    using the stimulus_ids module.
+
+Each script describes its region of interest once, as a RegionOfInterest
+object, e.g.:
+
+    region_of_interest = textgrid_roi.RegionOfInterest(start_labels = ['e:'], end_labels = ['m', 'n', 'N', 'p', 't', 'k', 'x'], end_index = 1)
+
+For each tier, the labels are checked against the start and end labels once
+per entry in the tier's label table rather than once per interval. The tier is
+then scanned from the beginning only until both boundaries have been found.
+
+If either boundary can't be found (e.g. because MAUS has missed the start
+vowel), a ValueError is raised that says which sound was missing.
+
+The module should be saved in the same folder as the scripts that use it.
+"""
+
+import stimulus_ids
+
+
+class RegionOfInterest(object):
+    '''
+    A description of the region of interest in the stimuli. See the module
+    docstring for details.
+    '''
+
+    def __init__(self, start_labels, end_labels, end_index, overrides = None):
+        '''
+        Parameters
+        ----------
+        start_labels : list
+            The labels of the sound that starts the region of interest. The
+            first interval with one of these labels is used.
+        end_labels : list
+            The labels of the target sounds and the other sounds that are
+            counted to find the end of the region of interest.
+        end_index : int
+            Which of the intervals with one of the end labels (counting from 0)
+            ends the region of interest.
+        overrides : dict, optional
+            A different end index for specific words, looked up with
+            stimulus_ids.lookup(). The default is None (no overrides).
+
+        '''
+        self.start_labels = frozenset(start_labels)
+        self.end_labels = frozenset(end_labels)
+        self.end_index = end_index
+        self.overrides = dict(overrides or {})
+
+    def end_index_for(self, file):
+        '''
+        Returns the end index for the given file, taking any override into
+        account.
+        '''
+        return stimulus_ids.lookup(self.overrides, file, self.end_index)
+
+    def find(self, tier, file):
+        '''
+        Finds the start and end times of the region of interest.
+
+        Parameters
+        ----------
+        tier : Tier object from the textgrid_arrays module
+            The sound (MAU) tier.
+        file : str
+            The file name of the TextGrid, used to look up any override.
+
+        Raises
+        ------
+        ValueError
+            If the tier has no interval with one of the start labels, or too
+            few intervals with one of the end labels.
+
+        Returns
+        -------
+        start : float
+            The start time of the region of interest.
+        end : float
+            The end time of the region of interest.
+
+        '''
+        end_index = self.end_index_for(file)
+
+        # Check each label in the label table once
+        is_start = [label in self.start_labels for label in tier.labels]
+        is_end = [label in self.end_labels for label in tier.labels]
+
+        start_position = None
+        end_position = None
+        end_count = 0
+        for position, code in enumerate(tier.codes.tolist()):
+            if start_position is None and is_start[code]:
+                start_position = position
+            if end_position is None and is_end[code]:
+                if end_count == end_index:
+                    end_position = position
+                end_count += 1
+            if start_position is not None and end_position is not None:
+                break
+
+        if start_position is None:
+            raise ValueError('no [{}] found on the sound tier'.format('] or ['.join(sorted(self.start_labels))))
+        if end_position is None:
+            raise ValueError('only {} target or carrier phrase sounds found on the sound tier, but the region of interest ends at number {}'.format(end_count, end_index + 1))
+
+        return float(tier.xmins[start_position]), float(tier.xmaxs[end_position])
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 11:48:20 2026
+
+@author: Roy Alderton
+
+This module applies the simple transcription corrections made by the
+process_textgrid_tiers_* scripts (e.g. replacing 'a~' with 'A~' or '3`' with
+'@r') to whole tiers at once.
+
+Each script lists its corrections as a table of Rule objects, in the order in
+which they should be applied. Each rule is one of the following:
+
+    1. A plain text replacement, like str.replace(), e.g. Rule('Q', 'A').
+    2. A regex replacement, like re.sub(), e.g. Rule(r'u$|u\\s', 'u:', regex = True).
+    3. A replacement of whole labels only, e.g. Rule('n @r', 'n @r d', whole = True),
+    which only changes labels that are exactly 'n @r'.
+
+Any rule can also have a condition, which is a function that takes the file
+name and returns True if the rule should be used for that file, e.g.
+Rule('?', 't', condition = lambda file: 'p13' not in file).
+
+The rules are turned into a RuleSet, which works as follows:
+
+    1. All the rules' patterns are compiled into one combined regex, so a
+    label can be checked against every rule with a single search. Labels that
+    don't match it can't be changed by any of the rules and are left alone.
+    2. The tiers of the textgrid_arrays module store each label only once, in a
+    label table, so the rules are applied to the label table rather than to
+    every interval. This means a label such as 'n' is corrected once per tier,
+    however many times it appears.
+    3. The corrected version of every label is also remembered across tiers
+    and files, so each label is only corrected once per run.
+
+Because the matching labels still go through the rules one after another, the
+results are the same as applying the rules as a chain of str.replace() and
+re.sub() calls, even when one rule changes the text that a later rule looks
+for (e.g. 'u ' -> 'u:' and then 's u:n' -> 's u: n').
+
+The module should be saved in the same folder as the scripts that use it.
+"""
+
+import re
+import numpy as np
+from collections import namedtuple
+
+# A single correction rule. See the module docstring for details.
+Rule = namedtuple('Rule', ['pattern', 'replacement', 'regex', 'whole', 'condition'], defaults = [False, False, None])
+
+
+class RuleSet(object):
+    '''
+    A table of Rule objects, compiled so that they can be applied to whole
+    tiers at once. See the module docstring for details.
+    '''
+
+    def __init__(self, rules):
+        '''
+        Parameters
+        ----------
+        rules : list
+            A list of Rule objects, in the order in which they should be
+            applied.
+
+        '''
+        self.rules = list(rules)
+
+        # Compiled versions of the rules for each combination of conditions,
+        # so that the conditions only need to be checked once per file
+        self._compiled = {}
+
+    def for_file(self, file):
+        '''
+        Returns the compiled rules that apply to the given file.
+
+        Parameters
+        ----------
+        file : str
+            The file name of the TextGrid.
+
+        Returns
+        -------
+        compiled : CompiledRules
+            The compiled rules, whose conditions (if any) are true for the file.
+
+        '''
+        active = tuple(rule.condition is None or bool(rule.condition(file)) for rule in self.rules)
+        compiled = self._compiled.get(active)
+        if compiled is None:
+            compiled = CompiledRules([rule for rule, is_active in zip(self.rules, active) if is_active])
+            self._compiled[active] = compiled
+        return compiled
+
+    def apply(self, tier, file):
+        '''
+        Applies the rules for the given file to all intervals in a tier.
+
+        Parameters
+        ----------
+        tier : Tier object from the textgrid_arrays module
+            The tier to correct, which is changed in place.
+        file : str
+            The file name of the TextGrid.
+
+        Returns
+        -------
+        None.
+
+        '''
+        self.for_file(file).apply_to_tier(tier)
+
+
+class CompiledRules(object):
+    '''
+    A list of rules compiled into a single combined regex. Created by
+    RuleSet.for_file() and not intended to be created directly.
+    '''
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.steps = []
+        patterns = []
+        for rule in rules:
+            if rule.whole:
+                pattern = '^' + re.escape(rule.pattern) + '$'
+                self.steps.append(('whole', rule.pattern, rule.replacement))
+            elif rule.regex:
+                pattern = rule.pattern
+                self.steps.append(('regex', re.compile(rule.pattern), rule.replacement))
+            else:
+                pattern = re.escape(rule.pattern)
+                self.steps.append(('text', rule.pattern, rule.replacement))
+            patterns.append('(?:{})'.format(pattern))
+
+        # One regex that matches wherever any of the rules would match
+        self.trigger = re.compile('|'.join(patterns)) if patterns else None
+
+        # Corrected versions of the labels seen so far
+        self.cache = {}
+
+    def apply_to_label(self, text):
+        '''
+        Returns the corrected version of a single label.
+        '''
+        corrected = self.cache.get(text)
+        if corrected is not None:
+            return corrected
+
+        corrected = text
+        if self.trigger is not None and self.trigger.search(text):
+            for kind, pattern, replacement in self.steps:
+                if kind == 'whole':
+                    if corrected == pattern:
+                        corrected = replacement
+                elif kind == 'regex':
+                    corrected = pattern.sub(replacement, corrected)
+                else:
+                    corrected = corrected.replace(pattern, replacement)
+
+        self.cache[text] = corrected
+        return corrected
+
+    def apply_to_tier(self, tier):
+        '''
+        Corrects every label in a tier by correcting its label table and then
+        pointing each interval at the corrected label.
+        '''
+        if len(tier) == 0:
+            return
+        new_codes = np.array([tier.intern(self.apply_to_label(label)) for label in list(tier.labels)], dtype = np.int32)
+        tier.codes = new_codes[tier.codes]
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 22:47:30 2026
+
+@author: Roy Alderton
+
+This script makes the TextGrids for the long stereo files recorded for each
+block in the nasalance experiment (e.g. 0012_nasalance_1), with a 'silences'
+tier that alternates between blank intervals for silence and intervals
+labelled 'speech' for the items. It does the same as Praat's 'Annotate to
+TextGrid (silences)...' function, so the TextGrids no longer have to be made
+in Praat one block at a time before they are labelled with
+change_textgrid_labels.py.
+
+The silences are found in the same way as in Praat:
+
+    1. The intensity of the recording is measured in overlapping frames, as
+    Praat's 'To Intensity...' does: each frame is weighted with a Kaiser
+    window 6.4 / pitch floor seconds long, after subtracting its mean, and
+    the frames are 0.8 / pitch floor seconds apart (by default). The
+    intensity of a stereo recording is the average of its two channels.
+
+    2. Frames more than the silence threshold (25 dB by default) below the
+    loudest frame are silent, and the rest are sounding. Boundaries are put
+    half way between neighbouring silent and sounding frames.
+
+    3. Sounding intervals shorter than the minimum sounding interval duration
+    are made silent, and then silent intervals shorter than the minimum
+    silent interval duration are made sounding (0.1 seconds by default for
+    both), merging them with the intervals either side.
+
+The recording is memory-mapped rather than read into memory (see the
+textgrid_audio module), and the intensity of a few hundred frames at a time
+is measured at once with numpy, so only a small part of the recording is in
+memory at any time. The silences of a whole session of hour-long recordings
+can be found in seconds.
+
+The script should be run in the command line by navigating to the correct
+folder and entering a command in the following format:
+
+    python textgrid_silences.py [WAV_file ...]
+
+An example for German speaker 12, block 1 in Windows is shown below:
+
+    python textgrid_silences.py 0012_nasalance_1.wav
+
+This makes 0012_nasalance_1.TextGrid, which can then be labelled with
+change_textgrid_labels.py. If no WAV files are given, a TextGrid is made for
+every WAV file in the folder. Existing TextGrids (e.g. ones that have been
+corrected by hand) are not replaced unless the --force option is used.
+
+The settings of Praat's function can be changed with the --pitch-floor,
+--time-step, --silence-threshold, --min-silent and --min-sounding options,
+e.g.:
+
+    python textgrid_silences.py 0012_nasalance_1.wav --silence-threshold -30 --min-silent 0.25
+
+If using Linux, you may need to replace 'python' with 'python3'.
+
+The textgrid_arrays.py and textgrid_audio.py modules must be saved in the same
+folder as this script.
+
+You may need to install the numpy library if it isn't already on your
+computer. You can do this by entering the following into the command prompt:
+
+    pip install numpy
+"""
+
+import os
+import argparse
+import numpy as np
+import textgrid_audio
+import textgrid_arrays
+
+# The name of the tier and the labels of its intervals, as expected by
+# change_textgrid_labels.py
+tier_name = 'silences'
+silent_label = ''
+sounding_label = 'speech'
+
+
+def intensity(wav, pitch_floor = 100.0, time_step = 0.0, block_frames = 512):
+    '''
+    Measures the intensity of a recording in overlapping frames, as Praat's
+    'To Intensity...' does (with 'Subtract mean' on).
+
+    Parameters
+    ----------
+    wav : textgrid_audio.WavFile
+        The recording.
+    pitch_floor : float, optional
+        The lowest pitch expected, in Hz, which sets the window length. The
+        default is 100.0.
+    time_step : float, optional
+        The time between frames in seconds, or 0.0 for 0.8 / pitch_floor. The
+        default is 0.0.
+    block_frames : int, optional
+        The number of frames measured at once. The default is 512.
+
+    Raises
+    ------
+    ValueError
+        If the recording is shorter than one window.
+
+    Returns
+    -------
+    times : numpy array
+        The time of the centre of each frame in seconds.
+    values : numpy array
+        The intensity of each frame in dB.
+
+    '''
+    # The window and time step, as in Praat
+    window_duration = 6.4 / pitch_floor
+    if time_step <= 0:
+        time_step = 0.8 / pitch_floor
+    half_window = int(0.5 * window_duration * wav.sample_rate)
+    window = np.kaiser(2 * half_window + 1, 2 * np.pi ** 2 + 0.5)
+    window_sum = window.sum()
+
+    # Fit as many frames as possible into the recording, centred on it
+    n_frames = int(np.floor((wav.duration - window_duration) / time_step)) + 1
+    if n_frames < 1 or wav.n_samples < len(window):
+        raise ValueError('{} is shorter than one analysis window ({} s)'.format(wav.path, window_duration))
+    times = 0.5 * wav.duration - 0.5 * n_frames * time_step + (np.arange(n_frames) + 0.5) * time_step
+    centres = np.clip(np.round(times * wav.sample_rate - 0.5).astype(np.int64), half_window, wav.n_samples - half_window - 1)
+
+    power = np.empty(n_frames)
+    for block in range(0, n_frames, block_frames):
+        block_centres = centres[block:block + block_frames]
+        first = int(block_centres[0]) - half_window
+        samples = wav.read_samples(first, int(block_centres[-1]) + half_window + 1)
+
+        # Weighted mean square of each frame after subtracting its mean,
+        # averaged over the channels
+        block_power = np.zeros(len(block_centres))
+        for channel in range(samples.shape[1]):
+            frames = np.lib.stride_tricks.sliding_window_view(samples[:, channel], len(window))[block_centres - half_window - first]
+            frames = frames - frames.mean(axis = 1, keepdims = True)
+            block_power += (frames * frames) @ window
+        power[block:block + block_frames] = block_power / (window_sum * samples.shape[1])
+
+    # Convert to dB relative to the auditory threshold (2e-5 Pa), with
+    # -300 dB for complete silence, as in Praat
+    power /= 4e-10
+    with np.errstate(divide = 'ignore'):
+        values = np.where(power < 1e-30, -300.0, 10 * np.log10(np.maximum(power, 1e-30)))
+    return times, values
+
+
+def _remove_short(edges, sounding, state, min_duration):
+    # Switch the intervals with the given state that are shorter than the
+    # minimum duration to the other state, then merge neighbouring intervals
+    # with the same state
+    short = (sounding == state) & (np.diff(edges) < min_duration)
+    sounding = np.where(short, not state, sounding)
+    keep = np.concatenate(([True], sounding[1:] != sounding[:-1]))
+    return np.concatenate((edges[:-1][keep], edges[-1:])), sounding[keep]
+
+
+def detect_silences(wav, pitch_floor = 100.0, time_step = 0.0, silence_threshold = -25.0, min_silent = 0.1, min_sounding = 0.1):
+    '''
+    Finds the silent and sounding intervals of a recording, as Praat's
+    'To TextGrid (silences)...' does. See the module docstring for details.
+
+    Parameters
+    ----------
+    wav : textgrid_audio.WavFile
+        The recording.
+    pitch_floor : float, optional
+        See intensity(). The default is 100.0.
+    time_step : float, optional
+        See intensity(). The default is 0.0.
+    silence_threshold : float, optional
+        How far below the loudest frame a frame must be to be silent, in dB.
+        The default is -25.0.
+    min_silent : float, optional
+        The shortest silent interval in seconds. The default is 0.1.
+    min_sounding : float, optional
+        The shortest sounding interval in seconds. The default is 0.1.
+
+    Returns
+    -------
+    edges : numpy array
+        The boundaries of the intervals, including the start and end of the
+        recording.
+    sounding : numpy array
+        Whether each interval is sounding (True) or silent (False).
+
+    '''
+    times, values = intensity(wav, pitch_floor, time_step)
+    threshold = max(values.max() + silence_threshold, values.min())
+    frames_sounding = values >= threshold
+
+    # Put a boundary half way between each pair of frames that differ
+    changes = np.flatnonzero(frames_sounding[1:] != frames_sounding[:-1])
+    edges = np.concatenate(([0.0], (times[changes] + times[changes + 1]) / 2, [wav.duration]))
+    sounding = np.concatenate((frames_sounding[:1], frames_sounding[changes + 1]))
+
+    # Remove short sounding intervals first and then short silent ones, which
+    # Praat finds works better than the other way round
+    edges, sounding = _remove_short(edges, sounding, True, min_sounding)
+    edges, sounding = _remove_short(edges, sounding, False, min_silent)
+    return edges, sounding
+
+
+def silences_textgrid(wav, **settings):
+    '''
+    Makes a TextGrid with a 'silences' tier for a recording. The settings are
+    passed on to detect_silences().
+
+    Returns
+    -------
+    tg : textgrid_arrays.TextGrid
+        The new TextGrid.
+
+    '''
+    edges, sounding = detect_silences(wav, **settings)
+    tg = textgrid_arrays.TextGrid(xmin = 0.0, xmax = wav.duration)
+    texts = [sounding_label if state else silent_label for state in sounding.tolist()]
+    tg[tier_name] = textgrid_arrays.Tier.from_arrays(edges[:-1], edges[1:], texts, xmin = 0.0, xmax = wav.duration)
+    return tg
+
+
+# Make a TextGrid for each WAV file given (or all the WAV files in the folder)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Make TextGrids with a silences tier for block recordings, like Praat\'s "Annotate to TextGrid (silences)".')
+    parser.add_argument('wav_files', nargs = '*', help = 'the recordings (default: every WAV file in the folder)')
+    parser.add_argument('--pitch-floor', type = float, default = 100.0, help = 'minimum pitch in Hz (default: 100)')
+    parser.add_argument('--time-step', type = float, default = 0.0, help = 'time step in seconds, or 0 for automatic (default: 0)')
+    parser.add_argument('--silence-threshold', type = float, default = -25.0, help = 'silence threshold in dB (default: -25)')
+    parser.add_argument('--min-silent', type = float, default = 0.1, help = 'minimum silent interval duration in seconds (default: 0.1)')
+    parser.add_argument('--min-sounding', type = float, default = 0.1, help = 'minimum sounding interval duration in seconds (default: 0.1)')
+    parser.add_argument('--force', action = 'store_true', help = 'replace existing TextGrids')
+    args = parser.parse_args()
+
+    wav_files = args.wav_files or sorted(file for file in os.listdir('.') if file.lower().endswith('.wav'))
+    settings = {'pitch_floor': args.pitch_floor, 'time_step': args.time_step, 'silence_threshold': args.silence_threshold,
+                'min_silent': args.min_silent, 'min_sounding': args.min_sounding}
+
+    for wav_file in wav_files:
+        textgrid_name = os.path.splitext(wav_file)[0] + '.TextGrid'
+        if os.path.exists(textgrid_name) and not args.force:
+            print('Skipping {}: {} already exists.'.format(wav_file, textgrid_name))
+            continue
+        with textgrid_audio.WavFile(wav_file) as wav:
+            tg = silences_textgrid(wav, **settings)
+        tg.write(textgrid_name)
+        print('Saved {} ({} items).'.format(textgrid_name, tg[tier_name].texts.count(sounding_label)))
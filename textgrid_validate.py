@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 18:02:37 2026
+
+@author: Roy Alderton
+
+This script checks a whole folder of TextGrids (e.g. the output of the
+process_textgrid_tiers_* scripts) for problems with the timing of the tiers,
+which Praat doesn't always complain about but which cause problems later
+(e.g. when measuring durations). It looks for:
+
+    1. Gaps between adjacent intervals ('gap'), where an interval doesn't start
+    where the previous one ends.
+    2. Adjacent intervals that overlap ('overlap').
+    3. Intervals with a zero or negative duration ('duration'), e.g. from
+    splitting a very short interval at a proportion of its duration.
+    4. Intervals on the PHRASE tier that run backwards ('backwards phrase'),
+    i.e. where the region of interest ends before it starts.
+    5. Tiers whose first interval doesn't start at the start of the tier
+    ('tier start'), or whose last interval doesn't end at the end of the tier
+    ('tier end').
+    6. Tiers that don't end at the end of the file ('file end'), e.g. a new
+    tier that ends at the end of the sound tier rather than of the recording.
+    7. Points on a point tier that are out of order ('point order') or outside
+    the tier ('point outside tier').
+
+All the files are loaded first, and the boundaries of every interval of every
+tier are put into one set of arrays. Each check is then made on the whole
+corpus at once with numpy, comparing each boundary with the next one, rather
+than by looping over the intervals in Python. Boundaries that differ by less
+than a tolerance (a nanosecond by default) count as the same, to allow for
+rounding in the TextGrid files.
+
+The script should be run in the command line by navigating to the correct
+folder and entering a command in the following format:
+
+    python textgrid_validate.py TextGrids/
+
+If using Linux, you may need to replace 'python' with 'python3'.
+
+Each problem is listed with the file, the tier, the type of problem and the
+time at which it occurs, followed by the number of problems of each type. The
+script exits with an error code if there are any problems, so it can be used
+to check the output of a batch run automatically.
+
+The textgrid_arrays.py module must be saved in the same folder as this script.
+
+You may need to install the numpy library if it isn't already on your
+computer. You can do this by entering the following into the command prompt:
+
+    pip install numpy
+
+"""
+
+import os
+import sys
+import argparse
+from collections import Counter
+import numpy as np
+import textgrid_arrays
+
+# Name of the tier with the region of interest
+phrase_tier_name = 'PHRASE'
+
+
+def load_boundaries(path, file_list):
+    '''
+    Loads a list of TextGrids and puts the boundaries of all their tiers into
+    one set of arrays.
+
+    Parameters
+    ----------
+    path : str
+        The folder the TextGrids are in.
+    file_list : list
+        The file names of the TextGrids.
+
+    Returns
+    -------
+    corpus : dict
+        The following numpy arrays, with one entry per tier: 'tier_file' (the
+        number of the file in file_list), 'tier_name' (the tier name),
+        'tier_xmin', 'tier_xmax', 'file_xmax' (the end of the file),
+        'is_point' (whether the tier is a point tier) and 'offsets' (where
+        the tier's intervals start in the interval arrays, plus the total
+        number of intervals at the end). Then the following, with one entry
+        per interval (or point): 'xmin', 'xmax' and 'tier' (the number of the
+        tier in the tier arrays).
+
+    '''
+    tier_file = []
+    tier_name = []
+    tier_xmin = []
+    tier_xmax = []
+    file_xmax = []
+    is_point = []
+    lengths = []
+    xmins = []
+    xmaxs = []
+    for file_code, file in enumerate(file_list):
+        tg = textgrid_arrays.TextGrid(os.path.join(path, file))
+        for name, tier in tg.items():
+            tier_file.append(file_code)
+            tier_name.append(name)
+            tier_xmin.append(tier.xmin)
+            tier_xmax.append(tier.xmax)
+            file_xmax.append(tg.xmax)
+            is_point.append(tier.is_point_tier)
+            lengths.append(len(tier))
+            xmins.append(tier.xmins)
+            xmaxs.append(tier.xmaxs)
+
+    lengths = np.array(lengths, dtype = np.int64)
+    return {'tier_file': np.array(tier_file, dtype = np.int64),
+            'tier_name': np.array(tier_name, dtype = object),
+            'tier_xmin': np.array(tier_xmin, dtype = np.float64),
+            'tier_xmax': np.array(tier_xmax, dtype = np.float64),
+            'file_xmax': np.array(file_xmax, dtype = np.float64),
+            'is_point': np.array(is_point, dtype = bool),
+            'offsets': np.concatenate([[0], np.cumsum(lengths)]),
+            'xmin': np.concatenate(xmins) if xmins else np.zeros(0),
+            'xmax': np.concatenate(xmaxs) if xmaxs else np.zeros(0),
+            'tier': np.repeat(np.arange(len(lengths)), lengths)}
+
+
+def find_problems(corpus, tolerance = 1e-9):
+    '''
+    Checks the boundaries loaded by load_boundaries() for the problems listed
+    in the module docstring.
+
+    Parameters
+    ----------
+    corpus : dict
+        The arrays returned by load_boundaries().
+    tolerance : float, optional
+        The largest difference between two boundaries, in seconds, that still
+        counts as no difference. The default is 1e-9.
+
+    Returns
+    -------
+    problems : list
+        A (tier, kind, time, value) tuple for each problem, where tier is the
+        number of the tier in the tier arrays, kind is the type of problem,
+        time is where it occurs and value is the size of the gap, overlap etc.
+        in seconds.
+
+    '''
+    xmin = corpus['xmin']
+    xmax = corpus['xmax']
+    tier = corpus['tier']
+    is_point = corpus['is_point']
+    is_phrase = corpus['tier_name'] == phrase_tier_name
+    problems = []
+
+    def add(kind, tiers, times, values):
+        problems.extend(zip(tiers.tolist(), [kind] * len(tiers), times.tolist(), values.tolist()))
+
+    # Compare each interval with the next one on the same tier
+    same_tier = tier[1:] == tier[:-1]
+    step = xmin[1:] - xmax[:-1]
+    interval_pair = same_tier & ~is_point[tier[1:]]
+    for kind, found in (('gap', interval_pair & (step > tolerance)),
+                        ('overlap', interval_pair & (step < -tolerance))):
+        positions = np.flatnonzero(found)
+        add(kind, tier[positions], xmax[positions], np.abs(step[positions]))
+
+    point_pair = same_tier & is_point[tier[1:]]
+    positions = np.flatnonzero(point_pair & (xmin[1:] < xmin[:-1] - tolerance))
+    add('point order', tier[positions + 1], xmin[positions + 1], xmin[positions] - xmin[positions + 1])
+
+    # Durations of each interval. A PHRASE interval that runs backwards is
+    # reported as such rather than as a negative duration.
+    duration = xmax - xmin
+    interval = ~is_point[tier]
+    backwards = interval & is_phrase[tier] & (duration < -tolerance)
+    positions = np.flatnonzero(backwards)
+    add('backwards phrase', tier[positions], xmin[positions], duration[positions])
+    positions = np.flatnonzero(interval & ~backwards & (duration <= tolerance))
+    add('duration', tier[positions], xmin[positions], duration[positions])
+
+    positions = np.flatnonzero(is_point[tier] & ((xmin < corpus['tier_xmin'][tier] - tolerance) | (xmin > corpus['tier_xmax'][tier] + tolerance)))
+    add('point outside tier', tier[positions], xmin[positions], xmin[positions])
+
+    # Compare the first and last interval of each (non-empty) interval tier
+    # with the tier and the tier with the file
+    offsets = corpus['offsets']
+    tiers = np.flatnonzero(~is_point & (offsets[1:] > offsets[:-1]))
+    first = offsets[tiers]
+    last = offsets[tiers + 1] - 1
+    for kind, times, expected in (('tier start', xmin[first], corpus['tier_xmin'][tiers]),
+                                  ('tier end', xmax[last], corpus['tier_xmax'][tiers])):
+        found = np.abs(times - expected) > tolerance
+        add(kind, tiers[found], times[found], (times - expected)[found])
+
+    tiers = np.arange(len(is_point))
+    found = np.abs(corpus['tier_xmax'] - corpus['file_xmax']) > tolerance
+    add('file end', tiers[found], corpus['tier_xmax'][found], (corpus['tier_xmax'] - corpus['file_xmax'])[found])
+
+    # List the problems in the order of the files and tiers
+    problems.sort(key = lambda problem: (problem[0], problem[2]))
+    return problems
+
+
+def validate(path, file_list, tolerance = 1e-9):
+    '''
+    Checks a list of TextGrids for problems. See load_boundaries() and
+    find_problems() for details.
+
+    Returns
+    -------
+    problems : list
+        A (file, tier name, kind, time, value) tuple for each problem.
+
+    '''
+    corpus = load_boundaries(path, file_list)
+    return [(file_list[corpus['tier_file'][tier]], corpus['tier_name'][tier], kind, time, value) for tier, kind, time, value in find_problems(corpus, tolerance)]
+
+
+# Check the TextGrids in the given folder
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Check a folder of TextGrids for gaps, overlaps and other problems with the timing of the tiers.')
+    parser.add_argument('path', help = 'folder with the TextGrids')
+    parser.add_argument('--tolerance', type = float, default = 1e-9,
+                        help = 'largest difference between boundaries, in seconds, that counts as none (default: 1e-9)')
+    args = parser.parse_args()
+
+    tg_list = sorted(file for file in os.listdir(args.path) if 'practice' not in file and file.endswith('.TextGrid'))
+    problems = validate(args.path, tg_list, args.tolerance)
+    for file, name, kind, time, value in problems:
+        print('{}  {}  {} at {:.6f} s ({:+.6f} s)'.format(file, name, kind, time, value))
+
+    counts = Counter(problem[2] for problem in problems)
+    print('\nChecked {} files: {}.'.format(len(tg_list), ', '.join('{} {}'.format(count, kind) for kind, count in sorted(counts.items())) if problems else 'no problems found'))
+    sys.exit(1 if problems else 0)
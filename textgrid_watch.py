@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 16 17:05:13 2026
+
+@author: Roy Alderton
+
+This module lets the process_textgrid_tiers_* scripts keep running and process
+new TextGrids as soon as they are saved in the TextGrids folder (e.g. as the
+results come back from WebMAUS during a session), instead of the script having
+to be run again each time.
+
+On Linux, the folder is watched with inotify, so the script is told about new
+and changed files straight away without checking the folder over and over. On
+other systems, the folder is checked once a second for new files or changes to
+the size or modification time of existing ones.
+
+A file is only processed once it hasn't changed for a short time (two seconds
+by default), so that a file that is still being copied isn't processed while
+it is only half there, and a file that is saved several times in quick
+succession is only processed once. The files are processed in the same
+process as the script, where the script and its rules are already loaded, and
+files that the manifest shows are already up to date (including the TextGrids
+the script has just written itself) are ignored.
+
+The module is used through the --watch option of the processing scripts, e.g.:
+
+    python process_textgrid_tiers_de.py --watch
+
+The module should be saved in the same folder as the scripts that use it.
+"""
+
+import os
+import sys
+import time
+import select
+import struct
+
+# inotify event flags (from <sys/inotify.h>)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_CLOEXEC = 0o2000000
+
+# The header of each inotify event: watch descriptor, flags, cookie and the
+# length of the file name that follows it
+_event_header = struct.Struct('iIII')
+
+
+def is_textgrid(file):
+    '''Checks whether a file name is one of the TextGrids to be processed.'''
+    return 'practice' not in file and file.endswith('.TextGrid')
+
+
+class FolderWatcher(object):
+    '''
+    Reports the TextGrids in a folder that are new or have changed. See the
+    module docstring for details.
+    '''
+
+    def __init__(self, path, poll_interval = 1.0):
+        '''
+        Parameters
+        ----------
+        path : str
+            The folder to watch.
+        poll_interval : float, optional
+            How often to check the folder if inotify isn't available, in
+            seconds. The default is 1.0.
+
+        '''
+        self.path = path
+        self.poll_interval = poll_interval
+        self._fd = None
+        if sys.platform.startswith('linux'):
+            self._fd = self._start_inotify(path)
+        if self._fd is None:
+            self._stats = self._scan()
+
+    @staticmethod
+    def _start_inotify(path):
+        # Use inotify from the C library directly, so that no other library is
+        # needed. Return None (and fall back to checking the folder) if it
+        # can't be used, e.g. on some network drives.
+        import ctypes
+        import ctypes.util
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno = True)
+            fd = libc.inotify_init1(IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(os.path.abspath(path)), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    @property
+    def method(self):
+        '''How the folder is watched: 'inotify' or 'polling'.'''
+        return 'inotify' if self._fd is not None else 'polling'
+
+    def _scan(self):
+        # The size and modification time of each TextGrid in the folder
+        stats = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if is_textgrid(entry.name):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    stats[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return stats
+
+    def changes(self, timeout):
+        '''
+        Waits for TextGrids in the folder to be saved or changed.
+
+        Parameters
+        ----------
+        timeout : float or None
+            The longest time to wait, in seconds, or None for no limit.
+
+        Returns
+        -------
+        files : set
+            The names of the TextGrids that have been saved or changed. This
+            may be empty, e.g. if nothing changed before the timeout, or
+            before the next check of the folder when inotify isn't used.
+
+        '''
+        if self._fd is None:
+            if timeout is None or timeout > self.poll_interval:
+                timeout = self.poll_interval
+            time.sleep(timeout)
+            stats = self._scan()
+            files = {file for file, stat in stats.items() if self._stats.get(file) != stat}
+            self._stats = stats
+            return files
+
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return set()
+        data = os.read(self._fd, 65536)
+        files = set()
+        position = 0
+        while position < len(data):
+            _, mask, _, length = _event_header.unpack_from(data, position)
+            position += _event_header.size
+            name = os.fsdecode(data[position:position + length].rstrip(b'\0'))
+            position += length
+
+            # If too many events happened at once, some were lost, so check
+            # every file in the folder
+            if mask & IN_Q_OVERFLOW:
+                files.update(file for file in os.listdir(self.path) if is_textgrid(file))
+            elif is_textgrid(name):
+                files.add(name)
+        return files
+
+    def close(self):
+        '''Stops watching the folder.'''
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def watch(process_batch, path, is_up_to_date, debounce = 2.0):
+    '''
+    Processes TextGrids as they are saved in a folder, until the script is
+    stopped with Ctrl+C.
+
+    Parameters
+    ----------
+    process_batch : function
+        Processes a list of TextGrid file names, e.g. with
+        textgrid_batch.run_batch().
+    path : str
+        The folder to watch.
+    is_up_to_date : function
+        Checks whether a TextGrid has already been processed and can be
+        ignored (e.g. because the script has just written it).
+    debounce : float, optional
+        How long a file must stay unchanged before it is processed, in
+        seconds. The default is 2.0.
+
+    Returns
+    -------
+    None.
+
+    '''
+    watcher = FolderWatcher(path)
+    print('Watching {} for new TextGrids ({}). Press Ctrl+C to stop.'.format(path, watcher.method))
+
+    # The last time each file that is waiting to be processed changed
+    waiting = {}
+    try:
+        while True:
+            now = time.monotonic()
+            timeout = max(0.0, min(waiting.values()) + debounce - now) if waiting else None
+            for file in watcher.changes(timeout):
+                waiting[file] = time.monotonic()
+
+            now = time.monotonic()
+            due = sorted(file for file, changed in waiting.items() if now - changed >= debounce)
+            for file in due:
+                del waiting[file]
+            due = [file for file in due if os.path.exists(os.path.join(path, file)) and not is_up_to_date(file)]
+            if due:
+                process_batch(due)
+    except KeyboardInterrupt:
+        print('\nStopped watching {}.'.format(path))
+    finally:
+        watcher.close()
@@ -20,6 +20,24 @@ folder and entering a command in the following format:
     
 If using Linux, you may need to replace 'python' with 'python3'.
 
+To see how long loading, transcribing and writing each file takes, add the
+--profile option, optionally followed by the name of a JSON file for the
+summary (default: profile.json), e.g.:
+
+    python transcribe_textgrids.py --profile transcribe_profile.json
+
+The progress (files per second and the estimated time left) is printed every
+few seconds. The textgrid_profile.py module must be saved in the same folder
+as this script to use this option.
+
+To read the TextGrids from a bundle made with textgrid_bundle.py instead of
+the TextGrids folder, add the --bundle option followed by the bundle, e.g.:
+
+    python transcribe_textgrids.py --bundle TextGrids.tgb
+
+The textgrid_bundle.py module must be saved in the same folder as this script
+to use this option.
+
 You may not be able to run this file from the IPS server, in which case,
 just copy everything to your computer and run it locally.
 
@@ -31,27 +49,64 @@ computer. You can do this by entering the following into the command prompt:
 """
 
 import os
+import argparse
 import textgrids
 
-# Specify folder path where the TextGrids are located
+parser = argparse.ArgumentParser(description = 'Write the text of the intervals on the \'text\' tier of each TextGrid to a text file.')
+parser.add_argument('--profile', metavar = 'JSON', nargs = '?', const = 'profile.json', default = None,
+                    help = 'measure the time spent on each stage of each file, print the progress and save a summary (default: profile.json)')
+parser.add_argument('--bundle', metavar = 'PATH', default = None,
+                    help = 'read the TextGrids from a bundle made with textgrid_bundle.py instead of the TextGrids folder')
+args = parser.parse_args()
+
+# Specify folder path where the TextGrids are located, or read the bundle
+# (which is only imported if needed, like textgrid_profile)
 path = "TextGrids/"
-dir_list = os.listdir(path)
+if args.bundle:
+    import textgrid_bundle
+    bundle = textgrid_bundle.Bundle(args.bundle)
+    dir_list = bundle.names()
+else:
+    dir_list = os.listdir(path)
 
 # Get a list of TextGrid files in the folder
 tg_list = [file for file in dir_list if 'practice' not in file and file.endswith('.TextGrid')]
 
+# Only measure the stages if asked to, so that the module isn't needed otherwise
+if args.profile:
+    import textgrid_profile
+    profile = textgrid_profile.BatchProfile(len(tg_list))
+
 # For each TextGrid file in the list...
 for file in tg_list:
+    if args.profile:
+        timer = textgrid_profile.StageTimer()
     
     # Load the file as a TextGrid in Python
-    tg = textgrids.TextGrid(path + file)
+    if args.bundle:
+        tg = textgrids.TextGrid()
+        tg.parse(bundle.read(file))
+    else:
+        tg = textgrids.TextGrid(path + file)
+    if args.profile:
+        timer.lap('load')
+    
+    # Collect the text of each interval
+    lines = [interval.text + '\n' for interval in tg['text']]
+    if args.profile:
+        timer.lap('transcribe')
     
     # Create a new text file and write each interval text to it
     with open(file[:-9] + '.txt', 'w') as transcript:
-        for interval in tg['text']:
-            transcript.write(interval.text + '\n')
+        transcript.writelines(lines)
+    if args.profile:
+        timer.lap('write')
+        profile.add(file, timer.times)
     
     # Print a message to check that the file has been successfully processed
     # (When transcript is opened, it acts as a TextIOWrapper object, which has 
     # a 'name' attribute that has to be accessed explicitly.)
-    print('Successfully created {}!'.format(transcript.name))
\ No newline at end of file
+    print('Successfully created {}!'.format(transcript.name))
+
+if args.profile:
+    profile.save(args.profile)
\ No newline at end of file